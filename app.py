@@ -16,8 +16,22 @@ Features:
     - Development mode with realistic sample data
 """
 
+from datetime import date
+from typing import cast
+
 import streamlit as st
-from utils.helpers import initialize_session_state, load_css
+from utils.helpers import (
+    carregar_dividas,
+    carregar_investimentos,
+    carregar_metas_reserva,
+    carregar_registro_importacoes,
+    carregar_transacoes,
+    carregar_transacoes_importadas,
+    initialize_session_state,
+    load_css,
+    sessao_de_exemplo,
+)
+from utils.dev_data import CENARIOS_DEV, gerar_cenario
 from utils.processing import processar_dados
 from ui.sidebar import render_sidebar
 from ui.tab_dashboard import render_dashboard
@@ -28,6 +42,8 @@ from ui.tab_dividas import render_dividas
 from ui.tab_investimentos import render_investimentos
 from ui.tab_planejamento import render_planejamento
 from ui.tab_configuracoes import render_configuracoes
+from ui.diagnostico import render_diagnostico
+from utils.profiling import rerun_registrado
 
 # ── Theme CSS blocks injected into the page ──────────────────────────────────
 _TEMA_CSS: dict[str, str] = {
@@ -97,105 +113,125 @@ st.set_page_config(
     initial_sidebar_state="expanded",
 )
 
-initialize_session_state()
-
-# Rebuild df_transacoes from persisted data on startup
-if st.session_state.df_transacoes is None and (
-    st.session_state.get("transacoes")
-    or st.session_state.get("transacoes_importadas")
-    or st.session_state.get("df_from_upload") is not None
-):
-    processar_dados()
-
-# ── Base CSS + theme overlay ─────────────────────────────────────────────────
-load_css("styles/main.css")
-
-tema_atual = st.session_state.get("tema", "Neutro")
-tema_css = _TEMA_CSS.get(tema_atual, _TEMA_CSS["Neutro"])
-st.markdown(f"<style>{tema_css}</style>", unsafe_allow_html=True)
-
-# ── Dev mode: load sample data ───────────────────────────────────────────────
-with st.sidebar:
-    st.markdown("---")
-    with st.expander("🛠️ Modo Desenvolvimento", expanded=False):
-        st.caption("Carrega dados simulados realistas para testar o dashboard sem arquivos reais.")
-        if st.button("▶️ Carregar dados de exemplo", use_container_width=True):
-            from utils.dev_data import (
-                gerar_transacoes_exemplo,
-                gerar_dividas_exemplo,
-                gerar_investimentos_exemplo,
-                gerar_metas_exemplo,
+# Closed even when st.rerun()/st.stop() or an error cut the script short
+with rerun_registrado():
+    initialize_session_state()
+
+    # Rebuild df_transacoes from persisted data on startup
+    if st.session_state.df_transacoes is None and (
+        st.session_state.get("transacoes")
+        or st.session_state.get("transacoes_importadas")
+        or st.session_state.get("df_from_upload") is not None
+    ):
+        processar_dados()
+
+    # ── Base CSS + theme overlay ─────────────────────────────────────────────
+    load_css("styles/main.css")
+
+    tema_atual = st.session_state.get("tema", "Neutro")
+    tema_css = _TEMA_CSS.get(tema_atual, _TEMA_CSS["Neutro"])
+    st.markdown(f"<style>{tema_css}</style>", unsafe_allow_html=True)
+
+    # ── Dev mode: load sample data ───────────────────────────────────────────
+    with st.sidebar:
+        st.markdown("---")
+        with st.expander("🛠️ Modo Desenvolvimento", expanded=False):
+            st.caption(
+                "Carrega dados simulados realistas para testar o dashboard sem arquivos reais. "
+                "Eles ficam só nesta sessão: nada é gravado e seus dados salvos não são alterados."
             )
-            membros = st.session_state.get("membros_familia", ["Douglas", "Família Conjunta"])
-            st.session_state.transacoes = gerar_transacoes_exemplo(membros=membros, meses=3)
-            st.session_state.dividas = gerar_dividas_exemplo()
-            st.session_state.investimentos = gerar_investimentos_exemplo()
-            st.session_state.metas_reserva = gerar_metas_exemplo()
-            if "renda_liquida" not in st.session_state or st.session_state.renda_liquida == 0.0:
-                st.session_state.renda_liquida = 10000.0
-            processar_dados()
-            st.success("Dados de exemplo carregados!")
-            st.rerun()
-
-        if st.button("🗑️ Limpar dados de exemplo", use_container_width=True, type="secondary"):
-            st.session_state.transacoes = []
-            st.session_state.transacoes_importadas = []
-            st.session_state.dividas = []
-            st.session_state.investimentos = []
-            st.session_state.metas_reserva = []
-            st.session_state.df_from_upload = None
-            st.session_state.df_transacoes = None
-            st.session_state.renda_liquida = 0.0
-            st.rerun()
-
-# ── Title ────────────────────────────────────────────────────────────────────
-st.title("👨‍👩‍👧‍👦 Dashboard Financeiro Familiar")
-
-render_sidebar()
-
-# ── Navigation tabs ──────────────────────────────────────────────────────────
-(
-    tab_dashboard,
-    tab_lancamentos,
-    tab_familia,
-    tab_extrato,
-    tab_planejamento,
-    tab_dividas,
-    tab_investimentos,
-    tab_config,
-) = st.tabs(
-    [
-        "📊 Dashboard",
-        "📝 Lançamentos",
-        "👥 Família",
-        "📋 Extrato",
-        "🎯 Planejamento",
-        "💳 Dívidas",
-        "📈 Investimentos",
-        "⚙️ Configurações",
-    ]
-)
-
-with tab_dashboard:
-    render_dashboard()
-
-with tab_lancamentos:
-    render_lancamentos()
-
-with tab_familia:
-    render_familia()
-
-with tab_extrato:
-    render_extrato()
-
-with tab_planejamento:
-    render_planejamento()
-
-with tab_dividas:
-    render_dividas()
-
-with tab_investimentos:
-    render_investimentos()
-
-with tab_config:
-    render_configuracoes()
+            cenario = cast(
+                str, st.selectbox("Volume de dados", list(CENARIOS_DEV.keys()), key="dev_cenario")
+            )
+            if st.button("▶️ Carregar dados de exemplo", use_container_width=True):
+                membros = st.session_state.get("membros_familia", ["Douglas", "Família Conjunta"])
+                dados = gerar_cenario(
+                    membros=membros, seed=42, fim=date.today(), **CENARIOS_DEV[cenario]
+                )
+                st.session_state.dados_exemplo = True
+                st.session_state.transacoes = dados["transacoes"]
+                st.session_state.transacoes_importadas = []
+                st.session_state.registro_importacoes = []
+                st.session_state.dividas = dados["dividas"]
+                st.session_state.investimentos = dados["investimentos"]
+                st.session_state.metas_reserva = dados["metas_reserva"]
+                st.session_state.df_from_upload = None
+                if "renda_liquida" not in st.session_state or st.session_state.renda_liquida == 0.0:
+                    st.session_state.renda_liquida = 10000.0
+                processar_dados()
+                st.success("Dados de exemplo carregados!")
+                st.rerun()
+
+            if sessao_de_exemplo():
+                st.warning("Usando dados de exemplo: alterações nesta sessão não são salvas.")
+                if st.button(
+                    "🗑️ Limpar dados de exemplo", use_container_width=True, type="secondary"
+                ):
+                    # Back to the saved data, which sample mode never wrote to.
+                    st.session_state.dados_exemplo = False
+                    st.session_state.transacoes = carregar_transacoes()
+                    st.session_state.transacoes_importadas = carregar_transacoes_importadas()
+                    st.session_state.registro_importacoes = carregar_registro_importacoes()
+                    st.session_state.dividas = carregar_dividas()
+                    st.session_state.investimentos = carregar_investimentos()
+                    st.session_state.metas_reserva = carregar_metas_reserva()
+                    st.session_state.df_from_upload = None
+                    st.session_state.df_transacoes = None
+                    st.session_state.versao_dados = None
+                    st.session_state.renda_liquida = 0.0
+                    st.rerun()
+
+    # ── Title ────────────────────────────────────────────────────────────────
+    st.title("👨‍👩‍👧‍👦 Dashboard Financeiro Familiar")
+
+    render_sidebar()
+
+    # ── Navigation tabs ──────────────────────────────────────────────────────
+    (
+        tab_dashboard,
+        tab_lancamentos,
+        tab_familia,
+        tab_extrato,
+        tab_planejamento,
+        tab_dividas,
+        tab_investimentos,
+        tab_config,
+    ) = st.tabs(
+        [
+            "📊 Dashboard",
+            "📝 Lançamentos",
+            "👥 Família",
+            "📋 Extrato",
+            "🎯 Planejamento",
+            "💳 Dívidas",
+            "📈 Investimentos",
+            "⚙️ Configurações",
+        ]
+    )
+
+    with tab_dashboard:
+        render_dashboard()
+
+    with tab_lancamentos:
+        render_lancamentos()
+
+    with tab_familia:
+        render_familia()
+
+    with tab_extrato:
+        render_extrato()
+
+    with tab_planejamento:
+        render_planejamento()
+
+    with tab_dividas:
+        render_dividas()
+
+    with tab_investimentos:
+        render_investimentos()
+
+    with tab_config:
+        render_configuracoes()
+
+# ── Diagnostics (opt-in: DFF_DIAGNOSTICO=1 or ?diagnostico=1) ────────────────
+render_diagnostico()
@@ -0,0 +1 @@
+"""Performance benchmarks for Dashboard Financeiro Familiar (run with --benchmarks)."""
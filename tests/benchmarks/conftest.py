@@ -0,0 +1,154 @@
+"""Fixtures for the benchmark suite: seeded datasets, scales and baselines.
+
+Baselines live in ``tests/benchmarks/baselines.json`` (mean, stddev and rounds
+per benchmark). Record them on the reference machine with::
+
+    pytest tests/benchmarks --benchmarks --atualizar-baseline
+
+Later runs with ``--benchmarks`` fail when a benchmark is slower than its
+baseline by more than ``LIMIAR_RELATIVO`` *and* the difference is significant
+under Welch's t-test (``T_CRITICO``).
+"""
+
+import json
+import math
+from datetime import date
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+import pandas as pd
+import pytest
+
+from utils.dev_data import gerar_historico_sintetico
+
+BASELINE_FILE = Path(__file__).parent / "baselines.json"
+LIMIAR_RELATIVO = 0.10
+T_CRITICO = 3.0
+
+ESCALAS = [
+    pytest.param(1_000, id="1k"),
+    pytest.param(100_000, id="100k", marks=pytest.mark.slow),
+    pytest.param(1_000_000, id="1m", marks=pytest.mark.slow),
+]
+
+# Rounds for the big scales (pedantic mode); 1k uses pytest-benchmark calibration.
+_ROUNDS = {100_000: 5, 1_000_000: 3}
+
+
+def gerar_dataset(n: int, seed: int = 42) -> pd.DataFrame:
+    """Generate a reproducible upload-shaped frame with exactly ``n`` rows.
+
+    Built on utils.dev_data.gerar_historico_sintetico (3 years, 4 members, 300
+    store codes) so the benchmarks exercise the same data as load testing.
+
+    Args:
+        n: Number of transactions.
+        seed: Random seed.
+
+    Returns:
+        DataFrame with ``date``, ``title`` and ``amount`` columns, as produced
+        by the sidebar column mapping.
+    """
+    meses, membros = 36, ["Douglas", "Esposa", "Filho", "Família Conjunta"]
+    por_mes = math.ceil(n / (meses * len(membros))) + 1
+    df = gerar_historico_sintetico(
+        meses=meses,
+        membros=membros,
+        transacoes_por_mes=por_mes,
+        seed=seed,
+        sufixos=300,
+        fim=date(2024, 12, 31),
+    )
+    df = df.sample(n=n, random_state=seed).reset_index(drop=True)
+    return df.rename(columns={"Data": "date", "Descrição": "title", "Valor": "amount"})[
+        ["date", "title", "amount"]
+    ]
+
+
+@pytest.fixture(scope="session")
+def categorias_bench() -> Dict[str, list]:
+    """Default categories shipped with the app."""
+    return {
+        "Alimentação": ["ifood", "restaurante", "mercado", "supermercado", "lanche"],
+        "Transporte": ["uber", "99", "transporte", "gasolina", "combustivel", "onibus"],
+        "Moradia": ["aluguel", "condominio", "luz", "internet", "agua", "vivo"],
+        "Saúde": ["farmacia", "remedio", "medico", "plano de saude", "drog", "cityfarma"],
+        "Lazer": ["cinema", "show", "bar", "viagem", "lazer", "netflix", "spotify"],
+        "Educação": ["escola", "faculdade", "curso", "livros"],
+        "Compras": ["lojas", "roupas", "compras", "amazon", "mercado livre"],
+        "Outros": [],
+    }
+
+
+@pytest.fixture(scope="session")
+def datasets() -> Callable[[int], pd.DataFrame]:
+    """Session-cached dataset factory keyed by size."""
+    cache: Dict[int, pd.DataFrame] = {}
+
+    def _get(n: int) -> pd.DataFrame:
+        if n not in cache:
+            cache[n] = gerar_dataset(n)
+        return cache[n]
+
+    return _get
+
+
+@pytest.fixture(scope="session")
+def baselines(request) -> Dict[str, Dict[str, float]]:
+    """Load stored baselines and, with --atualizar-baseline, rewrite them at the end."""
+    dados: Dict[str, Dict[str, float]] = {}
+    if BASELINE_FILE.exists():
+        dados = json.loads(BASELINE_FILE.read_text(encoding="utf-8"))
+    novos: Dict[str, Dict[str, float]] = {}
+    request.config._dff_baselines_novos = novos
+    yield dados
+    if request.config.getoption("--atualizar-baseline") and novos:
+        dados.update(novos)
+        BASELINE_FILE.write_text(
+            json.dumps(dados, indent=2, sort_keys=True) + "\n", encoding="utf-8"
+        )
+
+
+def _regressao_significativa(atual: Dict[str, float], base: Dict[str, float]) -> bool:
+    """Return True when ``atual`` is significantly slower than ``base``."""
+    if atual["mean"] <= base["mean"] * (1 + LIMIAR_RELATIVO):
+        return False
+    erro = math.sqrt(
+        atual["stddev"] ** 2 / max(atual["rounds"], 1)
+        + base["stddev"] ** 2 / max(base["rounds"], 1)
+    )
+    if erro == 0:
+        return True
+    return (atual["mean"] - base["mean"]) / erro > T_CRITICO
+
+
+@pytest.fixture
+def executar(benchmark, baselines, request) -> Callable[..., Any]:
+    """Run ``func`` under pytest-benchmark and check it against the baseline.
+
+    Usage: ``executar(escala, func, *args)``.
+    """
+
+    def _run(escala: int, func: Callable[..., Any], *args: Any) -> Any:
+        rounds = _ROUNDS.get(escala)
+        if rounds is None:
+            resultado = benchmark(func, *args)
+        else:
+            resultado = benchmark.pedantic(func, args=args, rounds=rounds, iterations=1)
+
+        if benchmark.stats is None:  # --benchmark-disable
+            return resultado
+        stats = benchmark.stats.stats
+        atual = {"mean": stats.mean, "stddev": stats.stddev, "rounds": stats.rounds}
+        chave = f"{request.node.module.__name__.rsplit('.', 1)[-1]}::{request.node.name}"
+        request.config._dff_baselines_novos[chave] = atual
+
+        base = baselines.get(chave)
+        if base is not None and not request.config.getoption("--atualizar-baseline"):
+            assert not _regressao_significativa(atual, base), (
+                f"Regressão em {chave}: média {atual['mean'] * 1000:.2f} ms vs baseline "
+                f"{base['mean'] * 1000:.2f} ms"
+            )
+        return resultado
+
+    return _run
@@ -0,0 +1,65 @@
+"""Benchmarks for utils.finance_models.
+
+Scale is the number of rows produced: schedule rows for the amortization
+functions and curve points for the dreams simulator.
+"""
+import pytest
+
+from tests.benchmarks.conftest import ESCALAS
+from utils.finance_models import (
+    calcular_resumo_divida,
+    gerar_cronograma_price,
+    gerar_cronograma_sac,
+    simular_meta_sonhos,
+)
+
+pytestmark = pytest.mark.benchmark
+
+_PARCELAS = 360
+_MESES_SIMULACAO = 600
+
+
+def _n_dividas(escala: int) -> int:
+    return max(escala // _PARCELAS, 1)
+
+
+@pytest.mark.parametrize("escala", ESCALAS)
+@pytest.mark.parametrize(
+    "gerador", [gerar_cronograma_price, gerar_cronograma_sac], ids=["price", "sac"]
+)
+def test_bench_cronograma(escala, gerador, executar):
+    """Generate 360-installment schedules until ``escala`` rows are produced."""
+    n = _n_dividas(escala)
+
+    def _run():
+        return [gerador(100_000.0 + i, 0.9, _PARCELAS) for i in range(n)]
+
+    resultado = executar(escala, _run)
+    assert len(resultado) == n
+
+
+@pytest.mark.parametrize("escala", ESCALAS)
+def test_bench_calcular_resumo_divida(escala, executar):
+    """Summarize a portfolio of 360-installment debts."""
+    n = _n_dividas(escala)
+
+    def _run():
+        return [
+            calcular_resumo_divida(50_000.0 + i, 1.1, _PARCELAS, 1 + i % _PARCELAS, "SAC")
+            for i in range(n)
+        ]
+
+    resultado = executar(escala, _run)
+    assert len(resultado) == n
+
+
+@pytest.mark.parametrize("escala", ESCALAS)
+def test_bench_simular_meta_sonhos(escala, executar):
+    """Run unreachable-goal simulations (full 600-month curves)."""
+    n = max(escala // _MESES_SIMULACAO, 1)
+
+    def _run():
+        return [simular_meta_sonhos(1e12, 100.0 + i, 0.5) for i in range(n)]
+
+    resultado = executar(escala, _run)
+    assert not resultado[0]["atingido"]
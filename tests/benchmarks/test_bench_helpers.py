@@ -0,0 +1,90 @@
+"""Benchmarks for utils.helpers text normalization and categorization."""
+import os
+
+import pytest
+
+from tests.benchmarks.conftest import ESCALAS
+from utils import categorias
+from utils.categorias import categorizar_serie, compilar_regras
+from utils.helpers import categorizar_despesa, normalizar_serie, normalizar_texto
+
+pytestmark = pytest.mark.benchmark
+
+
+@pytest.mark.parametrize("escala", ESCALAS)
+def test_bench_normalizar_texto(escala, datasets, executar):
+    """Normalize every description of the dataset."""
+    descricoes = datasets(escala)["title"].tolist()
+
+    def _run():
+        return [normalizar_texto(d) for d in descricoes]
+
+    resultado = executar(escala, _run)
+    assert len(resultado) == escala
+
+
+@pytest.mark.parametrize("escala", ESCALAS)
+def test_bench_normalizar_serie(escala, datasets, executar):
+    """Normalize the description column with the bulk API."""
+    descricoes = datasets(escala)["title"]
+
+    resultado = executar(escala, normalizar_serie, descricoes)
+    assert len(resultado) == escala
+
+
+@pytest.mark.parametrize("escala", ESCALAS)
+def test_bench_categorizar_despesa(escala, datasets, categorias_bench, executar):
+    """Categorize every description of the dataset."""
+    descricoes = datasets(escala)["title"].tolist()
+
+    def _run():
+        return [categorizar_despesa(d, categorias_bench) for d in descricoes]
+
+    resultado = executar(escala, _run)
+    assert len(resultado) == escala
+
+
+@pytest.mark.parametrize("escala", ESCALAS)
+def test_bench_categorizar_serie(escala, datasets, categorias_bench, executar):
+    """Categorize the description column with compiled rules."""
+    descricoes = datasets(escala)["title"]
+    regras = compilar_regras(categorias_bench)
+
+    resultado = executar(escala, categorizar_serie, descricoes, regras)
+    assert len(resultado) == escala
+
+
+@pytest.mark.parametrize("escala", ESCALAS)
+def test_bench_categorizar_serie_regras(escala, datasets, categorias_bench, executar):
+    """Categorize with regex, amount-range and person rules on top of the keywords."""
+    df = datasets(escala)
+    regras = compilar_regras({
+        "Combustível": ["re:^posto\\b.*", "posto valor:100..300"],
+        **categorias_bench,
+        "Grandes": ["valor:1000..", "re:pix.*pessoa pessoa:ana"],
+    })
+    pessoas = df["title"].str.len().map({10: "Ana"})
+
+    def _run():
+        return categorizar_serie(df["title"], regras, valores=df["amount"], pessoas=pessoas)
+
+    resultado = executar(escala, _run)
+    assert len(resultado) == escala
+
+
+@pytest.mark.skipif((os.cpu_count() or 1) < 2, reason="needs more than one CPU")
+@pytest.mark.parametrize("escala", ESCALAS)
+def test_bench_categorizar_serie_paralelo(
+    escala, datasets, categorias_bench, executar, monkeypatch
+):
+    """Categorize on the process pool (warm workers), for comparison with the serial run."""
+    monkeypatch.setattr(categorias, "MIN_UNICOS_PARALELO", 0)
+    descricoes = datasets(escala)["title"]
+    regras = compilar_regras(categorias_bench)
+    categorizar_serie(descricoes, regras, limiar=1)  # start the workers
+
+    try:
+        resultado = executar(escala, categorizar_serie, descricoes, regras, 1)
+    finally:
+        categorias.encerrar_pool()
+    assert len(resultado) == escala
@@ -0,0 +1,33 @@
+"""Benchmarks for utils.ofx."""
+import io
+
+import pytest
+
+from tests.benchmarks.conftest import ESCALAS
+from utils.ofx import importar_ofx
+
+pytestmark = pytest.mark.benchmark
+
+
+def _gerar_ofx(df) -> bytes:
+    """Render the dataset as an OFX 1.x (SGML) statement."""
+    linhas = ["OFXHEADER:100", "DATA:OFXSGML", "CHARSET:1252", "", "<OFX>", "<BANKTRANLIST>"]
+    for i, (data, titulo, valor) in enumerate(df.itertuples(index=False)):
+        linhas.append(
+            f"<STMTTRN><TRNTYPE>OTHER<DTPOSTED>{data.replace('-', '')}"
+            f"<TRNAMT>{valor:.2f}<FITID>{i}<MEMO>{titulo}"
+        )
+    linhas += ["</BANKTRANLIST>", "</OFX>"]
+    return "\n".join(linhas).encode("cp1252", errors="replace")
+
+
+@pytest.mark.parametrize("escala", ESCALAS)
+def test_bench_importar_ofx(escala, datasets, executar):
+    """Stream and dedup an OFX statement."""
+    conteudo = _gerar_ofx(datasets(escala))
+
+    def _run():
+        return importar_ofx(io.BytesIO(conteudo), [])
+
+    novos, duplicados = executar(escala, _run)
+    assert len(novos) == escala and duplicados == 0
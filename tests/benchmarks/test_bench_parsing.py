@@ -0,0 +1,31 @@
+"""Benchmarks for utils.parsing."""
+import pytest
+
+from tests.benchmarks.conftest import ESCALAS
+from utils.parsing import parsear_datas, parsear_valores
+
+pytestmark = pytest.mark.benchmark
+
+
+@pytest.mark.parametrize("escala", ESCALAS)
+def test_bench_parsear_datas(escala, datasets, executar):
+    """Parse dd/mm/yyyy dates as exported by Brazilian banks."""
+    datas = _datas_br(datasets(escala)["date"])
+
+    resultado = executar(escala, parsear_datas, datas)
+    assert resultado.notna().all()
+
+
+@pytest.mark.parametrize("escala", ESCALAS)
+def test_bench_parsear_valores(escala, datasets, executar):
+    """Parse "1.234,56" amounts."""
+    valores = datasets(escala)["amount"].map("{:,.2f}".format)
+    valores = valores.str.replace(",", "_").str.replace(".", ",").str.replace("_", ".")
+
+    resultado = executar(escala, parsear_valores, valores)
+    assert resultado.notna().all()
+
+
+def _datas_br(datas):
+    """Rewrite ISO date strings as dd/mm/yyyy."""
+    return datas.str[8:10] + "/" + datas.str[5:7] + "/" + datas.str[0:4]
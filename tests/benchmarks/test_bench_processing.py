@@ -0,0 +1,29 @@
+"""Benchmarks for utils.processing."""
+import pytest
+from unittest.mock import patch
+
+from tests.benchmarks.conftest import ESCALAS
+
+pytestmark = pytest.mark.benchmark
+
+
+@pytest.mark.parametrize("escala", ESCALAS)
+def test_bench_processar_dados(
+    escala, datasets, categorias_bench, executar, session_state_mock
+):
+    """Full processing of an uploaded statement."""
+    from utils.processing import processar_dados
+
+    session_state = session_state_mock(
+        {
+            "df_from_upload": datasets(escala),
+            "transacoes": [],
+            "transacoes_importadas": [],
+            "categories": categorias_bench,
+        }
+    )
+    with patch("utils.processing.st") as mock_st:
+        mock_st.session_state = session_state
+        executar(escala, processar_dados)
+
+    assert len(session_state["df_transacoes"]) == escala
@@ -0,0 +1,24 @@
+"""Benchmarks for utils.projecao (cash-flow forecast)."""
+import pytest
+
+from tests.benchmarks.conftest import ESCALAS
+from utils.processing import montar_transacoes
+from utils.projecao import HORIZONTE_MAXIMO, projetar_fluxo
+
+pytestmark = pytest.mark.benchmark
+
+
+@pytest.mark.parametrize("escala", ESCALAS)
+def test_bench_projetar_fluxo(escala, datasets, categorias_bench, executar):
+    """Forecast the longest horizon from a processed history."""
+    df = montar_transacoes([], [], categorias_bench, datasets(escala).copy())
+    dividas = [
+        {"valor_principal": 200000, "taxa_mensal": 0.008, "n_parcelas": 360,
+         "parcela_atual": 40, "sistema": "SAC"},
+        {"valor_principal": 30000, "taxa_mensal": 0.015, "n_parcelas": 48, "parcela_atual": 12},
+    ]
+
+    resultado = executar(
+        escala, projetar_fluxo, df, dividas, [{"aporte_mensal": 500}], None, HORIZONTE_MAXIMO
+    )
+    assert len(resultado) == HORIZONTE_MAXIMO
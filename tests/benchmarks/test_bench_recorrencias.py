@@ -0,0 +1,17 @@
+"""Benchmarks for utils.recorrencias (recurring-expense detection)."""
+import pytest
+
+from tests.benchmarks.conftest import ESCALAS
+from utils.processing import montar_transacoes
+from utils.recorrencias import detectar_recorrentes
+
+pytestmark = pytest.mark.benchmark
+
+
+@pytest.mark.parametrize("escala", ESCALAS)
+def test_bench_detectar_recorrentes(escala, datasets, categorias_bench, executar):
+    """Scan a processed history for monthly series."""
+    df = montar_transacoes([], [], categorias_bench, datasets(escala).copy())
+
+    resultado = executar(escala, detectar_recorrentes, df)
+    assert resultado["Confianca"].between(0.5, 1.0).all()
@@ -0,0 +1,46 @@
+"""Benchmarks for utils.saldo (dashboard balance chart series)."""
+import pandas as pd
+import plotly.graph_objects as go
+import pytest
+
+from tests.benchmarks.conftest import ESCALAS
+from utils.saldo import pontos_alvo, reduzir_serie, serie_saldo_diario
+
+pytestmark = pytest.mark.benchmark
+
+
+def _transacoes(df):
+    return pd.DataFrame({"Data": pd.to_datetime(df["date"]), "Valor": df["amount"]})
+
+
+@pytest.mark.parametrize("escala", ESCALAS)
+def test_bench_serie_saldo(escala, datasets, executar):
+    """End-of-day aggregation plus LTTB to a full-width chart."""
+    transacoes = _transacoes(datasets(escala))
+
+    def _run():
+        return reduzir_serie(serie_saldo_diario(transacoes), pontos_alvo(1400))
+
+    resultado = executar(escala, _run)
+    assert len(resultado) <= 1400
+
+
+@pytest.mark.parametrize("escala", ESCALAS)
+def test_bench_grafico_saldo_em_cache(escala, datasets, executar):
+    """Balance chart render on a warm figure cache (aggregation and build skipped)."""
+    from utils.graficos import figura_em_cache, limpar_figuras
+
+    transacoes = _transacoes(datasets(escala))
+
+    def _construir():
+        serie = reduzir_serie(serie_saldo_diario(transacoes), pontos_alvo(1400))
+        return go.Figure(go.Scatter(x=serie["Data"], y=serie["Saldo"], mode="lines"))
+
+    limpar_figuras()
+    figura_em_cache("bench.saldo", _construir, f"bench-{escala}")
+
+    def _run():
+        return figura_em_cache("bench.saldo", _construir, f"bench-{escala}")
+
+    resultado = executar(escala, _run)
+    assert len(resultado.data) == 1
@@ -0,0 +1,48 @@
+"""Benchmarks for the JSON stores (utils.helpers save/load on utils.serializacao)."""
+import pytest
+
+from tests.benchmarks.conftest import ESCALAS
+from utils import serializacao
+from utils.helpers import load_json, save_json
+
+pytestmark = pytest.mark.benchmark
+
+
+def _registros(df):
+    registros = df.rename(
+        columns={"date": "Data", "title": "Descrição", "amount": "Valor"}
+    ).to_dict("records")
+    for registro in registros:
+        registro["Pessoa"] = "Arquivo"
+        registro["Categoria_Manual"] = None
+    return registros
+
+
+@pytest.fixture(params=serializacao.BACKENDS_DISPONIVEIS)
+def backend(request):
+    """Benchmark every installed backend, restoring the default."""
+    anterior = serializacao.BACKEND
+    serializacao.definir_backend(request.param)
+    yield request.param
+    serializacao.definir_backend(anterior)
+
+
+@pytest.mark.parametrize("escala", ESCALAS[:2])
+def test_bench_save_json(escala, backend, datasets, executar, tmp_path):
+    """Atomically save a transaction store."""
+    registros = _registros(datasets(escala))
+    arquivo = str(tmp_path / "transacoes.json")
+
+    executar(escala, save_json, arquivo, registros)
+    assert load_json(arquivo, None) == registros
+
+
+@pytest.mark.parametrize("escala", ESCALAS[:2])
+def test_bench_load_json(escala, backend, datasets, executar, tmp_path):
+    """Load a transaction store with typed decoding."""
+    registros = _registros(datasets(escala))
+    arquivo = str(tmp_path / "transacoes.json")
+    save_json(arquivo, registros)
+
+    resultado = executar(escala, load_json, arquivo, [], serializacao.decodificar_transacoes)
+    assert len(resultado) == escala
@@ -0,0 +1,37 @@
+"""Benchmarks for utils.xlsx."""
+import io
+
+import openpyxl
+import pytest
+
+from tests.benchmarks.conftest import ESCALAS
+from utils.xlsx import ler_colunas_xlsx
+
+pytestmark = pytest.mark.benchmark
+
+# 1M rows is near Excel's sheet limit and takes minutes to write.
+ESCALAS_XLSX = ESCALAS[:2]
+
+
+def _gerar_xlsx(df) -> bytes:
+    """Write the dataset as a wide statement (three mapped + seven unused columns)."""
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(["Agência", "Conta", "date", "Lote", "title", "Doc", "amount", "A", "B", "C"])
+    for data, titulo, valor in df.itertuples(index=False):
+        ws.append(["0001", "12345", data, 1, titulo, "x", valor, "", "", ""])
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize("escala", ESCALAS_XLSX)
+def test_bench_ler_colunas_xlsx(escala, datasets, executar):
+    """Stream the three mapped columns of a wide spreadsheet."""
+    conteudo = _gerar_xlsx(datasets(escala))
+
+    def _run():
+        return ler_colunas_xlsx(io.BytesIO(conteudo), ["date", "title", "amount"])
+
+    resultado = executar(escala, _run)
+    assert len(resultado) == escala
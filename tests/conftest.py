@@ -1,5 +1,6 @@
 """Shared test fixtures and configuration."""
 import pytest
+import streamlit
 import sys
 from pathlib import Path
 
@@ -7,6 +8,37 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 
+class MockSessionState(dict):
+    """Mock streamlit SessionState that behaves like both dict and object."""
+
+    def __getattr__(self, key):
+        try:
+            return self[key]
+        except KeyError:
+            raise AttributeError(f"No attribute {key}")
+
+    def __setattr__(self, key, value):
+        self[key] = value
+
+
+@pytest.fixture
+def session_state_mock():
+    """Factory for dict-backed session states (``session_state_mock({...})``)."""
+    return MockSessionState
+
+
+@pytest.fixture
+def app_test(monkeypatch):
+    """streamlit.testing's AppTest, with the real streamlit importable by scripts.
+
+    tests/test_processing.py replaces streamlit in sys.modules at import.
+    """
+    monkeypatch.setitem(sys.modules, "streamlit", streamlit)
+    from streamlit.testing.v1 import AppTest
+
+    return AppTest
+
+
 @pytest.fixture
 def sample_categories():
     """Sample category dictionary for testing."""
@@ -46,3 +78,42 @@ def sample_transactions():
             "Pessoa": "Família"
         }
     ]
+
+
+@pytest.fixture(autouse=True)
+def classificacoes_isoladas(tmp_path, monkeypatch):
+    """Keep the persisted description classifications out of the working tree."""
+    from utils import categorias, helpers
+
+    monkeypatch.setattr(
+        helpers, "CLASSIFICACOES_FILE", str(tmp_path / helpers.CLASSIFICACOES_FILE)
+    )
+    categorias.limpar_classificacoes()
+    yield
+    categorias.limpar_classificacoes()
+
+
+def pytest_addoption(parser):
+    """Register opt-in switches for the benchmark suite."""
+    parser.addoption(
+        "--benchmarks",
+        action="store_true",
+        default=False,
+        help="Run the performance benchmarks in tests/benchmarks.",
+    )
+    parser.addoption(
+        "--atualizar-baseline",
+        action="store_true",
+        default=False,
+        help="Overwrite tests/benchmarks/baselines.json with the current timings.",
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    """Skip benchmark tests unless --benchmarks is given."""
+    if config.getoption("--benchmarks"):
+        return
+    skip = pytest.mark.skip(reason="benchmarks rodam apenas com --benchmarks")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
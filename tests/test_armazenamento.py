@@ -0,0 +1,117 @@
+"""Tests for utils.armazenamento module."""
+import json
+import os
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+from utils import armazenamento
+from utils.armazenamento import (
+    carregar_compartilhado,
+    compartilhado,
+    copia_para_edicao,
+    guardar_frame,
+    impressao_dados,
+    obter_frame,
+)
+
+
+@pytest.fixture(autouse=True)
+def loja_limpa():
+    """Start and end every test with an empty process-wide store."""
+    armazenamento.limpar()
+    yield
+    armazenamento.limpar()
+
+
+def _carregar(arquivo, chamadas):
+    def _run():
+        chamadas.append(1)
+        with open(arquivo, encoding="utf-8") as f:
+            return json.load(f)
+
+    return _run
+
+
+class TestCarregarCompartilhado:
+    """Test sharing of stores loaded from disk."""
+
+    def test_same_object_until_file_changes(self, tmp_path):
+        """Sessions get the same list until the file is rewritten."""
+        arquivo = tmp_path / "transacoes.json"
+        arquivo.write_text("[1, 2]", encoding="utf-8")
+        chamadas = []
+        primeira = carregar_compartilhado(str(arquivo), _carregar(arquivo, chamadas))
+        segunda = carregar_compartilhado(str(arquivo), _carregar(arquivo, chamadas))
+        assert primeira is segunda and len(chamadas) == 1
+
+        arquivo.write_text("[1, 2, 3]", encoding="utf-8")
+        os.utime(arquivo, ns=(0, os.stat(arquivo).st_mtime_ns + 1))
+        terceira = carregar_compartilhado(str(arquivo), _carregar(arquivo, chamadas))
+        assert terceira == [1, 2, 3] and len(chamadas) == 2
+
+    def test_missing_file_is_not_shared(self, tmp_path):
+        """A missing store loads the default and is never shared."""
+        vazio = carregar_compartilhado(str(tmp_path / "nada.json"), list)
+        assert vazio == [] and not compartilhado(vazio)
+
+    def test_copy_on_write(self, tmp_path):
+        """Editing takes a private copy of a shared list only."""
+        arquivo = tmp_path / "transacoes.json"
+        arquivo.write_text("[1]", encoding="utf-8")
+        base = carregar_compartilhado(str(arquivo), _carregar(arquivo, []))
+
+        editavel = copia_para_edicao(base)
+        editavel.append(2)
+        assert base == [1] and editavel == [1, 2]
+        assert copia_para_edicao(editavel) is editavel
+
+
+class TestFrames:
+    """Test sharing of processed frames."""
+
+    def test_fingerprint_depends_on_content(self):
+        """Equal inputs give equal keys; any change gives a new key."""
+        transacoes = [{"Data": "2024-01-01", "Valor": -1.0}]
+        assert impressao_dados(transacoes, {}) == impressao_dados(list(transacoes), {})
+        assert impressao_dados(transacoes, {}) != impressao_dados(transacoes, {"A": ["a"]})
+        assert impressao_dados([], [1]) != impressao_dados([1], [])
+
+    def test_shared_store_hashed_once(self, tmp_path):
+        """A shared store is hashed once per file version; private copies every time."""
+        arquivo = tmp_path / "transacoes.json"
+        arquivo.write_text('[{"Valor": 1.0}]', encoding="utf-8")
+        base = carregar_compartilhado(str(arquivo), _carregar(arquivo, []))
+        copia = copia_para_edicao(base)
+        with patch("utils.armazenamento._digest", wraps=armazenamento._digest) as digest:
+            chave = impressao_dados(base, {})
+            assert impressao_dados(base, {}) == chave
+            assert digest.call_count == 3  # base once, {} twice
+            assert impressao_dados(copia, {}) == chave
+            assert digest.call_count == 5
+
+    def test_first_frame_wins_and_lru(self, monkeypatch):
+        """Concurrent builds converge on one frame; old versions are evicted."""
+        monkeypatch.setattr(armazenamento, "MAX_VERSOES", 2)
+        df = pd.DataFrame({"a": [1]})
+        assert guardar_frame("v1", df) is df
+        assert guardar_frame("v1", df.copy()) is df
+
+        guardar_frame("v2", df.copy())
+        obter_frame("v1")  # refresh v1
+        guardar_frame("v3", df.copy())
+        assert obter_frame("v1") is df
+        assert obter_frame("v2") is None
+
+    def test_derived_results_do_not_evict_frames(self, monkeypatch):
+        """Each key namespace has its own LRU bound."""
+        monkeypatch.setattr(armazenamento, "MAX_VERSOES", 2)
+        df = pd.DataFrame({"a": [1]})
+        guardar_frame("v1", df)
+        for prefixo in ("saldo", "indice", "recorrentes", "projecao"):
+            for versao in range(3):
+                guardar_frame(f"{prefixo}:v{versao}", df.copy())
+        assert obter_frame("v1") is df
+        assert obter_frame("saldo:v0") is None
+        assert obter_frame("saldo:v2") is not None
@@ -0,0 +1,313 @@
+"""Tests for utils.categorias module."""
+import re
+import sys
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+import streamlit
+
+from utils import categorias
+from utils.categorias import (
+    ajustar_classificacoes,
+    carregar_classificacoes,
+    categorizar,
+    categorizar_serie,
+    compilar_regras,
+    encerrar_pool,
+    erro_regra,
+    impressao_categorias,
+    interpretar_regra,
+    limpar_cache_regras,
+    limpar_classificacoes,
+    normalizar_regra,
+    obter_regras,
+    salvar_classificacoes,
+    separar_palavras,
+)
+from utils.helpers import categorizar_despesa
+
+DESCRICOES = [
+    "iFood Delivery",
+    "UBER TRIP",
+    "Farmácia Pague Menos",
+    "Aluguel Apartamento",
+    "Netflix.com",
+    "Transferência",
+    "Supermercado Extra",
+]
+
+
+@pytest.fixture(autouse=True)
+def cache_limpo():
+    """Isolate the process-wide rules cache."""
+    limpar_cache_regras()
+    yield
+    limpar_cache_regras()
+
+
+class TestCompilarRegras:
+    """Test compiled categorization rules."""
+
+    def test_same_result_as_categorizar_despesa(self, sample_categories):
+        """Compiled matching agrees with the keyword scan."""
+        regras = compilar_regras(sample_categories)
+        esperado = [categorizar_despesa(d, sample_categories) for d in DESCRICOES]
+        assert [categorizar(d, regras) for d in DESCRICOES] == esperado
+        serie = pd.Series(DESCRICOES + DESCRICOES[:2], index=range(10, 19))
+        resultado = categorizar_serie(serie, regras)
+        assert resultado.tolist() == esperado + esperado[:2]
+        assert resultado.index.equals(serie.index)
+
+    def test_keywords_normalized_and_escaped(self):
+        """Accented/capitalized keywords match and regex characters are literal."""
+        regras = compilar_regras({"Saúde": ["Farmácia", "farmacia"], "Lojas": ["c&a", "a.b"]})
+        assert regras["palavras"]["Saúde"] == ("farmacia",)
+        assert categorizar("FARMACIA SAO JOAO", regras) == "Saúde"
+        assert categorizar("Loja C&A", regras) == "Lojas"
+        assert categorizar("axb", regras) == "Outros"
+
+    def test_priority_follows_dict_order(self):
+        """The first matching category wins, as in categorizar_despesa."""
+        regras = compilar_regras({"Mercado": ["mercado"], "Compras": ["mercado livre"]})
+        assert categorizar("Mercado Livre", regras) == "Mercado"
+
+
+def _script_compartilhamento():
+    """Runs inside a Streamlit script context, where st.cache_resource is active."""
+    import streamlit as st
+
+    from utils.categorias import categorizar, obter_regras
+
+    categorias = {"Saúde": ["farmacia"], "Outros": []}
+    primeira = obter_regras(categorias)
+    st.session_state.mesma = obter_regras(dict(categorias)) is primeira
+    novas = obter_regras({**categorias, "Pets": ["petz"]})
+    st.session_state.nova = novas is not primeira
+    st.session_state.pets = categorizar("PETZ", novas)
+    st.session_state.antiga = categorizar("PETZ", obter_regras(categorias))
+
+
+class TestObterRegras:
+    """Test the process-wide shared rules."""
+
+    def test_shared_by_content(self):
+        """Equal content returns the same instance; new content a new one."""
+        # tests/test_processing.py replaces streamlit in sys.modules at import
+        with patch.dict(sys.modules, {"streamlit": streamlit}):
+            from streamlit.testing.v1 import AppTest
+
+            at = AppTest.from_function(_script_compartilhamento).run()
+        assert not at.exception
+        assert at.session_state["mesma"] and at.session_state["nova"]
+        assert at.session_state["pets"] == "Pets"
+        assert at.session_state["antiga"] == "Outros"
+
+    def test_fingerprint(self, sample_categories):
+        """Rules carry the content hash of their categories."""
+        regras = obter_regras(sample_categories)
+        assert regras["impressao"] == impressao_categorias(dict(sample_categories))
+        assert regras["impressao"] != impressao_categorias({"Outros": []})
+
+
+class TestCategorizacaoParalela:
+    """Test classification of large histories on a process pool."""
+
+    @pytest.fixture(autouse=True)
+    def pool_encerrado(self, monkeypatch):
+        """Use the pool for small inputs; stop the worker processes after each test."""
+        monkeypatch.setattr(categorias, "MIN_UNICOS_PARALELO", 0)
+        yield
+        encerrar_pool()
+
+    def test_identical_to_serial(self, sample_categories):
+        """Sharded parallel classification returns the serial result, in order."""
+        regras = compilar_regras(sample_categories)
+        serie = pd.Series(
+            [f"{d} {i % 37}" for i, d in enumerate(DESCRICOES * 300)], index=range(5, 2105)
+        )
+        serial = categorizar_serie(serie, regras, limiar=0)
+        paralelo = categorizar_serie(serie, regras, limiar=1, processos=2)
+        pd.testing.assert_series_equal(paralelo, serial)
+
+    def test_pool_kept_per_ruleset(self, sample_categories):
+        """Workers are reused for the same rules and replaced when they change."""
+        serie = pd.Series(DESCRICOES * 4)
+        regras = compilar_regras(sample_categories)
+        categorizar_serie(serie, regras, limiar=1, processos=2)
+        pool = categorias._pool[2]
+        categorizar_serie(serie, regras, limiar=1, processos=2)
+        assert categorias._pool[2] is pool
+
+        novas = compilar_regras({"Streaming": ["netflix"], **sample_categories})
+        resultado = categorizar_serie(serie, novas, limiar=1, processos=2)
+        assert categorias._pool[2] is not pool
+        assert resultado[DESCRICOES.index("Netflix.com")] == "Streaming"
+
+    def test_replaced_pool_finishes_running_work(self, sample_categories):
+        """Another ruleset replacing the pool does not cancel a call still using it."""
+        regras = compilar_regras(sample_categories)
+        lotes = [np.array(["uber trip"], dtype=object)] * 16
+        with categorias._usar_pool(regras, 2) as executor:
+            pendentes = [executor.submit(categorias._classificar_lote, lote) for lote in lotes]
+            novas = compilar_regras({"Streaming": ["netflix"], **sample_categories})
+            categorizar_serie(pd.Series(DESCRICOES * 4), novas, limiar=1, processos=2)
+            assert categorias._pool[2] is not executor
+            depois = list(executor.map(categorias._classificar_lote, lotes))
+            assert [f.result()[0] for f in pendentes] == ["Transporte"] * 16
+            assert [r[0] for r in depois] == ["Transporte"] * 16
+        assert executor not in categorias._usos_pool
+
+
+class TestClassificacoesPersistidas:
+    """Test the persisted description → category cache."""
+
+    def test_known_descriptions_not_rematched(self, sample_categories):
+        """Cached descriptions are reused; only new ones are matched and added."""
+        regras = compilar_regras(sample_categories)
+        classificacoes = {"uber trip": "Lazer"}
+        resultado = categorizar_serie(pd.Series(["UBER TRIP", "iFood"]), regras,
+                                      classificacoes=classificacoes)
+        assert resultado.tolist() == ["Lazer", "Alimentação"]
+        assert classificacoes == {"uber trip": "Lazer", "ifood": "Alimentação"}
+
+    def test_keyword_edit_drops_only_affected(self, sample_categories):
+        """Adding or removing a keyword only invalidates descriptions containing it."""
+        antigas = compilar_regras(sample_categories)
+        classificacoes = {"uber trip": "Transporte", "netflix.com": "Lazer", "pix": "Outros"}
+        editadas = dict(sample_categories, Lazer=["cinema", "show", "bar"], Outros=["pix"])
+        ajustadas = ajustar_classificacoes(
+            classificacoes, antigas["palavras"], compilar_regras(editadas)
+        )
+        assert ajustadas == {"uber trip": "Transporte"}
+
+    def test_reorder_drops_everything(self, sample_categories):
+        """Changing category priority invalidates every classification."""
+        antigas = compilar_regras(sample_categories)
+        invertidas = dict(reversed(list(sample_categories.items())))
+        assert ajustar_classificacoes(
+            {"uber trip": "Transporte"}, antigas["palavras"], compilar_regras(invertidas)
+        ) == {}
+
+    def test_persisted_per_ruleset(self, sample_categories):
+        """Saved classifications are reloaded and adjusted to the current rules."""
+        regras = compilar_regras(sample_categories)
+        classificacoes = carregar_classificacoes(regras)
+        categorizar_serie(pd.Series(["UBER TRIP", "Cinema"]), regras,
+                          classificacoes=classificacoes)
+        salvar_classificacoes(regras)
+        limpar_classificacoes()
+        assert carregar_classificacoes(regras) == {
+            "uber trip": "Transporte", "cinema": "Lazer"
+        }
+
+        limpar_classificacoes()
+        sem_cinema = dict(sample_categories, Lazer=["show", "bar", "netflix"])
+        assert carregar_classificacoes(compilar_regras(sem_cinema)) == {
+            "uber trip": "Transporte"
+        }
+
+
+class TestLinguagemRegras:
+    """Test regex, amount-range and person rules."""
+
+    CATEGORIAS = {
+        "Viagem": ["re:UBER.*TRIP"],
+        "Combustível": ["posto valor:100..300"],
+        "Transporte": ["uber", "posto"],
+        "Família": ["pix pessoa:Ana"],
+        "Grandes": ["valor:1000.."],
+        "Outros": [],
+    }
+
+    def test_parsing(self):
+        """Terms are split into description regex, amount range and person."""
+        regra = interpretar_regra(normalizar_regra("Posto Shell valor:100..300,5 pessoa:Ana"))
+        assert regra.texto == re.escape("posto shell")
+        assert (regra.valor_min, regra.valor_max, regra.pessoa) == (100.0, 300.5, "ana")
+        assert regra.condicional
+        assert interpretar_regra("valor:..50").valor_min == -np.inf
+        assert interpretar_regra(normalizar_regra(r"re:\D+ TRIP")).texto == r"(?i:\D+ TRIP)"
+        assert normalizar_regra(" Farmácia ") == " farmacia "  # plain keywords unchanged
+        assert not interpretar_regra("plano de saude").condicional
+
+    def test_plain_words_are_one_phrase(self):
+        """Plain words of a keyword match together, as one literal phrase."""
+        regras = compilar_regras({"Delivery": ["ifood delivery"], "Outros": []})
+        assert categorizar("IFOOD DELIVERY SP", regras) == "Delivery"
+        assert categorizar("delivery ifood", regras) == "Outros"
+
+    def test_invalid_rules(self):
+        """Broken regexes and ranges are reported and ignored when compiling."""
+        assert "inválida" in erro_regra("re:uber(")
+        assert "inválida" in erro_regra("valor:abc")
+        assert erro_regra("posto valor:10..20") is None
+        regras = compilar_regras({"A": ["re:uber(", "uber"], "Outros": []})
+        assert categorizar("UBER", regras) == "A"
+
+    def test_rules_combine_safely(self):
+        """Each regex is validated as combined: flags are scoped, group references rejected."""
+        assert interpretar_regra("re:(?s)uber").texto == "(?i:(?s:uber))"
+        assert "inválida" in erro_regra("re:x(?i)y")
+        assert "grupos nomeados" in erro_regra("re:(?P<t>uber)")
+        assert "referências" in erro_regra(r"re:(b)\1")
+        assert erro_regra(r"re:a\\1") is None  # escaped backslash, not a reference
+        assert "inválida" in erro_regra("re:a)|(b")  # would balance once wrapped
+        regras = compilar_regras({
+            "A": ["re:(x)"],
+            "B": [r"re:(b)\1", "re:(?i)uber", "re:(?P<g>bb)"],
+            "C": ["re:(?P<g>cc)", "bb"],
+            "Outros": [],
+        })
+        assert categorizar("UBER", regras) == "B"
+        assert categorizar("bb", regras) == "C"
+
+    def test_separar_palavras(self):
+        """Commas inside regex quantifiers, classes and groups do not split keywords."""
+        assert separar_palavras(r"Farmácia, re:\d{2,4}x , posto re:[,.](a,b), uber") == [
+            "Farmácia", r"re:\d{2,4}x", "posto re:[,.](a,b)", "uber"
+        ]
+        assert separar_palavras(r"re:a\,b, care:x,y") == [r"re:a\,b", "care:x", "y"]
+
+    def test_priority_with_single_automaton(self):
+        """The first category wins, wherever its match is in the description."""
+        regras = compilar_regras({"A": ["trip"], "B": ["uber"], "Outros": []})
+        assert categorizar("uber trip", regras) == "A"
+        regras = compilar_regras(self.CATEGORIAS)
+        assert categorizar("Uber Eats Trip", regras) == "Viagem"
+        assert categorizar("Uber Eats", regras) == "Transporte"
+
+    def test_conditions_vectorized(self):
+        """Amount and person conditions are evaluated per row."""
+        regras = compilar_regras(self.CATEGORIAS)
+        descricoes = pd.Series(["Posto Ipiranga"] * 3 + ["PIX Mercado", "PIX Mercado", "Loja"],
+                               index=range(5, 11))
+        valores = pd.Series([-150.0, -50.0, -300.0, -20.0, -20.0, -2500.0], index=descricoes.index)
+        pessoas = pd.Series(["Bia", "Bia", None, "ANA", "Bia", "Ana"], index=descricoes.index)
+        resultado = categorizar_serie(descricoes, regras, valores=valores, pessoas=pessoas)
+        assert resultado.tolist() == [
+            "Combustível", "Transporte", "Combustível", "Família", "Outros", "Grandes"
+        ]
+        assert resultado.index.equals(descricoes.index)
+        sem_colunas = categorizar_serie(descricoes, regras)
+        assert sem_colunas.tolist() == ["Transporte"] * 3 + ["Outros"] * 3
+        assert categorizar("Posto", regras, valor=-120.0) == "Combustível"
+
+    def test_cache_keeps_description_only_result(self):
+        """Conditional overrides are not stored in the classifications cache."""
+        regras = compilar_regras(self.CATEGORIAS)
+        classificacoes = {}
+        categorizar_serie(pd.Series(["Posto"]), regras, classificacoes=classificacoes,
+                          valores=pd.Series([-150.0]))
+        assert classificacoes == {"posto": "Transporte"}
+        resultado = categorizar_serie(pd.Series(["Posto"]), regras,
+                                      classificacoes=classificacoes, valores=pd.Series([-150.0]))
+        assert resultado.tolist() == ["Combustível"]
+
+    def test_regex_edit_invalidates_matching_descriptions(self):
+        """An edited regex drops the descriptions it matches, not its literal text."""
+        antigas = compilar_regras({"A": ["uber"], "Outros": []})
+        novas = compilar_regras({"A": ["uber", "re:^pix.*mercado"], "Outros": []})
+        classificacoes = {"pix no mercado": "Outros", "uber": "A"}
+        assert ajustar_classificacoes(classificacoes, antigas["palavras"], novas) == {"uber": "A"}
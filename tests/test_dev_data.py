@@ -0,0 +1,136 @@
+"""Tests for utils.dev_data synthetic generators."""
+import os
+import tempfile
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from utils.dev_data import (
+    gerar_cenario,
+    gerar_dividas_sinteticas,
+    gerar_historico_sintetico,
+    gerar_investimentos_sinteticos,
+    gerar_transacoes_exemplo,
+    salvar_cenario,
+)
+from utils.finance_models import calcular_resumo_divida
+from utils.helpers import DIVIDAS_FILE, TRANSACOES_FILE, load_json
+
+
+class TestHistoricoSintetico:
+    """Test the vectorized transaction generator."""
+
+    def test_reproducible_with_seed(self):
+        """Same seed and parameters should produce identical data."""
+        a = gerar_historico_sintetico(meses=6, seed=7, fim=date(2024, 6, 1))
+        b = gerar_historico_sintetico(meses=6, seed=7, fim=date(2024, 6, 1))
+        pd.testing.assert_frame_equal(a, b)
+
+    def test_columns_and_period(self):
+        """Should cover exactly the requested months with the app's schema."""
+        df = gerar_historico_sintetico(meses=12, seed=1, fim=date(2024, 12, 15))
+        assert list(df.columns) == ["Data", "Descrição", "Valor", "Categoria_Manual", "Pessoa"]
+        meses = pd.to_datetime(df["Data"]).dt.to_period("M")
+        assert meses.min() == pd.Period("2024-01")
+        assert meses.max() == pd.Period("2024-12")
+        assert df["Data"].is_monotonic_increasing
+
+    def test_every_member_has_salary(self):
+        """Each member should receive one salary per month."""
+        membros = ["Ana", "Bia", "Caio"]
+        df = gerar_historico_sintetico(meses=4, membros=membros, seed=3, fim=date(2024, 4, 1))
+        salarios = df[df["Descrição"].str.startswith("Salário ")]
+        assert salarios.groupby("Pessoa").size().to_dict() == {m: 4 for m in membros}
+
+    def test_scales_with_members_and_rate(self):
+        """Row count should grow with members and transactions per month."""
+        pequeno = gerar_historico_sintetico(meses=12, transacoes_por_mes=5, seed=1)
+        grande = gerar_historico_sintetico(
+            meses=12, membros=[f"M{i}" for i in range(10)], transacoes_por_mes=50, seed=1
+        )
+        assert len(grande) > 20 * len(pequeno) / 2
+
+    def test_december_seasonality(self):
+        """Variable spending should peak in December."""
+        df = gerar_historico_sintetico(meses=48, transacoes_por_mes=40, seed=5)
+        var = df[~df["Categoria_Manual"].isin(["Receita", "Moradia"])].copy()
+        var["mes"] = pd.to_datetime(var["Data"]).dt.month
+        media = var.groupby("mes")["Valor"].mean().abs()
+        assert media.idxmax() == 12
+
+    def test_sufixos_add_variety(self):
+        """Store codes should multiply the distinct descriptions."""
+        base = gerar_historico_sintetico(meses=6, seed=2)
+        variado = gerar_historico_sintetico(meses=6, seed=2, sufixos=500)
+        assert variado["Descrição"].nunique() > 3 * base["Descrição"].nunique()
+
+    def test_gerar_transacoes_exemplo_records(self):
+        """Legacy helper should keep returning processar_dados-compatible dicts."""
+        registros = gerar_transacoes_exemplo(meses=2, seed=1)
+        assert registros and set(registros[0]) == {
+            "Data",
+            "Descrição",
+            "Valor",
+            "Categoria_Manual",
+            "Pessoa",
+        }
+
+
+class TestDividasInvestimentos:
+    """Test synthetic debts and investments."""
+
+    def test_dividas_are_valid(self):
+        """Every generated debt should be accepted by calcular_resumo_divida."""
+        dividas = gerar_dividas_sinteticas(500, seed=1)
+        assert len({d["id"] for d in dividas}) == 500
+        for d in dividas:
+            calcular_resumo_divida(
+                d["valor_principal"],
+                d["taxa_mensal"],
+                d["n_parcelas"],
+                d["parcela_atual"],
+                d["sistema"],
+                d["status"],
+            )
+
+    def test_investimentos_fields(self):
+        """Investments should carry positive applied values and ISO dates."""
+        investimentos = gerar_investimentos_sinteticos(200, seed=1)
+        assert all(inv["valor_aplicado"] > 0 for inv in investimentos)
+        assert all(len(inv["data_aplicacao"]) == 10 for inv in investimentos)
+
+    def test_investimentos_independent_of_today(self):
+        """Application dates are counted back from the reference date, not today."""
+        investimentos = gerar_investimentos_sinteticos(50, seed=1)
+        assert max(inv["data_aplicacao"] for inv in investimentos) <= "2024-12-01"
+        outro_dia = gerar_investimentos_sinteticos(50, seed=1, referencia=date(2025, 12, 31))
+        assert investimentos[0]["data_aplicacao"] < outro_dia[0]["data_aplicacao"]
+
+    def test_cenario_falls_back_to_examples(self):
+        """Zero synthetic debts/investments should use the hand-written examples."""
+        dados = gerar_cenario(meses=1, seed=1)
+        assert len(dados["dividas"]) == 3
+        assert len(dados["investimentos"]) == 3
+
+
+class TestSalvarCenario:
+    """Test writing scenarios to the app's JSON stores."""
+
+    def test_writes_loadable_files(self):
+        """Files should be readable back with load_json."""
+        with tempfile.TemporaryDirectory() as diretorio:
+            contagens = salvar_cenario(diretorio, meses=2, n_dividas=10, seed=1)
+            transacoes = load_json(os.path.join(diretorio, TRANSACOES_FILE), [])
+            dividas = load_json(os.path.join(diretorio, DIVIDAS_FILE), [])
+
+        assert len(transacoes) == contagens[TRANSACOES_FILE] > 0
+        assert len(dividas) == 10
+
+    @pytest.mark.parametrize("arquivo", ["transacoes_importadas.json"])
+    def test_custom_transactions_store(self, arquivo):
+        """Should allow writing transactions to the imported store."""
+        with tempfile.TemporaryDirectory() as diretorio:
+            salvar_cenario(diretorio, arquivo_transacoes=arquivo, meses=1, seed=1)
+            assert os.path.exists(os.path.join(diretorio, arquivo))
+            assert not os.path.exists(os.path.join(diretorio, TRANSACOES_FILE))
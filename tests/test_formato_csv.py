@@ -0,0 +1,96 @@
+"""Tests for utils.formato_csv module."""
+import codecs
+
+import pytest
+
+from utils.formato_csv import detectar_encoding, detectar_formato_csv
+from utils.importacao import amostrar_arquivo, detectar_formato, ler_arquivo_mapeado
+from utils.parsing import parsear_valores
+
+CSV_BB = (
+    "Extrato de Conta Corrente\n"
+    "Agência: 1234-5;Conta: 99999-9\n"
+    "\n"
+    "Data;Histórico;Documento;Valor\n"
+    "05/01/2024;Pagamento de Boleto - Condomínio;123;-1.234,56\n"
+    "06/01/2024;Pix recebido - João;456;2.000,00\n"
+    "07/01/2024;Tarifa Pacote Serviços;789;-35,90\n"
+)
+
+
+class TestDetectarEncoding:
+    """Test encoding detection on byte samples."""
+
+    def test_utf8(self):
+        """Valid UTF-8 is detected as such."""
+        assert detectar_encoding("Condomínio".encode("utf-8")) == "utf-8"
+
+    def test_utf8_bom(self):
+        """A BOM selects utf-8-sig so it is not read into the first header."""
+        assert detectar_encoding(codecs.BOM_UTF8 + b"a;b") == "utf-8-sig"
+
+    def test_cp1252(self):
+        """Windows exports with accents and curly quotes are cp1252."""
+        assert detectar_encoding("Serviços “Pix”".encode("cp1252")) == "cp1252"
+
+    def test_latin1_fallback(self):
+        """Bytes undefined in cp1252 fall back to latin-1."""
+        assert detectar_encoding(b"Servi\xe7os \x81") == "latin-1"
+
+    def test_truncated_multibyte_char(self):
+        """A UTF-8 character cut by the sample end is still UTF-8."""
+        assert detectar_encoding("Condomínio".encode("utf-8")[:6]) == "utf-8"
+
+
+class TestDetectarFormatoCsv:
+    """Test dialect sniffing."""
+
+    def test_semicolon_latin1_with_preamble(self):
+        """Typical Brazilian export: ';', decimal comma, cp1252 and a preamble."""
+        formato = detectar_formato_csv(CSV_BB.encode("cp1252"))
+        assert formato == {
+            "encoding": "cp1252",
+            "delimitador": ";",
+            "decimal": ",",
+            "linhas_ignoradas": 3,
+        }
+
+    def test_comma_with_quoted_decimal_comma(self):
+        """Decimal comma inside quotes cannot be the decimal option with sep=','."""
+        conteudo = 'data,descricao,valor\n05/01/2024,IFOOD,"-50,00"\n'.encode("utf-8")
+        formato = detectar_formato_csv(conteudo)
+        assert formato["delimitador"] == ","
+        assert formato["decimal"] == "."
+        assert formato["linhas_ignoradas"] == 0
+
+    @pytest.mark.parametrize("delimitador", [";", ",", "\t", "|"])
+    def test_delimiters(self, delimitador):
+        """Should detect each supported delimiter."""
+        linhas = ["date", "title", "amount"], ["2024-01-01", "Uber", "-10.50"]
+        texto = "\n".join(delimitador.join(linha) for linha in linhas * 3)
+        assert detectar_formato_csv(texto.encode("utf-8"))["delimitador"] == delimitador
+
+    def test_only_sample_is_inspected(self):
+        """Bytes past the sample size should not affect detection."""
+        conteudo = CSV_BB.encode("utf-8") + b"\xff\xfe" * 10_000
+        assert detectar_formato_csv(conteudo, tamanho=200)["encoding"] == "utf-8"
+
+    def test_empty(self):
+        """Empty files get the defaults."""
+        assert detectar_formato_csv(b"")["delimitador"] == ","
+
+
+class TestLeituraComFormato:
+    """Test that sniffed options drive the C parser."""
+
+    def test_sample_and_mapped_read(self):
+        """Preamble, delimiter, encoding and decimal should all be honored."""
+        conteudo = CSV_BB.encode("cp1252")
+        formato = detectar_formato("extrato.csv", conteudo)
+        amostra = amostrar_arquivo("extrato.csv", conteudo, formato)
+        assert list(amostra.columns) == ["Data", "Histórico", "Documento", "Valor"]
+
+        perfil = dict(formato, date="Data", title="Histórico", amount="Valor")
+        df = ler_arquivo_mapeado("extrato.csv", conteudo, perfil)
+        assert df["Descrição"].tolist()[1] == "Pix recebido - João"
+        assert parsear_valores(df["Valor"]).tolist() == pytest.approx([-1234.56, 2000.0, -35.90])
@@ -0,0 +1,84 @@
+"""Tests for utils.graficos module."""
+import json
+
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+import pytest
+
+from utils import graficos
+from utils.graficos import SEM_DADOS, chave_figura, figura_em_cache, limpar_figuras
+
+
+@pytest.fixture(autouse=True)
+def cache_limpo():
+    """Isolate the process-wide figure cache."""
+    limpar_figuras()
+    yield
+    limpar_figuras()
+
+
+class _Construtor:
+    """Figure builder that counts its calls."""
+
+    def __init__(self):
+        self.chamadas = 0
+
+    def __call__(self):
+        self.chamadas += 1
+        df = pd.DataFrame({
+            "Data": pd.date_range("2024-01-01", periods=3),
+            "Valor": [1.0, 2.5, -3.0],
+        })
+        fig = px.bar(df, x="Data", y="Valor", title="Teste")
+        fig.update_traces(marker_cornerradius=4)
+        return fig
+
+
+class TestFiguraEmCache:
+    """Test figure caching by chart, data version, inputs and theme."""
+
+    def test_hit_skips_builder_and_keeps_spec(self):
+        """A second render rebuilds the same spec without calling the builder."""
+        construir = _Construtor()
+        original = figura_em_cache("g", construir, "v1", filtros={"mes": "2024-01"})
+        cacheada = figura_em_cache("g", construir, "v1", filtros={"mes": "2024-01"})
+        assert construir.chamadas == 1
+        assert isinstance(cacheada, go.Figure)
+        assert cacheada is not original
+        assert json.loads(cacheada.to_json()) == json.loads(original.to_json())
+
+    def test_key_components(self):
+        """Version, inputs, theme and chart id each invalidate the entry."""
+        construir = _Construtor()
+        figura_em_cache("g", construir, "v1", filtros=("2024-01",), tema="Neutro")
+        figura_em_cache("g", construir, "v2", filtros=("2024-01",), tema="Neutro")
+        figura_em_cache("g", construir, "v2", filtros=("2024-02",), tema="Neutro")
+        figura_em_cache("g", construir, "v2", filtros=("2024-02",), tema="Escuro")
+        figura_em_cache("h", construir, "v2", filtros=("2024-02",), tema="Escuro")
+        assert construir.chamadas == 5
+
+    def test_unknown_version_not_cached(self):
+        """Without a data version every render builds the figure."""
+        construir = _Construtor()
+        figura_em_cache("g", construir, None)
+        figura_em_cache("g", construir, None)
+        assert construir.chamadas == 2
+        assert chave_figura("g", None) is None
+
+    def test_dict_inputs_order_independent(self):
+        """Dict inputs (e.g. budgets) hash by content, not insertion order."""
+        assert chave_figura("g", SEM_DADOS, {"a": 1, "b": [1, 2]}) == chave_figura(
+            "g", SEM_DADOS, {"b": [1, 2], "a": 1}
+        )
+
+    def test_lru_bound(self, monkeypatch):
+        """Only the most recently used MAX_FIGURAS specs are kept."""
+        monkeypatch.setattr(graficos, "MAX_FIGURAS", 2)
+        construir = _Construtor()
+        for versao in ("v1", "v2", "v1", "v3"):
+            figura_em_cache("g", construir, versao)
+        assert construir.chamadas == 3
+        figura_em_cache("g", construir, "v1")
+        figura_em_cache("g", construir, "v2")
+        assert construir.chamadas == 4
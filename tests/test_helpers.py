@@ -3,7 +3,15 @@ import pytest
 import os
 import json
 import tempfile
+import pandas as pd
+from unittest.mock import patch
+
+import utils.helpers as helpers
 from utils.helpers import (
+    _normalizar_str,
+    escrita_agrupada,
+    limpar_cache_normalizacao,
+    normalizar_serie,
     normalizar_texto,
     load_json,
     save_json,
@@ -40,6 +48,36 @@ class TestNormalizarTexto:
         assert "sao paulo" in result and "sp" in result
 
 
+class TestNormalizacaoCache:
+    """Test memoization and bulk normalization."""
+
+    def test_repeated_strings_hit_cache(self):
+        """Repeated descriptions should be served from the memo."""
+        limpar_cache_normalizacao()
+        for _ in range(5):
+            normalizar_texto("IFOOD *Restaurante")
+        info = _normalizar_str.cache_info()
+        assert info.misses == 1
+        assert info.hits == 4
+
+    def test_ascii_and_non_string_input(self):
+        """ASCII fast path and non-string input should match the slow path."""
+        assert normalizar_texto("UBER TRIP") == "uber trip"
+        assert normalizar_texto(123) == "123"
+
+    def test_normalizar_serie(self):
+        """Bulk API should preserve index and match normalizar_texto."""
+        serie = pd.Series(["Café", "UBER", "Café", "Açaí"], index=[10, 11, 12, 13], name="t")
+        resultado = normalizar_serie(serie)
+        assert resultado.tolist() == ["cafe", "uber", "cafe", "acai"]
+        assert list(resultado.index) == [10, 11, 12, 13]
+        assert resultado.name == "t"
+
+    def test_normalizar_serie_empty(self):
+        """Empty Series should return an empty Series."""
+        assert normalizar_serie(pd.Series([], dtype=object)).empty
+
+
 class TestJsonHandling:
     """Test JSON file operations."""
 
@@ -95,6 +133,87 @@ class TestJsonHandling:
                 os.unlink(temp_file)
 
 
+class TestSaveJsonAtomico:
+    """Test atomic and coalesced JSON writes."""
+
+    def test_compact_and_no_temp_left(self, tmp_path):
+        """Saves are compact and leave no temporary file behind."""
+        arquivo = tmp_path / "dados.json"
+        save_json(str(arquivo), {"a": [1, 2], "b": "ção"}, fsync=True)
+        assert arquivo.read_text(encoding="utf-8") == '{"a":[1,2],"b":"ção"}'
+        assert os.listdir(tmp_path) == ["dados.json"]
+
+    def test_failed_write_keeps_previous_file(self, tmp_path):
+        """A crash during serialization leaves the old content intact."""
+        arquivo = tmp_path / "dados.json"
+        save_json(str(arquivo), [1, 2, 3])
+        with pytest.raises(TypeError):
+            save_json(str(arquivo), [object()])
+        assert load_json(str(arquivo), None) == [1, 2, 3]
+        assert os.listdir(tmp_path) == ["dados.json"]
+
+    def test_failed_rename_removes_temp(self, tmp_path):
+        """If the rename fails the temp file is cleaned up."""
+        arquivo = tmp_path / "dados.json"
+        with patch("utils.helpers.os.replace", side_effect=OSError("disk")):
+            with pytest.raises(OSError):
+                save_json(str(arquivo), [1])
+        assert os.listdir(tmp_path) == []
+
+    @pytest.mark.skipif(os.name != "posix", reason="POSIX permission bits")
+    def test_keeps_file_permissions(self, tmp_path):
+        """Saving keeps the target's mode; new files get the umask default, not 0600."""
+        arquivo = tmp_path / "dados.json"
+        save_json(str(arquivo), [1])
+        assert arquivo.stat().st_mode & 0o777 == 0o666 & ~helpers._UMASK
+        os.chmod(arquivo, 0o640)
+        save_json(str(arquivo), [1, 2])
+        assert arquivo.stat().st_mode & 0o777 == 0o640
+
+    def test_coalesces_writes_per_file(self, tmp_path):
+        """Repeated saves inside the block produce one write with the last data."""
+        arquivo = str(tmp_path / "dados.json")
+        outro = str(tmp_path / "outro.json")
+        with patch("utils.helpers._gravar_json", wraps=helpers._gravar_json) as gravar:
+            with escrita_agrupada():
+                save_json(arquivo, [1])
+                save_json(arquivo, [1, 2])
+                save_json(outro, {})
+                with escrita_agrupada():
+                    save_json(arquivo, [1, 2, 3])
+                assert not os.path.exists(arquivo)
+                assert load_json(arquivo, None) == [1, 2, 3]
+        assert gravar.call_count == 2
+        assert load_json(arquivo, None) == [1, 2, 3]
+        assert load_json(outro, None) == {}
+
+    def test_flushes_when_block_raises(self, tmp_path):
+        """Saves made before an exception (e.g. st.rerun) are still written."""
+        arquivo = str(tmp_path / "dados.json")
+        with pytest.raises(RuntimeError):
+            with escrita_agrupada():
+                save_json(arquivo, ["ok"])
+                raise RuntimeError("rerun")
+        assert load_json(arquivo, None) == ["ok"]
+
+
+class TestDadosExemplo:
+    """Test that sample-data sessions never write the user's stores."""
+
+    def test_sample_session_does_not_save(self, tmp_path, monkeypatch, session_state_mock):
+        """Stores are written normally, and left untouched while sample data is loaded."""
+        arquivo = str(tmp_path / "transacoes.json")
+        monkeypatch.setattr(helpers, "TRANSACOES_FILE", arquivo)
+        sessao = session_state_mock({"transacoes": [{"Valor": 1.0}]})
+        with patch("utils.helpers.st") as mock_st:
+            mock_st.session_state = sessao
+            helpers.salvar_transacoes()
+            sessao.dados_exemplo = True
+            sessao.transacoes = []
+            helpers.salvar_transacoes()
+        assert load_json(arquivo, None) == [{"Valor": 1.0}]
+
+
 class TestCategorizarDespesa:
     """Test expense categorization function."""
 
@@ -0,0 +1,243 @@
+"""Tests for utils.importacao module."""
+import io
+
+import openpyxl
+import pytest
+
+from utils.importacao import (
+    LINHAS_DESCARTADAS,
+    amostrar_arquivo,
+    buscar_importacao,
+    chave_layout,
+    desfazer_importacao,
+    detectar_formato,
+    encontrar_perfil,
+    hash_conteudo,
+    impressao_layout,
+    importar_lote,
+    ler_arquivo_mapeado,
+    registrar_importacao,
+    registrar_perfil,
+)
+
+CSV_ITAU = (
+    "data,lançamento,ag./origem,valor\n"
+    "05/01/2024,IFOOD,0001,\"-50,00\"\n"
+    "06/01/2024,UBER TRIP,0001,\"-20,00\"\n"
+).encode("utf-8")
+
+CSV_ITAU_FEV = (
+    "data,lançamento,ag./origem,valor\n"
+    "06/01/2024,UBER TRIP,0001,\"-20,00\"\n"
+    "05/02/2024,FARMACIA,0001,\"-30,00\"\n"
+).encode("utf-8")
+
+OFX = b"""OFXHEADER:100
+<OFX><BANKACCTFROM><ACCTID>1<BANKTRANLIST>
+<STMTTRN><DTPOSTED>20240110<TRNAMT>-9.90<FITID>F1<MEMO>NETFLIX
+<STMTTRN><DTPOSTED>20240111<TRNAMT>-9.90<FITID>F1<MEMO>NETFLIX
+</BANKTRANLIST></OFX>
+"""
+
+
+def _xlsx() -> bytes:
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(["Data Mov.", "Histórico", "Docto", "Valor (R$)"])
+    ws.append(["2024-03-01", "Mercado", 1, -100.0])
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def perfis():
+    """Profiles for the CSV and XLSX layouts above."""
+    perfis = {}
+    registrar_perfil(
+        perfis,
+        ["data", "lançamento", "ag./origem", "valor"],
+        {"date": "data", "title": "lançamento", "amount": "valor"},
+        nome="Itaú",
+    )
+    registrar_perfil(
+        perfis,
+        ["Data Mov.", "Histórico", "Docto", "Valor (R$)"],
+        {"date": "Data Mov.", "title": "Histórico", "amount": "Valor (R$)"},
+        detectar_formato("mar.xlsx", b""),
+    )
+    return perfis
+
+
+class TestPerfis:
+    """Test mapping profiles keyed by layout fingerprint."""
+
+    def test_layout_key_ignores_case_and_accents(self):
+        """Equivalent headers should share a profile."""
+        assert chave_layout(["Data", "Lançamento"]) == chave_layout(["DATA", "lancamento"])
+
+    def test_fingerprint_includes_delimiter_and_encoding(self):
+        """Same header with another delimiter or encoding is another layout."""
+        colunas = ["data", "valor"]
+        utf8 = {"delimitador": ",", "encoding": "utf-8"}
+        base = impressao_layout(colunas, utf8)
+        assert base == impressao_layout(["DATA", "Valor"], utf8)
+        assert base != impressao_layout(colunas, {"delimitador": ";", "encoding": "utf-8"})
+        assert base != impressao_layout(colunas, {"delimitador": ",", "encoding": "cp1252"})
+
+    def test_profile_stores_reading_options(self, perfis):
+        """Profiles keep the header and reading options they were saved with."""
+        perfil = encontrar_perfil(["data", "lançamento", "ag./origem", "valor"], perfis)
+        assert perfil["delimitador"] == ","
+        assert perfil["encoding"] == "utf-8"
+        assert perfil["colunas"] == ["data", "lançamento", "ag./origem", "valor"]
+
+    def test_xlsx_profile_does_not_match_csv(self, perfis):
+        """A spreadsheet profile should not be used for a CSV with the same header."""
+        colunas = ["Data Mov.", "Histórico", "Docto", "Valor (R$)"]
+        assert encontrar_perfil(colunas, perfis) is None
+        assert encontrar_perfil(colunas, perfis, detectar_formato("a.xlsx", b"")) is not None
+
+    def test_encontrar_perfil(self, perfis):
+        """Known layouts return their mapping; unknown ones return None."""
+        perfil = encontrar_perfil(["data", "lançamento", "ag./origem", "valor"], perfis)
+        assert perfil["title"] == "lançamento"
+        assert perfil["nome"] == "Itaú"
+        assert encontrar_perfil(["outra", "coisa"], perfis) is None
+
+
+class TestLerArquivoMapeado:
+    """Test reading a single file into the imported schema."""
+
+    def test_csv_reads_only_mapped_columns(self, perfis):
+        """CSV should come back with the imported-transaction columns."""
+        perfil = encontrar_perfil(["data", "lançamento", "ag./origem", "valor"], perfis)
+        df = ler_arquivo_mapeado("jan.csv", CSV_ITAU, perfil)
+        assert list(df.columns) == ["Data", "Descrição", "Valor", "Pessoa", "Categoria_Manual"]
+        assert df["Descrição"].tolist() == ["IFOOD", "UBER TRIP"]
+
+    def test_malformed_lines_counted(self, perfis):
+        """Lines with extra fields are left out and counted, not read shifted."""
+        perfil = encontrar_perfil(["data", "lançamento", "ag./origem", "valor"], perfis)
+        conteudo = CSV_ITAU + b'07/01/2024,PADARIA, CAFE,0001,"-9,00"\n'
+        df = ler_arquivo_mapeado("jan.csv", conteudo, perfil)
+        assert df["Descrição"].tolist() == ["IFOOD", "UBER TRIP"]
+        assert df.attrs[LINHAS_DESCARTADAS] == 1
+        assert ler_arquivo_mapeado("jan.csv", CSV_ITAU, perfil).attrs[LINHAS_DESCARTADAS] == 0
+
+    def test_amostra(self):
+        """Sampling reads the header and at most the requested rows."""
+        amostra = amostrar_arquivo("jan.csv", CSV_ITAU, linhas=1)
+        assert list(amostra.columns) == ["data", "lançamento", "ag./origem", "valor"]
+        assert len(amostra) == 1
+
+    def test_unsupported_extension(self):
+        """Unknown formats should raise ValueError."""
+        with pytest.raises(ValueError):
+            ler_arquivo_mapeado("extrato.pdf", b"", None)
+
+
+class TestImportarLote:
+    """Test batch import."""
+
+    def test_dedup_across_batch_and_existing(self, perfis):
+        """Overlapping statements and repeated FITIDs are imported once."""
+        existentes = [
+            {"Data": "05/01/2024", "Descrição": "IFOOD", "Valor": "-50,00"},
+        ]
+        progresso = []
+        resultado = importar_lote(
+            [
+                ("jan.csv", CSV_ITAU),
+                ("fev.csv", CSV_ITAU_FEV),
+                ("cartao.ofx", OFX),
+                ("mar.xlsx", _xlsx()),
+            ],
+            perfis,
+            existentes,
+            max_workers=2,
+            progresso=lambda feitos, total, nome: progresso.append((feitos, total)),
+        )
+
+        descricoes = [r["Descrição"] for r in resultado["novos"]]
+        assert descricoes == ["UBER TRIP", "FARMACIA", "NETFLIX", "Mercado"]
+        assert resultado["duplicados"] == 3
+        assert resultado["erros"] == {}
+        assert progresso[-1] == (4, 4)
+
+    def test_records_are_json_friendly(self, perfis):
+        """CSV rows should not carry empty OFX fields or NaN."""
+        resultado = importar_lote([("a.ofx", OFX), ("jan.csv", CSV_ITAU)], perfis, [])
+        csv_rows = [r for r in resultado["novos"] if "FITID" not in r]
+        assert len(csv_rows) == 2
+        assert all("Conta" not in r for r in csv_rows)
+
+    def test_unknown_layout_and_errors(self, perfis):
+        """Files without profile or unreadable are reported, not imported."""
+        resultado = importar_lote(
+            [("novo.csv", b"a,b,c\n1,2,3\n"), ("quebrado.xlsx", b"nada")],
+            perfis,
+            [],
+        )
+        assert resultado["novos"] == []
+        assert resultado["sem_perfil"] == ["novo.csv"]
+        assert "quebrado.xlsx" in resultado["erros"]
+
+    def test_reports_malformed_lines(self, perfis):
+        """Files with malformed lines are listed with how many lines were left out."""
+        quebrado = CSV_ITAU_FEV + b'08/02/2024,PIX, JOAO,0001,"-5,00"\n'
+        resultado = importar_lote([("jan.csv", CSV_ITAU), ("fev.csv", quebrado)], perfis, [])
+        assert resultado["linhas_descartadas"] == {"fev.csv": 1}
+        assert len(resultado["novos"]) == 3
+
+
+class TestRegistroImportacoes:
+    """Test the content-hash import registry and rollback."""
+
+    def test_hash_bytes_and_stream_match(self):
+        """Bytes and a binary stream with the same content hash equally."""
+        assert hash_conteudo(CSV_ITAU) == hash_conteudo(io.BytesIO(CSV_ITAU))
+        assert hash_conteudo(CSV_ITAU) != hash_conteudo(CSV_ITAU_FEV)
+
+    def test_registrar_and_buscar(self):
+        """Registered hashes are found; unknown hashes are not."""
+        registro = []
+        lote = registrar_importacao(registro, [("jan.csv", "h1"), ("fev.csv", "h2")], 0, 4)
+        assert lote["id"] == 1
+        assert buscar_importacao(registro, "h2") is lote
+        assert buscar_importacao(registro, "h3") is None
+        assert registrar_importacao(registro, [("mar.csv", "h3")], 4, 5)["id"] == 2
+
+    def test_desfazer_removes_range_and_shifts_later(self):
+        """Rolling back a batch deletes its rows and shifts later ranges."""
+        importados = [{"n": i} for i in range(6)]
+        registro = []
+        registrar_importacao(registro, [("a", "ha")], 0, 2)
+        registrar_importacao(registro, [("b", "hb")], 2, 5)
+        registrar_importacao(registro, [("c", "hc")], 5, 6)
+
+        assert desfazer_importacao(registro, importados, 2) == 3
+        assert [r["n"] for r in importados] == [0, 1, 5]
+        assert buscar_importacao(registro, "hb") is None
+        ultimo = buscar_importacao(registro, "hc")
+        assert (ultimo["inicio"], ultimo["fim"]) == (2, 3)
+        assert desfazer_importacao(registro, importados, 99) == 0
+
+    def test_lote_skips_already_imported(self, perfis):
+        """Known hashes and same-content files under another name are skipped."""
+        registro = []
+        registrar_importacao(registro, [("jan.csv", hash_conteudo(CSV_ITAU))], 0, 2)
+        resultado = importar_lote(
+            [
+                ("janeiro_copia.csv", CSV_ITAU),
+                ("fev.csv", CSV_ITAU_FEV),
+                ("fev (1).csv", CSV_ITAU_FEV),
+                ("novo.csv", b"a,b,c\n1,2,3\n"),
+            ],
+            perfis,
+            [],
+            registro=registro,
+        )
+        assert resultado["ja_importados"] == ["janeiro_copia.csv", "fev (1).csv"]
+        assert resultado["hashes"] == [("fev.csv", hash_conteudo(CSV_ITAU_FEV))]
+        assert len(resultado["novos"]) == 2
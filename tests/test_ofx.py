@@ -0,0 +1,164 @@
+"""Tests for utils.ofx module."""
+import io
+
+import pytest
+
+from utils import ofx
+from utils.ofx import detectar_encoding_ofx, importar_ofx, iterar_transacoes_ofx
+
+OFX_SGML = """OFXHEADER:100
+DATA:OFXSGML
+VERSION:102
+ENCODING:USASCII
+CHARSET:1252
+
+<OFX>
+<BANKMSGSRSV1><STMTTRNRS><STMTRS>
+<CURDEF>BRL
+<BANKACCTFROM>
+<BANKID>0341
+<ACCTID>12345-6
+</BANKACCTFROM>
+<BANKTRANLIST>
+<DTSTART>20240101
+<STMTTRN>
+<TRNTYPE>DEBIT
+<DTPOSTED>20240105120000[-3:BRT]
+<TRNAMT>-50.00
+<FITID>A1
+<MEMO>IFOOD *Restaurante São João
+<STMTTRN>
+<TRNTYPE>CREDIT
+<DTPOSTED>20240110
+<TRNAMT>3000,00
+<FITID>A2
+<NAME>SALARIO
+</BANKTRANLIST>
+<LEDGERBAL><BALAMT>2950.00<DTASOF>20240131</LEDGERBAL>
+</STMTRS></STMTTRNRS>
+<STMTTRNRS><STMTRS>
+<BANKACCTFROM><ACCTID>99999-0</BANKACCTFROM>
+<BANKTRANLIST>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20240112<TRNAMT>-10.00<FITID>A1<MEMO>UBER</STMTTRN>
+</BANKTRANLIST>
+</STMTRS></STMTTRNRS></BANKMSGSRSV1>
+</OFX>
+"""
+
+OFX_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<?OFX OFXHEADER="200" VERSION="220"?>
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS>
+<BANKACCTFROM><ACCTID>777</ACCTID></BANKACCTFROM>
+<BANKTRANLIST>
+<STMTTRN><TRNTYPE>DEBIT</TRNTYPE><DTPOSTED>20240201</DTPOSTED>
+<TRNAMT>-12.34</TRNAMT><FITID>X1</FITID><MEMO>Padaria &amp; Café</MEMO></STMTTRN>
+</BANKTRANLIST>
+</STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+"""
+
+
+def _arquivo(texto: str, encoding: str = "cp1252") -> io.BytesIO:
+    return io.BytesIO(texto.encode(encoding))
+
+
+class TestIterarTransacoesOfx:
+    """Test streaming OFX parsing."""
+
+    def test_sgml_records(self):
+        """Should map SGML records without closing tags."""
+        registros = list(iterar_transacoes_ofx(_arquivo(OFX_SGML)))
+        assert len(registros) == 3
+        primeiro = registros[0]
+        assert primeiro["Data"] == "2024-01-05"
+        assert primeiro["Valor"] == -50.0
+        assert primeiro["Descrição"] == "IFOOD *Restaurante São João"
+        assert primeiro["FITID"] == "A1"
+        assert primeiro["Conta"] == "12345-6"
+
+    def test_name_and_comma_amount(self):
+        """NAME is used without MEMO and comma decimals are accepted."""
+        segundo = list(iterar_transacoes_ofx(_arquivo(OFX_SGML)))[1]
+        assert segundo["Descrição"] == "SALARIO"
+        assert segundo["Valor"] == 3000.0
+
+    def test_multiple_accounts(self):
+        """Each record should carry the account it belongs to."""
+        contas = [r["Conta"] for r in iterar_transacoes_ofx(_arquivo(OFX_SGML))]
+        assert contas == ["12345-6", "12345-6", "99999-0"]
+
+    def test_xml_records(self):
+        """Should parse OFX 2.x XML and unescape entities."""
+        registros = list(iterar_transacoes_ofx(_arquivo(OFX_XML, "utf-8")))
+        assert registros == [
+            {
+                "Data": "2024-02-01",
+                "Descrição": "Padaria & Café",
+                "Valor": -12.34,
+                "Pessoa": "Arquivo",
+                "Categoria_Manual": None,
+                "FITID": "X1",
+                "Conta": "777",
+            }
+        ]
+
+    def test_small_blocks(self, monkeypatch):
+        """Tokens split across read blocks should be reassembled."""
+        monkeypatch.setattr(ofx, "TAMANHO_BLOCO", 7)
+        monkeypatch.setattr(ofx, "_TAMANHO_CABECALHO", 5)
+        esperado = list(iterar_transacoes_ofx(_arquivo(OFX_SGML)))
+        monkeypatch.undo()
+        assert esperado == list(iterar_transacoes_ofx(_arquivo(OFX_SGML)))
+
+    def test_value_longer_than_block(self, monkeypatch):
+        """A tag value spanning whole blocks without any "<" is kept intact."""
+        monkeypatch.setattr(ofx, "TAMANHO_BLOCO", 16)
+        monkeypatch.setattr(ofx, "_TAMANHO_CABECALHO", 5)
+        memo = "PAGAMENTO " + "X" * 100
+        texto = OFX_SGML.replace("IFOOD *Restaurante São João", memo, 1)
+        assert list(iterar_transacoes_ofx(_arquivo(texto)))[0]["Descrição"] == memo
+
+    def test_invalid_records_skipped(self):
+        """Records without a valid date or amount are skipped."""
+        texto = "<OFX><BANKTRANLIST><STMTTRN><DTPOSTED>x<TRNAMT>1<STMTTRN><TRNAMT>1</OFX>"
+        assert list(iterar_transacoes_ofx(_arquivo(texto))) == []
+
+
+class TestEncoding:
+    """Test header encoding detection."""
+
+    @pytest.mark.parametrize(
+        "cabecalho,esperado",
+        [
+            (b"OFXHEADER:100\nCHARSET:1252\n", "cp1252"),
+            (b"OFXHEADER:100\nCHARSET:ISO-8859-1\n", "latin-1"),
+            (b'<?xml version="1.0" encoding="UTF-8"?>', "utf-8"),
+            (b"OFXHEADER:100\n", "cp1252"),
+        ],
+    )
+    def test_detectar_encoding(self, cabecalho, esperado):
+        """Should map OFX headers to Python codecs."""
+        assert detectar_encoding_ofx(cabecalho) == esperado
+
+
+class TestImportarOfx:
+    """Test FITID deduplication."""
+
+    def test_dedup_against_existing(self):
+        """Already imported (conta, FITID) pairs should be skipped."""
+        existentes = list(iterar_transacoes_ofx(_arquivo(OFX_SGML)))[:1]
+        novos, duplicados = importar_ofx(_arquivo(OFX_SGML), existentes)
+        assert duplicados == 1
+        assert [r["FITID"] for r in novos] == ["A2", "A1"]
+
+    def test_same_fitid_other_account_is_new(self):
+        """FITIDs are only unique per account."""
+        novos, duplicados = importar_ofx(_arquivo(OFX_SGML), [])
+        assert duplicados == 0
+        assert len(novos) == 3
+
+    def test_reimport_is_noop(self):
+        """Importing the same file twice adds nothing."""
+        novos, _ = importar_ofx(_arquivo(OFX_SGML), [])
+        novos2, duplicados = importar_ofx(_arquivo(OFX_SGML), novos)
+        assert novos2 == []
+        assert duplicados == 3
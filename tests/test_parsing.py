@@ -0,0 +1,112 @@
+"""Tests for utils.parsing module."""
+import pandas as pd
+import pytest
+
+from utils.parsing import (
+    chaves_transacoes,
+    detectar_formato_data,
+    parsear_datas,
+    parsear_valores,
+)
+
+
+class TestDetectarFormatoData:
+    """Test per-source date format detection."""
+
+    @pytest.mark.parametrize(
+        "valores,formato",
+        [
+            (["2024-01-05", "2024-12-31"], "%Y-%m-%d"),
+            (["05/01/2024", "31/12/2024"], "%d/%m/%Y"),
+            (["05/01/24", "31/12/24"], "%d/%m/%y"),
+            (["05/01/2024 10:30:00"], "%d/%m/%Y %H:%M:%S"),
+            (["20240105", "20241231"], "%Y%m%d"),
+        ],
+    )
+    def test_detects_bank_formats(self, valores, formato):
+        """Should detect the formats exported by Brazilian banks."""
+        assert detectar_formato_data(pd.Series(valores)) == formato
+
+    def test_prefers_day_first(self):
+        """Ambiguous dates should be read as dd/mm/yyyy."""
+        assert detectar_formato_data(pd.Series(["01/02/2024", "03/04/2024"])) == "%d/%m/%Y"
+
+    def test_no_dates(self):
+        """Should return None when nothing looks like a date."""
+        assert detectar_formato_data(pd.Series(["abc", None, ""])) is None
+
+
+class TestParsearDatas:
+    """Test vectorized date parsing."""
+
+    def test_brazilian_dates(self):
+        """Should parse dd/mm/yyyy as day-first."""
+        datas = parsear_datas(pd.Series(["01/02/2024", "15/03/2024"]))
+        assert datas.tolist() == [pd.Timestamp("2024-02-01"), pd.Timestamp("2024-03-15")]
+
+    def test_invalid_and_mixed_values(self):
+        """Outliers fall back to inference; garbage becomes NaT."""
+        datas = parsear_datas(pd.Series(["01/02/2024", "2024-04-01", "xyz", None]))
+        assert datas[0] == pd.Timestamp("2024-02-01")
+        assert datas[1] == pd.Timestamp("2024-04-01")
+        assert datas[2:].isna().all()
+
+    def test_datetime_passthrough(self):
+        """Already-parsed columns are returned unchanged."""
+        serie = pd.Series(pd.to_datetime(["2024-01-01"]))
+        assert parsear_datas(serie) is serie
+
+
+class TestParsearValores:
+    """Test vectorized amount parsing."""
+
+    @pytest.mark.parametrize(
+        "texto,esperado",
+        [
+            ("1.234,56", 1234.56),
+            ("-1.234,56", -1234.56),
+            ("R$ 1.234,56", 1234.56),
+            ("R$ -50,00", -50.0),
+            ("(10,00)", -10.0),
+            ("50,00-", -50.0),
+            ("1,234.56", 1234.56),
+            ("12.5", 12.5),
+            ("1.500", 1500.0),
+            ("-50.0", -50.0),
+            ("0,99", 0.99),
+        ],
+    )
+    def test_formats(self, texto, esperado):
+        """Should parse Brazilian and international notations."""
+        assert parsear_valores(pd.Series([texto]))[0] == pytest.approx(esperado)
+
+    def test_invalid_becomes_nan(self):
+        """Unparseable values become NaN."""
+        assert parsear_valores(pd.Series(["abc", None, ""])).isna().all()
+
+    def test_numeric_and_mixed_columns(self):
+        """Numbers pass through, also when mixed with strings."""
+        assert parsear_valores(pd.Series([1, -2.5])).tolist() == [1.0, -2.5]
+        mistos = parsear_valores(pd.Series([1.5, "2,5", None], dtype=object))
+        assert mistos[:2].tolist() == [1.5, 2.5]
+        assert pd.isna(mistos[2])
+
+
+class TestChavesTransacoes:
+    """Test dedup keys for imported rows."""
+
+    def test_equivalent_rows_share_key(self):
+        """Case, padding and amount notation should not change the key."""
+        df = pd.DataFrame(
+            {
+                "Data": ["01/02/2024", "01/02/2024 "],
+                "Descrição": ["Uber", " UBER"],
+                "Valor": ["-10,50", -10.5],
+            }
+        )
+        chaves = chaves_transacoes(df)
+        assert chaves[0] == chaves[1]
+
+    def test_empty(self):
+        """Empty frames produce no keys."""
+        assert len(chaves_transacoes(pd.DataFrame())) == 0
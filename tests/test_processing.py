@@ -21,6 +21,9 @@ class MockSessionState(dict):
         return dict.get(self, key, default)
 
 
+# Bind st.cache_resource in utils.categorias to the real streamlit first
+import utils.categorias  # noqa: E402,F401
+
 # Mock streamlit before importing processing
 sys.modules['streamlit'] = MagicMock()
 
@@ -268,3 +271,220 @@ class TestProcessarDados:
         result_df = session_state['df_transacoes']
         # First row should be the latest date
         assert result_df['Descrição'].iloc[0] == 'C'  # 2024-01-03
+
+    @patch('utils.processing.st')
+    def test_processar_dados_brazilian_formats(self, mock_st):
+        """Should parse dd/mm/yyyy dates and 1.234,56 amounts from imports."""
+        from utils.processing import processar_dados
+
+        importadas = [
+            {'Data': '05/02/2024', 'Descrição': 'Aluguel', 'Valor': '-1.234,56',
+             'Pessoa': 'Arquivo', 'Categoria_Manual': None},
+            {'Data': '10/02/2024', 'Descrição': 'Salário', 'Valor': '3.000,00',
+             'Pessoa': 'Arquivo', 'Categoria_Manual': None},
+        ]
+
+        session_state = MockSessionState({
+            'df_from_upload': None,
+            'transacoes': [],
+            'transacoes_importadas': importadas,
+            'categories': {"Moradia": ["aluguel"], "Outros": []},
+        })
+        mock_st.session_state = session_state
+
+        processar_dados()
+
+        result_df = session_state['df_transacoes'].set_index('Descrição')
+        assert result_df.loc['Aluguel', 'Valor'] == pytest.approx(-1234.56)
+        assert result_df.loc['Aluguel', 'Data'] == pd.Timestamp('2024-02-05')
+        assert result_df.loc['Salário', 'Tipo'] == 'Receita'
+
+    @patch('utils.processing.st')
+    def test_processar_dados_shared_across_sessions(self, mock_st, sample_transactions):
+        """Sessions with the same data share one frame; an edit gets its own."""
+        from utils import armazenamento
+        from utils.processing import processar_dados
+
+        armazenamento.limpar()
+        sessoes = [
+            MockSessionState({
+                'df_from_upload': None,
+                'transacoes': list(sample_transactions),
+                'categories': {"Alimentação": ["ifood"], "Outros": []},
+            })
+            for _ in range(2)
+        ]
+        for sessao in sessoes:
+            mock_st.session_state = sessao
+            processar_dados()
+        assert sessoes[0]['df_transacoes'] is sessoes[1]['df_transacoes']
+
+        sessoes[1]['transacoes'].append(
+            {'Data': '2024-02-01', 'Descrição': 'Uber', 'Valor': -20.0, 'Pessoa': 'Ana'}
+        )
+        mock_st.session_state = sessoes[1]
+        processar_dados()
+        assert len(sessoes[1]['df_transacoes']) == len(sessoes[0]['df_transacoes']) + 1
+        armazenamento.limpar()
+
+
+class TestPipeline:
+    """Test the pure pipeline stages (no session state involved)."""
+
+    CATEGORIAS = {"Alimentação": ["ifood"], "Moradia": ["aluguel"], "Outros": []}
+
+    def _fontes(self, sample_transactions):
+        importadas = [
+            {'Data': '05/02/2024', 'Descrição': 'IFOOD *LOJA', 'Valor': '-1.234,50',
+             'Pessoa': None, 'FITID': 'F1'},
+            {'Data': 'inválida', 'Descrição': 'Lixo', 'Valor': '-1,00', 'Pessoa': 'Ana'},
+            {'Data': '06/02/2024', 'Descrição': 'Estorno', 'Valor': '0,00', 'Pessoa': 'Ana'},
+        ]
+        return list(sample_transactions), importadas
+
+    def test_stages_match_wrapper(self, sample_transactions):
+        """Chaining the stages by hand gives the montar_transacoes frame."""
+        from utils.categorias import compilar_regras
+        from utils.processing import (
+            classificar, concatenar, derivar, montar_transacoes, ordenar, parsear,
+        )
+
+        transacoes, importadas = self._fontes(sample_transactions)
+        bruto = concatenar(transacoes, importadas)
+        assert bruto["_fonte"].tolist() == [0, 0, 0, 1, 1, 1]
+        df = ordenar(derivar(classificar(parsear(bruto), compilar_regras(self.CATEGORIAS))))
+        pd.testing.assert_frame_equal(
+            df, montar_transacoes(transacoes, importadas, self.CATEGORIAS)
+        )
+
+    def test_per_source_formats_and_types(self, sample_transactions):
+        """ISO and Brazilian sources parse side by side into the typed frame."""
+        from utils.processing import COLUNAS_PROCESSADAS, montar_transacoes
+
+        transacoes, importadas = self._fontes(sample_transactions)
+        df = montar_transacoes(transacoes, importadas, self.CATEGORIAS)
+        assert {c: str(df[c].dtype) for c in COLUNAS_PROCESSADAS} == COLUNAS_PROCESSADAS
+        assert len(df) == 4  # invalid date and zero amount dropped
+        ifood = df[df["Descrição"] == "IFOOD *LOJA"].iloc[0]
+        assert ifood["Data"] == pd.Timestamp("2024-02-05")
+        assert ifood["Valor"] == pytest.approx(-1234.5)
+        assert ifood["Categoria"] == "Alimentação"
+        assert ifood["Pessoa"] == "Não informada"
+        assert ifood["AnoMes"] == "2024-02"
+        assert df["Data"].is_monotonic_decreasing
+        assert montar_transacoes([], [], self.CATEGORIAS) is None
+
+    def test_stages_do_not_modify_inputs(self, sample_transactions):
+        """Each stage returns a new frame, so stage outputs can be cached."""
+        from utils.categorias import compilar_regras
+        from utils.processing import classificar, concatenar, derivar, parsear
+
+        transacoes, importadas = self._fontes(sample_transactions)
+        etapas = [
+            parsear,
+            lambda d: classificar(d, compilar_regras(self.CATEGORIAS)),
+            derivar,
+        ]
+        df = concatenar(transacoes, importadas)
+        for etapa in etapas:
+            antes = df.copy()
+            saida = etapa(df)
+            pd.testing.assert_frame_equal(df, antes)
+            df = saida
+
+
+class TestRecategorizacao:
+    """Test targeted re-categorization after a keywords edit."""
+
+    ANTIGAS = {"Alimentação": ["ifood", "padaria"], "Transporte": ["uber"], "Outros": []}
+
+    TRANSACOES = [
+        {'Data': '2024-01-01', 'Descrição': 'iFood Delivery', 'Valor': -50.0},
+        {'Data': '2024-01-02', 'Descrição': 'Uber Eats', 'Valor': -30.0},
+        {'Data': '2024-01-03', 'Descrição': 'UBER EATS', 'Valor': -25.0},
+        {'Data': '2024-01-04', 'Descrição': 'Padaria Pão', 'Valor': -10.0},
+        {'Data': '2024-01-05', 'Descrição': 'Uber Eats', 'Valor': -40.0,
+         'Categoria_Manual': 'Lazer'},
+        {'Data': '2024-01-06', 'Descrição': 'Uber Eats reembolso', 'Valor': 15.0},
+        {'Data': '2024-01-07', 'Descrição': 'Cinema', 'Valor': -20.0},
+    ]
+
+    def _recategorizar(self, novas):
+        from utils.categorias import compilar_regras
+        from utils.processing import indexar_descricoes, montar_transacoes, recategorizar
+
+        df = montar_transacoes(self.TRANSACOES, [], self.ANTIGAS)
+        antes = df.copy()
+        resultado = recategorizar(
+            df, indexar_descricoes(df), compilar_regras(self.ANTIGAS)["palavras"],
+            compilar_regras(novas),
+        )
+        pd.testing.assert_frame_equal(df, antes)
+        pd.testing.assert_frame_equal(resultado, montar_transacoes(self.TRANSACOES, [], novas))
+        return resultado.set_index("Descrição")["Categoria"]
+
+    def test_keyword_edit_matches_full_rebuild(self):
+        """Added and removed keywords move only matching rules-based rows."""
+        categoria = self._recategorizar(
+            {"Alimentação": ["ifood", "uber eats"], "Transporte": ["uber"], "Outros": []}
+        )
+        assert categoria["UBER EATS"] == "Alimentação"
+        assert categoria["Uber Eats reembolso"] == "Receita"
+        assert sorted(categoria["Uber Eats"]) == ["Alimentação", "Lazer"]
+        assert categoria["Padaria Pão"] == "Outros"
+
+    def test_priority_change_matches_full_rebuild(self):
+        """Reordering categories re-evaluates every description."""
+        categoria = self._recategorizar(
+            {"Transporte": ["uber"], "Alimentação": ["ifood", "padaria", "eats"], "Outros": []}
+        )
+        assert categoria["UBER EATS"] == "Transporte"
+
+    def test_unchanged_rules_keep_frame(self):
+        """Without keyword changes the frame is returned as is."""
+        from utils.categorias import compilar_regras
+        from utils.processing import indexar_descricoes, montar_transacoes, recategorizar
+
+        df = montar_transacoes(self.TRANSACOES, [], self.ANTIGAS)
+        regras = compilar_regras(self.ANTIGAS)
+        assert recategorizar(df, indexar_descricoes(df), regras["palavras"], regras) is df
+
+    @patch('utils.processing.st')
+    def test_session_gets_new_version(self, mock_st):
+        """The session frame and version follow the edit; the old frame is untouched."""
+        from utils import armazenamento
+        from utils.processing import atualizar_categorias, montar_transacoes, processar_dados
+
+        armazenamento.limpar()
+        sessao = MockSessionState({
+            'df_from_upload': None,
+            'transacoes': list(self.TRANSACOES),
+            'categories': self.ANTIGAS,
+        })
+        mock_st.session_state = sessao
+        processar_dados()
+        anterior, versao = sessao['df_transacoes'], sessao['versao_dados']
+
+        novas = {**self.ANTIGAS, "Lazer": ["cinema"]}
+        sessao['categories'] = novas
+        atualizar_categorias(self.ANTIGAS)
+        assert sessao['versao_dados'] != versao
+        assert (anterior["Categoria"] == "Lazer").sum() == 1
+        pd.testing.assert_frame_equal(
+            sessao['df_transacoes'], montar_transacoes(self.TRANSACOES, [], novas)
+        )
+        assert armazenamento.obter_frame(f"indice:{sessao['versao_dados']}") is not None
+
+        processar_dados()  # same data version: the patched frame is reused
+        assert armazenamento.obter_frame(sessao['versao_dados']) is sessao['df_transacoes']
+        armazenamento.limpar()
+
+    def test_conditional_rule_edit_matches_full_rebuild(self):
+        """Amount and person rules are re-evaluated on the affected rows."""
+        categoria = self._recategorizar({
+            "Mercado": ["uber eats valor:..26"],
+            **self.ANTIGAS,
+            "Lazer": ["valor:20"],
+        })
+        assert categoria["UBER EATS"] == "Mercado"
+        assert categoria["Cinema"] == "Lazer"
@@ -0,0 +1,148 @@
+"""Tests for utils.profiling module."""
+import json
+import tracemalloc
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from utils import profiling
+from utils.profiling import (
+    exportar_json,
+    finalizar_rerun,
+    iniciar_rerun,
+    instrumentar,
+    medir,
+    rerun_registrado,
+    resumo_secoes,
+)
+
+
+@pytest.fixture
+def mock_st(monkeypatch, session_state_mock):
+    """Streamlit mock with an empty session and diagnostics enabled."""
+    monkeypatch.setenv(profiling.DIAGNOSTICO_ENV, "1")
+    st_mock = MagicMock()
+    st_mock.session_state = session_state_mock()
+    with patch("utils.profiling.st", st_mock):
+        yield st_mock
+    profiling._local.atual = None
+
+
+class TestMedir:
+    """Test section timing."""
+
+    def test_noop_without_rerun(self):
+        """Should run the block normally when nothing is being recorded."""
+        profiling._local.atual = None
+        with medir("qualquer"):
+            valor = 1 + 1
+        assert valor == 2
+
+    def test_records_sections_and_nesting(self, mock_st):
+        """Should record each section with its nesting level."""
+        iniciar_rerun(medir_memoria=False)
+        with medir("externo"):
+            with medir("interno"):
+                pass
+        resumo = finalizar_rerun()
+
+        nomes = {s["nome"]: s for s in resumo["secoes"]}
+        assert nomes["externo"]["nivel"] == 0
+        assert nomes["interno"]["nivel"] == 1
+        assert resumo["total_ms"] >= nomes["externo"]["ms"]
+
+    def test_instrumentar_uses_function_name(self, mock_st):
+        """Decorated functions should be timed under their own name."""
+
+        @instrumentar
+        def render_teste():
+            return "ok"
+
+        iniciar_rerun(medir_memoria=False)
+        assert render_teste() == "ok"
+        resumo = finalizar_rerun()
+        assert [s["nome"] for s in resumo["secoes"]] == ["render_teste"]
+
+    def test_disabled_records_nothing(self, mock_st, monkeypatch):
+        """Should not record when diagnostics are disabled."""
+        monkeypatch.setenv(profiling.DIAGNOSTICO_ENV, "0")
+        mock_st.experimental_get_query_params.return_value = {}
+        iniciar_rerun(medir_memoria=False)
+        assert finalizar_rerun() is None
+
+
+class TestMemoria:
+    """Test that tracemalloc only runs while a rerun measures memory."""
+
+    def test_tracing_stops_after_rerun(self, mock_st):
+        """Tracing starts with the rerun and stops when it is finalized."""
+        assert not tracemalloc.is_tracing()
+        iniciar_rerun()
+        assert tracemalloc.is_tracing()
+        with medir("alocacao"):
+            dados = [0] * 100_000
+        resumo = finalizar_rerun()
+        assert not tracemalloc.is_tracing()
+        assert resumo["secoes"][0]["mem_kb"] > 0
+        del dados
+
+    def test_tracing_stops_when_disabled(self, mock_st, monkeypatch):
+        """An unfinished rerun releases tracing once diagnostics are turned off."""
+        iniciar_rerun()
+        monkeypatch.setenv(profiling.DIAGNOSTICO_ENV, "0")
+        mock_st.experimental_get_query_params.return_value = {}
+        iniciar_rerun()
+        assert not tracemalloc.is_tracing()
+
+    def test_tracing_stops_when_script_raises(self, mock_st):
+        """A script cut short by an exception (e.g. st.rerun) is closed as interrupted."""
+        with pytest.raises(RuntimeError):
+            with rerun_registrado():
+                assert tracemalloc.is_tracing()
+                raise RuntimeError("rerun")
+        assert not tracemalloc.is_tracing()
+        with rerun_registrado():
+            pass
+        reruns = list(mock_st.session_state["_diagnostico_reruns"])
+        assert [r["interrompido"] for r in reruns] == [True, False]
+
+
+class TestHistorico:
+    """Test ring buffer, aggregation and export."""
+
+    def test_interrupted_rerun_is_kept(self, mock_st):
+        """A rerun cut short by st.rerun() should be stored as interrupted."""
+        iniciar_rerun(medir_memoria=False)
+        iniciar_rerun(medir_memoria=False)
+        finalizar_rerun()
+
+        reruns = list(mock_st.session_state["_diagnostico_reruns"])
+        assert [r["interrompido"] for r in reruns] == [True, False]
+
+    def test_ring_buffer_is_bounded(self, mock_st):
+        """Should keep only the last MAX_RERUNS reruns."""
+        for _ in range(profiling.MAX_RERUNS + 5):
+            iniciar_rerun(medir_memoria=False)
+            finalizar_rerun()
+        assert len(mock_st.session_state["_diagnostico_reruns"]) == profiling.MAX_RERUNS
+
+    def test_resumo_secoes(self):
+        """Should aggregate durations per section, slowest first."""
+        reruns = [
+            {"secoes": [{"nome": "a", "ms": 10.0, "mem_kb": 1.0}, {"nome": "b", "ms": 1.0}]},
+            {"secoes": [{"nome": "a", "ms": 30.0, "mem_kb": 3.0}]},
+        ]
+        resumo = resumo_secoes(reruns)
+        assert resumo[0]["Seção"] == "a"
+        assert resumo[0]["Chamadas"] == 2
+        assert resumo[0]["Média (ms)"] == pytest.approx(20.0)
+        assert resumo[0]["Máx (ms)"] == pytest.approx(30.0)
+        assert resumo[0]["Memória média (KB)"] == pytest.approx(2.0)
+        assert resumo[1]["Memória média (KB)"] is None
+
+    def test_exportar_json(self):
+        """Export should be valid JSON with raw reruns and summary."""
+        reruns = [{"inicio": "x", "total_ms": 5.0, "secoes": [{"nome": "a", "ms": 5.0}]}]
+        payload = json.loads(exportar_json(reruns))
+        assert payload["reruns"] == reruns
+        assert payload["resumo"][0]["Seção"] == "a"
@@ -0,0 +1,133 @@
+"""Tests for utils.projecao module."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import armazenamento
+from utils.finance_models import gerar_cronograma_price
+from utils.projecao import (
+    COLUNAS_PROJECAO,
+    HORIZONTE_MAXIMO,
+    fatores_sazonais,
+    historico_mensal,
+    obter_projecao,
+    parcelas_por_mes,
+    projetar_fluxo,
+)
+
+
+def _historico(meses=24, salario=5000.0, gasto=3000.0, decimo_terceiro=True):
+    """Monthly salary and spending, with a 13th salary every December."""
+    datas = pd.date_range("2023-01-01", periods=meses, freq="MS") + pd.Timedelta(days=4)
+    receitas = np.full(meses, salario)
+    if decimo_terceiro:
+        receitas[datas.month == 12] *= 2
+    linhas = pd.DataFrame({
+        "Data": np.concatenate([datas, datas]),
+        "Tipo": ["Receita"] * meses + ["Despesa"] * meses,
+        "ValorAbs": np.concatenate([receitas, np.full(meses, gasto)]),
+    })
+    linhas["Valor"] = np.where(linhas["Tipo"] == "Receita", 1, -1) * linhas["ValorAbs"]
+    return linhas
+
+
+class TestHistorico:
+    """Tests for historico_mensal and fatores_sazonais."""
+
+    def test_months_without_data_are_zero(self):
+        """Gaps in the history become zero-valued months."""
+        df = _historico(meses=3).drop(index=[1, 4])
+        historico = historico_mensal(df)
+        assert len(historico) == 3
+        assert historico.iloc[1].tolist() == [0.0, 0.0]
+
+    def test_december_factor(self):
+        """The 13th salary raises December's factor, shrunk by the years observed."""
+        serie = historico_mensal(_historico())["Receitas"]
+        fatores = fatores_sazonais(serie)
+        media = serie.mean()
+        assert fatores[11] == pytest.approx(1 + (10000 / media - 1) * 2 / 3)
+        assert fatores[0] < 1 < fatores[11]
+
+    def test_short_history_has_no_seasonality(self):
+        """Less than a year of history leaves every factor at 1."""
+        serie = historico_mensal(_historico(meses=11))["Receitas"]
+        assert fatores_sazonais(serie).tolist() == [1.0] * 12
+
+
+class TestParcelas:
+    """Tests for parcelas_por_mes."""
+
+    def test_remaining_installments_only(self):
+        """A debt stops weighing after its last installment; paid-off debts are ignored."""
+        dividas = [
+            {"valor_principal": 1200, "taxa_mensal": 0.01, "n_parcelas": 12,
+             "parcela_atual": 10, "sistema": "PRICE", "status": "Ativa"},
+            {"valor_principal": 5000, "taxa_mensal": 0.02, "n_parcelas": 24,
+             "parcela_atual": 1, "sistema": "SAC", "status": "Quitada"},
+            {"valor_principal": "x", "taxa_mensal": 0.01, "n_parcelas": 0},
+        ]
+        parcela = gerar_cronograma_price(1200, 0.01, 12)[0]["valor_parcela"]
+        total = parcelas_por_mes(dividas, 6)
+        assert total[:3] == pytest.approx([parcela] * 3)
+        assert total[3:].tolist() == [0.0] * 3
+
+
+class TestProjetarFluxo:
+    """Tests for projetar_fluxo."""
+
+    def test_balance_continues_from_history(self):
+        """The forecast starts after the last month and accumulates from the current balance."""
+        df = _historico(decimo_terceiro=False)
+        projecao = projetar_fluxo(df, horizonte=3)
+        assert list(projecao.columns) == COLUNAS_PROJECAO
+        assert projecao["Mes"].iloc[0] == pd.Timestamp("2025-01-01")
+        assert projecao["Fluxo"].tolist() == pytest.approx([2000.0] * 3)
+        saldo = df["Valor"].sum()
+        assert projecao["Saldo"].tolist() == pytest.approx([saldo + 2000 * i for i in (1, 2, 3)])
+
+    def test_fixed_outflows_come_out_of_spending(self):
+        """Recurring expenses, contributions and installments replace part of the spending."""
+        df = _historico(decimo_terceiro=False)
+        recorrentes = pd.DataFrame({"Descrição": ["Aluguel"], "Valor": [1000.0]})
+        dividas = [{"valor_principal": 1200, "taxa_mensal": 0.0, "n_parcelas": 12,
+                    "parcela_atual": 11}]
+        projecao = projetar_fluxo(
+            df, dividas, [{"aporte_mensal": 500}], recorrentes, horizonte=3
+        )
+        assert projecao["DespesasVariaveis"].tolist() == pytest.approx([1400.0] * 3)
+        assert projecao["Parcelas"].tolist() == pytest.approx([100.0, 100.0, 0.0])
+        # Spending the history already contains is unchanged; the finished debt frees cash.
+        assert projecao["Fluxo"].tolist() == pytest.approx([2000.0, 2000.0, 2100.0])
+
+    def test_seasonal_income(self):
+        """December is projected above the other months when the history has a 13th salary."""
+        projecao = projetar_fluxo(_historico(), horizonte=12).set_index("Mes")
+        assert projecao.loc["2025-12-01", "Receitas"] > projecao.loc["2025-11-01", "Receitas"]
+
+    def test_invalid_inputs(self):
+        """Out-of-range horizons and empty histories are rejected."""
+        df = _historico()
+        with pytest.raises(ValueError):
+            projetar_fluxo(df, horizonte=0)
+        with pytest.raises(ValueError):
+            projetar_fluxo(df, horizonte=HORIZONTE_MAXIMO + 1)
+        with pytest.raises(ValueError):
+            projetar_fluxo(df.iloc[:0])
+
+
+class TestObterProjecao:
+    """Tests for obter_projecao caching."""
+
+    def test_cached_per_version_and_inputs(self):
+        """Same version and inputs reuse the frame; changed inputs recompute it."""
+        armazenamento.limpar()
+        df = _historico()
+        recorrentes = pd.DataFrame({"Descrição": ["Aluguel"], "Valor": [1000.0]})
+        primeira = obter_projecao(df, "v1", [], [], recorrentes, 12)
+        assert obter_projecao(df, "v1", [], [], recorrentes, 12) is primeira
+        outra = obter_projecao(df, "v1", [], [{"aporte_mensal": 100}], recorrentes, 12)
+        assert outra is not primeira
+        assert (outra["Aportes"] == 100).all()
+        assert outra["Saldo"].tolist() == pytest.approx(primeira["Saldo"].tolist())
+        armazenamento.limpar()
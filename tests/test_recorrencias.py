@@ -0,0 +1,104 @@
+"""Tests for utils.recorrencias module."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import armazenamento
+from utils.recorrencias import (
+    COLUNAS_SUGESTOES,
+    chave_comerciante,
+    detectar_recorrentes,
+    nao_cadastradas,
+    obter_recorrentes,
+)
+
+
+def _serie(descricao, valores, datas, categoria="Lazer"):
+    return pd.DataFrame({
+        "Data": pd.to_datetime(datas),
+        "Descrição": descricao,
+        "Tipo": "Despesa",
+        "Categoria": categoria,
+        "ValorAbs": valores,
+    })
+
+
+def _historico(seed=3):
+    """Two years: monthly subscription, monthly bill, sporadic and stopped spending."""
+    rng = np.random.default_rng(seed)
+    meses = pd.date_range("2023-01-01", periods=24, freq="MS")
+    partes = [
+        _serie("NETFLIX.COM 12/05", 55.9, meses + pd.to_timedelta(rng.integers(2, 9, 24), "D")),
+        _serie("Energia Elétrica", (200 * rng.normal(1, 0.05, 24)).round(2),
+               meses + pd.to_timedelta(rng.integers(5, 15, 24), "D"), "Moradia"),
+        _serie("iFood", rng.uniform(20, 120, 60).round(2),
+               pd.Timestamp("2023-01-01") + pd.to_timedelta(rng.integers(0, 720, 60), "D"),
+               "Alimentação"),
+        _serie("Academia", 99.0, meses[:10] + pd.Timedelta(days=3), "Saúde"),
+    ]
+    receita = _serie("Salário", 5000.0, meses + pd.Timedelta(days=4), "Receita")
+    receita["Tipo"] = "Receita"
+    return pd.concat(partes + [receita], ignore_index=True)
+
+
+class TestChaveComerciante:
+    """Test the merchant key."""
+
+    def test_ignores_digits_punctuation_and_accents(self):
+        """Dates, ids and accents do not split a merchant."""
+        chaves = chave_comerciante(pd.Series(["NETFLIX.COM 12/05", "Netflix.com 03/06", "12/05"]))
+        assert chaves.tolist() == ["netflix com", "netflix com", ""]
+
+
+class TestDetectarRecorrentes:
+    """Test recurring-expense detection from interval statistics."""
+
+    def test_monthly_series_found(self):
+        """Subscriptions and bills are proposed; sporadic and stopped ones are not."""
+        sugestoes = detectar_recorrentes(_historico())
+        assert list(sugestoes.columns) == COLUNAS_SUGESTOES
+        assert sugestoes["Descrição"].tolist() == ["NETFLIX.COM 12/05", "Energia Elétrica"]
+        netflix = sugestoes.iloc[0]
+        assert netflix["Valor"] == pytest.approx(55.9)
+        assert netflix["Categoria"] == "Lazer"
+        assert netflix["Ocorrencias"] == 24
+        assert 25 <= netflix["IntervaloMedio"] <= 35
+        assert netflix["Confianca"] == 1.0
+        assert 0.5 <= sugestoes.iloc[1]["Confianca"] < 1.0
+
+    def test_outlier_amounts_and_reference(self):
+        """Far-off amounts are left out; old series fade with the reference date."""
+        df = _historico()
+        extra = _serie("NETFLIX.COM 12/05", 500.0, ["2023-06-20"])
+        sugestoes = detectar_recorrentes(pd.concat([df, extra], ignore_index=True))
+        assert sugestoes.iloc[0]["Ocorrencias"] == 24
+        assert detectar_recorrentes(df, referencia=pd.Timestamp("2026-01-01")).empty
+        academia = detectar_recorrentes(df, referencia=pd.Timestamp("2023-11-01"))
+        assert "Academia" in academia["Descrição"].tolist()
+
+    def test_empty_inputs(self):
+        """No data or no expenses yield an empty, typed frame."""
+        assert detectar_recorrentes(None).empty
+        vazio = detectar_recorrentes(_historico().query("Tipo == 'Receita'"))
+        assert vazio.empty and list(vazio.columns) == COLUNAS_SUGESTOES
+
+
+class TestSugestoes:
+    """Test caching and filtering of suggestions."""
+
+    def test_cached_per_version(self):
+        """The same data version returns the shared frame."""
+        armazenamento.limpar()
+        df = _historico()
+        assert obter_recorrentes(df, "v1") is obter_recorrentes(df, "v1")
+        assert obter_recorrentes(df, None) is not obter_recorrentes(df, None)
+        armazenamento.limpar()
+
+    def test_registered_merchants_dropped(self):
+        """Suggestions matching a registered recurring expense are hidden."""
+        sugestoes = detectar_recorrentes(_historico())
+        cadastradas = pd.DataFrame({"Descrição": ["Netflix.com"], "Valor": [55.9],
+                                    "Categoria": ["Lazer"]})
+        assert nao_cadastradas(sugestoes, cadastradas)["Descrição"].tolist() == [
+            "Energia Elétrica"
+        ]
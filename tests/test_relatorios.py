@@ -0,0 +1,168 @@
+"""Tests for utils.relatorios module."""
+import json
+
+import pandas as pd
+import pytest
+
+from utils import armazenamento
+from utils.dev_data import salvar_cenario
+from utils.relatorios import (
+    calcular_analise_5030_20,
+    gerar_relatorios,
+    gerar_storytelling,
+    main,
+    mapa_buckets,
+    obter_analise_5030_20,
+    obter_resumo_por_pessoa,
+    relatorios_domicilio,
+    resumo_por_pessoa,
+)
+
+
+@pytest.fixture
+def domicilios(tmp_path):
+    """Two household data directories with different histories."""
+    diretorios = []
+    for i, meses in enumerate((3, 2)):
+        diretorio = str(tmp_path / f"familia{i}")
+        salvar_cenario(diretorio, meses=meses, seed=i)
+        diretorios.append(diretorio)
+    return diretorios
+
+
+def _despesas(linhas):
+    return pd.DataFrame(
+        [{"Categoria": c, "ValorAbs": v, "Tipo": "Despesa"} for c, v in linhas]
+    )
+
+
+class TestAnalise5030_20:
+    """Test the headless 50/30/20 analysis."""
+
+    def test_buckets_and_limits(self):
+        """Expenses are summed per bucket; unknown categories count as wants."""
+        df = _despesas([("Moradia", 2000.0), ("Lazer", 500.0), ("Nova", 100.0)])
+        analise = calcular_analise_5030_20(10000.0, df, mapa_buckets({"Nova": []}))
+        gastos = dict(zip(analise["Grupo"], analise["Gasto (R$)"]))
+        assert gastos == {"Necessidades": 2000.0, "Desejos": 600.0, "Poupança/Dívidas": 0.0}
+        assert analise["Limite (R$)"].tolist() == [5000.0, 3000.0, 2000.0]
+
+    def test_no_income(self):
+        """Without income there is nothing to compare against."""
+        assert calcular_analise_5030_20(0.0, _despesas([("Lazer", 1.0)]), {}).empty
+
+
+class TestAgregacoesCompartilhadas:
+    """Test the tab aggregations shared per data version."""
+
+    DF = pd.DataFrame({
+        "Pessoa": ["Ana", "Ana", "Bia"],
+        "Tipo": ["Receita", "Despesa", "Despesa"],
+        "Categoria": ["Receita", "Moradia", "Lazer"],
+        "ValorAbs": [1000.0, 400.0, 50.0],
+        "AnoMes": ["2024-01", "2024-01", "2024-02"],
+    })
+
+    def test_computed_once_per_version(self):
+        """The second call returns the shared frame; no version means no caching."""
+        armazenamento.limpar()
+        resumo = obter_resumo_por_pessoa(self.DF, "v1")
+        assert obter_resumo_por_pessoa(self.DF, "v1") is resumo
+        assert resumo.set_index("Pessoa")["Saldo"].to_dict() == {"Ana": 600.0, "Bia": -50.0}
+        pd.testing.assert_frame_equal(obter_resumo_por_pessoa(self.DF, None), resumo)
+
+        analise = obter_analise_5030_20(self.DF, "v1", "2024-01", 1000.0, mapa_buckets({}))
+        assert obter_analise_5030_20(self.DF, "v1", "2024-01", 1000.0, mapa_buckets({})) is analise
+        assert analise["Gasto (R$)"].tolist() == [400.0, 0.0, 0.0]
+        outro_mes = obter_analise_5030_20(self.DF, "v1", "2024-02", 1000.0, mapa_buckets({}))
+        assert outro_mes["Gasto (R$)"].tolist() == [0.0, 50.0, 0.0]
+        armazenamento.limpar()
+
+    def test_resumo_without_income(self):
+        """People with only expenses still get a Receita column."""
+        resumo = resumo_por_pessoa(self.DF[self.DF["Tipo"] == "Despesa"])
+        assert resumo["Receita"].tolist() == [0, 0]
+
+
+class TestStorytelling:
+    """Test the narrative text."""
+
+    def test_top_category_and_savings(self):
+        """Mentions the largest category and the savings rate."""
+        df = pd.DataFrame({
+            "Tipo": ["Receita", "Despesa", "Despesa"],
+            "Categoria": ["Receita", "Lazer", "Moradia"],
+            "ValorAbs": [1000.0, 100.0, 500.0],
+            "AnoMes": ["2024-01"] * 3,
+            "Descrição": ["Salário", "Cinema", "Aluguel"],
+        })
+        texto = gerar_storytelling(df, 600.0, 1000.0)
+        assert "**Moradia**" in texto
+        assert "**40.0%**" in texto
+        assert "**Aluguel**" in texto
+
+
+class TestRelatorios:
+    """Test per-household reports and the process pool."""
+
+    def test_monthly_kpis(self, domicilios):
+        """One report per month; KPIs match the month's transactions."""
+        relatorios = relatorios_domicilio(domicilios[0], renda_liquida=8000.0)
+        meses = [r["mes"] for r in relatorios]
+        assert meses == sorted(meses) and len(meses) >= 3
+        rel = relatorios[-1]
+        assert rel["domicilio"] == "familia0"
+        assert rel["kpis"]["saldo"] == pytest.approx(
+            rel["kpis"]["receitas"] - rel["kpis"]["despesas"]
+        )
+        assert sum(c["valor"] for c in rel["categorias"]) == pytest.approx(
+            rel["kpis"]["despesas"]
+        )
+        assert [g["Grupo"] for g in rel["analise_5030_20"]] == [
+            "Necessidades", "Desejos", "Poupança/Dívidas"
+        ]
+        assert rel["dividas"]["total_em_dividas"] > 0
+        assert rel["storytelling"]
+
+    def test_storytelling_compares_with_previous_month(self, domicilios):
+        """The monthly narrative compares the month with the one before it, not later ones."""
+        relatorios = relatorios_domicilio(domicilios[0])
+        assert "que em" not in relatorios[0]["storytelling"]
+        anterior, atual = relatorios[-2]["mes"], relatorios[-1]["mes"]
+        assert f"em **{atual}** foram" in relatorios[-1]["storytelling"]
+        assert f"que em {anterior}" in relatorios[-1]["storytelling"]
+        assert f"em **{anterior}** foram" in relatorios[-2]["storytelling"]
+
+    def test_month_filter_and_missing_data(self, domicilios, tmp_path):
+        """Only requested months are reported; empty directories yield nothing."""
+        mes = relatorios_domicilio(domicilios[0])[0]["mes"]
+        assert [r["mes"] for r in relatorios_domicilio(domicilios[0], [mes, "1999-01"])] == [mes]
+        assert relatorios_domicilio(str(tmp_path / "vazio")) == []
+
+    def test_process_pool_matches_sequential(self, domicilios):
+        """Parallel runs return the same reports, in directory order."""
+        sequencial = gerar_relatorios(domicilios, processos=1)
+        paralelo = gerar_relatorios(domicilios, processos=2)
+        assert paralelo == sequencial
+        assert sequencial[0]["domicilio"] == "familia0"
+        assert sequencial[-1]["domicilio"] == "familia1"
+
+
+class TestCli:
+    """Test the command-line entry point."""
+
+    def test_json_and_html(self, domicilios, tmp_path):
+        """Writes a JSON list or an HTML document with one section per report."""
+        saida_json = str(tmp_path / "rel.json")
+        assert main([*domicilios, "--processos", "1", "--saida", saida_json]) == 0
+        with open(saida_json, encoding="utf-8") as f:
+            relatorios = json.load(f)
+        assert relatorios == gerar_relatorios(domicilios, processos=1)
+
+        saida_html = str(tmp_path / "rel.html")
+        main([domicilios[1], "--formato", "html", "--renda", "5000", "--saida", saida_html])
+        with open(saida_html, encoding="utf-8") as f:
+            documento = f.read()
+        assert documento.startswith("<!DOCTYPE html>")
+        assert documento.count("<section>") == len(relatorios_domicilio(domicilios[1]))
+        assert "Regra 50/30/20" in documento
@@ -0,0 +1,116 @@
+"""Tests for utils.saldo module."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import armazenamento
+from utils.saldo import (
+    incorporar_lancamentos,
+    lttb,
+    obter_serie_saldo,
+    pontos_alvo,
+    propagar_lancamentos,
+    reduzir_serie,
+    serie_saldo_diario,
+)
+
+
+def _transacoes(n=500, seed=1):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "Data": pd.Timestamp("2024-01-01")
+        + pd.to_timedelta(rng.integers(0, 200, n), unit="D")
+        + pd.to_timedelta(rng.integers(0, 24, n), unit="h"),
+        "Valor": rng.normal(0, 100, n).round(2),
+    })
+
+
+@pytest.fixture(autouse=True)
+def loja_limpa():
+    """Isolate the process-wide frame cache."""
+    armazenamento.limpar()
+    yield
+    armazenamento.limpar()
+
+
+class TestSerieSaldoDiario:
+    """Test end-of-day balance aggregation."""
+
+    def test_end_of_day_balance(self):
+        """One point per day with the balance after the day's transactions."""
+        df = pd.DataFrame({
+            "Data": pd.to_datetime(["2024-01-02 10:00", "2024-01-01 00:00", "2024-01-02 18:00"]),
+            "Valor": [-30.0, 100.0, -20.0],
+        })
+        serie = serie_saldo_diario(df)
+        assert serie["Data"].tolist() == [pd.Timestamp("2024-01-01"), pd.Timestamp("2024-01-02")]
+        assert serie["Saldo"].tolist() == [100.0, 50.0]
+        assert serie["Variacao"].tolist() == [100.0, -50.0]
+
+    def test_empty(self):
+        """An empty frame gives an empty series with the same columns."""
+        serie = serie_saldo_diario(pd.DataFrame({"Data": pd.to_datetime([]), "Valor": []}))
+        assert serie.empty and list(serie.columns) == ["Data", "Variacao", "Saldo"]
+
+    def test_incremental_matches_full_recompute(self):
+        """Adding transactions incrementally equals re-aggregating everything."""
+        base = _transacoes()
+        novos = pd.DataFrame({
+            "Data": pd.to_datetime(["2023-12-25", "2024-03-01", "2024-03-01", "2025-01-01"]),
+            "Valor": [10.0, -5.0, 7.5, 99.0],
+        })
+        serie = serie_saldo_diario(base)
+        incremental = incorporar_lancamentos(serie, novos["Data"], novos["Valor"])
+        completa = serie_saldo_diario(pd.concat([base, novos]))
+        pd.testing.assert_frame_equal(incremental, completa, check_dtype=False)
+        assert len(serie) == len(serie_saldo_diario(base))  # input untouched
+
+
+class TestLttb:
+    """Test Largest Triangle Three Buckets downsampling."""
+
+    def test_keeps_endpoints_and_peaks(self):
+        """Output has n sorted points, both endpoints and the global extremes."""
+        x = np.arange(10_000, dtype=float)
+        y = np.sin(x / 500)
+        y[4321], y[7777] = 10.0, -10.0
+        indices = lttb(x, y, 200)
+        assert len(indices) == 200
+        assert indices[0] == 0 and indices[-1] == 9_999
+        assert np.all(np.diff(indices) > 0)
+        assert 4321 in indices and 7777 in indices
+
+    def test_short_input_untouched(self):
+        """Requests for more points than available return every index."""
+        assert lttb(np.arange(5), np.arange(5), 10).tolist() == [0, 1, 2, 3, 4]
+
+    def test_reduzir_serie(self):
+        """Series longer than the target are cut to the target size."""
+        serie = serie_saldo_diario(_transacoes(5_000))
+        assert reduzir_serie(serie, 1_000) is serie
+        reduzida = reduzir_serie(serie, 50)
+        assert len(reduzida) == 50
+        assert reduzida["Saldo"].iloc[-1] == serie["Saldo"].iloc[-1]
+        assert pontos_alvo(10) == 100 and pontos_alvo(1400) == 1400
+
+
+class TestCacheSerie:
+    """Test per-version caching and incremental propagation."""
+
+    def test_cached_per_version(self):
+        """The same version returns the same series object."""
+        df = _transacoes()
+        assert obter_serie_saldo(df, "v1") is obter_serie_saldo(df.iloc[:0], "v1")
+        assert len(obter_serie_saldo(df.iloc[:0], None)) == 0
+
+    def test_propagar_lancamentos(self):
+        """A new version is seeded from the previous one plus the additions."""
+        df = _transacoes()
+        obter_serie_saldo(df, "v1")
+        propagar_lancamentos("v1", "v2", ["2024-02-10"], [-42.0])
+        esperado = serie_saldo_diario(
+            pd.concat([df, pd.DataFrame({"Data": [pd.Timestamp("2024-02-10")], "Valor": [-42.0]})])
+        )
+        pd.testing.assert_frame_equal(
+            obter_serie_saldo(df.iloc[:0], "v2"), esperado, check_dtype=False
+        )
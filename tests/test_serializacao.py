@@ -0,0 +1,79 @@
+"""Tests for utils.serializacao module."""
+import json
+
+import numpy as np
+import pytest
+
+from utils import serializacao
+from utils.serializacao import (
+    BACKENDS_DISPONIVEIS,
+    decodificar_transacoes,
+    definir_backend,
+    dumps,
+    loads,
+)
+
+TRANSACOES = [
+    {"Data": "2024-01-05", "Descrição": "Padaria São João", "Valor": -12.5,
+     "Pessoa": "Ana", "Categoria_Manual": None},
+    {"Data": "05/01/2024", "Descrição": "IFOOD", "Valor": "-50,00",
+     "Pessoa": "Arquivo", "Categoria_Manual": None, "FITID": "F1", "Conta": "1"},
+]
+
+
+@pytest.fixture(params=BACKENDS_DISPONIVEIS)
+def backend(request):
+    """Run the test with every installed backend, restoring the default."""
+    anterior = serializacao.BACKEND
+    definir_backend(request.param)
+    yield request.param
+    definir_backend(anterior)
+
+
+class TestSerializacao:
+    """Test the pluggable JSON serializer."""
+
+    def test_roundtrip_compact_utf8(self, backend):
+        """Output is compact UTF-8 and equals the stdlib encoding."""
+        dados = dumps(TRANSACOES)
+        assert b"\n" not in dados and b", " not in dados
+        assert "São João".encode("utf-8") in dados
+        assert json.loads(dados) == TRANSACOES
+        assert loads(dados) == TRANSACOES
+
+    def test_numpy_and_int_keys(self, backend):
+        """numpy scalars and non-string keys are serialized like the stdlib."""
+        assert json.loads(dumps({1: np.float64(2.5), "n": int(np.int64(3))})) == {
+            "1": 2.5,
+            "n": 3,
+        }
+
+    def test_unserializable_raises_type_error(self, backend):
+        """Arbitrary objects are rejected with TypeError."""
+        with pytest.raises(TypeError):
+            dumps([object()])
+
+    def test_non_finite_floats_written_as_null(self, backend):
+        """Every backend writes the same bytes for NaN and infinities."""
+        dados = {"a": float("nan"), "b": [1.5, float("inf"), -np.inf], "c": np.float64("nan")}
+        assert dumps(dados) == b'{"a":null,"b":[1.5,null,null],"c":null}'
+
+    def test_legacy_nan_and_invalid_input(self, backend):
+        """NaN written by the stdlib still loads; garbage raises ValueError."""
+        assert np.isnan(loads(b'[NaN]')[0])
+        with pytest.raises(ValueError):
+            loads(b'{"a": ')
+
+    def test_decodificar_transacoes(self, backend):
+        """Transaction stores decode to records; other shapes are rejected."""
+        registros = decodificar_transacoes(dumps(TRANSACOES))
+        assert [r["Descrição"] for r in registros] == ["Padaria São João", "IFOOD"]
+        assert registros[1]["Valor"] == "-50,00"
+        assert decodificar_transacoes(b'[{"Data": "x", "extra": [1]}]')[0]["extra"] == [1]
+        with pytest.raises(ValueError):
+            decodificar_transacoes(b'{"Data": "x"}')
+
+    def test_unknown_backend(self):
+        """Unknown backend names raise ValueError."""
+        with pytest.raises(ValueError):
+            definir_backend("simdjson")
@@ -0,0 +1,85 @@
+"""Smoke tests for ui.sidebar, run as Streamlit scripts with AppTest."""
+OFX = b"""OFXHEADER:100
+DATA:OFXSGML
+VERSION:102
+ENCODING:USASCII
+CHARSET:1252
+
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS>
+<BANKACCTFROM><ACCTID>12345-6</BANKACCTFROM>
+<BANKTRANLIST>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20240105<TRNAMT>-50.00<FITID>A1<MEMO>IFOOD</STMTTRN>
+<STMTTRN><TRNTYPE>CREDIT<DTPOSTED>20240110<TRNAMT>3000.00<FITID>A2<NAME>SALARIO</STMTTRN>
+</BANKTRANLIST>
+</STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+"""
+
+
+def _script_upload():
+    """Render the sidebar with the main uploader returning ``st.session_state.upload``."""
+    import io
+    from unittest.mock import patch
+
+    import streamlit as st
+    from streamlit.delta_generator import DeltaGenerator
+
+    from ui.sidebar import render_sidebar
+    from utils.helpers import initialize_session_state
+
+    initialize_session_state()
+    nome, conteudo = st.session_state.upload
+    arquivo = io.BytesIO(conteudo)
+    arquivo.name, arquivo.size, arquivo.file_id = nome, len(conteudo), nome
+
+    def _file_uploader(self, label, *args, **kwargs):
+        return arquivo if kwargs.get("key") is None else None
+
+    with patch.object(DeltaGenerator, "file_uploader", _file_uploader):
+        render_sidebar()
+
+
+def _executar_upload(app_test, nome, conteudo, **estado):
+    at = app_test.from_function(_script_upload, default_timeout=30)
+    at.session_state["upload"] = (nome, conteudo)
+    for chave, valor in estado.items():
+        at.session_state[chave] = valor
+    return at.run()
+
+
+class TestUploadSidebar:
+    """Test the single-file upload branches of the sidebar."""
+
+    def test_ofx_import(self, app_test, tmp_path, monkeypatch):
+        """An OFX upload is imported directly and reported as a success."""
+        monkeypatch.chdir(tmp_path)
+        at = _executar_upload(app_test, "extrato.ofx", OFX)
+        assert not at.exception
+        assert not at.sidebar.error
+        assert "2 novos registros" in at.sidebar.success[0].value
+        assert len(at.session_state["transacoes_importadas"]) == 2
+        assert (tmp_path / "transacoes_importadas.json").exists()
+
+    def test_saved_layout_import(self, app_test, tmp_path, monkeypatch):
+        """A CSV with a saved layout is imported directly; malformed lines are reported."""
+        from utils.importacao import detectar_formato, ler_cabecalho, registrar_perfil
+
+        monkeypatch.chdir(tmp_path)
+        conteudo = (
+            "Data;Histórico;Valor\n05/01/2024;IFOOD;-50,00\n10/01/2024;SALARIO;3000,00\n"
+            "11/01/2024;PIX;JOAO;-5,00\n"
+        ).encode("utf-8")
+        formato = detectar_formato("itau.csv", conteudo)
+        perfis = {}
+        registrar_perfil(
+            perfis,
+            ler_cabecalho("itau.csv", conteudo, formato),
+            {"date": "Data", "title": "Histórico", "amount": "Valor"},
+            formato,
+            nome="Itaú",
+        )
+        at = _executar_upload(app_test, "itau.csv", conteudo, perfis_mapeamento=perfis)
+        assert not at.exception
+        assert not at.sidebar.error
+        assert "perfil 'Itaú'" in at.sidebar.success[0].value
+        assert "1 linha(s) malformada(s)" in at.sidebar.warning[0].value
+        assert len(at.session_state["transacoes_importadas"]) == 2
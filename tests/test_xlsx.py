@@ -0,0 +1,82 @@
+"""Tests for utils.xlsx module."""
+import io
+from datetime import datetime
+
+import openpyxl
+import pytest
+
+from utils.xlsx import amostrar_xlsx, ler_colunas_xlsx
+
+
+def _planilha(linhas) -> io.BytesIO:
+    """Build an in-memory workbook with the given rows."""
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    for linha in linhas:
+        ws.append(linha)
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    buffer.seek(0)
+    return buffer
+
+
+@pytest.fixture
+def extrato():
+    """Statement with unused columns, a blank row and Excel dates."""
+    linhas = [["Agência", "Data", "Histórico", "Documento", "Valor", None, "Valor"]]
+    for i in range(1, 121):
+        linhas.append(
+            ["0001", datetime(2024, 1, 1 + i % 28), f"Compra {i}", i, -float(i), "x", 0]
+        )
+    linhas.insert(10, [None] * 7)
+    return _planilha(linhas)
+
+
+class TestAmostrarXlsx:
+    """Test the sampling read used for column mapping."""
+
+    def test_sample_size_and_header(self, extrato):
+        """Should read only the first rows and name columns like pandas."""
+        amostra, total = amostrar_xlsx(extrato, linhas=20)
+        assert len(amostra) == 20
+        assert list(amostra.columns) == [
+            "Agência",
+            "Data",
+            "Histórico",
+            "Documento",
+            "Valor",
+            "Unnamed: 5",
+            "Valor.1",
+        ]
+        assert total == 121
+
+    def test_dates_become_iso_strings(self, extrato):
+        """Date cells should be JSON-serializable ISO strings."""
+        amostra, _ = amostrar_xlsx(extrato, linhas=1)
+        assert amostra.loc[0, "Data"] == "2024-01-02"
+
+    def test_empty_workbook(self):
+        """An empty sheet yields an empty frame."""
+        amostra, _ = amostrar_xlsx(_planilha([]))
+        assert amostra.empty
+
+
+class TestLerColunasXlsx:
+    """Test the projected streaming read."""
+
+    def test_reads_only_mapped_columns(self, extrato):
+        """Should return the requested columns, in order, skipping blank rows."""
+        df = ler_colunas_xlsx(extrato, ["Data", "Histórico", "Valor"])
+        assert list(df.columns) == ["Data", "Histórico", "Valor"]
+        assert len(df) == 120
+        assert df.iloc[0].tolist() == ["2024-01-02", "Compra 1", -1.0]
+
+    def test_column_order_is_respected(self, extrato):
+        """Mapped columns may be in any order in the sheet."""
+        df = ler_colunas_xlsx(extrato, ["Valor", "Data"])
+        assert df.iloc[0].tolist() == [-1.0, "2024-01-02"]
+
+    def test_missing_column(self, extrato):
+        """Unknown columns should raise KeyError."""
+        with pytest.raises(KeyError):
+            ler_colunas_xlsx(extrato, ["Inexistente"])
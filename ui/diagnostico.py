@@ -0,0 +1,58 @@
+"""Diagnóstico panel — per-rerun timings collected by utils.profiling.
+
+Only rendered when diagnostics are enabled (``DFF_DIAGNOSTICO=1`` or
+``?diagnostico=1``), so regular users never see it.
+"""
+
+import pandas as pd
+import streamlit as st
+from utils.profiling import (
+    diagnostico_ativo,
+    exportar_json,
+    historico_reruns,
+    resumo_secoes,
+)
+
+
+def render_diagnostico() -> None:
+    """Render the hidden Diagnóstico panel in the sidebar.
+
+    Displays:
+    - Sections of the most recent rerun with duration and memory delta
+    - Aggregated statistics over the ring buffer
+    - JSON export of all recorded reruns
+    """
+    if not diagnostico_ativo():
+        return
+
+    reruns = historico_reruns()
+    with st.sidebar.expander("🩺 Diagnóstico", expanded=False):
+        if not reruns:
+            st.caption("Nenhum rerun registrado ainda.")
+            return
+
+        ultimo = reruns[-1]
+        st.metric("Último rerun", f"{ultimo['total_ms']:,.0f} ms")
+        st.caption(f"{len(reruns)} reruns registrados nesta sessão.")
+
+        df_ultimo = pd.DataFrame(ultimo["secoes"])
+        if not df_ultimo.empty:
+            df_ultimo["nome"] = [
+                "  " * nivel + nome for nome, nivel in zip(df_ultimo["nome"], df_ultimo["nivel"])
+            ]
+            df_ultimo = df_ultimo[["nome", "ms", "mem_kb"]]
+            df_ultimo.columns = ["Seção", "ms", "Memória (KB)"]
+            st.dataframe(df_ultimo, use_container_width=True, hide_index=True)
+
+        st.markdown("**Agregado**")
+        st.dataframe(
+            pd.DataFrame(resumo_secoes(reruns)), use_container_width=True, hide_index=True
+        )
+
+        st.download_button(
+            "⬇️ Exportar JSON",
+            data=exportar_json(reruns),
+            file_name="diagnostico_reruns.json",
+            mime="application/json",
+            use_container_width=True,
+        )
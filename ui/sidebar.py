@@ -1,21 +1,48 @@
 """Sidebar component for file upload and column mapping.
 
-Handles CSV/XLSX file uploads, column mapping interface, and data processing trigger.
+Handles CSV/XLSX/OFX file uploads, column mapping interface, and data processing trigger.
 """
 
+from typing import Any, Dict, List, Tuple
+
 import streamlit as st
 import pandas as pd
-from utils.helpers import salvar_transacoes_importadas
+from utils.helpers import (
+    escrita_agrupada,
+    lista_para_edicao,
+    salvar_perfis_mapeamento,
+    salvar_registro_importacoes,
+    salvar_transacoes_importadas,
+)
+from utils.importacao import (
+    LINHAS_DESCARTADAS,
+    amostrar_arquivo,
+    buscar_importacao,
+    deduplicar_registros,
+    desfazer_importacao,
+    detectar_formato,
+    encontrar_perfil,
+    hash_conteudo,
+    importar_lote,
+    ler_arquivo_mapeado,
+    ler_cabecalho,
+    para_registros,
+    registrar_importacao,
+    registrar_perfil,
+)
+from utils.ofx import importar_ofx
 from utils.processing import processar_dados
+from utils.profiling import instrumentar
 
 
+@instrumentar
 def render_sidebar() -> None:
     """Render sidebar with file upload and column mapping interface.
 
     Displays:
     - Logo at the top
-    - File uploader for CSV/XLSX statements
-    - Column mapping selection interface
+    - File uploader for CSV/XLSX/OFX statements
+    - Column mapping selection interface (skipped for layouts with a saved profile)
     - Transaction count metric
     """
 
@@ -32,40 +59,94 @@ def render_sidebar() -> None:
         )
 
     st.sidebar.markdown("##### 📂 Importar Extrato")
-    st.sidebar.caption("Carregue seu extrato bancário (CSV/XLSX)")
+    st.sidebar.caption("Carregue seu extrato bancário (CSV/XLSX/OFX)")
     uploaded_file = st.sidebar.file_uploader(
         "Selecione um arquivo",
-        type=["csv", "xlsx"],
+        type=["csv", "xlsx", "ofx"],
         label_visibility="collapsed",
-        help="Arquivos aceitos: CSV, XLSX (máx. 10 MB)",
+        help="Arquivos aceitos: CSV, XLSX (máx. 10 MB) e OFX",
     )
 
+    if st.session_state.get("_linhas_descartadas") is not None:
+        _avisar_descartadas(*st.session_state._linhas_descartadas)
+        st.session_state._linhas_descartadas = None
+
     if uploaded_file is not None:
-        # Check file size
-        if uploaded_file.size > 10 * 1024 * 1024:  # 10 MB limit
+        hash_upload = _hash_upload(uploaded_file)
+        lote = buscar_importacao(st.session_state.registro_importacoes, hash_upload)
+        pendente = st.session_state.get("raw_arquivo")
+
+        if lote is not None:
+            # Mesmo conteúdo já importado (mesmo com outro nome): nada a fazer
+            st.sidebar.info(
+                f"ℹ️ {uploaded_file.name} já foi importado em {lote['data'][:10]} "
+                f"(lote #{lote['id']})."
+            )
+        elif pendente is not None and pendente.get("hash") == hash_upload:
+            pass  # aguardando o mapeamento abaixo
+        elif uploaded_file.name.lower().endswith(".ofx"):
+            # OFX já traz data/valor/descrição: importa direto, sem mapeamento
+            try:
+                with st.sidebar, st.spinner("📥 Importando OFX..."):
+                    novos, duplicados = importar_ofx(
+                        uploaded_file, st.session_state.get("transacoes_importadas", [])
+                    )
+                    _anexar_importados(novos, [(uploaded_file.name, hash_upload)])
+                    st.session_state.raw_df = None
+                    st.session_state.raw_arquivo = None
+                st.sidebar.success(
+                    f"✅ {uploaded_file.name}: {len(novos)} novos registros"
+                    f" ({duplicados} já importados)"
+                )
+            except Exception as e:
+                st.sidebar.error(f"❌ Erro ao ler OFX: {str(e)[:100]}")
+        elif uploaded_file.size > 10 * 1024 * 1024:  # 10 MB limit
             st.sidebar.error("❌ Arquivo muito grande (máximo 10 MB)")
             st.session_state.raw_df = None
-        elif st.session_state.get("last_uploaded_file") != uploaded_file.name:
+        else:
             try:
-                with st.sidebar.spinner("📥 Carregando arquivo..."):
-                    if uploaded_file.name.endswith(".csv"):
-                        df = pd.read_csv(
-                            uploaded_file, sep=",", engine="python", encoding="utf-8"
-                        )
-                    else:
-                        df = pd.read_excel(uploaded_file)
+                with st.sidebar, st.spinner("📥 Carregando arquivo..."):
+                    conteudo = uploaded_file.getvalue()
+                    formato = detectar_formato(uploaded_file.name, conteudo)
+                    colunas = ler_cabecalho(uploaded_file.name, conteudo, formato)
+                    perfil = encontrar_perfil(
+                        colunas, st.session_state.get("perfis_mapeamento", {}), formato
+                    )
 
-                    if df.empty:
-                        st.sidebar.error("❌ Arquivo vazio")
+                    if perfil is not None:
+                        # Layout conhecido: importa direto, sem tela de mapeamento
+                        df_mapped = ler_arquivo_mapeado(uploaded_file.name, conteudo, perfil)
+                        n_novos = _importar_mapeado(
+                            df_mapped, [(uploaded_file.name, hash_upload)]
+                        )
                         st.session_state.raw_df = None
-                    else:
-                        st.session_state.raw_df = df
-                        st.session_state.last_uploaded_file = uploaded_file.name
-                        st.session_state.df_from_upload = None
+                        st.session_state.raw_arquivo = None
+                        rotulo = perfil.get("nome") or "layout salvo"
                         st.sidebar.success(
-                            f"✅ {uploaded_file.name} carregado ({len(df)} linhas)"
+                            f"✅ {uploaded_file.name} importado com o perfil "
+                            f"'{rotulo}'. Novos registros: {n_novos}"
                         )
-                        st.rerun()
+                        _avisar_descartadas(
+                            uploaded_file.name, df_mapped.attrs.get(LINHAS_DESCARTADAS, 0)
+                        )
+                    else:
+                        # Só uma amostra para o mapeamento; as colunas escolhidas
+                        # são lidas em streaming ao processar.
+                        df = amostrar_arquivo(uploaded_file.name, conteudo, formato)
+                        if df.empty:
+                            st.sidebar.error("❌ Arquivo vazio")
+                            st.session_state.raw_df = None
+                        else:
+                            st.session_state.raw_df = df
+                            st.session_state.raw_arquivo = {
+                                "nome": uploaded_file.name,
+                                "conteudo": conteudo,
+                                "formato": formato,
+                                "hash": hash_upload,
+                            }
+                            st.session_state.df_from_upload = None
+                            st.sidebar.success(f"✅ {uploaded_file.name} carregado")
+                            st.rerun()
 
             except Exception as e:
                 st.sidebar.error(f"❌ Erro ao ler: {str(e)[:100]}")
@@ -159,43 +240,32 @@ def render_sidebar() -> None:
             "▶️ Processar Extrato", type="primary", use_container_width=True
         ):
             if date_col and title_col and amount_col:
-                with st.sidebar.spinner("⏳ Processando..."):
+                with st.sidebar, st.spinner("⏳ Processando..."):
                     try:
-                        df_mapped = st.session_state.raw_df[
-                            [date_col, title_col, amount_col]
-                        ].copy()
-                        df_mapped.columns = ["Data", "Descrição", "Valor"]
-                        df_mapped["Pessoa"] = "Arquivo"
-                        df_mapped["Categoria_Manual"] = None
-
-                        importados = st.session_state.get("transacoes_importadas", [])
-
-                        def _row_key(row: dict) -> tuple:
-                            valor_raw = str(row.get("Valor", "0")).replace(",", ".")
-                            valor_num = pd.to_numeric(valor_raw, errors="coerce")
-                            return (
-                                str(row.get("Data", "")).strip(),
-                                str(row.get("Descrição", "")).strip().lower(),
-                                float(valor_num) if pd.notna(valor_num) else 0.0,
-                            )
-
-                        existing_keys = {_row_key(item) for item in importados}
-                        novos = 0
-
-                        for row in df_mapped.to_dict("records"):
-                            key = _row_key(row)
-                            if key not in existing_keys:
-                                importados.append(row)
-                                existing_keys.add(key)
-                                novos += 1
-
-                        st.session_state.transacoes_importadas = importados
-                        salvar_transacoes_importadas()
+                        mapeamento = {"date": date_col, "title": title_col, "amount": amount_col}
+                        raw_arquivo = st.session_state.raw_arquivo
+                        perfil = registrar_perfil(
+                            st.session_state.perfis_mapeamento,
+                            columns,
+                            mapeamento,
+                            raw_arquivo["formato"],
+                        )
+                        salvar_perfis_mapeamento()
+                        df_mapped = ler_arquivo_mapeado(
+                            raw_arquivo["nome"], raw_arquivo["conteudo"], perfil
+                        )
+                        n_novos = _importar_mapeado(
+                            df_mapped, [(raw_arquivo["nome"], raw_arquivo["hash"])]
+                        )
+                        # Shown after the rerun below
+                        st.session_state._linhas_descartadas = (
+                            raw_arquivo["nome"], df_mapped.attrs.get(LINHAS_DESCARTADAS, 0)
+                        )
                         st.session_state.df_from_upload = None
-                        processar_dados()
                         st.session_state.raw_df = None
+                        st.session_state.raw_arquivo = None
                         st.sidebar.success(
-                            f"✅ Extrato processado com sucesso! Novos registros: {novos}"
+                            f"✅ Extrato processado com sucesso! Novos registros: {n_novos}"
                         )
                         st.rerun()
                     except Exception as e:
@@ -203,6 +273,10 @@ def render_sidebar() -> None:
             else:
                 st.sidebar.error("⚠️ Mapeie as três colunas para continuar.")
 
+    _render_importacao_lote()
+    _render_historico_importacoes()
+    _render_perfis_mapeamento()
+
     # Info resumo
     st.sidebar.write("---")
     n_transacoes = 0
@@ -218,7 +292,178 @@ def render_sidebar() -> None:
         "🗑️ Limpar Importadas", use_container_width=True
     ):
         st.session_state.transacoes_importadas = []
-        salvar_transacoes_importadas()
+        st.session_state.registro_importacoes = []
+        with escrita_agrupada():
+            salvar_transacoes_importadas()
+            salvar_registro_importacoes()
         processar_dados()
         st.sidebar.success("Transações importadas foram removidas.")
         st.rerun()
+
+
+def _avisar_descartadas(nome: str, linhas: int, area: Any = st.sidebar) -> None:
+    """Warn about malformed CSV lines left out of an import."""
+    if linhas:
+        area.warning(
+            f"⚠️ {nome}: {linhas} linha(s) malformada(s) ignorada(s) "
+            "(mais colunas que o cabeçalho). Confira o extrato."
+        )
+
+
+def _hash_upload(uploaded_file) -> str:
+    """Content hash of an upload, computed once per uploaded file."""
+    file_id = getattr(uploaded_file, "file_id", None) or uploaded_file.name
+    memo = st.session_state.get("_hash_upload")
+    if memo is None or memo[0] != file_id:
+        memo = (file_id, hash_conteudo(uploaded_file))
+        st.session_state._hash_upload = memo
+    return memo[1]
+
+
+def _anexar_importados(
+    registros: List[Dict[str, Any]], arquivos: List[Tuple[str, str]]
+) -> None:
+    """Append records to the imported transactions as one registered batch.
+
+    Args:
+        registros: New records (already deduplicated).
+        arquivos: ``(nome, hash)`` of the files in the batch.
+    """
+    importados = lista_para_edicao("transacoes_importadas")
+    inicio = len(importados)
+    importados.extend(registros)
+    with escrita_agrupada():
+        if arquivos:
+            registrar_importacao(
+                st.session_state.registro_importacoes, arquivos, inicio, len(importados)
+            )
+            salvar_registro_importacoes()
+        if registros:
+            salvar_transacoes_importadas()
+    if registros:
+        processar_dados()
+
+
+def _importar_mapeado(df_mapped: pd.DataFrame, arquivos: List[Tuple[str, str]]) -> int:
+    """Deduplicate mapped rows and append them as one registered batch.
+
+    Args:
+        df_mapped: Rows in the imported-transaction schema.
+        arquivos: ``(nome, hash)`` of the source file(s).
+
+    Returns:
+        Number of new (non-duplicate) records.
+    """
+    importados = st.session_state.get("transacoes_importadas", [])
+    df_novos, _ = deduplicar_registros(df_mapped, importados)
+    _anexar_importados(para_registros(df_novos), arquivos)
+    return len(df_novos)
+
+
+def _render_historico_importacoes() -> None:
+    """Render the import registry with a rollback button per batch."""
+    registro = st.session_state.get("registro_importacoes", [])
+    if not registro:
+        return
+    with st.sidebar.expander(f"🧾 Histórico de importações ({len(registro)})", expanded=False):
+        for lote in reversed(registro[-20:]):
+            nomes = ", ".join(a["nome"] for a in lote["arquivos"])
+            st.caption(
+                f"#{lote['id']} · {lote['data'][:16].replace('T', ' ')} · "
+                f"{lote['fim'] - lote['inicio']} registros · {nomes}"
+            )
+            chave = f"desfazer_lote_{lote['id']}"
+            if st.button("↩️ Desfazer", key=chave, use_container_width=True):
+                removidos = desfazer_importacao(
+                    registro, lista_para_edicao("transacoes_importadas"), lote["id"]
+                )
+                with escrita_agrupada():
+                    salvar_transacoes_importadas()
+                    salvar_registro_importacoes()
+                processar_dados()
+                st.success(f"Lote #{lote['id']} desfeito ({removidos} registros removidos).")
+                st.rerun()
+
+
+def _render_perfis_mapeamento() -> None:
+    """Render the saved mapping profiles with options to rename or forget them."""
+    perfis = st.session_state.get("perfis_mapeamento", {})
+    if not perfis:
+        return
+    with st.sidebar.expander(f"🗂️ Perfis de mapeamento ({len(perfis)})", expanded=False):
+        st.caption("Arquivos com um layout salvo são importados sem a tela de mapeamento.")
+        for chave, perfil in list(perfis.items()):
+            nome = st.text_input(
+                "Nome",
+                value=perfil.get("nome", ""),
+                key=f"perfil_nome_{chave}",
+                placeholder="Ex.: Itaú conta corrente",
+            )
+            if nome != perfil.get("nome", ""):
+                perfil["nome"] = nome
+                salvar_perfis_mapeamento()
+            st.caption(
+                f"📅 {perfil['date']} · 📝 {perfil['title']} · 💰 {perfil['amount']}"
+                f" · {perfil.get('encoding', '')} {perfil.get('delimitador', '')}"
+            )
+            if st.button("🗑️ Esquecer", key=f"perfil_del_{chave}", use_container_width=True):
+                del perfis[chave]
+                salvar_perfis_mapeamento()
+                st.rerun()
+
+
+def _render_importacao_lote() -> None:
+    """Render the batch import expander (many statements, one processing pass).
+
+    CSV/XLSX files are mapped with the profile saved the last time a file
+    with the same layout was processed individually; OFX needs no mapping.
+    """
+    with st.sidebar.expander("📚 Importação em lote", expanded=False):
+        st.caption(
+            "Envie vários extratos de uma vez. CSV/XLSX usam o mapeamento salvo "
+            "para o mesmo layout; OFX é importado direto."
+        )
+        arquivos = st.file_uploader(
+            "Extratos",
+            type=["csv", "xlsx", "ofx"],
+            accept_multiple_files=True,
+            key="upload_lote",
+            label_visibility="collapsed",
+        )
+        if not arquivos:
+            return
+
+        if st.button("📥 Importar lote", use_container_width=True, key="btn_importar_lote"):
+            barra = st.progress(0.0, text="Lendo arquivos...")
+
+            def _progresso(concluidos: int, total: int, nome: str) -> None:
+                barra.progress(concluidos / max(total, 1), text=f"{concluidos}/{total} · {nome}")
+
+            resultado = importar_lote(
+                [(arquivo.name, arquivo.getvalue()) for arquivo in arquivos],
+                st.session_state.get("perfis_mapeamento", {}),
+                st.session_state.get("transacoes_importadas", []),
+                progresso=_progresso,
+                registro=st.session_state.registro_importacoes,
+            )
+
+            barra.progress(1.0, text="Processando...")
+            _anexar_importados(resultado["novos"], resultado["hashes"])
+            barra.empty()
+
+            st.success(
+                f"✅ {len(resultado['por_arquivo'])} arquivo(s): "
+                f"{len(resultado['novos'])} novos registros, "
+                f"{resultado['duplicados']} duplicados ignorados"
+            )
+            for nome, linhas in resultado["linhas_descartadas"].items():
+                _avisar_descartadas(nome, linhas, st)
+            if resultado["ja_importados"]:
+                st.info("ℹ️ Já importados antes: " + ", ".join(resultado["ja_importados"]))
+            if resultado["sem_perfil"]:
+                st.warning(
+                    "⚠️ Sem mapeamento salvo (importe um arquivo de cada layout "
+                    "individualmente primeiro): " + ", ".join(resultado["sem_perfil"])
+                )
+            for nome, erro in resultado["erros"].items():
+                st.error(f"❌ {nome}: {erro[:100]}")
@@ -1,14 +1,20 @@
 """Configurações tab — categories, budget, recurring expenses, and theme."""
 
+import pandas as pd
 import streamlit as st
 import plotly.express as px
+import plotly.graph_objects as go
+from utils.categorias import erro_regra, normalizar_regra, separar_palavras
+from utils.graficos import figura_em_cache
 from utils.helpers import (
-    save_json,
+    escrita_agrupada,
+    salvar_categorias,
     salvar_orcamento_mensal,
     salvar_despesas_recorrentes,
-    CATEGORIES_FILE,
-    normalizar_texto,
 )
+from utils.processing import atualizar_categorias
+from utils.profiling import instrumentar
+from utils.recorrencias import nao_cadastradas, obter_recorrentes
 
 # Available themes: name → CSS variable overrides injected into the page
 TEMAS_DISPONIVEIS = {
@@ -18,6 +24,7 @@ TEMAS_DISPONIVEIS = {
 }
 
 
+@instrumentar
 def render_configuracoes() -> None:
     """Render settings tab with categories, budget, recurring expenses, theme, and logo."""
     config_tab1, config_tab2, config_tab3, config_tab4, config_tab5 = st.tabs(
@@ -43,6 +50,13 @@ def render_configuracoes() -> None:
 def _render_categorias() -> None:
     """Render category management: add, edit keywords, delete."""
     st.markdown("##### Gerenciar Categorias")
+    st.caption(
+        "Além de trechos da descrição, as palavras-chave aceitam regras: "
+        "`re:uber.*trip` (expressão regular), `valor:100..300` (faixa de valor) "
+        "e `pessoa:ana`. Condições da mesma palavra-chave precisam valer juntas "
+        "(`posto valor:100..300`); as demais palavras formam um único trecho: "
+        "`ifood delivery` só casa com descrições que contêm exatamente esse texto."
+    )
 
     with st.form("form_nova_cat", clear_on_submit=True):
         col1, col2 = st.columns(2)
@@ -55,13 +69,20 @@ def _render_categorias() -> None:
             )
 
         if st.form_submit_button("Adicionar Categoria"):
-            if nova_cat and palavras:
-                kws = [normalizar_texto(p.strip()) for p in palavras.split(",")]
-                st.session_state.categories[nova_cat] = kws
+            kws = [normalizar_regra(p) for p in separar_palavras(palavras)]
+            erros = [e for e in map(erro_regra, kws) if e]
+            for erro in erros:
+                st.error(erro)
+            if nova_cat and palavras and not erros:
+                antigas = st.session_state.categories
+                # The loaded categories are shared across sessions: edit a copy
+                st.session_state.categories = {**antigas, nova_cat: kws}
+                atualizar_categorias(antigas)
                 if nova_cat not in st.session_state.orcamento_mensal:
                     st.session_state.orcamento_mensal[nova_cat] = 0.0
-                save_json(CATEGORIES_FILE, st.session_state.categories)
-                salvar_orcamento_mensal()
+                with escrita_agrupada():
+                    salvar_categorias()
+                    salvar_orcamento_mensal()
                 st.success(f"Categoria '{nova_cat}' adicionada!")
                 st.rerun()
 
@@ -80,24 +101,35 @@ def _render_categorias() -> None:
         with col2:
             st.write("")
             if st.button("Remover", key=f"del_cat_{cat}"):
-                del st.session_state.categories[cat]
+                antigas = st.session_state.categories
+                st.session_state.categories = {c: kws for c, kws in antigas.items() if c != cat}
+                atualizar_categorias(antigas)
                 if cat in st.session_state.orcamento_mensal:
                     del st.session_state.orcamento_mensal[cat]
-                save_json(CATEGORIES_FILE, st.session_state.categories)
-                salvar_orcamento_mensal()
+                with escrita_agrupada():
+                    salvar_categorias()
+                    salvar_orcamento_mensal()
                 st.rerun()
 
     if st.button("💾 Salvar Palavras-chave", use_container_width=True):
-        for cat in list(st.session_state.categories.keys()):
+        categorias = dict(st.session_state.categories)
+        for cat in list(categorias.keys()):
             if cat == "Outros":
                 continue
             key = f"kw_{cat}"
             if key in st.session_state:
-                st.session_state.categories[cat] = [
-                    normalizar_texto(p.strip())
-                    for p in st.session_state[key].split(",")
+                categorias[cat] = [
+                    normalizar_regra(p) for p in separar_palavras(st.session_state[key])
                 ]
-        save_json(CATEGORIES_FILE, st.session_state.categories)
+        erros = [e for kws in categorias.values() for e in map(erro_regra, kws) if e]
+        for erro in erros:
+            st.error(erro)
+        if erros:
+            return
+        antigas = st.session_state.categories
+        st.session_state.categories = categorias
+        atualizar_categorias(antigas)
+        salvar_categorias()
         st.success("Palavras-chave salvas!")
 
 
@@ -168,22 +200,34 @@ def _render_orcamento() -> None:
                     },
                 )
 
-                fig_orc = px.bar(
-                    df_orc,
-                    x="Categoria",
-                    y=["Orçado", "Gasto"],
-                    barmode="group",
-                    labels={"value": "R$", "variable": ""},
-                    color_discrete_map={"Orçado": "#4B5563", "Gasto": "#DC2626"},
-                )
-                fig_orc.update_layout(
-                    title=dict(text=f"Orçado vs Real — {mes}", font=dict(size=15), x=0.02),
-                    paper_bgcolor="rgba(0,0,0,0)",
-                    plot_bgcolor="rgba(0,0,0,0)",
-                    margin=dict(l=30, r=20, t=50, b=30),
-                    legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+                def _fig_orcamento() -> go.Figure:
+                    fig = px.bar(
+                        df_orc,
+                        x="Categoria",
+                        y=["Orçado", "Gasto"],
+                        barmode="group",
+                        labels={"value": "R$", "variable": ""},
+                        color_discrete_map={"Orçado": "#4B5563", "Gasto": "#DC2626"},
+                    )
+                    fig.update_layout(
+                        title=dict(text=f"Orçado vs Real — {mes}", font=dict(size=15), x=0.02),
+                        paper_bgcolor="rgba(0,0,0,0)",
+                        plot_bgcolor="rgba(0,0,0,0)",
+                        margin=dict(l=30, r=20, t=50, b=30),
+                        legend=dict(
+                            orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1
+                        ),
+                    )
+                    fig.update_traces(marker_line_width=0, marker_cornerradius=4)
+                    return fig
+
+                fig_orc = figura_em_cache(
+                    "configuracoes.orcamento",
+                    _fig_orcamento,
+                    st.session_state.get("versao_dados"),
+                    filtros=(mes, st.session_state.orcamento_mensal),
+                    tema=st.session_state.get("tema"),
                 )
-                fig_orc.update_traces(marker_line_width=0, marker_cornerradius=4)
                 st.plotly_chart(fig_orc, use_container_width=True)
 
 
@@ -218,6 +262,59 @@ def _render_recorrentes() -> None:
     st.metric("TOTAL RECORRENTE", f"R$ {total:,.2f}")
     st.caption("Salvamento automático ativado para despesas recorrentes.")
 
+    _render_sugestoes_recorrentes()
+
+
+def _render_sugestoes_recorrentes() -> None:
+    """Render recurring expenses detected in the history, ready to be added."""
+    df = st.session_state.get("df_transacoes")
+    if df is None or df.empty:
+        return
+    sugestoes = nao_cadastradas(
+        obter_recorrentes(df, st.session_state.get("versao_dados")),
+        st.session_state.despesas_recorrentes,
+    )
+    with st.expander(f"🔍 Detectadas no histórico ({len(sugestoes)})", expanded=False):
+        if sugestoes.empty:
+            st.info("Nenhuma nova despesa recorrente encontrada nas transações.")
+            return
+        st.caption(
+            "Mesmo estabelecimento, valor parecido e cobrança mês a mês. "
+            "Marque as que deseja cadastrar."
+        )
+        editadas = st.data_editor(
+            sugestoes.assign(Adicionar=False),
+            hide_index=True,
+            use_container_width=True,
+            disabled=list(sugestoes.columns),
+            key="editor_sugestoes_recorrentes",
+            column_config={
+                "Valor": st.column_config.NumberColumn("Valor (R$)", format="R$ %.2f"),
+                "Ocorrencias": st.column_config.NumberColumn("Ocorrências"),
+                "IntervaloMedio": st.column_config.NumberColumn(
+                    "Intervalo (dias)", format="%.0f"
+                ),
+                "UltimaData": st.column_config.DateColumn("Última", format="DD/MM/YYYY"),
+                "Confianca": st.column_config.ProgressColumn(
+                    "Confiança", min_value=0.0, max_value=1.0, format="%.2f"
+                ),
+            },
+        )
+        selecionadas = editadas[editadas["Adicionar"]]
+        if st.button("➕ Adicionar selecionadas", disabled=selecionadas.empty):
+            st.session_state.despesas_recorrentes = pd.concat(
+                [
+                    st.session_state.despesas_recorrentes,
+                    selecionadas[["Descrição", "Valor", "Categoria"]],
+                ],
+                ignore_index=True,
+            )
+            salvar_despesas_recorrentes()
+            st.session_state._despesas_recorrentes_snapshot = (
+                st.session_state.despesas_recorrentes.to_dict("records")
+            )
+            st.rerun()
+
 
 def _render_tema() -> None:
     """Render theme selector — changes are applied on next interaction."""
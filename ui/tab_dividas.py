@@ -4,7 +4,7 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 from datetime import datetime
-from typing import Any, Dict, List
+from typing import Any
 from utils.helpers import salvar_dividas
 from utils.finance_models import (
     calcular_parcela_price,
@@ -13,6 +13,8 @@ from utils.finance_models import (
     gerar_cronograma_sac,
     calcular_resumo_divida,
 )
+from utils.profiling import instrumentar
+from utils.relatorios import resumo_dividas
 
 _CHART_COLORS = {
     "despesa": "#DC2626",
@@ -29,35 +31,7 @@ def _safe_float(value: Any, default: float = 0.0) -> float:
         return default
 
 
-def _resumo_dividas(dividas: List[Dict[str, Any]]) -> Dict[str, float]:
-    resumo = {
-        "total_em_dividas": 0.0,
-        "total_pago": 0.0,
-        "total_restante": 0.0,
-        "parcela_mensal_total": 0.0,
-        "qtd_ativas": 0.0,
-    }
-    for divida in dividas:
-        try:
-            metricas = calcular_resumo_divida(
-                valor_principal=_safe_float(divida.get("valor_principal")),
-                taxa_mensal=_safe_float(divida.get("taxa_mensal")),
-                n_parcelas=int(_safe_float(divida.get("n_parcelas"), 1.0)),
-                parcela_atual=int(_safe_float(divida.get("parcela_atual"), 1.0)),
-                sistema=str(divida.get("sistema", "PRICE")),
-                status=str(divida.get("status", "Ativa")),
-            )
-        except ValueError:
-            continue
-        resumo["total_em_dividas"] += metricas["total_final"]
-        resumo["total_pago"] += metricas["total_pago"]
-        resumo["total_restante"] += metricas["total_restante"]
-        resumo["parcela_mensal_total"] += metricas["parcela_mensal_atual"]
-        if str(divida.get("status", "Ativa")).lower() == "ativa":
-            resumo["qtd_ativas"] += 1
-    return resumo
-
-
+@instrumentar
 def render_dividas() -> None:
     """Render debts tab with PRICE/SAC calculations and installment tracking."""
     st.markdown("##### Cadastro de Dívidas e Parcelas")
@@ -137,7 +111,7 @@ def render_dividas() -> None:
 
     st.write("---")
 
-    resumo = _resumo_dividas(st.session_state.dividas)
+    resumo = resumo_dividas(st.session_state.dividas)
     m1, m2, m3, m4 = st.columns(4)
     m1.metric("TOTAL EM DÍVIDAS", f"R$ {resumo['total_em_dividas']:,.2f}")
     m2.metric("TOTAL JÁ PAGO", f"R$ {resumo['total_pago']:,.2f}")
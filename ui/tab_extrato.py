@@ -1,8 +1,10 @@
 """Extrato tab — filtered transaction viewer with summary metrics."""
 
 import streamlit as st
+from utils.profiling import instrumentar
 
 
+@instrumentar
 def render_extrato() -> None:
     """Render detailed transaction view with filters.
 
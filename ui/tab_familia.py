@@ -2,7 +2,11 @@
 
 import streamlit as st
 import plotly.express as px
+import plotly.graph_objects as go
+from utils.graficos import figura_em_cache
 from utils.helpers import save_json, MEMBROS_FILE
+from utils.profiling import instrumentar
+from utils.relatorios import obter_resumo_por_pessoa
 
 _COLORS = {
     "receita": "#16A34A",
@@ -10,6 +14,7 @@ _COLORS = {
 }
 
 
+@instrumentar
 def render_familia() -> None:
     """Render family member management and per-person financial summary.
 
@@ -69,17 +74,9 @@ def render_familia() -> None:
     st.markdown("##### Resumo Financeiro por Pessoa")
     df = st.session_state.df_transacoes
     if df is not None and not df.empty:
-        resumo = (
-            df.groupby(["Pessoa", "Tipo"])["ValorAbs"]
-            .sum()
-            .unstack(fill_value=0)
-            .reset_index()
-        )
-        if "Receita" not in resumo.columns:
-            resumo["Receita"] = 0
-        if "Despesa" not in resumo.columns:
-            resumo["Despesa"] = 0
-        resumo["Saldo"] = resumo["Receita"] - resumo["Despesa"]
+        # Shared per data version: the groupby runs once, not on every rerun
+        versao = st.session_state.get("versao_dados")
+        resumo = obter_resumo_por_pessoa(df, versao)
 
         st.dataframe(
             resumo,
@@ -93,26 +90,35 @@ def render_familia() -> None:
         )
 
         if len(resumo) > 0:
-            fig_fam = px.bar(
-                resumo,
-                x="Pessoa",
-                y=["Receita", "Despesa"],
-                barmode="group",
-                labels={"value": "Valor (R$)", "variable": "", "Pessoa": ""},
-                color_discrete_map={
-                    "Receita": _COLORS["receita"],
-                    "Despesa": _COLORS["despesa"],
-                },
-            )
-            fig_fam.update_layout(
-                paper_bgcolor="rgba(0,0,0,0)",
-                plot_bgcolor="rgba(0,0,0,0)",
-                margin=dict(l=30, r=20, t=50, b=30),
-                title=dict(text="Receitas vs Despesas por Pessoa", font=dict(size=15), x=0.02),
-                legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
-                bargap=0.25,
+            def _fig_familia() -> go.Figure:
+                fig = px.bar(
+                    obter_resumo_por_pessoa(df, versao),
+                    x="Pessoa",
+                    y=["Receita", "Despesa"],
+                    barmode="group",
+                    labels={"value": "Valor (R$)", "variable": "", "Pessoa": ""},
+                    color_discrete_map={
+                        "Receita": _COLORS["receita"],
+                        "Despesa": _COLORS["despesa"],
+                    },
+                )
+                fig.update_layout(
+                    paper_bgcolor="rgba(0,0,0,0)",
+                    plot_bgcolor="rgba(0,0,0,0)",
+                    margin=dict(l=30, r=20, t=50, b=30),
+                    title=dict(text="Receitas vs Despesas por Pessoa", font=dict(size=15), x=0.02),
+                    legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+                    bargap=0.25,
+                )
+                fig.update_traces(marker_line_width=0, marker_cornerradius=4)
+                return fig
+
+            fig_fam = figura_em_cache(
+                "familia.resumo",
+                _fig_familia,
+                versao,
+                tema=st.session_state.get("tema"),
             )
-            fig_fam.update_traces(marker_line_width=0, marker_cornerradius=4)
             st.plotly_chart(fig_fam, use_container_width=True)
     else:
         st.info("Adicione transações para ver o resumo.")
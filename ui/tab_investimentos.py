@@ -4,9 +4,11 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 from datetime import date, datetime
-from typing import Any, Dict, List
+from typing import Any
 from utils.helpers import salvar_investimentos, salvar_metas_reserva
 from utils.finance_models import calcular_rentabilidade, calcular_progresso_meta
+from utils.profiling import instrumentar
+from utils.relatorios import resumo_investimentos
 
 _PALETTE = [
     "#4B5563", "#16A34A", "#EA580C", "#DC2626",
@@ -21,39 +23,7 @@ def _safe_float(value: Any, default: float = 0.0) -> float:
         return default
 
 
-def _resumo_investimentos(
-    investimentos: List[Dict[str, Any]], metas_reserva: List[Dict[str, Any]]
-) -> Dict[str, float]:
-    total_aplicado = sum(_safe_float(inv.get("valor_aplicado")) for inv in investimentos)
-    patrimonio_atual = sum(_safe_float(inv.get("valor_atual")) for inv in investimentos)
-
-    rentabilidade = (
-        calcular_rentabilidade(total_aplicado, patrimonio_atual)
-        if total_aplicado > 0
-        else {"lucro": 0.0, "rentabilidade_percentual": 0.0}
-    )
-
-    progressos = []
-    for meta in metas_reserva:
-        valor_meta = _safe_float(meta.get("valor_meta"))
-        valor_atual = _safe_float(meta.get("valor_atual"))
-        if valor_meta > 0:
-            try:
-                progressos.append(calcular_progresso_meta(valor_atual, valor_meta))
-            except ValueError:
-                continue
-
-    progresso_medio = sum(progressos) / len(progressos) if progressos else 0.0
-
-    return {
-        "patrimonio_atual": patrimonio_atual,
-        "total_aplicado": total_aplicado,
-        "rentabilidade_reais": rentabilidade["lucro"],
-        "rentabilidade_percentual": rentabilidade["rentabilidade_percentual"],
-        "progresso_medio_metas": progresso_medio,
-    }
-
-
+@instrumentar
 def render_investimentos() -> None:
     """Render investments tab with portfolio and reserve goals tracking."""
     st.markdown("##### Investimentos e Dinheiro Guardado")
@@ -121,7 +91,7 @@ def render_investimentos() -> None:
 
     st.write("---")
 
-    resumo = _resumo_investimentos(
+    resumo = resumo_investimentos(
         st.session_state.investimentos, st.session_state.metas_reserva
     )
     mi1, mi2, mi3 = st.columns(3)
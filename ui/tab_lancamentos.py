@@ -2,10 +2,13 @@
 
 import streamlit as st
 from datetime import date
-from utils.helpers import salvar_transacoes
+from utils.helpers import lista_para_edicao, salvar_transacoes
 from utils.processing import processar_dados
+from utils.profiling import instrumentar
+from utils.saldo import propagar_lancamentos
 
 
+@instrumentar
 def render_lancamentos() -> None:
     """Render manual transaction entry form and recent history.
 
@@ -65,9 +68,16 @@ def render_lancamentos() -> None:
                         "Pessoa": pessoa,
                     }
 
-                    st.session_state.transacoes.append(nova_transacao)
+                    lista_para_edicao("transacoes").append(nova_transacao)
                     salvar_transacoes()
+                    versao_anterior = st.session_state.get("versao_dados")
                     processar_dados()
+                    propagar_lancamentos(
+                        versao_anterior,
+                        st.session_state.get("versao_dados"),
+                        [nova_transacao["Data"]],
+                        [valor_final],
+                    )
 
                     st.success(
                         f"{'Receita' if tipo == 'Receita' else 'Despesa'} de R$ {valor:,.2f} adicionada!"
@@ -17,20 +17,9 @@ import pandas as pd
 import numpy as np
 from typing import Dict, List
 from utils.finance_models import simular_meta_sonhos
-
-# --- Category → 50/30/20 bucket mapping ---
-# Users can adjust this in session state (future feature).
-_DEFAULT_BUCKET_MAP: Dict[str, str] = {
-    "Moradia": "Necessidades",
-    "Alimentação": "Necessidades",
-    "Saúde": "Necessidades",
-    "Transporte": "Necessidades",
-    "Educação": "Necessidades",
-    "Lazer": "Desejos",
-    "Compras": "Desejos",
-    "Outros": "Desejos",
-    "Receita": "Receita",  # excluded from analysis
-}
+from utils.graficos import SEM_DADOS, figura_em_cache
+from utils.profiling import instrumentar
+from utils.relatorios import LIMITES_5030_20, mapa_buckets, obter_analise_5030_20
 
 _BUCKET_COLORS = {
     "Necessidades": "#4B5563",   # neutral gray
@@ -38,63 +27,13 @@ _BUCKET_COLORS = {
     "Poupança/Dívidas": "#16A34A",  # green
 }
 
-_LIMITS = {"Necessidades": 50.0, "Desejos": 30.0, "Poupança/Dívidas": 20.0}
-
 
 def _get_bucket_map() -> Dict[str, str]:
     """Return the current category-to-bucket mapping from session state."""
-    cats = st.session_state.get("categories", {})
-    mapping = dict(_DEFAULT_BUCKET_MAP)
-    # Ensure new user-created categories default to "Desejos"
-    for cat in cats:
-        if cat not in mapping:
-            mapping[cat] = "Desejos"
-    return mapping
-
-
-def _calcular_analise_5030_20(
-    renda_liquida: float,
-    df_despesas: pd.DataFrame,
-    bucket_map: Dict[str, str],
-) -> pd.DataFrame:
-    """Compute planned vs. actual spending per 50/30/20 bucket.
-
-    Args:
-        renda_liquida: Monthly net income entered by user.
-        df_despesas: DataFrame with expense transactions for selected month.
-        bucket_map: Category → bucket name mapping.
-
-    Returns:
-        DataFrame with columns: Grupo, Limite (%), Limite (R$), Gasto (R$), Saldo (R$), % Renda.
-    """
-    if renda_liquida <= 0:
-        return pd.DataFrame()
-
-    # Map categories to buckets
-    df = df_despesas.copy()
-    df["Grupo"] = df["Categoria"].map(bucket_map).fillna("Desejos")
-    df = df[df["Grupo"] != "Receita"]
-
-    gastos_por_grupo = df.groupby("Grupo")["ValorAbs"].sum()
-
-    rows = []
-    for bucket, pct in _LIMITS.items():
-        limite_rs = renda_liquida * pct / 100
-        gasto = gastos_por_grupo.get(bucket, 0.0)
-        saldo = limite_rs - gasto
-        pct_renda = (gasto / renda_liquida) * 100 if renda_liquida > 0 else 0.0
-        rows.append({
-            "Grupo": bucket,
-            "Limite (%)": pct,
-            "Limite (R$)": limite_rs,
-            "Gasto (R$)": gasto,
-            "Saldo (R$)": saldo,
-            "% Renda": pct_renda,
-        })
-
-    return pd.DataFrame(rows)
+    return mapa_buckets(st.session_state.get("categories", {}))
 
 
+@instrumentar
 def render_planejamento() -> None:
     """Render the planning tab with 50/30/20 analysis and Dreams Manager."""
     tab_5030, tab_sonhos = st.tabs(["📊 Regra 50/30/20", "🌟 Gerenciador de Sonhos"])
@@ -146,15 +85,12 @@ def _render_5030_20() -> None:
         return
 
     df = st.session_state.df_transacoes
-    df_despesas_all = None
     mes_selecionado = None
 
     if df is not None and not df.empty:
-        df_desp = df[df["Tipo"] == "Despesa"]
-        if not df_desp.empty:
-            meses = sorted(df_desp["AnoMes"].unique(), reverse=True)
+        meses = sorted(df.loc[df["Tipo"] == "Despesa", "AnoMes"].unique(), reverse=True)
+        if meses:
             mes_selecionado = st.selectbox("Mês de referência", meses, key="plan_mes")
-            df_despesas_all = df_desp[df_desp["AnoMes"] == mes_selecionado]
 
     # ── Bucket mapping editor ──
     with st.expander("⚙️ Ajustar classificação das categorias"):
@@ -184,40 +120,54 @@ def _render_5030_20() -> None:
     col_p3.metric("Poupança/Dívidas (20%)", f"R$ {renda_liquida * 0.20:,.2f}")
 
     # ── Pie chart: planned allocation ──
-    df_pie = pd.DataFrame({
-        "Grupo": list(_LIMITS.keys()),
-        "Valor": [renda_liquida * p / 100 for p in _LIMITS.values()],
-    })
-    fig_pie = px.pie(
-        df_pie,
-        names="Grupo",
-        values="Valor",
-        hole=0.55,
-        color="Grupo",
-        color_discrete_map=_BUCKET_COLORS,
-    )
-    fig_pie.update_layout(
-        paper_bgcolor="rgba(0,0,0,0)",
-        plot_bgcolor="rgba(0,0,0,0)",
-        margin=dict(l=20, r=20, t=40, b=20),
-        legend=dict(orientation="h", yanchor="bottom", y=-0.2, xanchor="center", x=0.5),
-        title=dict(text="Divisão ideal da renda", font=dict(size=14), x=0.02),
-    )
-    fig_pie.update_traces(
-        textposition="inside",
-        textinfo="percent+label",
-        textfont_size=12,
-        marker_line_width=2,
-        marker_line_color="white",
+    def _fig_pizza() -> go.Figure:
+        df_pie = pd.DataFrame({
+            "Grupo": list(LIMITES_5030_20.keys()),
+            "Valor": [renda_liquida * p / 100 for p in LIMITES_5030_20.values()],
+        })
+        fig = px.pie(
+            df_pie,
+            names="Grupo",
+            values="Valor",
+            hole=0.55,
+            color="Grupo",
+            color_discrete_map=_BUCKET_COLORS,
+        )
+        fig.update_layout(
+            paper_bgcolor="rgba(0,0,0,0)",
+            plot_bgcolor="rgba(0,0,0,0)",
+            margin=dict(l=20, r=20, t=40, b=20),
+            legend=dict(orientation="h", yanchor="bottom", y=-0.2, xanchor="center", x=0.5),
+            title=dict(text="Divisão ideal da renda", font=dict(size=14), x=0.02),
+        )
+        fig.update_traces(
+            textposition="inside",
+            textinfo="percent+label",
+            textfont_size=12,
+            marker_line_width=2,
+            marker_line_color="white",
+        )
+        return fig
+
+    fig_pie = figura_em_cache(
+        "planejamento.pizza",
+        _fig_pizza,
+        SEM_DADOS,
+        filtros=renda_liquida,
+        tema=st.session_state.get("tema"),
     )
     st.plotly_chart(fig_pie, use_container_width=True)
 
     # ── Actual analysis ──
-    if df_despesas_all is not None and not df_despesas_all.empty:
+    if mes_selecionado is not None:
         st.write("---")
         st.markdown(f"##### Real vs. Planejado — {mes_selecionado}")
 
-        df_analise = _calcular_analise_5030_20(renda_liquida, df_despesas_all, bucket_map)
+        # Shared per data version and inputs: the month is aggregated once
+        versao = st.session_state.get("versao_dados")
+        df_analise = obter_analise_5030_20(
+            df, versao, mes_selecionado, renda_liquida, bucket_map
+        )
 
         if not df_analise.empty:
             # Alerts
@@ -248,33 +198,48 @@ def _render_5030_20() -> None:
                 )
 
             # Grouped bar chart: Limite vs Gasto
-            fig_bar = go.Figure()
-            fig_bar.add_trace(go.Bar(
-                name="Limite",
-                x=df_analise["Grupo"],
-                y=df_analise["Limite (R$)"],
-                marker_color=["rgba(75,85,99,0.3)", "rgba(234,88,12,0.3)", "rgba(22,163,74,0.3)"],
-                marker_line_color=["#4B5563", "#EA580C", "#16A34A"],
-                marker_line_width=2,
-            ))
-            fig_bar.add_trace(go.Bar(
-                name="Gasto Real",
-                x=df_analise["Grupo"],
-                y=df_analise["Gasto (R$)"],
-                marker_color=[
-                    _BUCKET_COLORS.get(g, "#4B5563") for g in df_analise["Grupo"]
-                ],
-                marker_cornerradius=4,
-            ))
-            fig_bar.update_layout(
-                barmode="group",
-                paper_bgcolor="rgba(0,0,0,0)",
-                plot_bgcolor="rgba(0,0,0,0)",
-                margin=dict(l=30, r=20, t=50, b=30),
-                title=dict(text="Limite vs. Gasto Real por Grupo", font=dict(size=15), x=0.02),
-                legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
-                yaxis=dict(tickprefix="R$ ", gridcolor="#E2E8F0"),
-                bargap=0.3,
+            def _fig_limites() -> go.Figure:
+                df_analise = obter_analise_5030_20(
+                    df, versao, mes_selecionado, renda_liquida, bucket_map
+                )
+                fig = go.Figure()
+                fig.add_trace(go.Bar(
+                    name="Limite",
+                    x=df_analise["Grupo"],
+                    y=df_analise["Limite (R$)"],
+                    marker_color=[
+                        "rgba(75,85,99,0.3)", "rgba(234,88,12,0.3)", "rgba(22,163,74,0.3)"
+                    ],
+                    marker_line_color=["#4B5563", "#EA580C", "#16A34A"],
+                    marker_line_width=2,
+                ))
+                fig.add_trace(go.Bar(
+                    name="Gasto Real",
+                    x=df_analise["Grupo"],
+                    y=df_analise["Gasto (R$)"],
+                    marker_color=[
+                        _BUCKET_COLORS.get(g, "#4B5563") for g in df_analise["Grupo"]
+                    ],
+                    marker_cornerradius=4,
+                ))
+                fig.update_layout(
+                    barmode="group",
+                    paper_bgcolor="rgba(0,0,0,0)",
+                    plot_bgcolor="rgba(0,0,0,0)",
+                    margin=dict(l=30, r=20, t=50, b=30),
+                    title=dict(text="Limite vs. Gasto Real por Grupo", font=dict(size=15), x=0.02),
+                    legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+                    yaxis=dict(tickprefix="R$ ", gridcolor="#E2E8F0"),
+                    bargap=0.3,
+                )
+                return fig
+
+            fig_bar = figura_em_cache(
+                "planejamento.limites",
+                _fig_limites,
+                versao,
+                filtros=(mes_selecionado, renda_liquida, bucket_map),
+                tema=st.session_state.get("tema"),
             )
             st.plotly_chart(fig_bar, use_container_width=True)
 
@@ -422,16 +387,22 @@ def _render_gerenciador_sonhos() -> None:
         if not dados:
             return
 
-        try:
-            resultado = simular_meta_sonhos(
-                fv=dados["fv"],
-                p=dados["p"],
-                taxa_mensal=dados["taxa_mensal"],
-                saldo_inicial=dados["saldo_inicial"],
-            )
-        except ValueError as exc:
-            st.error(f"Erro na simulação: {exc}")
-            return
+        # Simulated once per goal, not on every rerun that shows it
+        anterior = st.session_state.get("_resultado_sonho")
+        if anterior is not None and anterior[0] == dados:
+            resultado = anterior[1]
+        else:
+            try:
+                resultado = simular_meta_sonhos(
+                    fv=dados["fv"],
+                    p=dados["p"],
+                    taxa_mensal=dados["taxa_mensal"],
+                    saldo_inicial=dados["saldo_inicial"],
+                )
+            except ValueError as exc:
+                st.error(f"Erro na simulação: {exc}")
+                return
+            st.session_state._resultado_sonho = (dict(dados), resultado)
 
         st.write("---")
         nome_exib = dados.get("nome", "Meu Sonho")
@@ -466,84 +437,94 @@ def _render_gerenciador_sonhos() -> None:
         )
 
         # Growth curve
-        df_curva = pd.DataFrame(resultado["curva"])
-        df_curva["Meta"] = dados["fv"]
-
-        fig = go.Figure()
-
-        # Aporte acumulado line (area)
-        aportes = [
-            dados["saldo_inicial"] + dados["p"] * m
-            for m in df_curva["mes"]
-        ]
-        fig.add_trace(go.Scatter(
-            x=df_curva["mes"],
-            y=aportes,
-            name="Só aportes (sem juros)",
-            line=dict(color="#94A3B8", width=1.5, dash="dot"),
-            hovertemplate="Mês %{x}<br>Sem juros: R$ %{y:,.2f}<extra></extra>",
-        ))
-
-        # Compound growth area
-        fig.add_trace(go.Scatter(
-            x=df_curva["mes"],
-            y=df_curva["saldo"],
-            name="Com juros compostos",
-            line=dict(color="#16A34A", width=2.5),
-            fill="tozeroy",
-            fillcolor="rgba(22,163,74,0.08)",
-            hovertemplate="Mês %{x}<br>Saldo: R$ %{y:,.2f}<extra></extra>",
-        ))
-
-        # Goal line
-        fig.add_trace(go.Scatter(
-            x=df_curva["mes"],
-            y=df_curva["Meta"],
-            name=f"Meta: R$ {dados['fv']:,.2f}",
-            line=dict(color="#DC2626", width=1.5, dash="dash"),
-            hovertemplate="Meta: R$ %{y:,.2f}<extra></extra>",
-        ))
-
-        # Mark intersection
-        if resultado["atingido"]:
-            fig.add_vline(
-                x=resultado["meses"],
-                line_width=1,
-                line_dash="dot",
-                line_color="#EA580C",
-                annotation_text=f"  Mês {resultado['meses']}",
-                annotation_position="top right",
-            )
+        def _fig_curva() -> go.Figure:
+            df_curva = pd.DataFrame(resultado["curva"])
+            df_curva["Meta"] = dados["fv"]
+
+            fig = go.Figure()
+
+            # Aporte acumulado line (area)
+            aportes = [
+                dados["saldo_inicial"] + dados["p"] * m
+                for m in df_curva["mes"]
+            ]
+            fig.add_trace(go.Scatter(
+                x=df_curva["mes"],
+                y=aportes,
+                name="Só aportes (sem juros)",
+                line=dict(color="#94A3B8", width=1.5, dash="dot"),
+                hovertemplate="Mês %{x}<br>Sem juros: R$ %{y:,.2f}<extra></extra>",
+            ))
 
-        fig.update_layout(
-            title=dict(
-                text=f"Curva de crescimento — {nome_exib}",
-                font=dict(size=15),
-                x=0.02,
-            ),
-            paper_bgcolor="rgba(0,0,0,0)",
-            plot_bgcolor="rgba(0,0,0,0)",
-            margin=dict(l=30, r=20, t=60, b=30),
-            xaxis=dict(
-                title="Meses",
-                gridcolor="#E2E8F0",
-                tickfont=dict(size=11),
-            ),
-            yaxis=dict(
-                title="Saldo (R$)",
-                tickprefix="R$ ",
-                gridcolor="#E2E8F0",
-                tickfont=dict(size=11),
-            ),
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=1.02,
-                xanchor="right",
-                x=1,
-                font=dict(size=11),
-            ),
-            hoverlabel=dict(bgcolor="white", font_size=12),
+            # Compound growth area
+            fig.add_trace(go.Scatter(
+                x=df_curva["mes"],
+                y=df_curva["saldo"],
+                name="Com juros compostos",
+                line=dict(color="#16A34A", width=2.5),
+                fill="tozeroy",
+                fillcolor="rgba(22,163,74,0.08)",
+                hovertemplate="Mês %{x}<br>Saldo: R$ %{y:,.2f}<extra></extra>",
+            ))
+
+            # Goal line
+            fig.add_trace(go.Scatter(
+                x=df_curva["mes"],
+                y=df_curva["Meta"],
+                name=f"Meta: R$ {dados['fv']:,.2f}",
+                line=dict(color="#DC2626", width=1.5, dash="dash"),
+                hovertemplate="Meta: R$ %{y:,.2f}<extra></extra>",
+            ))
+
+            # Mark intersection
+            if resultado["atingido"]:
+                fig.add_vline(
+                    x=resultado["meses"],
+                    line_width=1,
+                    line_dash="dot",
+                    line_color="#EA580C",
+                    annotation_text=f"  Mês {resultado['meses']}",
+                    annotation_position="top right",
+                )
+
+            fig.update_layout(
+                title=dict(
+                    text=f"Curva de crescimento — {nome_exib}",
+                    font=dict(size=15),
+                    x=0.02,
+                ),
+                paper_bgcolor="rgba(0,0,0,0)",
+                plot_bgcolor="rgba(0,0,0,0)",
+                margin=dict(l=30, r=20, t=60, b=30),
+                xaxis=dict(
+                    title="Meses",
+                    gridcolor="#E2E8F0",
+                    tickfont=dict(size=11),
+                ),
+                yaxis=dict(
+                    title="Saldo (R$)",
+                    tickprefix="R$ ",
+                    gridcolor="#E2E8F0",
+                    tickfont=dict(size=11),
+                ),
+                legend=dict(
+                    orientation="h",
+                    yanchor="bottom",
+                    y=1.02,
+                    xanchor="right",
+                    x=1,
+                    font=dict(size=11),
+                ),
+                hoverlabel=dict(bgcolor="white", font_size=12),
+            )
+            return fig
+
+        fig = figura_em_cache(
+            "planejamento.sonho",
+            _fig_curva,
+            SEM_DADOS,
+            filtros=dados,
+            tema=st.session_state.get("tema"),
         )
         st.plotly_chart(fig, use_container_width=True)
 
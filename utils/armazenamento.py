@@ -0,0 +1,187 @@
+"""Process-wide, read-only transaction store shared by all sessions.
+
+Streamlit serves every browser session from the same process, each in its
+own thread. Without sharing, N open tabs hold N copies of the household
+history: the ``transacoes`` / ``transacoes_importadas`` lists loaded by
+``initialize_session_state`` and the processed ``df_transacoes`` frame.
+
+This module keeps one copy of each per process:
+
+- stores loaded from disk are shared while the file is unchanged (keyed by
+  path, mtime and size);
+- processed frames are shared by a content fingerprint of their inputs, so
+  sessions with the same data reuse the same DataFrame; results derived
+  from them (``saldo:<versao>``, ``indice:<versao>``...) are cached under a
+  namespace prefix, each namespace with its own bound;
+- a session that edits a shared list first takes a private copy
+  (copia_para_edicao), so pending edits never leak into other sessions.
+
+Shared objects must be treated as read-only.
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from utils import serializacao
+
+# Frames kept per process and per namespace: processed transactions (keys
+# without prefix) and each kind of derived result (``saldo:``, ``indice:``,
+# ``recorrentes:``, ``projecao:``) have separate LRUs, so caching derived
+# series never evicts the processed frames they were built from.
+MAX_VERSOES: int = 8
+
+_trava = threading.Lock()
+_arquivos: Dict[str, Tuple[Tuple[int, int], Any]] = {}
+# Content digest of each shared store, computed once per file version.
+_impressoes: Dict[str, Tuple[Tuple[int, int], bytes]] = {}
+_frames: "Dict[str, OrderedDict[str, pd.DataFrame]]" = {}
+
+
+def _carimbo(arquivo: str) -> Optional[Tuple[int, int]]:
+    try:
+        info = os.stat(arquivo)
+    except OSError:
+        return None
+    return info.st_mtime_ns, info.st_size
+
+
+def carregar_compartilhado(arquivo: str, carregar: Callable[[], Any]) -> Any:
+    """Load a store once per process while the file is unchanged.
+
+    Args:
+        arquivo: Path of the JSON store.
+        carregar: Loader used on a miss (e.g. ``lambda: load_json(...)``).
+
+    Returns:
+        The shared object. Callers must not mutate it; use
+        copia_para_edicao first.
+    """
+    chave = os.path.abspath(arquivo)
+    carimbo = _carimbo(arquivo)
+    if carimbo is None:
+        return carregar()  # missing file: nothing worth sharing
+    with _trava:
+        atual = _arquivos.get(chave)
+        if atual is not None and atual[0] == carimbo:
+            return atual[1]
+    dados = carregar()
+    with _trava:
+        _arquivos[chave] = (carimbo, dados)
+    return dados
+
+
+def compartilhado(obj: Any) -> bool:
+    """Return True if ``obj`` is a shared store (see carregar_compartilhado)."""
+    with _trava:
+        return any(dados is obj for _, dados in _arquivos.values())
+
+
+def copia_para_edicao(lista: List[Any]) -> List[Any]:
+    """Copy-on-write: a private copy of a shared list, or the list itself.
+
+    The copy is shallow; records are only appended or removed, never
+    edited in place, so they can stay shared.
+
+    Args:
+        lista: List from session state.
+
+    Returns:
+        A list the session may mutate.
+    """
+    return list(lista) if compartilhado(lista) else lista
+
+
+def _digest(parte: Any) -> bytes:
+    return hashlib.blake2b(serializacao.dumps(parte), digest_size=16).digest()
+
+
+def _digest_parte(parte: Any) -> bytes:
+    """Digest of one input; shared stores are hashed once per file version."""
+    with _trava:
+        origem = next(
+            ((arquivo, carimbo) for arquivo, (carimbo, dados) in _arquivos.items()
+             if dados is parte),
+            None,
+        )
+        if origem is not None:
+            conhecida = _impressoes.get(origem[0])
+            if conhecida is not None and conhecida[0] == origem[1]:
+                return conhecida[1]
+    digest = _digest(parte)
+    if origem is not None:
+        with _trava:
+            _impressoes[origem[0]] = (origem[1], digest)
+    return digest
+
+
+def impressao_dados(*partes: Any) -> str:
+    """Content fingerprint of the inputs of a processed frame.
+
+    Shared stores (see carregar_compartilhado) are serialized and hashed
+    only once per file version, so sessions that did not edit them pay no
+    hashing cost; a session's private copy is hashed on every call. Both
+    give the same fingerprint for the same content.
+
+    Args:
+        *partes: JSON-serializable inputs (transaction lists, categories...).
+
+    Returns:
+        Hex digest identifying this data version.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    for parte in partes:
+        h.update(_digest_parte(parte))
+    return h.hexdigest()
+
+
+def _namespace(chave: str) -> str:
+    return chave.partition(":")[0] if ":" in chave else ""
+
+
+def obter_frame(chave: str) -> Optional[pd.DataFrame]:
+    """Return the shared processed frame for a data version, if built."""
+    with _trava:
+        frames = _frames.get(_namespace(chave))
+        if frames is None or chave not in frames:
+            return None
+        frames.move_to_end(chave)
+        return frames[chave]
+
+
+def guardar_frame(chave: str, df: pd.DataFrame) -> pd.DataFrame:
+    """Share a processed frame, keeping the ``MAX_VERSOES`` most recent.
+
+    The limit applies per namespace (the key prefix before ``:``), so
+    derived results and processed frames are evicted independently.
+
+    Args:
+        chave: Data version (see impressao_dados), optionally prefixed
+            with a namespace (e.g. ``saldo:<versao>``).
+        df: Processed frame; read-only from now on.
+
+    Returns:
+        The shared frame (an equal one built concurrently by another
+        session wins, so every session ends up on the same object).
+    """
+    with _trava:
+        frames = _frames.setdefault(_namespace(chave), OrderedDict())
+        existente = frames.get(chave)
+        if existente is not None:
+            return existente
+        frames[chave] = df
+        while len(frames) > MAX_VERSOES:
+            frames.popitem(last=False)
+    return df
+
+
+def limpar() -> None:
+    """Drop every shared object (tests, or after external file changes)."""
+    with _trava:
+        _arquivos.clear()
+        _impressoes.clear()
+        _frames.clear()
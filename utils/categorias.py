@@ -0,0 +1,784 @@
+"""Compiled categorization rules, shared by every session of the process.
+
+The categories dict (category → keywords) is small, but every session used
+to load and scan it per transaction. compilar_regras() turns it into
+normalized keyword tuples and one precompiled regex per category; the
+result is cached process-wide with ``st.cache_resource``, keyed by the
+content hash of the categories (the same bytes save_json writes to
+categorias.json). Saving edited categories produces a new key, so no
+session ever sees rules that disagree with its categories.
+
+The cached objects are shared: never mutate ``regras["categorias"]`` in
+place — copy it, edit the copy and save it with helpers.salvar_categorias.
+
+Very large histories (LIMIAR_PARALELO rows or more) are classified on a
+process pool: the distinct normalized descriptions are split into
+contiguous shards, one task each, and the results are concatenated in
+order, so the output is identical to the serial path. The pool is kept
+per rules version and each worker receives the compiled rules once, when
+it starts.
+
+Keywords are rules in a small language: one description condition (a
+phrase or a regex) plus optional amount and person conditions, which must
+all hold:
+
+- ``uber`` — substring of the normalized description (plain keyword).
+  Words are matched together as one phrase: ``ifood delivery`` only
+  matches descriptions containing exactly that text, not both words
+  anywhere;
+- ``re:uber.*trip`` — regular expression searched in the normalized
+  description (case-insensitive, write it without accents). Leading
+  global flags such as ``(?s)`` apply to the rule only; named groups and
+  group references (``\\1``) are rejected, as rules are combined into
+  one pattern;
+- ``valor:100..300`` — absolute amount in the range (``valor:100..`` and
+  ``valor:..300`` leave one end open);
+- ``pessoa:ana`` — the transaction's person.
+
+So ``posto valor:100..300`` matches fuel-station descriptions with amounts
+between 100 and 300. Rules that only look at the description are compiled
+into one alternation with a named group per category, tried in priority
+order; rules with amount or person conditions are evaluated for whole
+columns at once with numpy and only override a row when their category
+comes first.
+
+Classifications of distinct normalized descriptions are also remembered
+across runs in classificacoes.json, tagged with the ruleset they were made
+with. When the rules change, only descriptions containing an added or
+removed keyword are dropped (all of them if categories were reordered).
+"""
+
+import contextlib
+import hashlib
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union, cast
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils import helpers, serializacao
+
+# Category returned when no keyword matches.
+CATEGORIA_PADRAO: str = "Outros"
+
+# Rule versions kept in the process-wide cache.
+MAX_VERSOES_REGRAS: int = 8
+
+# Rows from which categorizar_serie classifies on a process pool
+# (``DFF_LIMIAR_PARALELO``; 0 disables parallelism).
+LIMIAR_PARALELO: int = int(os.environ.get("DFF_LIMIAR_PARALELO", "500000"))
+
+# Distinct descriptions below which the pool is not worth its IPC cost.
+MIN_UNICOS_PARALELO: int = 20_000
+
+# Worker processes of the pool (default: CPU count).
+PROCESSOS_CATEGORIZACAO: int = os.cpu_count() or 1
+
+# Shards per worker, so uneven shards still keep every worker busy.
+LOTES_POR_PROCESSO: int = 4
+
+# Prefixes of the rule language (see the module docstring).
+PREFIXO_REGEX: str = "re:"
+PREFIXO_VALOR: str = "valor:"
+PREFIXO_PESSOA: str = "pessoa:"
+
+# Description-only rules: one alternation and its group name → category.
+_Automato = Tuple[Optional["re.Pattern[str]"], Dict[str, str]]
+
+_trava_pool = threading.Lock()
+_pool: Optional[Tuple[str, int, ProcessPoolExecutor]] = None
+
+# Calls currently mapping on each pool. A pool replaced by another ruleset
+# keeps running until its last user is done, then it is shut down.
+_usos_pool: Dict[ProcessPoolExecutor, int] = {}
+
+# Rules of a worker process, set once by _iniciar_worker.
+_automato_worker: _Automato = (None, {})
+
+# Persisted classifications: {"impressao", "palavras", "classificacoes"}.
+_trava_classificacoes = threading.Lock()
+_classificacoes: Optional[Dict[str, Any]] = None
+
+
+def impressao_categorias(categorias: Dict[str, List[str]]) -> str:
+    """Content hash of a categories dict (as serialized to categorias.json)."""
+    return hashlib.sha256(serializacao.dumps(categorias)).hexdigest()
+
+
+class Regra(NamedTuple):
+    """One parsed keyword of the rule language."""
+
+    texto: Optional[str]  # regex source for the description; None matches any
+    valor_min: float = -np.inf
+    valor_max: float = np.inf
+    pessoa: Optional[str] = None
+
+    @property
+    def condicional(self) -> bool:
+        """True if the rule depends on the amount or the person."""
+        return self.pessoa is not None or self.valor_min > -np.inf or self.valor_max < np.inf
+
+
+_PREFIXOS = (PREFIXO_REGEX, PREFIXO_VALOR, PREFIXO_PESSOA)
+
+# Leading global flags of a regex rule, e.g. ``(?i)`` or ``(?s)``.
+_FLAGS_INICIAIS = re.compile(r"(?:\(\?[aiLmsux]+\))+")
+
+# Group references, which would point at another rule's groups once
+# combined: ``\1``..``\99`` and conditionals ``(?(1)...)``. Other escapes
+# (including ``\\``) are consumed first so they are not mistaken for one.
+_REFERENCIA_GRUPO = re.compile(r"\\[1-9]|\(\?\(|\\.")
+
+
+def _termo_especial(termo: str) -> bool:
+    return termo.lower().startswith(_PREFIXOS)
+
+
+def normalizar_regra(palavra: str) -> str:
+    """Normalize a keyword for storage: like normalizar_texto, except regexes.
+
+    Plain keywords are normalized exactly as before. The body of a ``re:``
+    term keeps its case, as escapes such as ``\\D`` or ``\\S`` depend on
+    it; it is matched case-insensitively anyway.
+
+    Args:
+        palavra: Keyword as typed.
+
+    Returns:
+        Normalized keyword.
+    """
+    termos = palavra.split()
+    if not any(_termo_especial(t) for t in termos):
+        return helpers.normalizar_texto(palavra)
+    normalizados = []
+    em_regex = False
+    for termo in termos:
+        if termo.lower().startswith(PREFIXO_REGEX):
+            em_regex = True
+            termo = PREFIXO_REGEX + termo[len(PREFIXO_REGEX):]
+        elif em_regex and not _termo_especial(termo):
+            pass  # regex bodies may contain spaces
+        else:
+            em_regex = False
+            termo = helpers.normalizar_texto(termo)
+        normalizados.append(termo)
+    return " ".join(normalizados)
+
+
+def separar_palavras(texto: str) -> List[str]:
+    """Split a comma-separated keyword list, keeping the commas of regexes.
+
+    Inside a ``re:`` rule a comma only separates keywords when it is not
+    escaped nor inside brackets, parentheses or braces, so quantifiers such
+    as ``\\d{2,4}`` and classes such as ``[,.]`` are kept.
+
+    Args:
+        texto: Keywords as typed, e.g. ``farmácia, re:\\d{2,4}``.
+
+    Returns:
+        Stripped keywords, in order.
+    """
+    palavras: List[str] = []
+    atual = ""
+    em_regex = em_classe = escape = False
+    profundidade = 0
+    for c in texto:
+        if escape:
+            escape = False
+        elif c == "," and not em_classe and profundidade == 0:
+            palavras.append(atual.strip())
+            atual = ""
+            em_regex = False
+            continue
+        elif em_regex and c == "\\":
+            escape = True
+        elif em_classe:
+            em_classe = c != "]"
+        elif em_regex and c == "[":
+            em_classe = True
+        elif em_regex and c in "({":
+            profundidade += 1
+        elif em_regex and c in ")}" and profundidade:
+            profundidade -= 1
+        atual += c
+        if not em_regex and atual.lower().endswith(PREFIXO_REGEX):
+            inicio = atual[: -len(PREFIXO_REGEX)]
+            em_regex = not inicio or inicio[-1].isspace()
+    palavras.append(atual.strip())
+    return palavras
+
+
+def _corpo_regex(palavra: str, corpo: str) -> str:
+    """Validate a regex rule and make it safe to combine with other rules.
+
+    Returns:
+        The regex, with leading global flags scoped to it.
+
+    Raises:
+        ValueError: If it does not compile, or uses named groups or group
+            references.
+    """
+    flags = _FLAGS_INICIAIS.match(corpo)
+    if flags:
+        letras = "".join(dict.fromkeys(re.findall(r"[aiLmsux]", flags.group())))
+        corpo = f"(?{letras}:{corpo[flags.end():]})"
+    try:
+        padrao = re.compile(corpo)
+        re.compile(f"(?i:{corpo})")
+    except re.error as erro:
+        raise ValueError(f"Expressão regular inválida em '{palavra}': {erro}") from None
+    if padrao.groupindex:
+        raise ValueError(
+            f"Expressão regular inválida em '{palavra}': grupos nomeados não são suportados"
+        )
+    referencias = [m.group() for m in _REFERENCIA_GRUPO.finditer(corpo)]
+    if any(r == "(?(" or r[1:].isdigit() for r in referencias):
+        raise ValueError(
+            f"Expressão regular inválida em '{palavra}': referências a grupos não são suportadas"
+        )
+    return corpo
+
+
+def _faixa(termo: str) -> Tuple[float, float]:
+    faixa = termo[len(PREFIXO_VALOR):]
+    minimo, separador, maximo = faixa.partition("..")
+    if not separador:
+        maximo = minimo
+    try:
+        limites = [float(v.replace(",", ".")) if v else None for v in (minimo, maximo)]
+    except ValueError:
+        raise ValueError(f"Faixa de valor inválida: {termo}") from None
+    if limites == [None, None]:
+        raise ValueError(f"Faixa de valor inválida: {termo}")
+    return (
+        -np.inf if limites[0] is None else limites[0],
+        np.inf if limites[1] is None else limites[1],
+    )
+
+
+def interpretar_regra(palavra: str) -> Regra:
+    """Parse a normalized keyword (see the module docstring).
+
+    The ``valor:`` and ``pessoa:`` terms become conditions; the remaining
+    terms, joined by single spaces, form one literal phrase or ``re:``
+    regex matched against the description.
+
+    Args:
+        palavra: Result of normalizar_regra.
+
+    Returns:
+        The parsed Regra.
+
+    Raises:
+        ValueError: On an invalid regex (or one that cannot be combined
+            with other rules, see _corpo_regex) or amount range.
+    """
+    termos = palavra.split()
+    if not any(_termo_especial(t) for t in termos):
+        return Regra(re.escape(palavra))
+
+    condicoes: Dict[str, Any] = {}
+    resto = []
+    for termo in termos:
+        if termo.startswith(PREFIXO_VALOR):
+            condicoes["valor_min"], condicoes["valor_max"] = _faixa(termo)
+        elif termo.startswith(PREFIXO_PESSOA) and len(termo) > len(PREFIXO_PESSOA):
+            condicoes["pessoa"] = termo[len(PREFIXO_PESSOA):]
+        else:
+            resto.append(termo)
+    texto = " ".join(resto)
+    if texto.startswith(PREFIXO_REGEX):
+        corpo = _corpo_regex(palavra, texto[len(PREFIXO_REGEX):])
+        return Regra(f"(?i:{corpo})", **condicoes)
+    return Regra(re.escape(texto) if texto else None, **condicoes)
+
+
+def erro_regra(palavra: str) -> Optional[str]:
+    """Validation message for a keyword, or None if it is valid."""
+    try:
+        interpretar_regra(normalizar_regra(palavra))
+    except ValueError as erro:
+        return str(erro)
+    return None
+
+
+def compilar_regras(categorias: Dict[str, List[str]]) -> Dict[str, Any]:
+    """Normalize keywords and compile them into one matcher.
+
+    Invalid rules (see erro_regra) are ignored.
+
+    Args:
+        categorias: Category name → keyword list, in priority order.
+
+    Returns:
+        Dict with ``categorias`` (the input), ``impressao`` (content hash),
+        ``palavras`` (category → tuple of normalized, deduplicated
+        keywords), ``automato`` (the description-only rules: one regex
+        whose alternatives, one per category in priority order, are tried
+        with ``match`` and named after the category they set, plus the
+        group name → category dict), ``condicionais`` (list of
+        ``(priority, category, Regra, compiled description regex or None)``
+        for the rules with amount or person conditions) and ``prioridades``
+        (position of each category with description-only rules; the
+        CATEGORIA_PADRAO fallback has none, so any conditional rule beats it).
+    """
+    palavras: Dict[str, tuple] = {}
+    ramos = []
+    grupos: Dict[str, str] = {}
+    condicionais = []
+    for prioridade, (categoria, lista) in enumerate(categorias.items()):
+        normalizadas = tuple(dict.fromkeys(normalizar_regra(p) for p in lista))
+        palavras[categoria] = normalizadas
+        fragmentos = []
+        for palavra in normalizadas:
+            try:
+                regra = interpretar_regra(palavra)
+            except ValueError:
+                continue
+            if regra.condicional:
+                padrao = re.compile(regra.texto) if regra.texto is not None else None
+                condicionais.append((prioridade, categoria, regra, padrao))
+            else:
+                fragmentos.append(regra.texto or "")
+        if fragmentos:
+            grupo = f"_c{prioridade}"
+            ramos.append(f"(?=.*?(?:{'|'.join(fragmentos)}))(?P<{grupo}>)")
+            grupos[grupo] = categoria
+    return {
+        "categorias": categorias,
+        "impressao": impressao_categorias(categorias),
+        "palavras": palavras,
+        "automato": (re.compile("|".join(ramos), re.DOTALL) if ramos else None, grupos),
+        "condicionais": condicionais,
+        "prioridades": {c: int(g[2:]) for g, c in grupos.items()},
+    }
+
+
+@st.cache_resource(max_entries=MAX_VERSOES_REGRAS, show_spinner=False)
+def _regras_compartilhadas(impressao: str, _categorias: Dict[str, List[str]]) -> Dict[str, Any]:
+    """Process-wide cache entry (only ``impressao`` is part of the key)."""
+    return compilar_regras(_categorias)
+
+
+def obter_regras(categorias: Dict[str, List[str]]) -> Dict[str, Any]:
+    """Return the shared compiled rules for a categories dict.
+
+    Args:
+        categorias: Category name → keyword list.
+
+    Returns:
+        The cached result of compilar_regras for this content.
+    """
+    return _regras_compartilhadas(impressao_categorias(categorias), categorias)
+
+
+def limpar_cache_regras() -> None:
+    """Drop every cached rule version (e.g. in tests)."""
+    cast(Any, _regras_compartilhadas).clear()
+
+
+def categorizar(
+    descricao: str,
+    regras: Dict[str, Any],
+    valor: Optional[float] = None,
+    pessoa: Optional[str] = None,
+) -> str:
+    """Categorize one description with compiled rules.
+
+    Same rule as helpers.categorizar_despesa: the first category (in dict
+    order) with a keyword contained in the normalized description. Keywords
+    are normalized as well, so accented or capitalized keywords from a
+    hand-edited categorias.json match too.
+
+    Args:
+        descricao: Transaction description.
+        regras: Result of obter_regras / compilar_regras.
+        valor: Transaction amount, for ``valor:`` rules.
+        pessoa: Transaction person, for ``pessoa:`` rules.
+
+    Returns:
+        Category name, or CATEGORIA_PADRAO.
+    """
+    if not regras["condicionais"]:
+        texto = helpers.normalizar_texto(descricao)
+        return _classificar_unicos([texto], regras["automato"])[0]
+    return categorizar_serie(
+        pd.Series([descricao], dtype=object),
+        regras,
+        limiar=0,
+        valores=None if valor is None else pd.Series([valor], dtype=float),
+        pessoas=None if pessoa is None else pd.Series([pessoa], dtype=object),
+    ).iloc[0]
+
+
+def _classificar_unicos(
+    unicos: Union[Sequence[str], np.ndarray], automato: _Automato
+) -> np.ndarray:
+    resultado = np.full(len(unicos), CATEGORIA_PADRAO, dtype=object)
+    padrao, grupos = automato
+    if padrao is None:
+        return resultado
+    casar = padrao.match
+    for i, texto in enumerate(unicos):
+        encontrado = casar(texto)
+        if encontrado is not None and encontrado.lastgroup is not None:
+            resultado[i] = grupos[encontrado.lastgroup]
+    return resultado
+
+
+def _iniciar_worker(automato: _Automato) -> None:
+    global _automato_worker
+    _automato_worker = automato
+
+
+def _classificar_lote(textos: np.ndarray) -> np.ndarray:
+    return _classificar_unicos(textos, _automato_worker)
+
+
+def _aposentar(executor: ProcessPoolExecutor) -> None:
+    """Shut down a replaced pool if no call is using it (lock held)."""
+    if not _usos_pool.get(executor):
+        _usos_pool.pop(executor, None)
+        executor.shutdown(wait=False)
+
+
+@contextlib.contextmanager
+def _usar_pool(regras: Dict[str, Any], processos: int) -> Iterator[ProcessPoolExecutor]:
+    """Process pool whose workers hold ``regras`` (replaced when rules change).
+
+    The pool is held for the duration of the block: replacing it (another
+    session with other rules) never cancels the work submitted here.
+    """
+    global _pool
+    with _trava_pool:
+        if _pool is None or _pool[:2] != (regras["impressao"], processos):
+            if _pool is not None:
+                _aposentar(_pool[2])
+            # spawn: forking the multithreaded Streamlit server is unsafe
+            novo = ProcessPoolExecutor(
+                max_workers=processos,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_iniciar_worker,
+                initargs=(regras["automato"],),
+            )
+            _pool = (regras["impressao"], processos, novo)
+        executor = _pool[2]
+        _usos_pool[executor] = _usos_pool.get(executor, 0) + 1
+    try:
+        yield executor
+    finally:
+        with _trava_pool:
+            _usos_pool[executor] -= 1
+            if _pool is None or _pool[2] is not executor:
+                _aposentar(executor)
+
+
+def encerrar_pool() -> None:
+    """Shut down the categorization process pool, if started."""
+    global _pool
+    with _trava_pool:
+        if _pool is not None:
+            _pool[2].shutdown(wait=True)
+            _pool = None
+
+
+def classificar_em_paralelo(
+    unicos: np.ndarray, regras: Dict[str, Any], processos: int
+) -> np.ndarray:
+    """Classify distinct normalized descriptions across worker processes.
+
+    Args:
+        unicos: Distinct normalized descriptions.
+        regras: Result of obter_regras / compilar_regras.
+        processos: Worker processes.
+
+    Returns:
+        Category per entry of ``unicos``, identical to the serial result.
+    """
+    lotes = np.array_split(np.asarray(unicos, dtype=object), processos * LOTES_POR_PROCESSO)
+    with _usar_pool(regras, processos) as executor:
+        partes = list(executor.map(_classificar_lote, [lote for lote in lotes if len(lote)]))
+    return np.concatenate(partes) if partes else np.empty(0, dtype=object)
+
+
+def _pares(palavras: Dict[str, Sequence[str]]) -> set:
+    return {(categoria, p) for categoria, lista in palavras.items() for p in lista}
+
+
+def palavras_alteradas(
+    palavras_antigas: Dict[str, Sequence[str]], palavras: Dict[str, Sequence[str]]
+) -> Optional[set]:
+    """Keywords whose edit can change the category of a description.
+
+    A description can only change category if it contains a keyword that
+    was added, removed or moved between categories. Descriptions without
+    any of those match exactly the same keywords as before, so they keep
+    their category, unless the relative order of categories (the match
+    priority) changed.
+
+    Args:
+        palavras_antigas: ``regras["palavras"]`` of the old rules.
+        palavras: ``regras["palavras"]`` of the new rules.
+
+    Returns:
+        Set of normalized keywords, or None when the priority changed and
+        every description may be affected.
+    """
+    antigas = [c for c, lista in palavras_antigas.items() if lista and palavras.get(c)]
+    novas = [c for c, lista in palavras.items() if lista and palavras_antigas.get(c)]
+    if antigas != novas:
+        return None
+    return {p for _, p in _pares(palavras_antigas) ^ _pares(palavras)}
+
+
+def _padrao_palavras(palavras: set) -> "re.Pattern[str]":
+    """Regex matching every description any of ``palavras`` may match."""
+    fragmentos = []
+    for palavra in sorted(palavras):
+        try:
+            fragmentos.append(interpretar_regra(palavra).texto or "")
+        except ValueError:
+            continue
+    return re.compile("|".join(fragmentos) or "(?!)", re.DOTALL)
+
+
+def descricoes_afetadas(
+    descricoes: Sequence[str],
+    palavras_antigas: Dict[str, Sequence[str]],
+    palavras: Dict[str, Sequence[str]],
+) -> np.ndarray:
+    """Mask of the normalized descriptions a keyword edit may re-categorize.
+
+    Args:
+        descricoes: Distinct normalized descriptions (e.g. the categories of
+            indice_descricoes).
+        palavras_antigas: ``regras["palavras"]`` before the edit.
+        palavras: ``regras["palavras"]`` after the edit.
+
+    Returns:
+        Boolean array aligned with ``descricoes`` (see palavras_alteradas).
+    """
+    alteradas = palavras_alteradas(palavras_antigas, palavras)
+    if alteradas is None:
+        return np.ones(len(descricoes), dtype=bool)
+    if not alteradas:
+        return np.zeros(len(descricoes), dtype=bool)
+    padrao = _padrao_palavras(alteradas)
+    return pd.Series(descricoes, dtype=object).str.contains(padrao).to_numpy(dtype=bool)
+
+
+def indice_descricoes(descricoes: pd.Series) -> pd.Series:
+    """Description index: each description's normalized form as a categorical.
+
+    The categories are the distinct normalized descriptions and the codes
+    map every row to one of them, so a keyword edit can be checked against
+    each distinct description once (descricoes_afetadas) and the rows to
+    update found from the codes.
+
+    Args:
+        descricoes: Raw descriptions.
+
+    Returns:
+        Categorical Series with the same index as ``descricoes``.
+    """
+    return helpers.normalizar_serie(descricoes).astype("category")
+
+
+def ajustar_classificacoes(
+    classificacoes: Dict[str, str],
+    palavras_antigas: Dict[str, Sequence[str]],
+    regras: Dict[str, Any],
+) -> Dict[str, str]:
+    """Keep the classifications that a ruleset change cannot affect.
+
+    Descriptions containing an added, removed or moved keyword are dropped;
+    everything is dropped if the match priority changed (see
+    palavras_alteradas).
+
+    Args:
+        classificacoes: Normalized description → category under the old rules.
+        palavras_antigas: ``regras["palavras"]`` of the old rules.
+        regras: New compiled rules.
+
+    Returns:
+        New dict with the classifications still valid under ``regras``.
+    """
+    alteradas = palavras_alteradas(palavras_antigas, regras["palavras"])
+    if alteradas is None:
+        return {}
+    if not alteradas:
+        return dict(classificacoes)
+    padrao = _padrao_palavras(alteradas)
+    return {d: c for d, c in classificacoes.items() if not padrao.search(d)}
+
+
+def carregar_classificacoes(regras: Dict[str, Any]) -> Dict[str, str]:
+    """Process-wide classifications for a ruleset, persisted across runs.
+
+    Loaded once from classificacoes.json; when ``regras`` differ from the
+    ruleset they were made with, they are adjusted with
+    ajustar_classificacoes.
+
+    Args:
+        regras: Result of obter_regras / compilar_regras.
+
+    Returns:
+        Shared normalized description → category dict; categorizar_serie
+        adds to it, salvar_classificacoes persists it.
+    """
+    global _classificacoes
+    with _trava_classificacoes:
+        atual = _classificacoes
+        if atual is None:
+            atual = helpers.load_json(helpers.CLASSIFICACOES_FILE, {})
+            if not isinstance(atual.get("classificacoes"), dict):
+                atual = {"impressao": None, "palavras": {}, "classificacoes": {}}
+        if atual["impressao"] != regras["impressao"]:
+            atual = {
+                "impressao": regras["impressao"],
+                "palavras": {c: list(p) for c, p in regras["palavras"].items()},
+                "classificacoes": ajustar_classificacoes(
+                    atual["classificacoes"], atual["palavras"], regras
+                ),
+            }
+        _classificacoes = atual
+        return atual["classificacoes"]
+
+
+def salvar_classificacoes(regras: Dict[str, Any]) -> None:
+    """Persist the classifications of ``regras`` (see carregar_classificacoes)."""
+    with _trava_classificacoes:
+        atual = _classificacoes
+        if atual is None or atual["impressao"] != regras["impressao"]:
+            return
+        dados = {**atual, "classificacoes": dict(atual["classificacoes"])}
+    helpers.save_json(helpers.CLASSIFICACOES_FILE, dados)
+
+
+def limpar_classificacoes() -> None:
+    """Forget the in-memory classifications (the file is reloaded on next use)."""
+    global _classificacoes
+    with _trava_classificacoes:
+        _classificacoes = None
+
+
+def categorizar_serie(
+    descricoes: pd.Series,
+    regras: Dict[str, Any],
+    limiar: Optional[int] = None,
+    processos: Optional[int] = None,
+    classificacoes: Optional[Dict[str, str]] = None,
+    valores: Optional[pd.Series] = None,
+    pessoas: Optional[pd.Series] = None,
+) -> pd.Series:
+    """Categorize a Series of descriptions, each distinct value once.
+
+    Description-only rules are matched per distinct description; rules with
+    amount or person conditions are then applied to all rows at once (see
+    _aplicar_condicionais).
+
+    Args:
+        descricoes: Transaction descriptions.
+        regras: Result of obter_regras / compilar_regras.
+        limiar: Rows from which the distinct descriptions are classified on
+            a process pool (default LIMIAR_PARALELO; 0 disables it). The
+            pool is only used with MIN_UNICOS_PARALELO distinct values.
+        processos: Worker processes (default PROCESSOS_CATEGORIZACAO).
+        classificacoes: Known normalized description → category for these
+            rules (see carregar_classificacoes); only the other descriptions
+            are matched, and their categories are added to it. Only
+            description-only rules are cached.
+        valores: Amounts aligned with ``descricoes``; without them
+            ``valor:`` rules never match.
+        pessoas: Persons aligned with ``descricoes``; without them
+            ``pessoa:`` rules never match.
+
+    Returns:
+        Series of category names aligned with ``descricoes``.
+    """
+    limiar = LIMIAR_PARALELO if limiar is None else limiar
+    processos = PROCESSOS_CATEGORIZACAO if processos is None else processos
+    normalizadas = helpers.normalizar_serie(descricoes)
+    codigos, unicos = pd.factorize(normalizadas, use_na_sentinel=False)
+    resultado = np.empty(len(unicos), dtype=object)
+    faltantes = np.arange(len(unicos))
+    if classificacoes:
+        conhecidas = pd.Series(unicos, dtype=object).map(classificacoes).to_numpy()
+        faltantes = np.flatnonzero(pd.isna(conhecidas))
+        resultado[:] = conhecidas
+    novos = unicos[faltantes]
+    if (
+        limiar
+        and len(descricoes) >= limiar
+        and processos > 1
+        and len(novos) >= max(MIN_UNICOS_PARALELO, processos)
+    ):
+        resultado[faltantes] = classificar_em_paralelo(novos, regras, processos)
+    else:
+        resultado[faltantes] = _classificar_unicos(novos, regras["automato"])
+    if classificacoes is not None and len(novos):
+        classificacoes.update(zip(novos, resultado[faltantes]))
+    if regras["condicionais"]:
+        categorias = _aplicar_condicionais(resultado, codigos, unicos, regras, valores, pessoas)
+    else:
+        categorias = resultado[codigos]
+    return pd.Series(categorias, index=descricoes.index, dtype=object)
+
+
+def _aplicar_condicionais(
+    por_unico: np.ndarray,
+    codigos: np.ndarray,
+    unicos: np.ndarray,
+    regras: Dict[str, Any],
+    valores: Optional[pd.Series],
+    pessoas: Optional[pd.Series],
+) -> np.ndarray:
+    """Row categories, overridden by the conditional rules that come first.
+
+    Each rule is one vectorized pass: its description regex is matched per
+    distinct description and broadcast through ``codigos``, and its amount
+    and person conditions are array comparisons over all rows.
+
+    Args:
+        por_unico: Category of each distinct description (``unicos``) under
+            the description-only rules.
+        codigos: Position in ``unicos`` of each row.
+        unicos: Distinct normalized descriptions.
+        regras: Result of compilar_regras.
+        valores: Amount of each row, or None.
+        pessoas: Person of each row, or None.
+
+    Returns:
+        Category of each row.
+    """
+    prioridades = regras["prioridades"]
+    prioridade = np.array(
+        [prioridades.get(c, np.inf) for c in por_unico], dtype=float
+    )[codigos]
+    categorias = por_unico[codigos]
+    descricoes = pd.Series(unicos, dtype=object)
+    absolutos = normalizadas = None
+    for ordem, categoria, regra, padrao in regras["condicionais"]:
+        casa = prioridade > ordem
+        if padrao is not None:
+            casa &= descricoes.str.contains(padrao).to_numpy(dtype=bool)[codigos]
+        if regra.valor_min > -np.inf or regra.valor_max < np.inf:
+            if valores is None:
+                continue
+            if absolutos is None:
+                absolutos = np.abs(valores.to_numpy(dtype=float))
+            casa &= (absolutos >= regra.valor_min) & (absolutos <= regra.valor_max)
+        if regra.pessoa is not None:
+            if pessoas is None:
+                continue
+            if normalizadas is None:
+                normalizadas = helpers.normalizar_serie(pessoas.fillna("")).to_numpy()
+            casa &= normalizadas == regra.pessoa
+        prioridade[casa] = ordem
+        categorias[casa] = categoria
+    return categorias
@@ -3,140 +3,259 @@
 Generates realistic sample transactions, debts, investments, and goals
 so the dashboard works out-of-the-box without real bank data.
 Activate via the sidebar toggle in development mode.
+
+All generators are vectorized with NumPy and take a ``seed`` so the same
+parameters always produce the same data; the larger scenarios (years of
+history, thousands of debts/investments) are meant for load testing and
+benchmarks and can be written straight to the JSON stores the app loads.
 """
 
-import random
-from datetime import date, timedelta
-from typing import Any, Dict, List
+import os
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
 
+import numpy as np
+import pandas as pd
 
-def _random_date(start: date, end: date) -> str:
-    delta = (end - start).days
-    return str(start + timedelta(days=random.randint(0, delta)))
+from utils.helpers import (
+    DIVIDAS_FILE,
+    INVESTIMENTOS_FILE,
+    MEMBROS_FILE,
+    METAS_RESERVA_FILE,
+    TRANSACOES_FILE,
+    save_json,
+)
 
+# (descrição, valor mensal, probabilidade de ocorrer no mês)
+_RECEITAS_EVENTUAIS = [
+    ("Freelance Design", 800.0, 0.5),
+    ("Aluguel recebido", 1200.0, 1.0),
+    ("Dividendos FII", 150.0, 0.7),
+]
 
-def gerar_transacoes_exemplo(
-    membros: List[str] | None = None,
-    meses: int = 3,
-) -> List[Dict[str, Any]]:
-    """Generate a list of realistic sample transactions.
+# (descrição, valor, categoria, membro preferencial)
+_DESPESAS_FIXAS = [
+    ("Financiamento Imóvel", -1850.0, "Moradia", "Família Conjunta"),
+    ("Internet Vivo Fibra", -119.90, "Moradia", "Família Conjunta"),
+    ("Energia Elétrica", -210.0, "Moradia", "Família Conjunta"),
+    ("Água SABESP", -95.0, "Moradia", "Família Conjunta"),
+    ("Condomínio", -450.0, "Moradia", "Família Conjunta"),
+    ("Plano de Saúde Unimed", -780.0, "Saúde", "Família Conjunta"),
+    ("Netflix", -55.90, "Lazer", "Douglas"),
+    ("Spotify", -21.90, "Lazer", "Douglas"),
+    ("Academia Smart Fit", -89.90, "Saúde", "Douglas"),
+    ("Seguro Auto", -180.0, "Transporte", "Família Conjunta"),
+]
+
+# (descrição, valor médio, categoria)
+_DESPESAS_VARIAVEIS = [
+    ("Mercado Extra", -380.0, "Alimentação"),
+    ("Supermercado Carrefour", -520.0, "Alimentação"),
+    ("iFood Pedido", -65.0, "Alimentação"),
+    ("iFood Almoço", -38.0, "Alimentação"),
+    ("Posto Gasolina", -200.0, "Transporte"),
+    ("Uber Corrida", -35.0, "Transporte"),
+    ("Farmácia Drogasil", -120.0, "Saúde"),
+    ("Cityfarma Remédios", -85.0, "Saúde"),
+    ("Cinema Kinoplex", -80.0, "Lazer"),
+    ("Bar Boteco", -120.0, "Lazer"),
+    ("Amazon Compras", -250.0, "Compras"),
+    ("Mercado Livre", -180.0, "Compras"),
+    ("Curso Udemy", -50.0, "Educação"),
+    ("Livros Amazon", -90.0, "Educação"),
+    ("Pet Shop Ração", -145.0, "Outros"),
+    ("Veterinário", -220.0, "Saúde"),
+    ("Restaurante Almoço", -95.0, "Alimentação"),
+    ("Padaria Café", -45.0, "Alimentação"),
+    ("Estacionamento", -30.0, "Transporte"),
+    ("Manutenção Carro", -350.0, "Transporte"),
+]
+
+# Multiplicador das despesas variáveis por mês do ano (jan..dez): material escolar
+# e IPVA em janeiro, Black Friday em novembro, festas em dezembro.
+_SAZONALIDADE = np.array([1.12, 0.92, 0.95, 0.97, 1.00, 0.98, 1.06, 0.97, 0.96, 1.00, 1.10, 1.35])
+_CONTAS_CONSUMO = {"Energia Elétrica", "Água SABESP"}
+_INFLACAO_ANUAL = 0.045
+_REAJUSTE_SALARIAL_ANUAL = 0.05
+
+_COLUNAS = ["Data", "Descrição", "Valor", "Categoria_Manual", "Pessoa"]
+
+# Default end of the generated history and reference for investment ages, so
+# that a seed yields the same data on any day.
+DATA_REFERENCIA: date = date(2024, 12, 31)
+
+# Presets offered by the "Modo Desenvolvimento" expander.
+CENARIOS_DEV: Dict[str, Dict[str, int]] = {
+    "Exemplo — 3 meses": {
+        "meses": 3,
+        "transacoes_por_mes": 8,
+        "n_dividas": 0,
+        "n_investimentos": 0,
+    },
+    "Histórico — 2 anos": {
+        "meses": 24,
+        "transacoes_por_mes": 15,
+        "n_dividas": 20,
+        "n_investimentos": 20,
+    },
+    "Carga — 5 anos": {
+        "meses": 60,
+        "transacoes_por_mes": 60,
+        "n_dividas": 2000,
+        "n_investimentos": 2000,
+    },
+}
+
+
+def _membro_preferencial(membro: str, membros: List[str], i: int) -> str:
+    return membro if membro in membros else membros[i % len(membros)]
+
+
+def _iso(dias: np.ndarray) -> np.ndarray:
+    return np.datetime_as_string(dias.astype("datetime64[D]"), unit="D").astype(object)
+
+
+def gerar_historico_sintetico(
+    meses: int = 36,
+    membros: Optional[List[str]] = None,
+    transacoes_por_mes: int = 20,
+    seed: Optional[int] = 42,
+    sufixos: int = 0,
+    fim: Optional[date] = None,
+) -> pd.DataFrame:
+    """Generate a seeded, vectorized transaction history.
+
+    Every member gets a monthly salary (with a yearly raise and a 13th salary in
+    December); fixed household bills follow inflation; variable expenses are
+    Poisson-distributed per member and month and scaled by ``_SAZONALIDADE``.
 
     Args:
-        membros: Family member names to distribute transactions across.
-        meses: How many past months to generate data for.
+        meses: Number of months of history, ending at ``fim``'s month.
+        membros: Family member names (defaults to Douglas + Família Conjunta).
+        transacoes_por_mes: Mean number of variable expenses per member and month.
+        seed: Random seed; ``None`` draws fresh entropy.
+        sufixos: When > 0, append one of this many store codes to variable
+            expense descriptions, mimicking the variety of real bank statements.
+        fim: Last month included (defaults to DATA_REFERENCIA).
 
     Returns:
-        List of transaction dicts compatible with processar_dados().
+        DataFrame with columns Data (ISO string), Descrição, Valor,
+        Categoria_Manual and Pessoa, sorted by date.
     """
     if not membros:
         membros = ["Douglas", "Família Conjunta"]
+    rng = np.random.default_rng(seed)
+    fim = fim or DATA_REFERENCIA
 
-    hoje = date.today()
-    inicio = date(hoje.year, hoje.month, 1) - timedelta(days=30 * meses)
+    ultimo_mes = np.datetime64(f"{fim.year:04d}-{fim.month:02d}", "M")
+    lista_meses = np.arange(ultimo_mes - meses + 1, ultimo_mes + 1)
+    inicio_mes = lista_meses.astype("datetime64[D]")
+    dias_no_mes = ((lista_meses + 1).astype("datetime64[D]") - inicio_mes).astype(int)
+    mes_do_ano = lista_meses.astype(int) % 12
+    anos_decorridos = np.arange(meses) // 12
+    inflacao = (1 + _INFLACAO_ANUAL) ** (np.arange(meses) / 12)
+    n_membros = len(membros)
+    blocos: List[pd.DataFrame] = []
 
-    receitas = [
-        ("Salário Douglas", 5800.0, "Douglas"),
-        ("Salário Esposa", 4200.0, "Família Conjunta"),
-        ("Freelance Design", 800.0, "Douglas"),
-        ("Aluguel recebido", 1200.0, "Família Conjunta"),
-        ("Dividendos FII", 150.0, "Douglas"),
-    ]
+    # Salários: membro x mês, dia 5 a 10, reajuste anual; 13º em dezembro.
+    base_salario = np.round(rng.lognormal(np.log(5000.0), 0.35, size=n_membros), -1)
+    idx_m = np.tile(np.arange(meses), n_membros)
+    idx_p = np.repeat(np.arange(n_membros), meses)
+    salario = base_salario[idx_p] * (1 + _REAJUSTE_SALARIAL_ANUAL) ** anos_decorridos[idx_m]
+    dias = inicio_mes[idx_m] + rng.integers(4, 10, size=len(idx_m))
+    descricoes = np.array([f"Salário {m}" for m in membros], dtype=object)[idx_p]
+    decimo = mes_do_ano[idx_m] == 11
+    blocos.append(
+        pd.DataFrame(
+            {
+                "Data": _iso(np.concatenate([dias, dias[decimo] + 10])),
+                "Descrição": np.concatenate([descricoes, np.full(decimo.sum(), "13º Salário")]),
+                "Valor": np.round(np.concatenate([salario, salario[decimo]]), 2),
+                "Categoria_Manual": "Receita",
+                "Pessoa": np.array(membros, dtype=object)[np.concatenate([idx_p, idx_p[decimo]])],
+            }
+        )
+    )
 
-    despesas_fixas = [
-        ("Financiamento Imóvel", -1850.0, "Moradia", "Família Conjunta"),
-        ("Internet Vivo Fibra", -119.90, "Moradia", "Família Conjunta"),
-        ("Energia Elétrica", -210.0, "Moradia", "Família Conjunta"),
-        ("Água SABESP", -95.0, "Moradia", "Família Conjunta"),
-        ("Condomínio", -450.0, "Moradia", "Família Conjunta"),
-        ("Plano de Saúde Unimed", -780.0, "Saúde", "Família Conjunta"),
-        ("Netflix", -55.90, "Lazer", "Douglas"),
-        ("Spotify", -21.90, "Lazer", "Douglas"),
-        ("Academia Smart Fit", -89.90, "Saúde", "Douglas"),
-        ("Seguro Auto", -180.0, "Transporte", "Família Conjunta"),
-    ]
+    # Receitas eventuais: distribuídas entre os membros, ocorrem com probabilidade p.
+    for i, (desc, valor, prob) in enumerate(_RECEITAS_EVENTUAIS):
+        ocorre = rng.random(meses) < prob
+        idx = np.flatnonzero(ocorre)
+        blocos.append(
+            pd.DataFrame(
+                {
+                    "Data": _iso(inicio_mes[idx] + rng.integers(4, 10, size=len(idx))),
+                    "Descrição": desc,
+                    "Valor": np.round(valor * inflacao[idx], 2),
+                    "Categoria_Manual": "Receita",
+                    "Pessoa": membros[i % n_membros],
+                }
+            )
+        )
 
-    despesas_variaveis = [
-        ("Mercado Extra", -380.0, "Alimentação", "Família Conjunta"),
-        ("Supermercado Carrefour", -520.0, "Alimentação", "Família Conjunta"),
-        ("iFood Pedido", -65.0, "Alimentação", "Douglas"),
-        ("iFood Almoço", -38.0, "Alimentação", "Douglas"),
-        ("Posto Gasolina", -200.0, "Transporte", "Douglas"),
-        ("Uber Corrida", -35.0, "Transporte", "Douglas"),
-        ("Farmácia Drogasil", -120.0, "Saúde", "Família Conjunta"),
-        ("Cityfarma Remédios", -85.0, "Saúde", "Família Conjunta"),
-        ("Cinema Kinoplex", -80.0, "Lazer", "Douglas"),
-        ("Bar Boteco", -120.0, "Lazer", "Douglas"),
-        ("Amazon Compras", -250.0, "Compras", "Douglas"),
-        ("Mercado Livre", -180.0, "Compras", "Família Conjunta"),
-        ("Curso Udemy", -50.0, "Educação", "Douglas"),
-        ("Livros Amazon", -90.0, "Educação", "Douglas"),
-        ("Pet Shop Ração", -145.0, "Outros", "Família Conjunta"),
-        ("Veterinário", -220.0, "Saúde", "Família Conjunta"),
-        ("Restaurante Almoço", -95.0, "Alimentação", "Família Conjunta"),
-        ("Padaria Café", -45.0, "Alimentação", "Douglas"),
-        ("Estacionamento", -30.0, "Transporte", "Douglas"),
-        ("Manutenção Carro", -350.0, "Transporte", "Família Conjunta"),
-    ]
+    # Despesas fixas: todo mês, dia 1 a 15, corrigidas pela inflação (±5% nas contas de consumo).
+    for i, (desc, valor, cat, membro) in enumerate(_DESPESAS_FIXAS):
+        ruido = rng.normal(1.0, 0.05, size=meses) if desc in _CONTAS_CONSUMO else np.ones(meses)
+        blocos.append(
+            pd.DataFrame(
+                {
+                    "Data": _iso(inicio_mes + rng.integers(0, 15, size=meses)),
+                    "Descrição": desc,
+                    "Valor": np.round(valor * inflacao * ruido, 2),
+                    "Categoria_Manual": cat,
+                    "Pessoa": _membro_preferencial(membro, membros, i),
+                }
+            )
+        )
 
-    transacoes = []
-
-    for mes_offset in range(meses):
-        ref = hoje.replace(day=1) - timedelta(days=30 * mes_offset)
-        mes_inicio = ref.replace(day=1)
-        mes_fim = (mes_inicio + timedelta(days=32)).replace(day=1) - timedelta(days=1)
-
-        # Receitas mensais (todo mês)
-        for desc, valor, membro in receitas:
-            # Não gerar todas receitas todos os meses — freelance é eventual
-            if "Freelance" in desc and random.random() < 0.5:
-                continue
-            if "Dividendos" in desc and random.random() < 0.3:
-                continue
-            # Salário cai entre os dias 5 e 10
-            dia = random.randint(5, 10)
-            dia = min(dia, mes_fim.day)
-            d = mes_inicio.replace(day=dia)
-            membro_real = membro if membro in membros else (membros[0] if membros else "Família Conjunta")
-            transacoes.append({
-                "Data": str(d),
-                "Descrição": desc,
-                "Valor": valor,
-                "Categoria_Manual": "Receita",
-                "Pessoa": membro_real,
-            })
-
-        # Despesas fixas (todo mês, dia entre 1 e 15)
-        for desc, valor, cat, membro in despesas_fixas:
-            dia = random.randint(1, 15)
-            dia = min(dia, mes_fim.day)
-            d = mes_inicio.replace(day=dia)
-            membro_real = membro if membro in membros else (membros[0] if membros else "Família Conjunta")
-            transacoes.append({
-                "Data": str(d),
-                "Descrição": desc,
-                "Valor": valor,
-                "Categoria_Manual": cat,
-                "Pessoa": membro_real,
-            })
-
-        # Despesas variáveis (aleatórias — nem todas aparecem todo mês)
-        n_var = random.randint(10, len(despesas_variaveis))
-        selecionadas = random.sample(despesas_variaveis, n_var)
-        for desc, valor, cat, membro in selecionadas:
-            # Variação de ±20% no valor
-            fator = 1.0 + random.uniform(-0.2, 0.2)
-            valor_var = round(valor * fator, 2)
-            d = _random_date(mes_inicio, mes_fim)
-            membro_real = membro if membro in membros else (membros[0] if membros else "Família Conjunta")
-            transacoes.append({
-                "Data": d,
-                "Descrição": desc,
-                "Valor": valor_var,
-                "Categoria_Manual": cat,
-                "Pessoa": membro_real,
-            })
-
-    return transacoes
+    # Despesas variáveis: Poisson por membro/mês, valor ±20% com sazonalidade.
+    contagens = rng.poisson(transacoes_por_mes, size=(n_membros, meses))
+    idx_p = np.repeat(np.repeat(np.arange(n_membros), meses), contagens.ravel())
+    idx_m = np.repeat(np.tile(np.arange(meses), n_membros), contagens.ravel())
+    n_var = len(idx_m)
+    modelos = rng.integers(0, len(_DESPESAS_VARIAVEIS), size=n_var)
+    desc_var = np.array([d for d, _, _ in _DESPESAS_VARIAVEIS], dtype=object)[modelos]
+    valor_var = np.array([v for _, v, _ in _DESPESAS_VARIAVEIS])[modelos]
+    cat_var = np.array([c for _, _, c in _DESPESAS_VARIAVEIS], dtype=object)[modelos]
+    fator = _SAZONALIDADE[mes_do_ano[idx_m]] * inflacao[idx_m] * rng.uniform(0.8, 1.2, n_var)
+    dias = inicio_mes[idx_m] + (rng.random(n_var) * dias_no_mes[idx_m]).astype(int)
+    df_var = pd.DataFrame(
+        {
+            "Data": _iso(dias),
+            "Descrição": desc_var,
+            "Valor": np.round(valor_var * fator, 2),
+            "Categoria_Manual": cat_var,
+            "Pessoa": np.array(membros, dtype=object)[idx_p],
+        }
+    )
+    if sufixos > 0:
+        codigos = pd.Series(rng.integers(1, sufixos + 1, size=n_var)).astype(str)
+        df_var["Descrição"] = df_var["Descrição"] + " " + codigos.str.zfill(4).to_numpy()
+    blocos.append(df_var)
+
+    df = pd.concat(blocos, ignore_index=True)[_COLUNAS]
+    return df.sort_values("Data", kind="stable").reset_index(drop=True)
+
+
+def gerar_transacoes_exemplo(
+    membros: List[str] | None = None,
+    meses: int = 3,
+    seed: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """Generate a list of realistic sample transactions.
+
+    Args:
+        membros: Family member names to distribute transactions across.
+        meses: How many months up to the current one to generate data for.
+        seed: Random seed for reproducible data (``None`` = different every call).
+
+    Returns:
+        List of transaction dicts compatible with processar_dados().
+    """
+    df = gerar_historico_sintetico(
+        meses=meses, membros=membros, transacoes_por_mes=8, seed=seed, fim=date.today()
+    )
+    return df.to_dict("records")
 
 
 def gerar_dividas_exemplo() -> List[Dict[str, Any]]:
@@ -145,7 +264,6 @@ def gerar_dividas_exemplo() -> List[Dict[str, Any]]:
     Returns:
         List of debt dicts compatible with session_state.dividas.
     """
-    from datetime import datetime
     base_ts = int(datetime(2024, 1, 1).timestamp() * 1_000_000)
 
     return [
@@ -194,7 +312,6 @@ def gerar_investimentos_exemplo() -> List[Dict[str, Any]]:
     Returns:
         List of investment dicts compatible with session_state.investimentos.
     """
-    from datetime import datetime
     base_ts = int(datetime(2024, 1, 1).timestamp() * 1_000_000)
 
     return [
@@ -240,7 +357,6 @@ def gerar_metas_exemplo() -> List[Dict[str, Any]]:
     Returns:
         List of goal dicts compatible with session_state.metas_reserva.
     """
-    from datetime import datetime
     base_ts = int(datetime(2024, 1, 1).timestamp() * 1_000_000)
 
     return [
@@ -263,3 +379,190 @@ def gerar_metas_exemplo() -> List[Dict[str, Any]]:
             "valor_atual": 8640.0,
         },
     ]
+
+
+_TIPOS_DIVIDA = [
+    # (nome, credor, sistema, principal mediano, taxa mensal %, prazos possíveis)
+    ("Financiamento Imóvel", "Caixa Econômica", "SAC", 250000.0, 0.75, (240, 360, 420)),
+    ("Carro Financiado", "Banco Itaú", "PRICE", 45000.0, 1.3, (36, 48, 60)),
+    ("Cartão de Crédito", "Nubank", "PRICE", 6000.0, 3.5, (6, 10, 12)),
+    ("Empréstimo Pessoal", "Bradesco", "PRICE", 15000.0, 2.2, (12, 24, 36)),
+    ("Consignado", "Banco do Brasil", "PRICE", 20000.0, 1.6, (48, 72, 96)),
+]
+
+_TIPOS_INVESTIMENTO = [
+    # (tipo, instituição, retorno anual médio, liquidez)
+    ("Tesouro", "Tesouro Direto", 0.105, "D+1"),
+    ("CDB", "Nubank", 0.11, "No vencimento"),
+    ("LCI/LCA", "Banco Inter", 0.095, "No vencimento"),
+    ("FII", "XP Investimentos", 0.08, "D+2"),
+    ("Ações", "Rico", 0.12, "D+2"),
+    ("Poupança", "Caixa Econômica", 0.07, "D+0"),
+]
+
+_OBJETIVOS = ["Reserva de emergência", "Renda passiva", "Viagem", "Aposentadoria", "Troca do carro"]
+
+
+def gerar_dividas_sinteticas(n: int, seed: Optional[int] = 42) -> List[Dict[str, Any]]:
+    """Generate ``n`` seeded debts spread over common Brazilian credit types.
+
+    Args:
+        n: Number of debts.
+        seed: Random seed.
+
+    Returns:
+        List of debt dicts compatible with session_state.dividas.
+    """
+    rng = np.random.default_rng(seed)
+    base_ts = int(datetime(2024, 1, 1).timestamp() * 1_000_000)
+    tipo = rng.integers(0, len(_TIPOS_DIVIDA), size=n)
+    principal = np.array([t[3] for t in _TIPOS_DIVIDA])[tipo] * rng.lognormal(0.0, 0.4, n)
+    taxa = np.array([t[4] for t in _TIPOS_DIVIDA])[tipo] * rng.uniform(0.8, 1.2, n)
+    prazos = np.array([t[5] for t in _TIPOS_DIVIDA])
+    n_parcelas = prazos[tipo, rng.integers(0, prazos.shape[1], size=n)]
+    parcela_atual = 1 + (rng.random(n) * n_parcelas).astype(int)
+    quitada = rng.random(n) < 0.1
+    parcela_atual[quitada] = n_parcelas[quitada]
+    vencimento = rng.integers(1, 29, size=n)
+
+    return [
+        {
+            "id": base_ts + 1000 + i,
+            "nome": f"{_TIPOS_DIVIDA[t][0]} {i + 1}",
+            "credor": _TIPOS_DIVIDA[t][1],
+            "sistema": _TIPOS_DIVIDA[t][2],
+            "status": "Quitada" if q else "Ativa",
+            "valor_principal": round(float(p), 2),
+            "taxa_mensal": round(float(tx), 2),
+            "n_parcelas": int(np_),
+            "parcela_atual": int(pa),
+            "vencimento_dia": int(v),
+        }
+        for i, (t, p, tx, np_, pa, q, v) in enumerate(
+            zip(tipo, principal, taxa, n_parcelas, parcela_atual, quitada, vencimento)
+        )
+    ]
+
+
+def gerar_investimentos_sinteticos(
+    n: int, seed: Optional[int] = 42, referencia: date = DATA_REFERENCIA
+) -> List[Dict[str, Any]]:
+    """Generate ``n`` seeded investments with returns consistent with their age.
+
+    Args:
+        n: Number of investments.
+        seed: Random seed.
+        referencia: Date the investment ages are counted back from.
+
+    Returns:
+        List of investment dicts compatible with session_state.investimentos.
+    """
+    rng = np.random.default_rng(seed)
+    base_ts = int(datetime(2024, 1, 1).timestamp() * 1_000_000)
+    tipo = rng.integers(0, len(_TIPOS_INVESTIMENTO), size=n)
+    aplicado = np.round(rng.lognormal(np.log(8000.0), 0.9, n), 2)
+    idade_dias = rng.integers(30, 5 * 365, size=n)
+    retorno = np.array([t[2] for t in _TIPOS_INVESTIMENTO])[tipo] + rng.normal(0, 0.05, n)
+    atual = np.round(aplicado * np.maximum(1 + retorno, 0.3) ** (idade_dias / 365), 2)
+    aporte = rng.choice([0.0, 100.0, 200.0, 500.0, 1000.0], size=n)
+    data_aplicacao = _iso(np.datetime64(referencia) - idade_dias)
+    objetivo = rng.integers(0, len(_OBJETIVOS), size=n)
+
+    return [
+        {
+            "id": base_ts + 100_000 + i,
+            "tipo": _TIPOS_INVESTIMENTO[t][0],
+            "instituicao": _TIPOS_INVESTIMENTO[t][1],
+            "valor_aplicado": float(ap),
+            "valor_atual": float(at),
+            "aporte_mensal": float(apm),
+            "data_aplicacao": str(d),
+            "objetivo": _OBJETIVOS[o],
+            "liquidez": _TIPOS_INVESTIMENTO[t][3],
+        }
+        for i, (t, ap, at, apm, d, o) in enumerate(
+            zip(tipo, aplicado, atual, aporte, data_aplicacao, objetivo)
+        )
+    ]
+
+
+def gerar_cenario(
+    meses: int = 3,
+    transacoes_por_mes: int = 8,
+    n_dividas: int = 0,
+    n_investimentos: int = 0,
+    membros: Optional[List[str]] = None,
+    seed: Optional[int] = 42,
+    sufixos: int = 0,
+    fim: date = DATA_REFERENCIA,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Generate a complete household dataset.
+
+    ``n_dividas``/``n_investimentos`` equal to zero fall back to the small
+    hand-written examples.
+
+    Args:
+        meses: Months of transaction history.
+        transacoes_por_mes: Mean variable expenses per member and month.
+        n_dividas: Number of synthetic debts.
+        n_investimentos: Number of synthetic investments.
+        membros: Family member names.
+        seed: Random seed.
+        sufixos: Store-code variety for descriptions (see gerar_historico_sintetico).
+        fim: Last month of history and reference date of the investments.
+
+    Returns:
+        Dict with ``transacoes``, ``dividas``, ``investimentos`` and ``metas_reserva``.
+    """
+    df = gerar_historico_sintetico(
+        meses=meses,
+        membros=membros,
+        transacoes_por_mes=transacoes_por_mes,
+        seed=seed,
+        sufixos=sufixos,
+        fim=fim,
+    )
+    return {
+        "transacoes": df.to_dict("records"),
+        "dividas": (
+            gerar_dividas_sinteticas(n_dividas, seed) if n_dividas else gerar_dividas_exemplo()
+        ),
+        "investimentos": (
+            gerar_investimentos_sinteticos(n_investimentos, seed, fim)
+            if n_investimentos
+            else gerar_investimentos_exemplo()
+        ),
+        "metas_reserva": gerar_metas_exemplo(),
+    }
+
+
+def salvar_cenario(
+    diretorio: str = ".",
+    membros: Optional[List[str]] = None,
+    arquivo_transacoes: str = TRANSACOES_FILE,
+    **parametros: Any,
+) -> Dict[str, int]:
+    """Generate a scenario and write it to the JSON stores the app loads.
+
+    Args:
+        diretorio: Directory where the JSON files are written.
+        membros: Family member names (also written to membros.json).
+        arquivo_transacoes: Store for the transactions (manual or imported file).
+        **parametros: Forwarded to gerar_cenario (meses, transacoes_por_mes, ...).
+
+    Returns:
+        Number of records written per file name.
+    """
+    membros = membros or ["Douglas", "Família Conjunta"]
+    dados = gerar_cenario(membros=membros, **parametros)
+    arquivos: Dict[str, List[Any]] = {
+        arquivo_transacoes: dados["transacoes"],
+        DIVIDAS_FILE: dados["dividas"],
+        INVESTIMENTOS_FILE: dados["investimentos"],
+        METAS_RESERVA_FILE: dados["metas_reserva"],
+        MEMBROS_FILE: membros,
+    }
+    os.makedirs(diretorio, exist_ok=True)
+    for nome, registros in arquivos.items():
+        save_json(os.path.join(diretorio, nome), registros)
+    return {nome: len(registros) for nome, registros in arquivos.items()}
@@ -0,0 +1,120 @@
+"""CSV dialect sniffing on a small byte sample.
+
+Bank CSV exports vary in encoding (UTF-8, Windows-1252, Latin-1), delimiter
+(``;`` is common in Brazil), decimal separator and in preamble lines before
+the header ("Extrato de conta corrente", "Agência: ..."). Inspecting only
+the first few KB lets the file be read once with pandas' C parser and
+explicit options instead of guessing through a full failed parse.
+"""
+
+import codecs
+import csv
+import re
+from collections import Counter
+from typing import Any, Dict, List
+
+# Bytes inspected to detect the dialect.
+AMOSTRA_BYTES: int = 8 * 1024
+
+DELIMITADORES: str = ";,\t|"
+
+_NUMERO_VIRGULA = re.compile(r"^[-+(]?(?:R\$\s*)?-?\d{1,3}(?:\.?\d{3})*,\d{1,2}\)?-?$")
+_NUMERO_PONTO = re.compile(r"^[-+(]?(?:R\$\s*)?-?\d{1,3}(?:,?\d{3})*\.\d{1,2}\)?-?$")
+
+
+def detectar_encoding(amostra: bytes) -> str:
+    """Detect the text encoding of a byte sample.
+
+    Args:
+        amostra: First bytes of the file.
+
+    Returns:
+        ``utf-8-sig`` (BOM), ``utf-8``, ``cp1252`` or ``latin-1``.
+    """
+    if amostra.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    try:
+        # final=False tolerates a multi-byte character cut by the sample end.
+        codecs.getincrementaldecoder("utf-8")().decode(amostra, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        pass
+    try:
+        amostra.decode("cp1252")
+        return "cp1252"
+    except UnicodeDecodeError:
+        return "latin-1"
+
+
+def _contar_campos(linhas: List[str], delimitador: str) -> List[int]:
+    return [len(campos) for campos in csv.reader(linhas, delimiter=delimitador)]
+
+
+def _detectar_delimitador(linhas: List[str]) -> str:
+    """Pick the delimiter that splits most lines into the same number of fields."""
+    melhor, melhor_pontos = ",", (0, 0)
+    for delimitador in DELIMITADORES:
+        contagens = [n for n in _contar_campos(linhas, delimitador) if n > 1]
+        if not contagens:
+            continue
+        campos, frequencia = Counter(contagens).most_common(1)[0]
+        pontos = (frequencia, campos)
+        if pontos > melhor_pontos:
+            melhor, melhor_pontos = delimitador, pontos
+    return melhor
+
+
+def _detectar_decimal(linhas: List[str], delimitador: str) -> str:
+    """Vote for the decimal separator among numeric-looking fields."""
+    virgula = ponto = 0
+    for campos in csv.reader(linhas, delimiter=delimitador):
+        for campo in campos:
+            campo = campo.strip()
+            if _NUMERO_VIRGULA.match(campo):
+                virgula += 1
+            elif _NUMERO_PONTO.match(campo):
+                ponto += 1
+    return "," if virgula > ponto else "."
+
+
+def detectar_formato_csv(conteudo: bytes, tamanho: int = AMOSTRA_BYTES) -> Dict[str, Any]:
+    """Sniff encoding, delimiter, decimal separator and header offset.
+
+    Args:
+        conteudo: Raw file bytes (only the first ``tamanho`` are inspected).
+        tamanho: Sample size in bytes.
+
+    Returns:
+        Dict with ``encoding``, ``delimitador``, ``decimal`` and
+        ``linhas_ignoradas`` (preamble lines before the header), ready to be
+        passed to ``pd.read_csv`` as ``encoding``, ``sep``, ``decimal`` and
+        ``skiprows``.
+    """
+    amostra = conteudo[:tamanho]
+    encoding = detectar_encoding(amostra)
+    texto = amostra.decode(encoding, errors="replace")
+    if len(conteudo) > tamanho and "\n" in texto:
+        texto = texto[: texto.rfind("\n")]  # drop the truncated last line
+    linhas = texto.splitlines()
+    nao_vazias = [linha for linha in linhas if linha.strip()]
+    if not nao_vazias:
+        return {"encoding": encoding, "delimitador": ",", "decimal": ".", "linhas_ignoradas": 0}
+
+    delimitador = _detectar_delimitador(nao_vazias)
+
+    # Header = first line with the most common field count (preamble lines
+    # such as "Agência: 0001" have fewer fields).
+    contagens = _contar_campos(linhas, delimitador)
+    campos = Counter(n for n in contagens if n > 1).most_common(1)
+    largura = campos[0][0] if campos else 1
+    cabecalho = next((i for i, n in enumerate(contagens) if n == largura), 0)
+
+    decimal = _detectar_decimal(linhas[cabecalho + 1 :], delimitador)
+    if decimal == delimitador:
+        decimal = "."
+    return {
+        "encoding": encoding,
+        "delimitador": delimitador,
+        "decimal": decimal,
+        "linhas_ignoradas": cabecalho,
+    }
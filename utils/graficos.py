@@ -0,0 +1,111 @@
+"""Process-wide cache of rendered Plotly figures.
+
+Every rerun used to re-aggregate the transactions and rebuild each chart
+with plotly.express, although the figures only change when the data, the
+chart's own inputs (selected month, budget, simulation parameters...) or
+the theme change. figura_em_cache() keys each figure by
+``(chart id, data version, inputs, theme)`` and keeps its serialized spec
+(the JSON sent to the browser), shared by every session of the process. On
+a hit, the aggregation and the plotly.express build are skipped and the
+figure is rebuilt from the spec without re-validation.
+
+The data version is ``st.session_state.versao_dados`` (see
+utils.processing.processar_dados): a content fingerprint, so a spec can
+never outlive the data it was built from. Charts that do not read the
+transactions pass SEM_DADOS instead.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+import plotly.graph_objects as go
+
+from utils import serializacao
+
+# Specs kept per process (a few KB each).
+MAX_FIGURAS: int = 64
+
+# Data version of charts that do not depend on the transactions.
+SEM_DADOS: str = "sem-dados"
+
+_trava = threading.Lock()
+_figuras: "OrderedDict[Tuple[Hashable, ...], bytes]" = OrderedDict()
+
+
+def _congelar(valor: Any) -> Hashable:
+    """Hashable, order-independent form of dicts/lists used as chart inputs."""
+    if isinstance(valor, dict):
+        return tuple(sorted((str(k), _congelar(v)) for k, v in valor.items()))
+    if isinstance(valor, (list, tuple, set, frozenset)):
+        itens = tuple(_congelar(v) for v in valor)
+        return tuple(sorted(itens, key=repr)) if isinstance(valor, (set, frozenset)) else itens
+    return valor
+
+
+def chave_figura(
+    id_grafico: str, versao: Optional[str], filtros: Any = None, tema: Optional[str] = None
+) -> Optional[Tuple[Hashable, ...]]:
+    """Cache key of a chart, or None when it must not be cached.
+
+    Args:
+        id_grafico: Stable chart identifier (e.g. ``"dashboard.mensal"``).
+        versao: Data version, SEM_DADOS, or None (unknown data: no caching).
+        filtros: Every other input the chart reads (scalars, dicts, lists).
+        tema: Visual theme (``st.session_state.tema``).
+
+    Returns:
+        Hashable key.
+    """
+    if versao is None:
+        return None
+    return (id_grafico, versao, _congelar(filtros), tema)
+
+
+def figura_em_cache(
+    id_grafico: str,
+    construir: Callable[[], go.Figure],
+    versao: Optional[str],
+    filtros: Any = None,
+    tema: Optional[str] = None,
+) -> go.Figure:
+    """Return a chart from the cache, building it only on a miss.
+
+    Args:
+        id_grafico: Stable chart identifier.
+        construir: Builds the figure, including any aggregation it needs;
+            not called on a hit.
+        versao: Data version (``st.session_state.versao_dados``), SEM_DADOS
+            for charts independent of the transactions, or None to disable
+            caching.
+        filtros: Every other input the chart reads.
+        tema: Visual theme.
+
+    Returns:
+        The figure (a fresh object the caller may modify).
+    """
+    chave = chave_figura(id_grafico, versao, filtros, tema)
+    if chave is None:
+        return construir()
+    with _trava:
+        spec = _figuras.get(chave)
+        if spec is not None:
+            _figuras.move_to_end(chave)
+    if spec is not None:
+        # The spec was produced by plotly itself: skip re-validation.
+        return go.Figure(serializacao.loads(spec), _validate=False)
+
+    fig = construir()
+    spec = fig.to_json(validate=False).encode("utf-8")
+    with _trava:
+        _figuras[chave] = spec
+        _figuras.move_to_end(chave)
+        while len(_figuras) > MAX_FIGURAS:
+            _figuras.popitem(last=False)
+    return fig
+
+
+def limpar_figuras() -> None:
+    """Drop every cached figure (e.g. in tests)."""
+    with _trava:
+        _figuras.clear()
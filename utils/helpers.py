@@ -5,11 +5,18 @@ CSS loading, and Streamlit session state initialization.
 """
 
 import streamlit as st
-import json
 import os
+import stat
+import tempfile
+import threading
 import unicodedata
+from contextlib import contextmanager
+from functools import lru_cache
+import numpy as np
 import pandas as pd
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from utils import armazenamento, categorias, serializacao
+from utils.profiling import instrumentar
 
 # --- File Constants ---
 CATEGORIES_FILE: str = "categorias.json"
@@ -21,56 +28,239 @@ INVESTIMENTOS_FILE: str = "investimentos.json"
 METAS_RESERVA_FILE: str = "metas_reserva.json"
 ORCAMENTO_FILE: str = "orcamento_mensal.json"
 RECORRENTES_FILE: str = "despesas_recorrentes.json"
+PERFIS_MAPEAMENTO_FILE: str = "perfis_mapeamento.json"
+IMPORTACOES_FILE: str = "importacoes.json"
+CLASSIFICACOES_FILE: str = "classificacoes.json"
+
+# Categories used when categorias.json does not exist yet.
+CATEGORIAS_PADRAO: Dict[str, List[str]] = {
+    "Alimentação": [
+        "ifood",
+        "restaurante",
+        "mercado",
+        "supermercado",
+        "lanche",
+    ],
+    "Transporte": [
+        "uber",
+        "99",
+        "transporte",
+        "gasolina",
+        "combustivel",
+        "onibus",
+    ],
+    "Moradia": ["aluguel", "condominio", "luz", "internet", "agua", "vivo"],
+    "Saúde": [
+        "farmacia",
+        "remedio",
+        "medico",
+        "plano de saude",
+        "drog",
+        "cityfarma",
+    ],
+    "Lazer": [
+        "cinema",
+        "show",
+        "bar",
+        "viagem",
+        "lazer",
+        "netflix",
+        "spotify",
+    ],
+    "Educação": ["escola", "faculdade", "curso", "livros"],
+    "Compras": ["lojas", "roupas", "compras", "amazon", "mercado livre"],
+    "Outros": [],
+}
 
 # --- Utility Functions ---
 
 
+# Bound for the normalization memo; bank descriptions repeat heavily, so a few
+# tens of thousands of distinct strings cover years of statements.
+NORMALIZACAO_CACHE_SIZE: int = 65_536
+
+
+@lru_cache(maxsize=NORMALIZACAO_CACHE_SIZE)
+def _normalizar_str(texto: str) -> str:
+    """Normalize a string, memoized (see normalizar_texto)."""
+    texto = texto.lower()
+    if texto.isascii():
+        return texto
+    return "".join(
+        c
+        for c in unicodedata.normalize("NFD", texto)
+        if unicodedata.category(c) != "Mn"
+    )
+
+
 def normalizar_texto(texto: str) -> str:
     """Normalize text to lowercase and remove accents.
 
+    Results are memoized in a bounded LRU cache and pure-ASCII input skips
+    the Unicode decomposition.
+
     Args:
         texto: Text to normalize.
 
     Returns:
         Normalized text without accents, in lowercase.
     """
-    texto = str(texto).lower()
-    texto = "".join(
-        c
-        for c in unicodedata.normalize("NFD", texto)
-        if unicodedata.category(c) != "Mn"
-    )
-    return texto
+    return _normalizar_str(str(texto))
+
+
+def normalizar_serie(serie: pd.Series) -> pd.Series:
+    """Normalize a whole Series, computing each distinct value only once.
+
+    Args:
+        serie: Series of texts (non-string values are converted with ``str``;
+            missing values normalize to ``"nan"``).
+
+    Returns:
+        Series of normalized texts with the same index as ``serie``.
+    """
+    codigos, unicos = pd.factorize(serie, use_na_sentinel=False)
+    normalizados = np.array([normalizar_texto(v) for v in unicos], dtype=object)
+    return pd.Series(normalizados[codigos], index=serie.index, name=serie.name, dtype=object)
+
+
+def limpar_cache_normalizacao() -> None:
+    """Clear the normalization memo (e.g. in tests or after bulk imports)."""
+    _normalizar_str.cache_clear()
 
 
-def load_json(file: str, default: Any) -> Any:
+# fsync every save (durable across power loss, slower). Off by default: the
+# atomic rename alone already guarantees a file is never left half-written.
+FSYNC_ESCRITA: bool = os.environ.get("DFF_FSYNC") == "1"
+
+# Process umask, read once at import: os.umask can only be queried by setting
+# it, which would race with other threads creating files.
+_UMASK: int = os.umask(0)
+os.umask(_UMASK)
+
+# Per-thread (i.e. per Streamlit session) pending writes of escrita_agrupada.
+_escritas = threading.local()
+
+
+def _pendentes() -> Optional[Dict[str, Tuple[Any, bool]]]:
+    return getattr(_escritas, "pendentes", None)
+
+
+def load_json(
+    file: str, default: Any, decodificar: Optional[Callable[[bytes], Any]] = None
+) -> Any:
     """Load JSON file, returning default if not found.
 
+    Inside escrita_agrupada, data saved but not yet flushed is returned.
+
     Args:
         file: Path to JSON file.
         default: Default value to return if file doesn't exist.
+        decodificar: Decoder for the raw bytes (e.g.
+            serializacao.decodificar_transacoes); defaults to
+            serializacao.loads.
 
     Returns:
         Parsed JSON content or default value.
     """
+    pendentes = _pendentes()
+    if pendentes is not None and file in pendentes:
+        return pendentes[file][0]
     if os.path.exists(file):
         try:
-            with open(file, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except (json.JSONDecodeError, OSError):
+            with open(file, "rb") as f:
+                return (decodificar or serializacao.loads)(f.read())
+        except (ValueError, OSError):
             return default
     return default
 
 
-def save_json(file: str, data: Any) -> None:
-    """Save data to JSON file with pretty printing.
+def _modo_arquivo(file: str) -> int:
+    """Permission bits for ``file``: its current mode, or the umask default for new files."""
+    try:
+        return stat.S_IMODE(os.stat(file).st_mode)
+    except FileNotFoundError:
+        return 0o666 & ~_UMASK
+
+
+def _gravar_json(file: str, data: Any, fsync: bool) -> None:
+    """Write compact JSON to a temp file and atomically rename it over ``file``.
+
+    mkstemp creates the temp file as 0600; it gets the target's permissions
+    (see _modo_arquivo) before the rename so saving never changes them.
+    """
+    conteudo = serializacao.dumps(data)
+    diretorio = os.path.dirname(os.path.abspath(file))
+    modo = _modo_arquivo(file)
+    fd, temporario = tempfile.mkstemp(
+        dir=diretorio, prefix=f".{os.path.basename(file)}.", suffix=".tmp"
+    )
+    try:
+        os.chmod(temporario, modo)
+        with os.fdopen(fd, "wb") as f:
+            f.write(conteudo)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(temporario, file)
+    except BaseException:
+        try:
+            os.unlink(temporario)
+        except OSError:
+            pass
+        raise
+
+    if fsync and hasattr(os, "O_DIRECTORY"):
+        # Persist the rename itself (POSIX only).
+        fd_dir = os.open(diretorio, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd_dir)
+        finally:
+            os.close(fd_dir)
+
+
+def save_json(file: str, data: Any, fsync: bool = FSYNC_ESCRITA) -> None:
+    """Save data to a JSON file atomically.
+
+    The data is serialized compactly (backend chosen by utils.serializacao)
+    to a temporary file in the same directory and renamed over the target,
+    so a crash mid-write leaves the previous version intact instead of a
+    truncated file. Inside escrita_agrupada the
+    write is deferred and coalesced with later saves of the same file.
 
     Args:
         file: Path to JSON file.
         data: Data to serialize and save.
+        fsync: Flush the file and directory to disk before returning.
     """
-    with open(file, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=4, ensure_ascii=False)
+    pendentes = _pendentes()
+    if pendentes is not None:
+        fsync = fsync or (file in pendentes and pendentes[file][1])
+        pendentes[file] = (data, fsync)
+        return
+    _gravar_json(file, data, fsync)
+
+
+@contextmanager
+def escrita_agrupada() -> Iterator[None]:
+    """Coalesce the saves made inside the block into one write per file.
+
+    Bulk actions (loading sample data, editing categories, imports) call
+    several ``salvar_*`` helpers, sometimes for the same file. Inside this
+    block each file is written once, with its last saved data, when the
+    outermost block exits — also when it exits through ``st.rerun()`` or an
+    error, so no save made before that point is lost.
+    """
+    if _pendentes() is not None:
+        yield  # nested: the outermost block flushes
+        return
+    _escritas.pendentes = {}
+    try:
+        yield
+    finally:
+        pendentes = _escritas.pendentes
+        _escritas.pendentes = None
+        for file, (data, fsync) in pendentes.items():
+            _gravar_json(file, data, fsync)
 
 
 def categorizar_despesa(descricao: str, categories: Dict[str, List[str]]) -> str:
@@ -103,32 +293,97 @@ def load_css(file_path: str) -> None:
         pass
 
 
+def lista_para_edicao(chave: str) -> List[Any]:
+    """Return a session-state list that this session may mutate.
+
+    Lists loaded from disk are shared across sessions; the first edit takes
+    a private copy (copy-on-write) and stores it back in session state.
+
+    Args:
+        chave: Session state key (e.g. ``"transacoes"``).
+
+    Returns:
+        The mutable list now held in ``st.session_state[chave]``.
+    """
+    lista = armazenamento.copia_para_edicao(st.session_state.get(chave) or [])
+    st.session_state[chave] = lista
+    return lista
+
+
+def sessao_de_exemplo() -> bool:
+    """Return whether this session holds "Modo Desenvolvimento" sample data.
+
+    Sample data lives in session state only: while it is loaded the
+    transaction, import, debt, investment and goal stores are not written, so
+    it can neither overwrite nor, when cleared, erase the user's files.
+    """
+    return bool(st.session_state.get("dados_exemplo", False))
+
+
 def salvar_transacoes() -> None:
     """Persist manual transactions to disk from session state."""
+    if sessao_de_exemplo():
+        return
     save_json(TRANSACOES_FILE, st.session_state.transacoes)
 
 
 def carregar_transacoes() -> List[Dict[str, Any]]:
     """Load manual transactions from disk.
 
+    The list is shared by every session of the process (see
+    utils.armazenamento); mutate it only through lista_para_edicao.
+
     Returns:
         List of transaction dictionaries from transacoes.json.
     """
-    return load_json(TRANSACOES_FILE, [])
+    return armazenamento.carregar_compartilhado(
+        TRANSACOES_FILE,
+        lambda: load_json(TRANSACOES_FILE, [], serializacao.decodificar_transacoes),
+    )
 
 
 def salvar_transacoes_importadas() -> None:
     """Persist imported transactions list to disk from session state."""
+    if sessao_de_exemplo():
+        return
     save_json(TRANSACOES_IMPORTADAS_FILE, st.session_state.transacoes_importadas)
 
 
 def carregar_transacoes_importadas() -> List[Dict[str, Any]]:
-    """Load imported transactions from disk.
+    """Load imported transactions from disk (shared, see carregar_transacoes).
 
     Returns:
         List of imported transaction dictionaries.
     """
-    return load_json(TRANSACOES_IMPORTADAS_FILE, [])
+    return armazenamento.carregar_compartilhado(
+        TRANSACOES_IMPORTADAS_FILE,
+        lambda: load_json(TRANSACOES_IMPORTADAS_FILE, [], serializacao.decodificar_transacoes),
+    )
+
+
+def carregar_categorias() -> Dict[str, List[str]]:
+    """Load categories from disk as the process-wide shared instance.
+
+    Sessions with the same categorias.json content share one dict and its
+    compiled rules (see utils.categorias). Treat it as read-only.
+
+    Returns:
+        Category name → keyword list.
+    """
+    return categorias.obter_regras(load_json(CATEGORIES_FILE, CATEGORIAS_PADRAO))["categorias"]
+
+
+def salvar_categorias() -> None:
+    """Persist categories and switch the session to the shared instance.
+
+    Callers edit a copy of ``st.session_state.categories`` (it is shared)
+    and assign it back before saving. The new content gets its own cache
+    entry, so compiled rules always match the saved categories.
+    """
+    save_json(CATEGORIES_FILE, st.session_state.categories)
+    st.session_state.categories = categorias.obter_regras(st.session_state.categories)[
+        "categorias"
+    ]
 
 
 def salvar_orcamento_mensal() -> None:
@@ -179,6 +434,8 @@ def carregar_despesas_recorrentes() -> pd.DataFrame:
 
 def salvar_dividas() -> None:
     """Persist debts list to disk from session state."""
+    if sessao_de_exemplo():
+        return
     save_json(DIVIDAS_FILE, st.session_state.dividas)
 
 
@@ -193,6 +450,8 @@ def carregar_dividas() -> List[Dict[str, Any]]:
 
 def salvar_investimentos() -> None:
     """Persist investments list to disk from session state."""
+    if sessao_de_exemplo():
+        return
     save_json(INVESTIMENTOS_FILE, st.session_state.investimentos)
 
 
@@ -207,6 +466,8 @@ def carregar_investimentos() -> List[Dict[str, Any]]:
 
 def salvar_metas_reserva() -> None:
     """Persist reserve goals list to disk from session state."""
+    if sessao_de_exemplo():
+        return
     save_json(METAS_RESERVA_FILE, st.session_state.metas_reserva)
 
 
@@ -219,6 +480,39 @@ def carregar_metas_reserva() -> List[Dict[str, Any]]:
     return load_json(METAS_RESERVA_FILE, [])
 
 
+def salvar_perfis_mapeamento() -> None:
+    """Persist column-mapping profiles to disk from session state."""
+    save_json(PERFIS_MAPEAMENTO_FILE, st.session_state.perfis_mapeamento)
+
+
+def carregar_perfis_mapeamento() -> Dict[str, Dict[str, Any]]:
+    """Load column-mapping profiles from disk.
+
+    Returns:
+        Dictionary mapping a file layout key to its saved column mapping.
+    """
+    data = load_json(PERFIS_MAPEAMENTO_FILE, {})
+    return data if isinstance(data, dict) else {}
+
+
+def salvar_registro_importacoes() -> None:
+    """Persist the import registry (file hashes and row ranges) from session state."""
+    if sessao_de_exemplo():
+        return
+    save_json(IMPORTACOES_FILE, st.session_state.registro_importacoes)
+
+
+def carregar_registro_importacoes() -> List[Dict[str, Any]]:
+    """Load the import registry from disk.
+
+    Returns:
+        List of import batches with file hashes and row ranges.
+    """
+    data = load_json(IMPORTACOES_FILE, [])
+    return data if isinstance(data, list) else []
+
+
+@instrumentar
 def initialize_session_state() -> None:
     """Initialize all required session state variables.
 
@@ -227,47 +521,7 @@ def initialize_session_state() -> None:
     """
 
     if "categories" not in st.session_state:
-        st.session_state.categories = load_json(
-            CATEGORIES_FILE,
-            {
-                "Alimentação": [
-                    "ifood",
-                    "restaurante",
-                    "mercado",
-                    "supermercado",
-                    "lanche",
-                ],
-                "Transporte": [
-                    "uber",
-                    "99",
-                    "transporte",
-                    "gasolina",
-                    "combustivel",
-                    "onibus",
-                ],
-                "Moradia": ["aluguel", "condominio", "luz", "internet", "agua", "vivo"],
-                "Saúde": [
-                    "farmacia",
-                    "remedio",
-                    "medico",
-                    "plano de saude",
-                    "drog",
-                    "cityfarma",
-                ],
-                "Lazer": [
-                    "cinema",
-                    "show",
-                    "bar",
-                    "viagem",
-                    "lazer",
-                    "netflix",
-                    "spotify",
-                ],
-                "Educação": ["escola", "faculdade", "curso", "livros"],
-                "Compras": ["lojas", "roupas", "compras", "amazon", "mercado livre"],
-                "Outros": [],
-            },
-        )
+        st.session_state.categories = carregar_categorias()
 
     if "membros_familia" not in st.session_state:
         st.session_state.membros_familia = load_json(MEMBROS_FILE, ["Família Conjunta"])
@@ -290,12 +544,24 @@ def initialize_session_state() -> None:
     if "df_transacoes" not in st.session_state:
         st.session_state.df_transacoes = None
 
+    if "versao_dados" not in st.session_state:
+        st.session_state.versao_dados = None
+
     if "df_from_upload" not in st.session_state:
         st.session_state.df_from_upload = None
 
     if "raw_df" not in st.session_state:
         st.session_state.raw_df = None
 
+    if "raw_arquivo" not in st.session_state:
+        st.session_state.raw_arquivo = None
+
+    if "registro_importacoes" not in st.session_state:
+        st.session_state.registro_importacoes = carregar_registro_importacoes()
+
+    if "perfis_mapeamento" not in st.session_state:
+        st.session_state.perfis_mapeamento = carregar_perfis_mapeamento()
+
     if "column_map" not in st.session_state:
         st.session_state.column_map = {"date": None, "title": None, "amount": None}
 
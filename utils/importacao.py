@@ -0,0 +1,531 @@
+"""Batch import of bank statements (CSV, XLSX and OFX).
+
+Files are read concurrently in a thread pool (pandas' C parser and the
+zip/XML readers release the GIL for most of the work), mapped through a
+saved column-mapping profile per file layout (fingerprint of header row,
+delimiter and encoding), deduplicated across the whole
+batch and against previous imports, and handed back as one list of records
+so the caller runs a single processing pass at the end.
+"""
+
+import hashlib
+import io
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import IO, Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from utils.formato_csv import detectar_formato_csv
+from utils.helpers import normalizar_texto
+from utils.ofx import chave_fitid, iterar_transacoes_ofx
+from utils.parsing import chaves_transacoes
+from utils.xlsx import amostrar_xlsx, ler_colunas_xlsx
+
+# Worker threads used by importar_lote.
+MAX_WORKERS: int = 4
+
+# Data rows read for the mapping preview of an unknown layout.
+AMOSTRA_LINHAS: int = 50
+
+# Fields of a column mapping, in the order used to build the mapped frame.
+CAMPOS_MAPEAMENTO: Tuple[str, str, str] = ("date", "title", "amount")
+
+# CSV reading options used when nothing else is known about the file.
+DELIMITADOR_PADRAO: str = ","
+ENCODING_PADRAO: str = "utf-8"
+
+# Block size used to hash uploads.
+BLOCO_HASH: int = 1024 * 1024
+
+# ``DataFrame.attrs`` key with the number of malformed CSV lines left out.
+LINHAS_DESCARTADAS: str = "linhas_descartadas"
+
+_COLUNAS_IMPORTADAS = ["Data", "Descrição", "Valor"]
+
+
+def _extensao(nome: str) -> str:
+    return nome.rsplit(".", 1)[-1].lower() if "." in nome else ""
+
+
+def detectar_formato(nome: str, conteudo: bytes) -> Dict[str, Any]:
+    """Return the reading options of a statement file.
+
+    CSV options are sniffed from the first few KB (see
+    utils.formato_csv.detectar_formato_csv).
+
+    Args:
+        nome: File name (the extension selects the reader).
+        conteudo: Raw file bytes.
+
+    Returns:
+        Dict with at least ``delimitador`` and ``encoding``; CSV files also
+        get ``decimal`` and ``linhas_ignoradas``. Spreadsheets and OFX use
+        their container format as ``encoding`` and no delimiter.
+    """
+    extensao = _extensao(nome)
+    if extensao == "csv":
+        return detectar_formato_csv(conteudo)
+    return {"delimitador": "", "encoding": extensao}
+
+
+def _ler_csv(conteudo: bytes, formato: Dict[str, Any], **kwargs: Any) -> pd.DataFrame:
+    """Read CSV bytes with the sniffed options, counting malformed lines.
+
+    Well-formed files are read by the C parser. A line with more fields than
+    the header (typically an unquoted delimiter inside a description) makes
+    it fail; the file is then re-read by the Python parser, which leaves those
+    lines out and counts them in ``df.attrs[LINHAS_DESCARTADAS]`` so callers
+    can report them instead of losing rows silently.
+
+    ``thousands`` is deliberately not set: with ``"."`` pandas would read
+    dd.mm.yyyy dates as integers. Amounts like "1.234,56" stay strings and
+    are handled by utils.parsing.parsear_valores.
+    """
+    opcoes: Dict[str, Any] = {
+        "sep": formato.get("delimitador") or DELIMITADOR_PADRAO,
+        "encoding": formato.get("encoding") or ENCODING_PADRAO,
+        "decimal": formato.get("decimal") or ".",
+        "skiprows": formato.get("linhas_ignoradas") or 0,
+        **kwargs,
+    }
+    try:
+        df = pd.read_csv(io.BytesIO(conteudo), engine="c", on_bad_lines="error", **opcoes)
+        descartadas = 0
+    except pd.errors.ParserError:
+        ruins: List[List[str]] = []
+        df = pd.read_csv(
+            io.BytesIO(conteudo), engine="python", on_bad_lines=ruins.append, **opcoes
+        )
+        descartadas = len(ruins)
+    df.attrs[LINHAS_DESCARTADAS] = descartadas
+    return df
+
+
+def amostrar_arquivo(
+    nome: str,
+    conteudo: bytes,
+    formato: Optional[Dict[str, Any]] = None,
+    linhas: int = AMOSTRA_LINHAS,
+) -> pd.DataFrame:
+    """Read the header and the first rows of a CSV or XLSX file.
+
+    Args:
+        nome: File name (the extension selects the reader).
+        conteudo: Raw file bytes.
+        formato: Reading options (see detectar_formato); detected if omitted.
+        linhas: Maximum number of data rows.
+
+    Returns:
+        DataFrame with the first rows; empty (no columns) for other formats.
+    """
+    extensao = _extensao(nome)
+    if extensao == "csv":
+        formato = formato or detectar_formato(nome, conteudo)
+        return _ler_csv(conteudo, formato, nrows=linhas)
+    if extensao == "xlsx":
+        amostra, _ = amostrar_xlsx(io.BytesIO(conteudo), linhas=linhas)
+        return amostra
+    return pd.DataFrame()
+
+
+def ler_cabecalho(
+    nome: str, conteudo: bytes, formato: Optional[Dict[str, Any]] = None
+) -> List[str]:
+    """Return the column names of a CSV or XLSX file.
+
+    Args:
+        nome: File name (the extension selects the reader).
+        conteudo: Raw file bytes.
+        formato: Reading options (see detectar_formato); detected if omitted.
+
+    Returns:
+        List of header names; empty for OFX, which needs no mapping.
+    """
+    return amostrar_arquivo(nome, conteudo, formato, linhas=0).columns.tolist()
+
+
+def chave_layout(colunas: Sequence[str]) -> str:
+    """Build an accent/case-insensitive key from a header row.
+
+    Args:
+        colunas: Header names.
+
+    Returns:
+        Normalized column names joined by ``|``.
+    """
+    return "|".join(normalizar_texto(str(c)).strip() for c in colunas)
+
+
+def impressao_layout(colunas: Sequence[str], formato: Dict[str, Any]) -> str:
+    """Fingerprint a file layout: header row, delimiter and encoding.
+
+    Args:
+        colunas: Header names.
+        formato: Reading options (see detectar_formato).
+
+    Returns:
+        Short hex digest used as the profile key.
+    """
+    partes = (chave_layout(colunas), formato.get("delimitador", ""), formato.get("encoding", ""))
+    return hashlib.sha1("\x1f".join(partes).encode("utf-8")).hexdigest()[:16]
+
+
+def encontrar_perfil(
+    colunas: Sequence[str],
+    perfis: Dict[str, Dict[str, Any]],
+    formato: Optional[Dict[str, Any]] = None,
+) -> Optional[Dict[str, Any]]:
+    """Find the saved mapping profile for a layout, if any.
+
+    Args:
+        colunas: Header names of the file.
+        perfis: Saved profiles keyed by impressao_layout.
+        formato: Reading options of the file; CSV defaults when omitted.
+
+    Returns:
+        Profile dict with ``date``, ``title`` and ``amount`` column names and
+        the reading options, or None when the layout is unknown or the mapped
+        columns are missing.
+    """
+    if formato is None:
+        formato = {"delimitador": DELIMITADOR_PADRAO, "encoding": ENCODING_PADRAO}
+    perfil = perfis.get(impressao_layout(colunas, formato))
+    if perfil is None or any(perfil.get(c) not in colunas for c in CAMPOS_MAPEAMENTO):
+        return None
+    return perfil
+
+
+def registrar_perfil(
+    perfis: Dict[str, Dict[str, Any]],
+    colunas: Sequence[str],
+    mapeamento: Dict[str, Any],
+    formato: Optional[Dict[str, Any]] = None,
+    nome: str = "",
+) -> Dict[str, Any]:
+    """Save (or replace) the mapping profile for a layout in ``perfis``.
+
+    Args:
+        perfis: Profiles dict to update in place.
+        colunas: Header names of the file.
+        mapeamento: Dict with ``date``, ``title`` and ``amount`` column names.
+        formato: Reading options of the file; CSV defaults when omitted.
+        nome: Optional label (e.g. bank name) shown in the UI.
+
+    Returns:
+        The stored profile.
+    """
+    if formato is None:
+        formato = {"delimitador": DELIMITADOR_PADRAO, "encoding": ENCODING_PADRAO}
+    perfil: Dict[str, Any] = {campo: mapeamento[campo] for campo in CAMPOS_MAPEAMENTO}
+    perfil.update(formato)
+    perfil["nome"] = nome
+    perfil["colunas"] = [str(c) for c in colunas]
+    perfis[impressao_layout(colunas, formato)] = perfil
+    return perfil
+
+
+def ler_arquivo_mapeado(
+    nome: str, conteudo: bytes, perfil: Optional[Dict[str, Any]]
+) -> pd.DataFrame:
+    """Read one statement into the imported-transaction schema.
+
+    Only the three mapped columns are kept (XLSX files stream just those).
+
+    Args:
+        nome: File name (the extension selects the reader).
+        conteudo: Raw file bytes.
+        perfil: Column mapping and reading options for CSV/XLSX (ignored for
+            OFX).
+
+    Returns:
+        DataFrame with Data, Descrição, Valor, Pessoa and Categoria_Manual
+        (plus FITID and Conta for OFX). For CSV files,
+        ``df.attrs[LINHAS_DESCARTADAS]`` is the number of malformed lines
+        left out.
+
+    Raises:
+        ValueError: For unsupported extensions or a missing mapping.
+    """
+    extensao = _extensao(nome)
+    if extensao == "ofx":
+        return pd.DataFrame(list(iterar_transacoes_ofx(io.BytesIO(conteudo))))
+    if extensao not in ("csv", "xlsx"):
+        raise ValueError(f"Formato não suportado: .{extensao}")
+    if perfil is None:
+        raise ValueError("Layout sem perfil de mapeamento")
+
+    colunas = [perfil[c] for c in CAMPOS_MAPEAMENTO]
+    if extensao == "csv":
+        # Every column is parsed (no usecols) so that rows with extra fields
+        # are detected instead of being read shifted.
+        lido = _ler_csv(conteudo, perfil)
+        df = lido[colunas].copy()
+        df.attrs[LINHAS_DESCARTADAS] = lido.attrs[LINHAS_DESCARTADAS]
+    else:
+        df = ler_colunas_xlsx(io.BytesIO(conteudo), colunas)
+    df.columns = _COLUNAS_IMPORTADAS
+    df["Pessoa"] = "Arquivo"
+    df["Categoria_Manual"] = None
+    return df
+
+
+def deduplicar_registros(
+    df: pd.DataFrame, existentes: List[Dict[str, Any]]
+) -> Tuple[pd.DataFrame, int]:
+    """Drop rows already imported or repeated within ``df``.
+
+    Rows with a FITID (OFX) are matched on ``(conta, FITID)``; the others on
+    the ``(data, descrição, valor)`` key.
+
+    Args:
+        df: Mapped rows (see ler_arquivo_mapeado).
+        existentes: Already imported transaction dicts.
+
+    Returns:
+        Tuple ``(df_novos, duplicados)``.
+    """
+    if df.empty:
+        return df, 0
+
+    if "FITID" in df.columns:
+        fitids_existentes = {chave_fitid(r) for r in existentes} - {None}
+        chaves_fitid = pd.Index(
+            [chave_fitid(r) for r in df[["FITID", "Conta"]].to_dict("records")],
+            tupleize_cols=False,
+        )
+        tem_fitid = chaves_fitid.notna()
+        repetido_fitid = tem_fitid & (
+            chaves_fitid.isin(fitids_existentes) | chaves_fitid.duplicated()
+        )
+    else:
+        tem_fitid = np.zeros(len(df), dtype=bool)
+        repetido_fitid = tem_fitid
+
+    sem_fitid_existentes = [r for r in existentes if chave_fitid(r) is None]
+    chaves_existentes = set(chaves_transacoes(pd.DataFrame(sem_fitid_existentes)))
+    chaves = chaves_transacoes(df)
+    repetido_chave = ~tem_fitid & (chaves.isin(chaves_existentes) | chaves.duplicated())
+
+    manter = ~(repetido_fitid | repetido_chave)
+    return df[manter], int((~manter).sum())
+
+
+def para_registros(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Convert mapped rows to JSON-friendly dicts for transacoes_importadas.
+
+    Args:
+        df: Mapped rows (see ler_arquivo_mapeado).
+
+    Returns:
+        List of dicts with NaN replaced by None; CSV/XLSX rows of a mixed
+        batch do not carry the empty OFX fields.
+    """
+    df = df.astype(object).where(df.notna(), None)
+    registros = df.to_dict("records")
+    if "FITID" in df.columns:
+        for registro in registros:
+            if registro.get("FITID") is None:
+                registro.pop("FITID", None)
+                registro.pop("Conta", None)
+    return registros
+
+
+def importar_lote(
+    arquivos: Sequence[Tuple[str, bytes]],
+    perfis: Dict[str, Dict[str, Any]],
+    existentes: List[Dict[str, Any]],
+    max_workers: int = MAX_WORKERS,
+    progresso: Optional[Callable[[int, int, str], None]] = None,
+    registro: Optional[List[Dict[str, Any]]] = None,
+) -> Dict[str, Any]:
+    """Import many statements at once.
+
+    Args:
+        arquivos: ``(nome, conteúdo)`` pairs.
+        perfis: Saved mapping profiles keyed by impressao_layout.
+        existentes: Already imported transaction dicts.
+        max_workers: Size of the thread pool.
+        progresso: Optional callback ``(concluídos, total, nome)`` called as
+            each file finishes (from the calling thread).
+        registro: Import registry; files whose content hash is already in it
+            (or repeated within the batch) are skipped without parsing.
+
+    Returns:
+        Dict with ``novos`` (records to append, in file order),
+        ``duplicados`` (rows skipped), ``por_arquivo`` (rows read per file),
+        ``hashes`` (``(nome, hash)`` of the files read successfully),
+        ``ja_importados`` (files skipped by hash), ``sem_perfil`` (CSV/XLSX files whose layout
+        has no profile), ``linhas_descartadas`` (file name → malformed CSV
+        lines left out, only files with any) and ``erros`` (file name → error
+        message).
+    """
+    resultado: Dict[str, Any] = {
+        "novos": [],
+        "duplicados": 0,
+        "por_arquivo": {},
+        "linhas_descartadas": {},
+        "hashes": [],
+        "ja_importados": [],
+        "sem_perfil": [],
+        "erros": {},
+    }
+    hashes: Dict[int, str] = {}
+    tarefas: List[Tuple[int, str, bytes, Optional[Dict[str, Any]]]] = []
+    for i, (nome, conteudo) in enumerate(arquivos):
+        hash_arquivo = hash_conteudo(conteudo)
+        if hash_arquivo in hashes.values() or (
+            registro is not None and buscar_importacao(registro, hash_arquivo) is not None
+        ):
+            resultado["ja_importados"].append(nome)
+            continue
+        hashes[i] = hash_arquivo
+
+        if _extensao(nome) == "ofx":
+            tarefas.append((i, nome, conteudo, None))
+            continue
+        try:
+            formato = detectar_formato(nome, conteudo)
+            perfil = encontrar_perfil(ler_cabecalho(nome, conteudo, formato), perfis, formato)
+        except Exception as e:
+            resultado["erros"][nome] = str(e)
+            continue
+        if perfil is None:
+            resultado["sem_perfil"].append(nome)
+        else:
+            tarefas.append((i, nome, conteudo, perfil))
+
+    total = len(tarefas)
+    frames: Dict[int, pd.DataFrame] = {}
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futuros = {
+            executor.submit(ler_arquivo_mapeado, nome, conteudo, perfil): (i, nome)
+            for i, nome, conteudo, perfil in tarefas
+        }
+        for concluidos, futuro in enumerate(as_completed(futuros), start=1):
+            i, nome = futuros[futuro]
+            try:
+                frames[i] = futuro.result()
+                resultado["por_arquivo"][nome] = len(frames[i])
+                if frames[i].attrs.get(LINHAS_DESCARTADAS):
+                    resultado["linhas_descartadas"][nome] = frames[i].attrs[LINHAS_DESCARTADAS]
+            except Exception as e:
+                resultado["erros"][nome] = str(e)
+            if progresso is not None:
+                progresso(concluidos, total, nome)
+
+    resultado["hashes"] = [(arquivos[i][0], hashes[i]) for i in sorted(frames)]
+    if frames:
+        df = pd.concat([frames[i] for i in sorted(frames)], ignore_index=True)
+        df, resultado["duplicados"] = deduplicar_registros(df, existentes)
+        resultado["novos"] = para_registros(df)
+    return resultado
+
+
+# --- Import registry (idempotent uploads and rollback) ---
+
+
+def hash_conteudo(conteudo: Union[bytes, memoryview, IO[bytes]]) -> str:
+    """SHA-256 of an upload, streamed in blocks.
+
+    Args:
+        conteudo: Bytes, or a binary buffer (e.g. a Streamlit UploadedFile,
+            hashed through ``getbuffer()`` without copying).
+
+    Returns:
+        Hex digest.
+    """
+    h = hashlib.sha256()
+    if hasattr(conteudo, "getbuffer"):
+        conteudo = conteudo.getbuffer()
+    if isinstance(conteudo, (bytes, bytearray, memoryview)):
+        visao = memoryview(conteudo)
+        for inicio in range(0, len(visao), BLOCO_HASH):
+            h.update(visao[inicio : inicio + BLOCO_HASH])
+        return h.hexdigest()
+
+    if hasattr(conteudo, "seek"):
+        conteudo.seek(0)
+    for bloco in iter(lambda: conteudo.read(BLOCO_HASH), b""):
+        h.update(bloco)
+    return h.hexdigest()
+
+
+def buscar_importacao(
+    registro: List[Dict[str, Any]], hash_arquivo: str
+) -> Optional[Dict[str, Any]]:
+    """Return the registry entry that already ingested a file, if any.
+
+    Args:
+        registro: Import registry (see registrar_importacao).
+        hash_arquivo: Content hash of the file.
+
+    Returns:
+        The batch entry containing the hash, or None.
+    """
+    for lote in registro:
+        if any(a["hash"] == hash_arquivo for a in lote.get("arquivos", [])):
+            return lote
+    return None
+
+
+def registrar_importacao(
+    registro: List[Dict[str, Any]],
+    arquivos: Sequence[Tuple[str, str]],
+    inicio: int,
+    fim: int,
+) -> Dict[str, Any]:
+    """Record an import batch and the rows it appended.
+
+    Imports only append to ``transacoes_importadas``, so each batch owns the
+    contiguous range ``[inicio, fim)`` of that list.
+
+    Args:
+        registro: Import registry, updated in place.
+        arquivos: ``(nome, hash)`` of each file in the batch.
+        inicio: Index of the first appended row.
+        fim: Index after the last appended row.
+
+    Returns:
+        The new entry.
+    """
+    lote = {
+        "id": max((item["id"] for item in registro), default=0) + 1,
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "arquivos": [{"nome": nome, "hash": h} for nome, h in arquivos],
+        "inicio": inicio,
+        "fim": fim,
+    }
+    registro.append(lote)
+    return lote
+
+
+def desfazer_importacao(
+    registro: List[Dict[str, Any]], importados: List[Dict[str, Any]], id_lote: int
+) -> int:
+    """Remove the rows of an import batch and forget its files.
+
+    Only the batch's own range is deleted; later batches' ranges are
+    shifted, so no row is scanned.
+
+    Args:
+        registro: Import registry, updated in place.
+        importados: ``transacoes_importadas`` list, updated in place.
+        id_lote: Id of the batch to roll back.
+
+    Returns:
+        Number of rows removed (0 if the batch is unknown).
+    """
+    lote = next((item for item in registro if item["id"] == id_lote), None)
+    if lote is None:
+        return 0
+    inicio, fim = lote["inicio"], min(lote["fim"], len(importados))
+    removidos = max(fim - inicio, 0)
+    del importados[inicio:fim]
+    registro.remove(lote)
+    for outro in registro:
+        if outro["inicio"] >= fim:
+            outro["inicio"] -= removidos
+            outro["fim"] -= removidos
+    return removidos
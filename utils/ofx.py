@@ -0,0 +1,200 @@
+"""Streaming OFX / OFX-SGML statement parser.
+
+Reads ``<STMTTRN>`` records token by token from a binary stream, in fixed
+size chunks, so large multi-account files are imported in bounded memory
+without building a DOM. Works for both OFX 1.x (SGML, closing tags
+optional) and OFX 2.x (XML).
+
+Each record is mapped to the transaction schema used by
+``transacoes_importadas``: DTPOSTED → Data, TRNAMT → Valor, MEMO (or NAME)
+→ Descrição, plus FITID and the account id for exact deduplication.
+"""
+
+import codecs
+import html
+import re
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+# Bytes read from the stream per iteration.
+TAMANHO_BLOCO: int = 64 * 1024
+
+# Header bytes inspected to detect the text encoding.
+_TAMANHO_CABECALHO = 2048
+
+_TOKEN = re.compile(r"<(/?)([A-Za-z0-9_.]+)>([^<]*)")
+
+# SGML CHARSET values used by Brazilian banks.
+_CHARSETS = {"1252": "cp1252", "ISO-8859-1": "latin-1", "8859-1": "latin-1", "UTF-8": "utf-8"}
+
+_CAMPOS_CONTA = {"ACCTID"}
+_CAMPOS_TRANSACAO = {"TRNTYPE", "DTPOSTED", "TRNAMT", "FITID", "MEMO", "NAME", "CHECKNUM"}
+
+
+def detectar_encoding_ofx(cabecalho: bytes) -> str:
+    """Detect the text encoding declared in an OFX header.
+
+    Args:
+        cabecalho: First bytes of the file.
+
+    Returns:
+        Python codec name; defaults to ``cp1252`` for SGML files without a
+        CHARSET and ``utf-8`` for XML files.
+    """
+    texto = cabecalho.decode("ascii", errors="ignore")
+    xml = re.search(r'encoding="([^"]+)"', texto)
+    if xml:
+        return xml.group(1).lower()
+    charset = re.search(r"CHARSET:\s*([\w-]+)", texto)
+    if charset:
+        return _CHARSETS.get(charset.group(1).upper(), "cp1252")
+    return "utf-8" if texto.lstrip().startswith("<?xml") else "cp1252"
+
+
+def _tokens(arquivo: IO[bytes], encoding: Optional[str]) -> Iterator[Tuple[bool, str, str]]:
+    """Yield ``(fechamento, tag, texto)`` tokens from an OFX byte stream."""
+    inicio = arquivo.read(_TAMANHO_CABECALHO)
+    if encoding is None:
+        encoding = detectar_encoding_ofx(inicio)
+
+    decodificador = codecs.getincrementaldecoder(encoding)(errors="replace")
+    resto = decodificador.decode(inicio)
+    while True:
+        bloco = arquivo.read(TAMANHO_BLOCO)
+        if bloco:
+            resto += decodificador.decode(bloco)
+            # Keep the last (possibly incomplete) token for the next block;
+            # with no "<" at all (a long tag value) keep the whole buffer.
+            corte = max(resto.rfind("<"), 0)
+        else:
+            corte = len(resto)
+        for m in _TOKEN.finditer(resto, 0, corte):
+            texto = m.group(3).strip()
+            if "&" in texto:
+                texto = html.unescape(texto)
+            yield m.group(1) == "/", m.group(2).upper(), texto
+        resto = resto[corte:]
+        if not bloco:
+            return
+
+
+def _data_ofx(valor: str) -> Optional[str]:
+    """Convert an OFX datetime (``YYYYMMDD[HHMMSS[.XXX]][[-3:BRT]]``) to ISO."""
+    if len(valor) < 8 or not valor[:8].isdigit():
+        return None
+    return f"{valor[:4]}-{valor[4:6]}-{valor[6:8]}"
+
+
+def _valor_ofx(valor: str) -> Optional[float]:
+    """Convert an OFX amount (decimal point or comma) to float."""
+    try:
+        return float(valor.replace(",", "."))
+    except ValueError:
+        return None
+
+
+def _montar_registro(campos: Dict[str, str], conta: str) -> Optional[Dict[str, Any]]:
+    """Map the fields of one ``<STMTTRN>`` to the transaction schema."""
+    data = _data_ofx(campos.get("DTPOSTED", ""))
+    valor = _valor_ofx(campos.get("TRNAMT", ""))
+    if data is None or valor is None:
+        return None
+    descricao = campos.get("MEMO") or campos.get("NAME") or campos.get("TRNTYPE", "")
+    return {
+        "Data": data,
+        "Descrição": descricao,
+        "Valor": valor,
+        "Pessoa": "Arquivo",
+        "Categoria_Manual": None,
+        "FITID": campos.get("FITID") or None,
+        "Conta": conta or None,
+    }
+
+
+def iterar_transacoes_ofx(
+    arquivo: IO[bytes], encoding: Optional[str] = None
+) -> Iterator[Dict[str, Any]]:
+    """Stream the transactions of an OFX file.
+
+    Args:
+        arquivo: Binary file-like object (e.g. a Streamlit UploadedFile).
+        encoding: Text encoding; detected from the header when omitted.
+
+    Yields:
+        Transaction dicts with Data (ISO), Descrição, Valor, Pessoa,
+        Categoria_Manual, FITID and Conta. Records without a valid date or
+        amount are skipped.
+    """
+    conta = ""
+    campos: Optional[Dict[str, str]] = None
+
+    for fechamento, tag, texto in _tokens(arquivo, encoding):
+        if tag == "STMTTRN":
+            # SGML allows a new record (or the list end) without </STMTTRN>.
+            if campos is not None:
+                registro = _montar_registro(campos, conta)
+                if registro is not None:
+                    yield registro
+            campos = None if fechamento else {}
+        elif tag == "BANKTRANLIST" and fechamento and campos is not None:
+            registro = _montar_registro(campos, conta)
+            if registro is not None:
+                yield registro
+            campos = None
+        elif fechamento:
+            continue
+        elif campos is not None and tag in _CAMPOS_TRANSACAO and texto:
+            campos[tag] = texto
+        elif campos is None and tag in _CAMPOS_CONTA and texto:
+            conta = texto
+
+    if campos is not None:
+        registro = _montar_registro(campos, conta)
+        if registro is not None:
+            yield registro
+
+
+def chave_fitid(registro: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+    """Return the ``(conta, FITID)`` dedup key of a record, if it has one."""
+    fitid = registro.get("FITID")
+    if not fitid or fitid != fitid:  # None, "" or NaN
+        return None
+    return (str(registro.get("Conta") or ""), str(fitid))
+
+
+def importar_ofx(
+    arquivo: IO[bytes],
+    existentes: Iterable[Dict[str, Any]],
+    encoding: Optional[str] = None,
+) -> Tuple[List[Dict[str, Any]], int]:
+    """Parse an OFX stream and keep only transactions not imported yet.
+
+    FITIDs are unique per account, so ``(conta, FITID)`` gives exact
+    deduplication against previous imports and within the file itself.
+    Records without a FITID are always kept.
+
+    Args:
+        arquivo: Binary file-like object.
+        existentes: Already imported transaction dicts.
+        encoding: Text encoding; detected from the header when omitted.
+
+    Returns:
+        Tuple ``(novos, duplicados)`` with the new records and the number of
+        records skipped as duplicates.
+    """
+    vistos: Set[Tuple[str, str]] = set()
+    for registro in existentes:
+        chave = chave_fitid(registro)
+        if chave is not None:
+            vistos.add(chave)
+
+    novos: List[Dict[str, Any]] = []
+    duplicados = 0
+    for registro in iterar_transacoes_ofx(arquivo, encoding):
+        chave = chave_fitid(registro)
+        if chave is not None:
+            if chave in vistos:
+                duplicados += 1
+                continue
+            vistos.add(chave)
+        novos.append(registro)
+    return novos, duplicados
@@ -0,0 +1,166 @@
+"""Vectorized parsing of dates and amounts exported by Brazilian banks.
+
+Dates are parsed with an explicit format detected once per source (ISO,
+dd/mm/yyyy and variants) instead of per-value inference. Amounts accept
+plain numbers as well as Brazilian strings such as ``"R$ 1.234,56"``,
+``"-1.234,56"`` or ``"(1.234,56)"``.
+"""
+
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Candidate date formats, in order of preference. Day-first variants come
+# before month-first ones because that is what Brazilian banks export.
+FORMATOS_DATA: List[str] = [
+    "%Y-%m-%d",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S",
+    "%d/%m/%Y",
+    "%d/%m/%Y %H:%M:%S",
+    "%d/%m/%Y %H:%M",
+    "%d/%m/%y",
+    "%d-%m-%Y",
+    "%d.%m.%Y",
+    "%Y/%m/%d",
+    "%Y%m%d",
+]
+
+# Rows sampled to detect the date format of a source.
+AMOSTRA_FORMATO: int = 500
+
+# "1.234" or "12.345.678": dots as thousands separators, no decimals.
+_PADRAO_MILHAR = r"^-?\d{1,3}(?:\.\d{3})+$"
+
+
+def detectar_formato_data(
+    serie: pd.Series, amostra: int = AMOSTRA_FORMATO
+) -> Optional[str]:
+    """Detect the strftime format of a column of date strings.
+
+    Args:
+        serie: Series of date strings.
+        amostra: Maximum number of distinct values tested per format.
+
+    Returns:
+        The first format in FORMATOS_DATA that parses the whole sample, or
+        the one parsing most of it; None when no format matches any value.
+    """
+    valores = pd.Series(serie.dropna().astype(str).str.strip().unique()[:amostra])
+    valores = valores[valores != ""]
+    if valores.empty:
+        return None
+
+    melhor, melhor_ok = None, 0
+    for formato in FORMATOS_DATA:
+        ok = pd.to_datetime(valores, format=formato, errors="coerce").notna().sum()
+        if ok == len(valores):
+            return formato
+        if ok > melhor_ok:
+            melhor, melhor_ok = formato, ok
+    return melhor
+
+
+def parsear_datas(serie: pd.Series) -> pd.Series:
+    """Parse a column of dates using a single detected format.
+
+    Values that do not match the detected format (mixed sources) fall back
+    to day-first inference; anything unparseable becomes NaT.
+
+    Args:
+        serie: Series with date strings, datetimes or a mix.
+
+    Returns:
+        Series of ``datetime64[ns]`` with the same index.
+    """
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return serie
+    if serie.empty:
+        return pd.to_datetime(serie, errors="coerce")
+
+    # Statements repeat the same few hundred dates: parse distinct values only.
+    codigos, unicos = pd.factorize(serie)
+    texto = pd.Series(unicos, dtype="string").str.strip()
+    formato = detectar_formato_data(texto)
+    if formato is None:
+        datas = pd.to_datetime(texto, errors="coerce", format="mixed", dayfirst=True)
+    else:
+        datas = pd.to_datetime(texto, format=formato, errors="coerce")
+        restantes = datas.isna() & (texto != "")
+        if restantes.any():
+            datas[restantes] = pd.to_datetime(
+                texto[restantes], errors="coerce", format="mixed", dayfirst=True
+            )
+    valores = datas.to_numpy(dtype="datetime64[ns]")
+    resultado = np.where(codigos >= 0, valores[np.maximum(codigos, 0)], np.datetime64("NaT"))
+    return pd.Series(resultado, index=serie.index, name=serie.name)
+
+
+def parsear_valores(serie: pd.Series) -> pd.Series:
+    """Parse amounts in Brazilian or international notation, vectorized.
+
+    Handles currency symbols, spaces, thousands separators, decimal comma,
+    leading or trailing minus and accounting parentheses. When both ``.``
+    and ``,`` appear, the last one is the decimal separator.
+
+    Args:
+        serie: Series of numbers and/or amount strings.
+
+    Returns:
+        Float Series with the same index; unparseable values become NaN.
+    """
+    tipo = pd.api.types.infer_dtype(serie, skipna=True)
+    if tipo in ("integer", "floating", "mixed-integer-float", "decimal", "empty"):
+        return pd.to_numeric(serie, errors="coerce").astype(float)
+    if tipo == "string":
+        codigos, unicos = pd.factorize(serie)
+        valores = _parsear_textos(pd.Series(unicos, dtype="string")).to_numpy()
+        resultado = np.where(codigos >= 0, valores[np.maximum(codigos, 0)], np.nan)
+        return pd.Series(resultado, index=serie.index, name=serie.name)
+
+    # Mixed column (e.g. numbers from XLSX next to strings from CSV).
+    eh_texto = serie.map(lambda v: isinstance(v, str)).astype(bool)
+    valores = pd.to_numeric(serie.where(~eh_texto), errors="coerce").astype(float)
+    if eh_texto.any():
+        valores[eh_texto] = _parsear_textos(serie[eh_texto].astype("string"))
+    return valores
+
+
+def _parsear_textos(texto: pd.Series) -> pd.Series:
+    """Parse a string Series of amounts (see parsear_valores)."""
+    texto = texto.str.replace(r"[R$\s]", "", regex=True)
+
+    # Accounting notation: "(10,00)" and "10,00-" are negative.
+    negativo = (texto.str.startswith("(") & texto.str.endswith(")")) | texto.str.endswith("-")
+    texto = texto.str.strip("()+").str.rstrip("-")
+
+    decimal_virgula = texto.str.rfind(",") > texto.str.rfind(".")
+    milhar = ~decimal_virgula & texto.str.match(_PADRAO_MILHAR)
+
+    com_virgula = texto.str.replace(".", "", regex=False).str.replace(",", ".", regex=False)
+    com_ponto = texto.str.replace(",", "", regex=False)
+    texto = com_ponto.mask(decimal_virgula | milhar, com_virgula)
+
+    valores = pd.to_numeric(texto, errors="coerce").astype(float)
+    return valores.mask(negativo.fillna(False).astype(bool), -valores.abs())
+
+
+def chaves_transacoes(df: pd.DataFrame) -> pd.Index:
+    """Build dedup keys (data, descrição, valor) for transaction rows.
+
+    Args:
+        df: DataFrame with ``Data``, ``Descrição`` and ``Valor`` columns as
+            stored in transacoes_importadas (raw strings or numbers).
+
+    Returns:
+        Index of ``(data, descrição em minúsculas, valor)`` tuples, one per row.
+    """
+    if df.empty:
+        return pd.Index([], dtype=object)
+    datas = df["Data"].astype(str).str.strip()
+    descricoes = df["Descrição"].astype(str).str.strip().str.lower()
+    valores = parsear_valores(df["Valor"]).fillna(0.0).round(2)
+    return pd.Index(
+        list(zip(datas, descricoes, valores.to_numpy(dtype=np.float64))), tupleize_cols=False
+    )
@@ -2,103 +2,373 @@
 
 Handles combining uploaded data and manual transactions, type conversion,
 categorization, and DataFrame aggregation.
+
+The work is done by a pure pipeline (montar_transacoes) of five stages —
+concatenar, parsear, classificar, derivar, ordenar — that take plain data
+and return new frames. processar_dados only reads its inputs from and
+writes the result to st.session_state.
 """
 
+import uuid
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
 import streamlit as st
 import pandas as pd
-from utils.helpers import categorizar_despesa
+from utils import armazenamento
+from utils.categorias import (
+    carregar_classificacoes,
+    categorizar_serie,
+    descricoes_afetadas,
+    indice_descricoes,
+    obter_regras,
+    salvar_classificacoes,
+)
+from utils.parsing import parsear_datas, parsear_valores
+from utils.profiling import instrumentar, medir
+
+# Columns of the processed frame and their dtypes.
+COLUNAS_PROCESSADAS: Dict[str, str] = {
+    "Data": "datetime64[ns]",
+    "Descrição": "object",
+    "Valor": "float64",
+    "Pessoa": "object",
+    "Tipo": "object",
+    "Categoria": "object",
+    "ValorAbs": "float64",
+    "AnoMes": "object",
+    "CategoriaAutomatica": "bool",
+}
 
 
+@instrumentar
 def processar_dados() -> None:
     """Combine uploaded and manual transactions into unified DataFrame.
 
-    Merges data from file uploads and manual entries, applies type conversions,
-    categorizes transactions, and stores result in st.session_state.df_transacoes.
+    Thin wrapper around montar_transacoes: reads the sources from session
+    state and stores the result in st.session_state.df_transacoes.
 
     Each row contains: Data, Descrição, Valor, Tipo, Categoria, Pessoa, AnoMes.
     - Valor > 0 = Receita (Income)
     - Valor < 0 = Despesa (Expense)
+
+    Sessions with the same transactions and categories share one read-only
+    frame (see utils.armazenamento); only legacy in-memory uploads
+    (df_from_upload) are processed per session.
+
+    Also sets st.session_state.versao_dados, an id of the data behind
+    df_transacoes (None without data) used to key derived caches.
+    """
+    chave = None
+    if st.session_state.df_from_upload is None:
+        chave = armazenamento.impressao_dados(
+            st.session_state.transacoes,
+            st.session_state.get("transacoes_importadas") or [],
+            st.session_state.categories,
+        )
+        df = armazenamento.obter_frame(chave)
+        if df is not None:
+            st.session_state.df_transacoes = df
+            st.session_state.versao_dados = chave
+            return
+
+    regras = obter_regras(st.session_state.categories)
+    classificacoes = carregar_classificacoes(regras)
+    conhecidas = len(classificacoes)
+    df = montar_transacoes(
+        st.session_state.transacoes,
+        st.session_state.get("transacoes_importadas") or [],
+        st.session_state.categories,
+        st.session_state.df_from_upload,
+        classificacoes,
+    )
+    if len(classificacoes) != conhecidas:
+        salvar_classificacoes(regras)
+    if df is None:
+        st.session_state.df_transacoes = None
+        st.session_state.versao_dados = None
+        return
+
+    if chave is not None:
+        df = armazenamento.guardar_frame(chave, df)
+    st.session_state.df_transacoes = df
+    st.session_state.versao_dados = chave if chave is not None else uuid.uuid4().hex
+
+
+def atualizar_categorias(categorias_antigas: Dict[str, List[str]]) -> None:
+    """Apply a categories edit to st.session_state.df_transacoes.
+
+    Call after replacing st.session_state.categories. Instead of a full
+    processar_dados, only the rows whose descriptions contain an edited
+    keyword are re-categorized (see recategorizar), using a description
+    index kept per data version. The shared frame of the old version is
+    left untouched: the result is shared under the new version.
+
+    Args:
+        categorias_antigas: Categories the current frame was built with.
+    """
+    df = st.session_state.get("df_transacoes")
+    if df is None:
+        return
+    versao = st.session_state.get("versao_dados")
+    indice = armazenamento.obter_frame(f"indice:{versao}") if versao else None
+    if indice is None:
+        indice = indexar_descricoes(df)
+
+    regras = obter_regras(st.session_state.categories)
+    classificacoes = carregar_classificacoes(regras)
+    conhecidas = len(classificacoes)
+    with medir("pipeline.recategorizar"):
+        df = recategorizar(
+            df, indice, obter_regras(categorias_antigas)["palavras"], regras, classificacoes
+        )
+    if len(classificacoes) != conhecidas:
+        salvar_classificacoes(regras)
+
+    if st.session_state.df_from_upload is None:
+        chave = armazenamento.impressao_dados(
+            st.session_state.transacoes,
+            st.session_state.get("transacoes_importadas") or [],
+            st.session_state.categories,
+        )
+        df = armazenamento.guardar_frame(chave, df)
+    else:
+        chave = uuid.uuid4().hex
+    armazenamento.guardar_frame(f"indice:{chave}", indice)
+    st.session_state.df_transacoes = df
+    st.session_state.versao_dados = chave
+
+
+def montar_transacoes(
+    transacoes: List[Dict[str, Any]],
+    importadas: List[Dict[str, Any]],
+    categorias: Dict[str, List[str]],
+    df_upload: Optional[pd.DataFrame] = None,
+    classificacoes: Optional[Dict[str, str]] = None,
+) -> Optional[pd.DataFrame]:
+    """Run the processing pipeline without touching session state.
+
+    Stages, each a pure function (inputs are never modified) timed as
+    ``pipeline.<stage>`` in the Diagnóstico panel: concatenar, parsear,
+    classificar, derivar and ordenar. Callers may run or cache them one by
+    one; this function just chains them.
+
+    Used by processar_dados and by the headless reports (utils.relatorios).
+
+    Args:
+        transacoes: Manual transactions (``transacoes.json``).
+        importadas: Persisted imported transactions.
+        categorias: Category → keywords mapping.
+        df_upload: Legacy in-memory upload with date/title/amount columns.
+        classificacoes: Known description classifications for these
+            categories (see categorias.carregar_classificacoes); new ones
+            are added to it.
+
+    Returns:
+        Frame with the COLUNAS_PROCESSADAS columns (plus any extra source
+        columns such as FITID), newest first; None when there is no data.
+    """
+    with medir("pipeline.concatenar"):
+        df = concatenar(transacoes, importadas, df_upload)
+    if df is None:
+        return None
+    with medir("pipeline.parsear"):
+        df = parsear(df)
+    with medir("pipeline.classificar"):
+        df = classificar(df, obter_regras(categorias), classificacoes)
+    with medir("pipeline.derivar"):
+        df = derivar(df)
+    with medir("pipeline.ordenar"):
+        return ordenar(df)
+
+
+def concatenar(
+    transacoes: List[Dict[str, Any]],
+    importadas: List[Dict[str, Any]],
+    df_upload: Optional[pd.DataFrame] = None,
+) -> Optional[pd.DataFrame]:
+    """Stage 1: stack every source into one raw frame.
+
+    Args:
+        transacoes: Manual transactions.
+        importadas: Persisted imported transactions.
+        df_upload: Legacy in-memory upload (date/title/amount columns).
+
+    Returns:
+        Raw frame (values still as stored) with a ``_fonte`` column numbering
+        the source of each row; None when every source is empty.
     """
     dfs = []
 
     # 1. Dados do arquivo enviado pelo usuário
-    if st.session_state.df_from_upload is not None:
-        df_upload = st.session_state.df_from_upload.copy()
-        df_upload.rename(
-            columns={"date": "Data", "title": "Descrição", "amount": "Valor"},
-            inplace=True,
+    if df_upload is not None:
+        df_upload = df_upload.rename(
+            columns={"date": "Data", "title": "Descrição", "amount": "Valor"}
         )
         df_upload["Pessoa"] = "Arquivo"
         df_upload["Categoria_Manual"] = None
         dfs.append(df_upload)
 
     # 2. Transações manuais
-    if st.session_state.transacoes:
-        df_manual = pd.DataFrame(st.session_state.transacoes)
-        dfs.append(df_manual)
+    if transacoes:
+        dfs.append(pd.DataFrame(transacoes))
 
     # 3. Transações importadas persistidas
-    if st.session_state.get("transacoes_importadas"):
-        df_importadas = pd.DataFrame(st.session_state.transacoes_importadas)
-        dfs.append(df_importadas)
+    if importadas:
+        dfs.append(pd.DataFrame(importadas))
 
     if not dfs:
-        st.session_state.df_transacoes = None
-        return
+        return None
+    for i, parte in enumerate(dfs):
+        parte["_fonte"] = i
+    return pd.concat(dfs, ignore_index=True)
 
-    df = pd.concat(dfs, ignore_index=True)
 
-    # Converter tipos
-    df["Data"] = pd.to_datetime(df["Data"], errors="coerce")
-    df.dropna(subset=["Data"], inplace=True)
-    df["Valor"] = pd.to_numeric(df["Valor"], errors="coerce")
-    df.dropna(subset=["Valor"], inplace=True)
-    df = df[df["Valor"] != 0]
+def parsear(df: pd.DataFrame) -> pd.DataFrame:
+    """Stage 2: parse dates and amounts, dropping invalid and zero rows.
 
-    # Tipo: Receita ou Despesa
-    df["Tipo"] = df["Valor"].apply(lambda v: "Receita" if v > 0 else "Despesa")
+    The date format is detected once per source (``_fonte``), as each bank
+    or file uses a single format.
 
-    # Valor absoluto para facilitar gráficos
-    df["ValorAbs"] = df["Valor"].abs()
+    Args:
+        df: Output of concatenar.
+
+    Returns:
+        Frame with ``Data`` as datetime64 and ``Valor`` as float, without
+        the ``_fonte`` column.
+    """
+    fontes = df["_fonte"].to_numpy()
+    if len(fontes) and fontes[0] == fontes[-1]:
+        datas = parsear_datas(df["Data"])
+        valores = parsear_valores(df["Valor"])
+    else:
+        datas = pd.Series(np.datetime64("NaT"), index=df.index, dtype="datetime64[ns]")
+        valores = pd.Series(np.nan, index=df.index, dtype=float)
+        for posicoes in df.groupby("_fonte", sort=False).indices.values():
+            # infer_objects: datetimes of one source in a column mixed by concat
+            datas.iloc[posicoes] = parsear_datas(df["Data"].iloc[posicoes].infer_objects())
+            valores.iloc[posicoes] = parsear_valores(df["Valor"].iloc[posicoes])
+
+    df = df.drop(columns="_fonte")
+    df["Data"] = datas
+    df["Valor"] = valores
+    return df[datas.notna() & valores.notna() & (valores != 0)]
 
-    # AnoMes
-    df["AnoMes"] = df["Data"].dt.to_period("M").astype(str)
 
-    # Categoria
+def classificar(
+    df: pd.DataFrame, regras: Dict[str, Any], classificacoes: Optional[Dict[str, str]] = None
+) -> pd.DataFrame:
+    """Stage 3: income/expense type and category.
+
+    Category precedence: manual category > "Receita" for income > compiled
+    keyword rules (each distinct description matched once).
+
+    Args:
+        df: Output of parsear.
+        regras: Compiled rules (categorias.obter_regras).
+        classificacoes: Known description classifications, filled with the
+            new ones (see categorias.categorizar_serie).
+
+    Returns:
+        Frame with ``Tipo``, ``Categoria`` and ``CategoriaAutomatica`` (True
+        where the category came from the keyword rules) added and the
+        temporary ``Categoria_Manual`` column removed.
+    """
+    despesa = df["Valor"].to_numpy() < 0
+    categoria = pd.Series("Receita", index=df.index, dtype=object)
+    categoria[despesa] = categorizar_serie(
+        df.loc[despesa, "Descrição"],
+        regras,
+        classificacoes=classificacoes,
+        valores=df.loc[despesa, "Valor"],
+        pessoas=df.loc[despesa, "Pessoa"] if "Pessoa" in df.columns else None,
+    )
+    automatica = despesa
     if "Categoria_Manual" in df.columns:
-        df["Categoria"] = df.apply(
-            lambda row: (
-                row["Categoria_Manual"]
-                if pd.notnull(row.get("Categoria_Manual"))
-                and row.get("Categoria_Manual") != ""
-                else (
-                    "Receita"
-                    if row["Tipo"] == "Receita"
-                    else categorizar_despesa(
-                        row["Descrição"], st.session_state.categories
-                    )
-                )
-            ),
-            axis=1,
-        )
-    else:
-        df["Categoria"] = df.apply(
-            lambda row: (
-                "Receita"
-                if row["Tipo"] == "Receita"
-                else categorizar_despesa(row["Descrição"], st.session_state.categories)
-            ),
-            axis=1,
-        )
+        manual = df["Categoria_Manual"]
+        sem_manual = (manual.isna() | (manual == "")).to_numpy()
+        categoria = categoria.where(sem_manual, manual)
+        automatica = despesa & sem_manual
+
+    df = df.drop(columns="Categoria_Manual", errors="ignore")
+    df["Tipo"] = np.where(despesa, "Despesa", "Receita").astype(object)
+    df["Categoria"] = categoria
+    df["CategoriaAutomatica"] = automatica
+    return df
 
-    # Pessoa
+
+def recategorizar(
+    df: pd.DataFrame,
+    indice: pd.Series,
+    palavras_antigas: Dict[str, Sequence[str]],
+    regras: Dict[str, Any],
+    classificacoes: Optional[Dict[str, str]] = None,
+) -> pd.DataFrame:
+    """Apply a categories edit to a processed frame without reprocessing it.
+
+    Only the distinct descriptions an edited rule may match are checked
+    again; the rows pointing to them in the description index are
+    re-categorized (first match wins, as in classificar). Manual categories and
+    income are never touched, as they are not in the index.
+
+    Args:
+        df: Processed frame (output of montar_transacoes); not modified.
+        indice: indexar_descricoes(df).
+        palavras_antigas: ``regras["palavras"]`` the frame was built with.
+        regras: Compiled rules after the edit.
+        classificacoes: Known description classifications for ``regras``,
+            filled with the re-matched ones.
+
+    Returns:
+        Frame equal to rebuilding ``df`` with the new rules (a shallow copy
+        with a new ``Categoria`` column, or ``df`` itself if nothing changes).
+    """
+    unicos = indice.cat.categories.to_numpy(dtype=object)
+    afetados = np.flatnonzero(descricoes_afetadas(unicos, palavras_antigas, regras["palavras"]))
+    if not len(afetados):
+        return df
+    linhas = np.isin(indice.cat.codes.to_numpy(), afetados)
+    posicoes = df.index.get_indexer(indice.index[linhas])
+    categoria = df["Categoria"].to_numpy(copy=True)
+    categoria[posicoes] = categorizar_serie(
+        df["Descrição"].iloc[posicoes],
+        regras,
+        classificacoes=classificacoes,
+        valores=df["Valor"].iloc[posicoes],
+        pessoas=df["Pessoa"].iloc[posicoes],
+    ).to_numpy()
+    df = df.copy(deep=False)
+    df["Categoria"] = categoria
+    return df
+
+
+def indexar_descricoes(df: pd.DataFrame) -> pd.Series:
+    """Description index of the rule-categorized rows of a processed frame.
+
+    See categorias.indice_descricoes; the Series is indexed like ``df``.
+    """
+    return indice_descricoes(df.loc[df["CategoriaAutomatica"].to_numpy(), "Descrição"])
+
+
+def derivar(df: pd.DataFrame) -> pd.DataFrame:
+    """Stage 4: columns derived for charts and filters.
+
+    Args:
+        df: Output of classificar.
+
+    Returns:
+        Frame with ``ValorAbs``, ``AnoMes`` (``AAAA-MM``) and ``Pessoa``
+        ("Não informada" when missing).
+    """
+    df = df.copy(deep=False)
+    df["ValorAbs"] = df["Valor"].abs()
+    df["AnoMes"] = df["Data"].dt.to_period("M").astype(str)
     if "Pessoa" not in df.columns:
         df["Pessoa"] = "Não informada"
     df["Pessoa"] = df["Pessoa"].fillna("Não informada")
+    return df
 
-    # Limpar colunas temporárias
-    df.drop(columns=["Categoria_Manual"], errors="ignore", inplace=True)
 
-    st.session_state.df_transacoes = df.sort_values(
-        "Data", ascending=False
-    ).reset_index(drop=True)
+def ordenar(df: pd.DataFrame) -> pd.DataFrame:
+    """Stage 5: newest transactions first, with a fresh RangeIndex."""
+    return df.sort_values("Data", ascending=False).reset_index(drop=True)
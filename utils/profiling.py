@@ -0,0 +1,287 @@
+"""Opt-in per-rerun instrumentation for Dashboard Financeiro Familiar.
+
+Times the main sections of each Streamlit rerun (session initialization, data
+processing, sidebar and every ``render_*`` function, plus optional named inner
+blocks) and keeps the last reruns in a per-session ring buffer. Collection is
+disabled unless the ``DFF_DIAGNOSTICO`` environment variable is set or the page
+is opened with ``?diagnostico=1``; when disabled, ``medir`` is a cheap no-op.
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, TypeVar
+
+import streamlit as st
+
+# --- Constants ---
+DIAGNOSTICO_ENV: str = "DFF_DIAGNOSTICO"
+MAX_RERUNS: int = 50
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Each Streamlit session runs its script on its own thread, so the rerun being
+# recorded is thread-local rather than global.
+_local = threading.local()
+
+# tracemalloc is process-wide: it runs only while some rerun is measuring
+# memory, and is stopped when the last one ends (unless it was already
+# tracing before, e.g. via PYTHONTRACEMALLOC).
+_lock_memoria = threading.Lock()
+_reruns_memoria = 0
+_tracing_proprio = False
+
+
+class RegistroRerun:
+    """Timing and memory measurements collected during a single rerun."""
+
+    def __init__(self, medir_memoria: bool) -> None:
+        self.inicio = datetime.now().isoformat(timespec="seconds")
+        self.secoes: List[Dict[str, Any]] = []
+        self.medir_memoria = medir_memoria
+        self._t0 = time.perf_counter()
+        self._profundidade = 0
+        self.total_ms: Optional[float] = None
+        self.interrompido = False
+
+    def finalizar(self, interrompido: bool = False) -> Dict[str, Any]:
+        """Close the rerun and return its serializable summary."""
+        self.total_ms = (time.perf_counter() - self._t0) * 1000
+        self.interrompido = interrompido
+        return {
+            "inicio": self.inicio,
+            "total_ms": round(self.total_ms, 2),
+            "interrompido": interrompido,
+            "secoes": self.secoes,
+        }
+
+
+def diagnostico_ativo() -> bool:
+    """Return whether instrumentation is enabled for the current session.
+
+    Returns:
+        True when ``DFF_DIAGNOSTICO`` is set or ``?diagnostico=1`` is in the URL.
+    """
+    if os.environ.get(DIAGNOSTICO_ENV, "").strip() not in ("", "0"):
+        return True
+    try:
+        params = st.experimental_get_query_params()
+    except Exception:
+        return False
+    return "1" in params.get("diagnostico", [])
+
+
+def _memoria_atual() -> int:
+    return tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0
+
+
+def _reservar_memoria() -> None:
+    global _reruns_memoria, _tracing_proprio
+    with _lock_memoria:
+        if _reruns_memoria == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracing_proprio = True
+        _reruns_memoria += 1
+
+
+def _liberar_memoria() -> None:
+    global _reruns_memoria, _tracing_proprio
+    with _lock_memoria:
+        _reruns_memoria = max(_reruns_memoria - 1, 0)
+        if _reruns_memoria == 0 and _tracing_proprio:
+            tracemalloc.stop()
+            _tracing_proprio = False
+
+
+def _encerrar(registro: RegistroRerun, interrompido: bool = False) -> Dict[str, Any]:
+    resumo = registro.finalizar(interrompido=interrompido)
+    if registro.medir_memoria:
+        _liberar_memoria()
+    return resumo
+
+
+def _historico() -> Deque[Dict[str, Any]]:
+    if "_diagnostico_reruns" not in st.session_state:
+        st.session_state._diagnostico_reruns = deque(maxlen=MAX_RERUNS)
+    return st.session_state._diagnostico_reruns
+
+
+def iniciar_rerun(medir_memoria: bool = True) -> None:
+    """Start recording a rerun if diagnostics are enabled.
+
+    A rerun interrupted by ``st.rerun()`` never reaches ``finalizar_rerun``;
+    it is closed here and flagged as interrupted.
+
+    Args:
+        medir_memoria: Whether to track allocation deltas with tracemalloc,
+            which then runs only until the rerun is finalized.
+    """
+    anterior: Optional[RegistroRerun] = getattr(_local, "atual", None)
+    _local.atual = None
+    if anterior is not None:
+        resumo = _encerrar(anterior, interrompido=True)
+    if not diagnostico_ativo():
+        return
+    if anterior is not None:
+        _historico().append(resumo)
+    if medir_memoria:
+        _reservar_memoria()
+    _local.atual = RegistroRerun(medir_memoria)
+
+
+def finalizar_rerun(interrompido: bool = False) -> Optional[Dict[str, Any]]:
+    """Stop recording the current rerun and push it into the ring buffer.
+
+    Args:
+        interrompido: Whether the script was cut short (exception,
+            ``st.rerun()`` or ``st.stop()``).
+
+    Returns:
+        The rerun summary, or None when diagnostics are disabled.
+    """
+    atual: Optional[RegistroRerun] = getattr(_local, "atual", None)
+    _local.atual = None
+    if atual is None:
+        return None
+    resumo = _encerrar(atual, interrompido=interrompido)
+    _historico().append(resumo)
+    return resumo
+
+
+@contextmanager
+def rerun_registrado(medir_memoria: bool = True) -> Iterator[None]:
+    """Record the enclosed script body as one rerun.
+
+    The rerun is always finalized, also when the body raises (including
+    Streamlit's rerun/stop exceptions), so memory tracking never outlives
+    it.
+
+    Args:
+        medir_memoria: See iniciar_rerun.
+    """
+    iniciar_rerun(medir_memoria)
+    try:
+        yield
+    except BaseException:
+        finalizar_rerun(interrompido=True)
+        raise
+    finalizar_rerun()
+
+
+@contextmanager
+def medir(nome: str) -> Iterator[None]:
+    """Time a named block inside the current rerun.
+
+    No-op when no rerun is being recorded (diagnostics disabled, tests,
+    headless use).
+
+    Args:
+        nome: Section name shown in the Diagnóstico panel.
+    """
+    atual: Optional[RegistroRerun] = getattr(_local, "atual", None)
+    if atual is None:
+        yield
+        return
+
+    mem0 = _memoria_atual() if atual.medir_memoria else 0
+    nivel = atual._profundidade
+    atual._profundidade += 1
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        duracao = (time.perf_counter() - t0) * 1000
+        atual._profundidade = nivel
+        atual.secoes.append(
+            {
+                "nome": nome,
+                "nivel": nivel,
+                "ms": round(duracao, 2),
+                "mem_kb": (
+                    round((_memoria_atual() - mem0) / 1024, 1) if atual.medir_memoria else None
+                ),
+            }
+        )
+
+
+def instrumentar(func: F) -> F:
+    """Decorate a function so each call is timed as a section named after it.
+
+    Args:
+        func: Function to instrument.
+
+    Returns:
+        Wrapped function with the same signature.
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        with medir(func.__name__):
+            return func(*args, **kwargs)
+
+    return wrapper  # type: ignore[return-value]
+
+
+def historico_reruns() -> List[Dict[str, Any]]:
+    """Return recorded reruns for the current session, oldest first."""
+    return list(st.session_state.get("_diagnostico_reruns", []))
+
+
+def resumo_secoes(reruns: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Aggregate section timings across reruns.
+
+    Args:
+        reruns: Rerun summaries as returned by ``historico_reruns``.
+
+    Returns:
+        One row per section with call count, mean, p95 and max duration (ms)
+        and mean memory delta (KB), sorted by mean duration descending.
+    """
+    por_secao: Dict[str, Dict[str, List[float]]] = {}
+    for rerun in reruns:
+        for secao in rerun.get("secoes", []):
+            dados = por_secao.setdefault(secao["nome"], {"ms": [], "mem": []})
+            dados["ms"].append(float(secao["ms"]))
+            if secao.get("mem_kb") is not None:
+                dados["mem"].append(float(secao["mem_kb"]))
+
+    linhas = []
+    for nome, dados in por_secao.items():
+        tempos = sorted(dados["ms"])
+        idx_p95 = min(len(tempos) - 1, int(round(0.95 * (len(tempos) - 1))))
+        linhas.append(
+            {
+                "Seção": nome,
+                "Chamadas": len(tempos),
+                "Média (ms)": round(sum(tempos) / len(tempos), 2),
+                "P95 (ms)": round(tempos[idx_p95], 2),
+                "Máx (ms)": round(tempos[-1], 2),
+                "Memória média (KB)": (
+                    round(sum(dados["mem"]) / len(dados["mem"]), 1) if dados["mem"] else None
+                ),
+            }
+        )
+    return sorted(linhas, key=lambda linha: linha["Média (ms)"], reverse=True)
+
+
+def exportar_json(reruns: List[Dict[str, Any]]) -> str:
+    """Serialize rerun summaries for download.
+
+    Args:
+        reruns: Rerun summaries to export.
+
+    Returns:
+        JSON string with the raw reruns and the aggregated section summary.
+    """
+    payload = {
+        "gerado_em": datetime.now().isoformat(timespec="seconds"),
+        "reruns": reruns,
+        "resumo": resumo_secoes(reruns),
+    }
+    return json.dumps(payload, indent=2, ensure_ascii=False)
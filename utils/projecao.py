@@ -0,0 +1,260 @@
+"""Cash-flow forecast: monthly balances 12 to 60 months ahead.
+
+Combines what is known about the coming months with what the history says
+about the rest:
+
+- income: recent monthly income, deseasonalized and projected with a
+  factor per calendar month estimated from the history;
+- recurring expenses (``despesas_recorrentes``) and investment
+  contributions (``aporte_mensal``): fixed monthly outflows;
+- debts: the remaining installments of each active debt's PRICE/SAC
+  schedule, so a financing that ends stops weighing on the balance;
+- variable expenses: recent monthly spending minus the fixed outflows
+  above (which the history is assumed to already contain), with the same
+  seasonality treatment as income.
+
+Every month is computed at once with numpy arrays indexed by month; the
+result is shared per data version and forecast inputs (see
+utils.armazenamento).
+"""
+
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from utils import armazenamento
+from utils.finance_models import gerar_cronograma_price, gerar_cronograma_sac
+
+HORIZONTE_PADRAO: int = 12
+HORIZONTE_MAXIMO: int = 60
+
+# Recent complete months that set the income and expense levels.
+MESES_BASE: int = 12
+
+# History needed to estimate seasonality (one full year).
+MIN_MESES_SAZONALIDADE: int = 12
+
+COLUNAS_PROJECAO: List[str] = [
+    "Mes",
+    "Receitas",
+    "DespesasVariaveis",
+    "Recorrentes",
+    "Parcelas",
+    "Aportes",
+    "Fluxo",
+    "Saldo",
+]
+
+
+def _safe_float(value: Any, default: float = 0.0) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def historico_mensal(df: pd.DataFrame) -> pd.DataFrame:
+    """Monthly income and expense totals, with months without data as zero.
+
+    Args:
+        df: Processed transactions (Data, Tipo, ValorAbs).
+
+    Returns:
+        DataFrame indexed by a continuous monthly PeriodIndex with
+        ``Receitas`` and ``Despesas``.
+    """
+    totais = (
+        df.groupby([df["Data"].dt.to_period("M"), "Tipo"])["ValorAbs"].sum().unstack(fill_value=0.0)
+    )
+    meses = pd.period_range(totais.index.min(), totais.index.max(), freq="M")
+    return pd.DataFrame(
+        {
+            "Receitas": totais.get("Receita", 0.0),
+            "Despesas": totais.get("Despesa", 0.0),
+        },
+        index=totais.index,
+    ).reindex(meses, fill_value=0.0)
+
+
+def fatores_sazonais(serie: pd.Series) -> np.ndarray:
+    """Multiplicative factor of each calendar month relative to the mean.
+
+    Factors are shrunk towards 1 by the number of years observed
+    (``anos / (anos + 1)``), so one unusual year cannot dominate. Without
+    MIN_MESES_SAZONALIDADE months of history every factor is 1.
+
+    Args:
+        serie: Monthly totals indexed by a monthly PeriodIndex.
+
+    Returns:
+        Array of 12 factors, January first.
+    """
+    media = serie.mean()
+    if len(serie) < MIN_MESES_SAZONALIDADE or media <= 0:
+        return np.ones(12)
+    por_mes = serie.groupby(serie.index.month).mean().reindex(range(1, 13))
+    anos = len(serie) / 12
+    brutos = (por_mes / media).fillna(1.0).to_numpy(dtype=float)
+    return 1 + (brutos - 1) * anos / (anos + 1)
+
+
+def parcelas_por_mes(dividas: List[Dict[str, Any]], horizonte: int) -> np.ndarray:
+    """Installments due in each forecast month, summed over active debts.
+
+    The first forecast month pays each debt's ``parcela_atual``. Paid-off
+    and invalid debts are ignored.
+
+    Args:
+        dividas: Debt records (``dividas.json``).
+        horizonte: Forecast months.
+
+    Returns:
+        Array of ``horizonte`` amounts.
+    """
+    total = np.zeros(horizonte)
+    for divida in dividas:
+        if str(divida.get("status", "Ativa")).lower() == "quitada":
+            continue
+        gerar = (
+            gerar_cronograma_sac
+            if str(divida.get("sistema", "PRICE")).upper().strip() == "SAC"
+            else gerar_cronograma_price
+        )
+        try:
+            cronograma = gerar(
+                _safe_float(divida.get("valor_principal")),
+                _safe_float(divida.get("taxa_mensal")),
+                int(_safe_float(divida.get("n_parcelas"), 1.0)),
+            )
+        except ValueError:
+            continue
+        inicio = max(int(_safe_float(divida.get("parcela_atual"), 1.0)) - 1, 0)
+        restantes = np.array([p["valor_parcela"] for p in cronograma[inicio:inicio + horizonte]])
+        total[:len(restantes)] += restantes
+    return total
+
+
+def _nivel(serie: pd.Series, fatores: np.ndarray) -> float:
+    """Mean of the last MESES_BASE months with seasonality removed."""
+    recentes = serie.iloc[-MESES_BASE:]
+    return float((recentes.to_numpy() / fatores[recentes.index.month - 1]).mean())
+
+
+def projetar_fluxo(
+    df: pd.DataFrame,
+    dividas: Optional[List[Dict[str, Any]]] = None,
+    investimentos: Optional[List[Dict[str, Any]]] = None,
+    recorrentes: Optional[pd.DataFrame] = None,
+    horizonte: int = HORIZONTE_PADRAO,
+) -> pd.DataFrame:
+    """Project monthly cash flow and balance after the last transaction month.
+
+    The last month of the history is usually incomplete, so the levels come
+    from the MESES_BASE months before it (or from it alone if it is the only
+    one); the starting balance is the sum of every transaction.
+
+    Args:
+        df: Processed transactions (Data, Tipo, Valor, ValorAbs).
+        dividas: Debt records.
+        investimentos: Investment records (``aporte_mensal``).
+        recorrentes: Recurring expenses table (``Valor`` per month).
+        horizonte: Months to project (1 to HORIZONTE_MAXIMO).
+
+    Returns:
+        DataFrame with COLUNAS_PROJECAO, one row per month: ``Mes`` (first
+        day), the projected amounts (outflows positive), ``Fluxo`` (net) and
+        ``Saldo`` (balance at the end of the month).
+
+    Raises:
+        ValueError: If ``horizonte`` is out of range or ``df`` is empty.
+    """
+    if not 1 <= horizonte <= HORIZONTE_MAXIMO:
+        raise ValueError(f"Horizonte deve estar entre 1 e {HORIZONTE_MAXIMO} meses")
+    if df is None or df.empty:
+        raise ValueError("Sem transações para projetar")
+
+    historico = historico_mensal(df)
+    completos = historico.iloc[:-1] if len(historico) > 1 else historico
+    fator_receita = fatores_sazonais(completos["Receitas"])
+    fator_despesa = fatores_sazonais(completos["Despesas"])
+
+    recorrente = 0.0
+    if recorrentes is not None and not recorrentes.empty:
+        recorrente = float(pd.to_numeric(recorrentes["Valor"], errors="coerce").fillna(0).sum())
+    aportes = sum(_safe_float(i.get("aporte_mensal")) for i in investimentos or [])
+    parcelas = parcelas_por_mes(dividas or [], horizonte)
+
+    fixos_atuais = recorrente + aportes + parcelas[0]
+    base_receita = _nivel(completos["Receitas"], fator_receita)
+    base_variavel = max(_nivel(completos["Despesas"], fator_despesa) - fixos_atuais, 0.0)
+
+    meses = pd.period_range(historico.index[-1] + 1, periods=horizonte, freq="M")
+    calendario = meses.month.to_numpy() - 1
+    receitas = base_receita * fator_receita[calendario]
+    variaveis = base_variavel * fator_despesa[calendario]
+    fluxo = receitas - variaveis - recorrente - parcelas - aportes
+    return pd.DataFrame(
+        {
+            "Mes": meses.to_timestamp(),
+            "Receitas": receitas,
+            "DespesasVariaveis": variaveis,
+            "Recorrentes": np.full(horizonte, recorrente),
+            "Parcelas": parcelas,
+            "Aportes": np.full(horizonte, aportes),
+            "Fluxo": fluxo,
+            "Saldo": float(df["Valor"].sum()) + np.cumsum(fluxo),
+        }
+    )[COLUNAS_PROJECAO]
+
+
+def chave_projecao(
+    versao: Optional[str],
+    dividas: List[Dict[str, Any]],
+    investimentos: List[Dict[str, Any]],
+    recorrentes: pd.DataFrame,
+    horizonte: int,
+) -> Optional[str]:
+    """Cache key of a forecast: data version plus every other input.
+
+    Returns:
+        Key string, or None when ``versao`` is None.
+    """
+    if versao is None:
+        return None
+    return "projecao:" + armazenamento.impressao_dados(
+        versao, dividas, investimentos, recorrentes.to_dict("records"), horizonte
+    )
+
+
+def obter_projecao(
+    df: pd.DataFrame,
+    versao: Optional[str],
+    dividas: List[Dict[str, Any]],
+    investimentos: List[Dict[str, Any]],
+    recorrentes: pd.DataFrame,
+    horizonte: int = HORIZONTE_PADRAO,
+) -> pd.DataFrame:
+    """Forecast for a data version, shared across sessions and reruns.
+
+    Args:
+        df: Processed transactions (``st.session_state.df_transacoes``).
+        versao: Data version (``st.session_state.versao_dados``); None
+            disables caching.
+        dividas: Debt records.
+        investimentos: Investment records.
+        recorrentes: Recurring expenses table.
+        horizonte: Months to project.
+
+    Returns:
+        Result of projetar_fluxo.
+    """
+    chave = chave_projecao(versao, dividas, investimentos, recorrentes, horizonte)
+    if chave is None:
+        return projetar_fluxo(df, dividas, investimentos, recorrentes, horizonte)
+    projecao = armazenamento.obter_frame(chave)
+    if projecao is None:
+        projecao = armazenamento.guardar_frame(
+            chave, projetar_fluxo(df, dividas, investimentos, recorrentes, horizonte)
+        )
+    return projecao
@@ -0,0 +1,232 @@
+"""Detection of recurring expenses in the transaction history.
+
+Subscriptions and fixed bills show up in the statements as the same
+merchant, for roughly the same amount, about once a month. The detector
+groups expenses by a merchant key (the normalized description without
+digits and punctuation, so dates, installment numbers and ids do not split
+a merchant), keeps the transactions close to the merchant's median amount
+and scores each group from the statistics of its intervals.
+
+Every step is a grouped, vectorized operation over the whole history (one
+sort plus groupby aggregations), never a pairwise comparison of
+transactions, so multi-year histories are scanned in well under a second.
+Results are shared per data version (see utils.armazenamento).
+"""
+
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from utils import armazenamento, helpers
+
+# Average days in a month.
+DIAS_MES: float = 365.25 / 12
+
+# Relative distance from the merchant's median amount for a transaction to
+# belong to its recurring series.
+TOLERANCIA_VALOR: float = 0.2
+
+# Occurrences needed for a suggestion, and from which more occurrences no
+# longer raise the confidence.
+MIN_OCORRENCIAS: int = 3
+OCORRENCIAS_PLENAS: int = 6
+
+# Suggestions below this confidence are discarded.
+MIN_CONFIANCA: float = 0.5
+
+# Months without an occurrence after which a series counts as cancelled
+# (confidence fades linearly to zero over the following month).
+MESES_INATIVO: float = 1.5
+
+COLUNAS_SUGESTOES: List[str] = [
+    "Descrição",
+    "Valor",
+    "Categoria",
+    "Ocorrencias",
+    "IntervaloMedio",
+    "UltimaData",
+    "Confianca",
+]
+
+
+def _vazio() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "Descrição": pd.Series(dtype=object),
+            "Valor": pd.Series(dtype=float),
+            "Categoria": pd.Series(dtype=object),
+            "Ocorrencias": pd.Series(dtype=int),
+            "IntervaloMedio": pd.Series(dtype=float),
+            "UltimaData": pd.Series(dtype="datetime64[ns]"),
+            "Confianca": pd.Series(dtype=float),
+        }
+    )
+
+
+def chave_comerciante(descricoes: pd.Series) -> pd.Series:
+    """Merchant key: normalized description without digits and punctuation.
+
+    Args:
+        descricoes: Transaction descriptions.
+
+    Returns:
+        Series of keys aligned with ``descricoes`` ("" when nothing is left).
+    """
+    codigos, unicos = pd.factorize(helpers.normalizar_serie(descricoes), use_na_sentinel=False)
+    chaves = (
+        pd.Series(unicos, dtype=object)
+        .str.replace(r"[^a-z]+", " ", regex=True)
+        .str.strip()
+        .to_numpy(dtype=object)
+    )
+    return pd.Series(chaves[codigos], index=descricoes.index, dtype=object)
+
+
+def _mais_frequente(grupos: np.ndarray, valores: np.ndarray) -> pd.Series:
+    """Most frequent value per group (ties: the first in sort order)."""
+    contagem = pd.DataFrame({"grupo": grupos, "valor": valores}).value_counts(sort=False)
+    contagem = contagem.reset_index(name="n").sort_values(
+        ["grupo", "n"], ascending=[True, False], kind="stable"
+    )
+    primeiros = contagem.drop_duplicates("grupo")
+    return pd.Series(primeiros["valor"].to_numpy(), index=primeiros["grupo"].to_numpy())
+
+
+def detectar_recorrentes(
+    df: pd.DataFrame,
+    referencia: Optional[pd.Timestamp] = None,
+    min_ocorrencias: int = MIN_OCORRENCIAS,
+    min_confianca: float = MIN_CONFIANCA,
+) -> pd.DataFrame:
+    """Propose recurring expenses found in the transaction history.
+
+    The confidence of a merchant's series is the product of:
+
+    - cadence: share of consecutive occurrences in consecutive calendar
+      months (bills move a few days around weekends and due dates, so
+      day counts alone would be too strict);
+    - amount stability: 1 - coefficient of variation of its amounts;
+    - support: occurrences, saturating at OCORRENCIAS_PLENAS;
+    - activity: 1 while the last occurrence is at most MESES_INATIVO
+      months before ``referencia``, fading to 0 one month later.
+
+    Args:
+        df: Processed transactions (Data, Descrição, Tipo, Categoria,
+            ValorAbs).
+        referencia: Date the history is observed at (default: the latest
+            transaction).
+        min_ocorrencias: Occurrences needed for a suggestion.
+        min_confianca: Lowest confidence kept.
+
+    Returns:
+        DataFrame with COLUNAS_SUGESTOES, highest confidence first. Valor is
+        the median amount, Descrição and Categoria the most frequent ones of
+        the series and IntervaloMedio the median days between occurrences.
+    """
+    if df is None or df.empty:
+        return _vazio()
+    despesas = df[df["Tipo"].to_numpy() == "Despesa"]
+    if despesas.empty:
+        return _vazio()
+    if referencia is None:
+        referencia = df["Data"].max()
+
+    chaves = chave_comerciante(despesas["Descrição"]).to_numpy()
+    grupos = pd.factorize(chaves)[0]
+    valores = despesas["ValorAbs"].to_numpy(dtype=float)
+    mediana = pd.Series(valores).groupby(grupos).transform("median").to_numpy()
+    na_serie = (chaves != "") & (np.abs(valores - mediana) <= TOLERANCIA_VALOR * mediana)
+
+    base = pd.DataFrame(
+        {
+            "grupo": grupos[na_serie],
+            "dia": despesas["Data"].to_numpy()[na_serie].astype("datetime64[D]"),
+            "Valor": valores[na_serie],
+            "Descrição": despesas["Descrição"].to_numpy()[na_serie],
+            "Categoria": despesas["Categoria"].to_numpy()[na_serie],
+        }
+    ).sort_values(["grupo", "dia"], kind="stable")
+    if base.empty:
+        return _vazio()
+
+    grupo = base["grupo"].to_numpy()
+    dia = base["dia"].to_numpy().astype("datetime64[D]")
+    mes = dia.astype("datetime64[M]").astype(np.int64)
+    mesmo_grupo = grupo[1:] == grupo[:-1]
+    intervalos = pd.DataFrame(
+        {
+            "grupo": grupo[1:][mesmo_grupo],
+            "intervalo": np.diff(dia.astype(np.int64))[mesmo_grupo].astype(float),
+            "mensal": np.diff(mes)[mesmo_grupo] == 1,
+        }
+    )
+    por_intervalo = intervalos.groupby("grupo").agg(
+        IntervaloMedio=("intervalo", "median"), cadencia=("mensal", "mean")
+    )
+    por_valor = base.groupby("grupo").agg(
+        Ocorrencias=("Valor", "size"),
+        Valor=("Valor", "median"),
+        media=("Valor", "mean"),
+        desvio=("Valor", "std"),
+        UltimaData=("dia", "max"),
+    )
+    stats = por_valor.join(por_intervalo, how="inner")
+    stats = stats[stats["Ocorrencias"] >= min_ocorrencias]
+    if stats.empty:
+        return _vazio()
+
+    estabilidade = np.clip(1 - stats["desvio"].fillna(0) / stats["media"], 0, 1)
+    suporte = np.minimum(1, (stats["Ocorrencias"] - 1) / (OCORRENCIAS_PLENAS - 1))
+    atraso = (pd.Timestamp(referencia) - stats["UltimaData"]).dt.days / DIAS_MES
+    atividade = np.clip(MESES_INATIVO + 1 - atraso, 0, 1)
+    stats["Confianca"] = (stats["cadencia"] * estabilidade * suporte * atividade).round(2)
+    stats = stats[stats["Confianca"] >= min_confianca]
+    if stats.empty:
+        return _vazio()
+
+    na_base = np.isin(grupo, stats.index.to_numpy())
+    stats["Descrição"] = _mais_frequente(grupo[na_base], base["Descrição"].to_numpy()[na_base])
+    stats["Categoria"] = _mais_frequente(grupo[na_base], base["Categoria"].to_numpy()[na_base])
+    stats["Valor"] = stats["Valor"].round(2)
+    stats["UltimaData"] = stats["UltimaData"].astype("datetime64[ns]")
+    return (
+        stats.sort_values(["Confianca", "Valor"], ascending=False)[COLUNAS_SUGESTOES]
+        .reset_index(drop=True)
+    )
+
+
+def obter_recorrentes(df: pd.DataFrame, versao: Optional[str]) -> pd.DataFrame:
+    """Suggestions for a data version, shared across sessions and reruns.
+
+    Args:
+        df: Processed transactions (``st.session_state.df_transacoes``).
+        versao: Data version (``st.session_state.versao_dados``); None
+            disables caching.
+
+    Returns:
+        Result of detectar_recorrentes for ``df``.
+    """
+    if versao is None:
+        return detectar_recorrentes(df)
+    chave = f"recorrentes:{versao}"
+    sugestoes = armazenamento.obter_frame(chave)
+    if sugestoes is None:
+        sugestoes = armazenamento.guardar_frame(chave, detectar_recorrentes(df))
+    return sugestoes
+
+
+def nao_cadastradas(sugestoes: pd.DataFrame, cadastradas: pd.DataFrame) -> pd.DataFrame:
+    """Drop suggestions whose merchant is already a registered recurring expense.
+
+    Args:
+        sugestoes: Result of detectar_recorrentes.
+        cadastradas: ``st.session_state.despesas_recorrentes``.
+
+    Returns:
+        The remaining suggestions.
+    """
+    if sugestoes.empty or cadastradas.empty:
+        return sugestoes
+    conhecidas = set(chave_comerciante(cadastradas["Descrição"].dropna().astype(str)))
+    return sugestoes[~chave_comerciante(sugestoes["Descrição"]).isin(conhecidas)]
@@ -0,0 +1,614 @@
+"""Headless reporting engine for Dashboard Financeiro Familiar.
+
+Computes the monthly report shown across the dashboard tabs (KPIs, spending
+by category, 50/30/20 analysis, debts, investments and the storytelling
+text) from the persisted JSON stores, without Streamlit session state. Many
+households (one data directory each) are processed in parallel with a
+process pool, each loaded and processed once for all requested months.
+
+Command line::
+
+    python -m utils.relatorios [DIRETORIO ...] [--mes AAAA-MM ...] [--renda 8000]
+        [--formato json|html] [--saida relatorio.html] [--processos 4]
+"""
+
+import argparse
+import html
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+
+import pandas as pd
+
+from utils import armazenamento, helpers, serializacao
+from utils.finance_models import (
+    calcular_progresso_meta,
+    calcular_rentabilidade,
+    calcular_resumo_divida,
+)
+from utils.processing import montar_transacoes
+
+# --- 50/30/20 rule ---
+# Category → bucket; categories not listed default to "Desejos".
+BUCKETS_PADRAO: Dict[str, str] = {
+    "Moradia": "Necessidades",
+    "Alimentação": "Necessidades",
+    "Saúde": "Necessidades",
+    "Transporte": "Necessidades",
+    "Educação": "Necessidades",
+    "Lazer": "Desejos",
+    "Compras": "Desejos",
+    "Outros": "Desejos",
+    "Receita": "Receita",  # excluded from analysis
+}
+
+LIMITES_5030_20: Dict[str, float] = {
+    "Necessidades": 50.0,
+    "Desejos": 30.0,
+    "Poupança/Dívidas": 20.0,
+}
+
+
+def _safe_float(value: Any, default: float = 0.0) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def mapa_buckets(categorias: Dict[str, List[str]]) -> Dict[str, str]:
+    """Category → 50/30/20 bucket mapping, with user categories as "Desejos".
+
+    Args:
+        categorias: Category → keywords mapping.
+
+    Returns:
+        New mapping dict.
+    """
+    mapping = dict(BUCKETS_PADRAO)
+    for cat in categorias:
+        if cat not in mapping:
+            mapping[cat] = "Desejos"
+    return mapping
+
+
+def calcular_analise_5030_20(
+    renda_liquida: float,
+    df_despesas: pd.DataFrame,
+    bucket_map: Dict[str, str],
+) -> pd.DataFrame:
+    """Compute planned vs. actual spending per 50/30/20 bucket.
+
+    Args:
+        renda_liquida: Monthly net income entered by user.
+        df_despesas: DataFrame with expense transactions for selected month.
+        bucket_map: Category → bucket name mapping.
+
+    Returns:
+        DataFrame with columns: Grupo, Limite (%), Limite (R$), Gasto (R$), Saldo (R$), % Renda.
+    """
+    if renda_liquida <= 0:
+        return pd.DataFrame()
+
+    # Map categories to buckets
+    df = df_despesas.copy()
+    df["Grupo"] = df["Categoria"].map(bucket_map).fillna("Desejos")
+    df = df[df["Grupo"] != "Receita"]
+
+    gastos_por_grupo = df.groupby("Grupo")["ValorAbs"].sum()
+
+    rows = []
+    for bucket, pct in LIMITES_5030_20.items():
+        limite_rs = renda_liquida * pct / 100
+        gasto = gastos_por_grupo.get(bucket, 0.0)
+        saldo = limite_rs - gasto
+        pct_renda = (gasto / renda_liquida) * 100 if renda_liquida > 0 else 0.0
+        rows.append({
+            "Grupo": bucket,
+            "Limite (%)": pct,
+            "Limite (R$)": limite_rs,
+            "Gasto (R$)": gasto,
+            "Saldo (R$)": saldo,
+            "% Renda": pct_renda,
+        })
+
+    return pd.DataFrame(rows)
+
+
+def obter_analise_5030_20(
+    df: pd.DataFrame,
+    versao: Optional[str],
+    mes: str,
+    renda_liquida: float,
+    bucket_map: Dict[str, str],
+) -> pd.DataFrame:
+    """50/30/20 analysis of one month, shared across sessions and reruns.
+
+    Args:
+        df: Processed transactions (``st.session_state.df_transacoes``).
+        versao: Data version (``st.session_state.versao_dados``); None
+            disables caching.
+        mes: Month as ``AAAA-MM``.
+        renda_liquida: Monthly net income.
+        bucket_map: Category → bucket name mapping.
+
+    Returns:
+        Result of calcular_analise_5030_20 for the month's expenses.
+    """
+    def _calcular() -> pd.DataFrame:
+        despesas = df[(df["Tipo"] == "Despesa") & (df["AnoMes"] == mes)]
+        return calcular_analise_5030_20(renda_liquida, despesas, bucket_map)
+
+    if versao is None:
+        return _calcular()
+    chave = "analise:" + armazenamento.impressao_dados(versao, mes, renda_liquida, bucket_map)
+    analise = armazenamento.obter_frame(chave)
+    if analise is None:
+        analise = armazenamento.guardar_frame(chave, _calcular())
+    return analise
+
+
+def resumo_por_pessoa(df: pd.DataFrame) -> pd.DataFrame:
+    """Income, expenses and balance per person.
+
+    Args:
+        df: Processed transactions.
+
+    Returns:
+        DataFrame with columns Pessoa, Receita, Despesa and Saldo (plus any
+        other transaction type), one row per person.
+    """
+    resumo = df.groupby(["Pessoa", "Tipo"])["ValorAbs"].sum().unstack(fill_value=0).reset_index()
+    if "Receita" not in resumo.columns:
+        resumo["Receita"] = 0
+    if "Despesa" not in resumo.columns:
+        resumo["Despesa"] = 0
+    resumo["Saldo"] = resumo["Receita"] - resumo["Despesa"]
+    return resumo
+
+
+def obter_resumo_por_pessoa(df: pd.DataFrame, versao: Optional[str]) -> pd.DataFrame:
+    """Per-person summary for a data version, shared across sessions and reruns.
+
+    Args:
+        df: Processed transactions (``st.session_state.df_transacoes``).
+        versao: Data version; None disables caching.
+
+    Returns:
+        Result of resumo_por_pessoa for ``df``.
+    """
+    if versao is None:
+        return resumo_por_pessoa(df)
+    chave = f"pessoas:{versao}"
+    resumo = armazenamento.obter_frame(chave)
+    if resumo is None:
+        resumo = armazenamento.guardar_frame(chave, resumo_por_pessoa(df))
+    return resumo
+
+
+def gerar_storytelling(
+    df: pd.DataFrame,
+    total_despesas: float,
+    total_receitas: float,
+    historico: Optional[pd.DataFrame] = None,
+) -> str:
+    """Generate dynamic narrative text based on transaction data.
+
+    Args:
+        df: Full transactions DataFrame.
+        total_despesas: Total absolute expenses.
+        total_receitas: Total absolute income.
+        historico: Transactions used for the month-over-month comparison
+            (its last two months); defaults to ``df``.
+
+    Returns:
+        Markdown-formatted narrative string.
+    """
+    lines = []
+    df_desp = df[df["Tipo"] == "Despesa"]
+
+    # Top category
+    if not df_desp.empty:
+        gastos_cat = df_desp.groupby("Categoria")["ValorAbs"].sum()
+        top_cat = gastos_cat.idxmax()
+        top_val = gastos_cat.max()
+        pct_cat = (top_val / total_despesas * 100) if total_despesas > 0 else 0
+        lines.append(
+            f"🔍 Sua maior despesa é **{top_cat}**, representando "
+            f"**{pct_cat:.1f}%** do total gasto (R$ {top_val:,.2f})."
+        )
+
+    # Balance health
+    if total_receitas > 0:
+        taxa_poupanca = ((total_receitas - total_despesas) / total_receitas) * 100
+        if taxa_poupanca >= 20:
+            lines.append(
+                f"✅ Parabéns! Você está poupando **{taxa_poupanca:.1f}%** da sua renda — "
+                "acima da meta de 20% da regra 50/30/20."
+            )
+        elif taxa_poupanca >= 0:
+            lines.append(
+                f"⚠️ Sua taxa de poupança é de **{taxa_poupanca:.1f}%**. "
+                "O ideal é manter acima de 20%."
+            )
+        else:
+            deficit = total_despesas - total_receitas
+            lines.append(
+                f"🚨 Atenção: suas despesas superam a renda em **R$ {deficit:,.2f}**. "
+                "Revise os gastos da categoria com maior peso."
+            )
+
+    # Month-over-month comparison
+    historico = df if historico is None else historico
+    meses = sorted(historico["AnoMes"].unique())
+    if len(meses) >= 2:
+        mes_atual = meses[-1]
+        mes_anterior = meses[-2]
+        despesas = historico[historico["Tipo"] == "Despesa"]
+        desp_atual = despesas.loc[despesas["AnoMes"] == mes_atual, "ValorAbs"].sum()
+        desp_anterior = despesas.loc[despesas["AnoMes"] == mes_anterior, "ValorAbs"].sum()
+        if desp_anterior > 0:
+            variacao = ((desp_atual - desp_anterior) / desp_anterior) * 100
+            if variacao > 0:
+                lines.append(
+                    f"📈 Seus gastos em **{mes_atual}** foram "
+                    f"**{variacao:.1f}% maiores** que em {mes_anterior} "
+                    f"(+R$ {desp_atual - desp_anterior:,.2f})."
+                )
+            else:
+                lines.append(
+                    f"📉 Ótimo! Seus gastos em **{mes_atual}** foram "
+                    f"**{abs(variacao):.1f}% menores** que em {mes_anterior} "
+                    f"(-R$ {desp_anterior - desp_atual:,.2f})."
+                )
+
+    # Top single expense
+    if not df_desp.empty:
+        top_row = df_desp.nlargest(1, "ValorAbs").iloc[0]
+        lines.append(
+            f"💸 Maior transação individual: **{top_row['Descrição']}** "
+            f"(R$ {top_row['ValorAbs']:,.2f})."
+        )
+
+    return "  \n".join(lines) if lines else ""
+
+
+def resumo_dividas(dividas: List[Dict[str, Any]]) -> Dict[str, float]:
+    """Aggregate debt totals with calcular_resumo_divida (invalid debts skipped).
+
+    Args:
+        dividas: Debt records (``dividas.json``).
+
+    Returns:
+        Dict with total_em_dividas, total_pago, total_restante,
+        parcela_mensal_total and qtd_ativas.
+    """
+    resumo = {
+        "total_em_dividas": 0.0,
+        "total_pago": 0.0,
+        "total_restante": 0.0,
+        "parcela_mensal_total": 0.0,
+        "qtd_ativas": 0.0,
+    }
+    for divida in dividas:
+        try:
+            metricas = calcular_resumo_divida(
+                valor_principal=_safe_float(divida.get("valor_principal")),
+                taxa_mensal=_safe_float(divida.get("taxa_mensal")),
+                n_parcelas=int(_safe_float(divida.get("n_parcelas"), 1.0)),
+                parcela_atual=int(_safe_float(divida.get("parcela_atual"), 1.0)),
+                sistema=str(divida.get("sistema", "PRICE")),
+                status=str(divida.get("status", "Ativa")),
+            )
+        except ValueError:
+            continue
+        resumo["total_em_dividas"] += metricas["total_final"]
+        resumo["total_pago"] += metricas["total_pago"]
+        resumo["total_restante"] += metricas["total_restante"]
+        resumo["parcela_mensal_total"] += metricas["parcela_mensal_atual"]
+        if str(divida.get("status", "Ativa")).lower() == "ativa":
+            resumo["qtd_ativas"] += 1
+    return resumo
+
+
+def resumo_investimentos(
+    investimentos: List[Dict[str, Any]], metas_reserva: List[Dict[str, Any]]
+) -> Dict[str, float]:
+    """Aggregate portfolio value, return and average reserve-goal progress.
+
+    Args:
+        investimentos: Investment records (``investimentos.json``).
+        metas_reserva: Reserve goals (``metas_reserva.json``).
+
+    Returns:
+        Dict with patrimonio_atual, total_aplicado, rentabilidade_reais,
+        rentabilidade_percentual and progresso_medio_metas.
+    """
+    total_aplicado = sum(_safe_float(inv.get("valor_aplicado")) for inv in investimentos)
+    patrimonio_atual = sum(_safe_float(inv.get("valor_atual")) for inv in investimentos)
+
+    rentabilidade = (
+        calcular_rentabilidade(total_aplicado, patrimonio_atual)
+        if total_aplicado > 0
+        else {"lucro": 0.0, "rentabilidade_percentual": 0.0}
+    )
+
+    progressos = []
+    for meta in metas_reserva:
+        valor_meta = _safe_float(meta.get("valor_meta"))
+        valor_atual = _safe_float(meta.get("valor_atual"))
+        if valor_meta > 0:
+            try:
+                progressos.append(calcular_progresso_meta(valor_atual, valor_meta))
+            except ValueError:
+                continue
+
+    progresso_medio = sum(progressos) / len(progressos) if progressos else 0.0
+
+    return {
+        "patrimonio_atual": patrimonio_atual,
+        "total_aplicado": total_aplicado,
+        "rentabilidade_reais": rentabilidade["lucro"],
+        "rentabilidade_percentual": rentabilidade["rentabilidade_percentual"],
+        "progresso_medio_metas": progresso_medio,
+    }
+
+
+def carregar_dados(diretorio: str) -> Dict[str, Any]:
+    """Load a household's persisted stores from its data directory.
+
+    Args:
+        diretorio: Directory holding transacoes.json, categorias.json, etc.
+
+    Returns:
+        Dict with transacoes, transacoes_importadas, categorias, dividas,
+        investimentos and metas_reserva (defaults for missing files).
+    """
+    def _caminho(arquivo: str) -> str:
+        return os.path.join(diretorio, arquivo)
+
+    return {
+        "transacoes": helpers.load_json(
+            _caminho(helpers.TRANSACOES_FILE), [], serializacao.decodificar_transacoes
+        ),
+        "transacoes_importadas": helpers.load_json(
+            _caminho(helpers.TRANSACOES_IMPORTADAS_FILE), [], serializacao.decodificar_transacoes
+        ),
+        "categorias": helpers.load_json(
+            _caminho(helpers.CATEGORIES_FILE), helpers.CATEGORIAS_PADRAO
+        ),
+        "dividas": helpers.load_json(_caminho(helpers.DIVIDAS_FILE), []),
+        "investimentos": helpers.load_json(_caminho(helpers.INVESTIMENTOS_FILE), []),
+        "metas_reserva": helpers.load_json(_caminho(helpers.METAS_RESERVA_FILE), []),
+    }
+
+
+def relatorio_mensal(
+    df: pd.DataFrame, mes: str, dados: Dict[str, Any], renda_liquida: float = 0.0
+) -> Dict[str, Any]:
+    """Compute the report of one month.
+
+    Args:
+        df: Processed transactions (see processing.montar_transacoes).
+        mes: Month as ``AAAA-MM``.
+        dados: Stores from carregar_dados (debts, investments, categories).
+        renda_liquida: Monthly net income for the 50/30/20 analysis (0 skips it).
+
+    Returns:
+        JSON-serializable dict: mes, kpis, categorias (largest first),
+        analise_5030_20, dividas, investimentos and storytelling (computed
+        over the month's transactions, compared with the previous month).
+    """
+    df_mes = df[df["AnoMes"] == mes]
+    df_despesas = df_mes[df_mes["Tipo"] == "Despesa"]
+    total_receitas = float(df_mes.loc[df_mes["Tipo"] == "Receita", "ValorAbs"].sum())
+    total_despesas = float(df_despesas["ValorAbs"].sum())
+
+    gastos_cat = df_despesas.groupby("Categoria")["ValorAbs"].sum().sort_values(ascending=False)
+    categorias = [
+        {
+            "categoria": str(cat),
+            "valor": float(valor),
+            "percentual": float(valor / total_despesas * 100) if total_despesas > 0 else 0.0,
+        }
+        for cat, valor in gastos_cat.items()
+    ]
+
+    analise = calcular_analise_5030_20(
+        renda_liquida, df_despesas, mapa_buckets(dados["categorias"])
+    )
+    analise_5030_20 = [
+        {k: (v if isinstance(v, str) else float(v)) for k, v in linha.items()}
+        for linha in analise.to_dict("records")
+    ]
+
+    return {
+        "mes": mes,
+        "kpis": {
+            "receitas": total_receitas,
+            "despesas": total_despesas,
+            "saldo": total_receitas - total_despesas,
+            "transacoes": int(len(df_mes)),
+        },
+        "categorias": categorias,
+        "analise_5030_20": analise_5030_20,
+        "dividas": resumo_dividas(dados["dividas"]),
+        "investimentos": resumo_investimentos(dados["investimentos"], dados["metas_reserva"]),
+        "storytelling": gerar_storytelling(
+            df_mes, total_despesas, total_receitas, historico=df[df["AnoMes"] <= mes]
+        ),
+    }
+
+
+def relatorios_domicilio(
+    diretorio: str, meses: Optional[Sequence[str]] = None, renda_liquida: float = 0.0
+) -> List[Dict[str, Any]]:
+    """Reports of one household; its data is loaded and processed once.
+
+    Args:
+        diretorio: Household data directory.
+        meses: Months (``AAAA-MM``) to report; None reports every month with
+            transactions. Months without data are skipped.
+        renda_liquida: Monthly net income for the 50/30/20 analysis.
+
+    Returns:
+        One report per month, oldest first, each with a ``domicilio`` key
+        (the directory name).
+    """
+    dados = carregar_dados(diretorio)
+    df = montar_transacoes(
+        dados["transacoes"], dados["transacoes_importadas"], dados["categorias"]
+    )
+    if df is None:
+        return []
+
+    disponiveis = set(df["AnoMes"].unique())
+    alvo = sorted(disponiveis if meses is None else disponiveis.intersection(meses))
+    domicilio = os.path.basename(os.path.abspath(diretorio))
+    return [
+        {"domicilio": domicilio, **relatorio_mensal(df, mes, dados, renda_liquida)}
+        for mes in alvo
+    ]
+
+
+def gerar_relatorios(
+    diretorios: Sequence[str],
+    meses: Optional[Sequence[str]] = None,
+    renda_liquida: float = 0.0,
+    processos: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """Reports of many households, one worker process per household.
+
+    Args:
+        diretorios: Household data directories.
+        meses: Months to report (None: all).
+        renda_liquida: Monthly net income for the 50/30/20 analysis.
+        processos: Worker processes (None: CPU count); with one household
+            or ``processos=1`` everything runs in the calling process.
+
+    Returns:
+        Reports in the order of ``diretorios``, then by month.
+    """
+    if processos is None:
+        processos = os.cpu_count() or 1
+    processos = min(processos, len(diretorios))
+    if processos <= 1:
+        lotes = [relatorios_domicilio(d, meses, renda_liquida) for d in diretorios]
+    else:
+        with ProcessPoolExecutor(max_workers=processos) as executor:
+            lotes = list(executor.map(
+                relatorios_domicilio,
+                diretorios,
+                [meses] * len(diretorios),
+                [renda_liquida] * len(diretorios),
+            ))
+    return [relatorio for lote in lotes for relatorio in lote]
+
+
+def _markdown_para_html(texto: str) -> str:
+    texto = html.escape(texto)
+    texto = re.sub(r"\*\*(.+?)\*\*", r"<strong>\1</strong>", texto)
+    return texto.replace("  \n", "<br>\n")
+
+
+def _tabela_html(linhas: List[Dict[str, Any]]) -> str:
+    if not linhas:
+        return ""
+    cabecalho = "".join(f"<th>{html.escape(str(k))}</th>" for k in linhas[0])
+    corpo = "".join(
+        "<tr>" + "".join(
+            f"<td>{v:,.2f}</td>" if isinstance(v, float) else f"<td>{html.escape(str(v))}</td>"
+            for v in linha.values()
+        ) + "</tr>"
+        for linha in linhas
+    )
+    return f"<table><thead><tr>{cabecalho}</tr></thead><tbody>{corpo}</tbody></table>"
+
+
+def renderizar_html(relatorios: List[Dict[str, Any]]) -> str:
+    """Render reports as a standalone HTML document.
+
+    Args:
+        relatorios: Output of gerar_relatorios.
+
+    Returns:
+        HTML document with one section per report.
+    """
+    secoes = []
+    for rel in relatorios:
+        titulo = html.escape(f"{rel.get('domicilio', '')} — {rel['mes']}")
+        partes = [
+            f"<h2>{titulo}</h2>",
+            _tabela_html([rel["kpis"]]),
+            f"<p>{_markdown_para_html(rel['storytelling'])}</p>" if rel["storytelling"] else "",
+            "<h3>Gastos por categoria</h3>",
+            _tabela_html(rel["categorias"]),
+        ]
+        if rel["analise_5030_20"]:
+            partes += ["<h3>Regra 50/30/20</h3>", _tabela_html(rel["analise_5030_20"])]
+        partes += [
+            "<h3>Dívidas</h3>",
+            _tabela_html([rel["dividas"]]),
+            "<h3>Investimentos</h3>",
+            _tabela_html([rel["investimentos"]]),
+        ]
+        secoes.append("<section>" + "\n".join(p for p in partes if p) + "</section>")
+    return (
+        "<!DOCTYPE html>\n<html lang=\"pt-BR\"><head><meta charset=\"utf-8\">"
+        "<title>Relatórios Financeiros</title>"
+        "<style>body{font-family:Inter,Segoe UI,sans-serif;color:#1A1A2E}"
+        "table{border-collapse:collapse;margin:8px 0}"
+        "th,td{border:1px solid #E2E8F0;padding:4px 8px;text-align:right}</style>"
+        "</head><body>\n" + "\n".join(secoes) + "\n</body></html>\n"
+    )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Command-line entry point (see the module docstring).
+
+    Args:
+        argv: Arguments without the program name (default: sys.argv[1:]).
+
+    Returns:
+        Process exit code.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m utils.relatorios",
+        description="Gera relatórios mensais a partir dos arquivos JSON do dashboard.",
+    )
+    parser.add_argument(
+        "diretorios", nargs="*", default=["."],
+        help="Diretórios de dados (um por família). Padrão: diretório atual.",
+    )
+    parser.add_argument(
+        "--mes", action="append", dest="meses", metavar="AAAA-MM",
+        help="Mês a incluir (pode repetir). Padrão: todos os meses com dados.",
+    )
+    parser.add_argument(
+        "--renda", type=float, default=0.0,
+        help="Renda líquida mensal para a análise 50/30/20.",
+    )
+    parser.add_argument("--formato", choices=("json", "html"), default="json")
+    parser.add_argument("--saida", help="Arquivo de saída. Padrão: saída padrão.")
+    parser.add_argument("--processos", type=int, default=None, help="Processos em paralelo.")
+    args = parser.parse_args(argv)
+
+    relatorios = gerar_relatorios(args.diretorios, args.meses, args.renda, args.processos)
+    if args.formato == "html":
+        conteudo = renderizar_html(relatorios).encode("utf-8")
+    else:
+        conteudo = serializacao.dumps(relatorios) + b"\n"
+
+    if args.saida:
+        with open(args.saida, "wb") as f:
+            f.write(conteudo)
+    else:
+        sys.stdout.buffer.write(conteudo)
+        sys.stdout.flush()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
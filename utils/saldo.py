@@ -0,0 +1,210 @@
+"""Daily cumulative-balance series for the dashboard.
+
+The balance chart used to sort every transaction, cumsum them and send one
+point per transaction to the browser. This module aggregates to
+end-of-day balances (one point per day), shares the series per data
+version (see utils.armazenamento), updates it incrementally when
+transactions are added, and downsamples it with LTTB (Largest Triangle
+Three Buckets) to roughly one point per horizontal pixel of the chart.
+"""
+
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from utils import armazenamento
+
+# Points per horizontal pixel kept by the downsampling.
+PONTOS_POR_PIXEL: float = 1.0
+
+# Series shorter than this are never downsampled.
+MIN_PONTOS: int = 100
+
+
+def serie_saldo_diario(df: pd.DataFrame) -> pd.DataFrame:
+    """Aggregate transactions into end-of-day balances.
+
+    Args:
+        df: Transactions with ``Data`` (datetime) and signed ``Valor``.
+
+    Returns:
+        DataFrame with one row per day that has transactions, sorted by
+        date: ``Data``, ``Variacao`` (net amount of the day) and ``Saldo``
+        (balance at the end of the day).
+    """
+    if df.empty:
+        return pd.DataFrame(
+            {
+                "Data": pd.Series(dtype="datetime64[ns]"),
+                "Variacao": pd.Series(dtype=float),
+                "Saldo": pd.Series(dtype=float),
+            }
+        )
+    variacao = df.groupby(df["Data"].dt.normalize(), sort=True)["Valor"].sum()
+    return pd.DataFrame(
+        {
+            "Data": variacao.index.values,
+            "Variacao": variacao.to_numpy(dtype=float),
+            "Saldo": variacao.to_numpy(dtype=float).cumsum(),
+        }
+    )
+
+
+def incorporar_lancamentos(
+    serie: pd.DataFrame, datas: Sequence, valores: Sequence[float]
+) -> pd.DataFrame:
+    """Add transactions to a daily series without recomputing it.
+
+    Only days from the earliest new transaction onwards are touched: new
+    days are inserted in order and the cumulative balance is re-summed from
+    that point.
+
+    Args:
+        serie: Result of serie_saldo_diario (not modified).
+        datas: Dates of the new transactions.
+        valores: Signed amounts of the new transactions.
+
+    Returns:
+        Updated series (a new DataFrame).
+    """
+    if len(datas) == 0:
+        return serie
+    dias_novos = pd.DatetimeIndex(pd.to_datetime(list(datas))).normalize()
+    novos = pd.Series(np.asarray(valores, dtype=float), index=dias_novos)
+    novos = novos.groupby(level=0).sum()
+
+    dias = serie["Data"].to_numpy(dtype="datetime64[ns]")
+    variacao = serie["Variacao"].to_numpy(dtype=float)
+    novos_dias = novos.index.values
+    posicoes = np.searchsorted(dias, novos_dias)
+    existentes = np.zeros(len(novos_dias), dtype=bool)
+    if len(dias):
+        dentro = np.minimum(posicoes, len(dias) - 1)
+        existentes = (posicoes < len(dias)) & (dias[dentro] == novos_dias)
+
+    variacao = variacao.copy()
+    np.add.at(variacao, posicoes[existentes], novos.to_numpy()[existentes])
+    dias = np.insert(dias, posicoes[~existentes], novos_dias[~existentes])
+    variacao = np.insert(variacao, posicoes[~existentes], novos.to_numpy()[~existentes])
+
+    inicio = int(np.searchsorted(dias, novos_dias.min()))
+    saldo = np.empty_like(variacao)
+    saldo[:inicio] = serie["Saldo"].to_numpy(dtype=float)[:inicio]
+    anterior = saldo[inicio - 1] if inicio > 0 else 0.0
+    saldo[inicio:] = anterior + np.cumsum(variacao[inicio:])
+    return pd.DataFrame({"Data": dias, "Variacao": variacao, "Saldo": saldo})
+
+
+def obter_serie_saldo(df: pd.DataFrame, versao: Optional[str]) -> pd.DataFrame:
+    """Daily series for a data version, shared across sessions and reruns.
+
+    Args:
+        df: Processed transactions (``st.session_state.df_transacoes``).
+        versao: Data version (``st.session_state.versao_dados``); None
+            disables caching.
+
+    Returns:
+        Result of serie_saldo_diario for ``df``.
+    """
+    if versao is None:
+        return serie_saldo_diario(df)
+    chave = f"saldo:{versao}"
+    serie = armazenamento.obter_frame(chave)
+    if serie is None:
+        serie = armazenamento.guardar_frame(chave, serie_saldo_diario(df))
+    return serie
+
+
+def propagar_lancamentos(
+    versao_anterior: Optional[str],
+    versao_nova: Optional[str],
+    datas: Sequence,
+    valores: Sequence[float],
+) -> None:
+    """Seed the series of a new data version from the previous one.
+
+    For edits that only add transactions (e.g. a manual entry), the new
+    version's series is derived incrementally instead of re-aggregating all
+    transactions on the next dashboard render. Zero amounts are ignored, as
+    processar_dados drops them.
+
+    Args:
+        versao_anterior: Data version before the edit.
+        versao_nova: Data version after processar_dados.
+        datas: Dates of the added transactions.
+        valores: Signed amounts of the added transactions.
+    """
+    if versao_anterior is None or versao_nova is None or versao_anterior == versao_nova:
+        return
+    anterior = armazenamento.obter_frame(f"saldo:{versao_anterior}")
+    if anterior is None:
+        return
+    pares = [(d, v) for d, v in zip(datas, valores) if v]
+    serie = incorporar_lancamentos(
+        anterior, [d for d, _ in pares], [v for _, v in pares]
+    )
+    armazenamento.guardar_frame(f"saldo:{versao_nova}", serie)
+
+
+def lttb(x: np.ndarray, y: np.ndarray, n: int) -> np.ndarray:
+    """Largest Triangle Three Buckets downsampling.
+
+    Keeps the first and last points and, from each of ``n - 2`` equal
+    buckets in between, the point forming the largest triangle with the
+    previously kept point and the average of the next bucket. Peaks and
+    troughs survive, unlike plain striding or averaging.
+
+    Args:
+        x: Monotonic x values (numeric).
+        y: Y values.
+        n: Number of points to keep.
+
+    Returns:
+        Sorted indices of the kept points.
+    """
+    tamanho = len(x)
+    if n >= tamanho or n < 3:
+        return np.arange(tamanho)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    limites = np.linspace(1, tamanho - 1, n - 1).astype(int)
+    indices = np.empty(n, dtype=int)
+    indices[0], indices[-1] = 0, tamanho - 1
+
+    a = 0
+    for i in range(n - 2):
+        inicio, fim = limites[i], limites[i + 1]
+        prox_inicio, prox_fim = fim, limites[i + 2] if i + 2 < len(limites) else tamanho
+        media_x = x[prox_inicio:prox_fim].mean()
+        media_y = y[prox_inicio:prox_fim].mean()
+        areas = np.abs(
+            (x[a] - media_x) * (y[inicio:fim] - y[a])
+            - (x[a] - x[inicio:fim]) * (media_y - y[a])
+        )
+        a = inicio + int(np.argmax(areas))
+        indices[i + 1] = a
+    return indices
+
+
+def pontos_alvo(largura_px: int, pontos_por_pixel: float = PONTOS_POR_PIXEL) -> int:
+    """Number of points worth drawing on a chart of the given width."""
+    return max(MIN_PONTOS, int(largura_px * pontos_por_pixel))
+
+
+def reduzir_serie(serie: pd.DataFrame, pontos: int) -> pd.DataFrame:
+    """Downsample a daily series with LTTB on (date, balance).
+
+    Args:
+        serie: Result of serie_saldo_diario.
+        pontos: Maximum number of points (see pontos_alvo).
+
+    Returns:
+        The series itself when short enough, else the selected rows.
+    """
+    if len(serie) <= pontos:
+        return serie
+    x = serie["Data"].to_numpy(dtype="datetime64[ns]").astype(np.int64)
+    indices = lttb(x, serie["Saldo"].to_numpy(dtype=float), pontos)
+    return serie.iloc[indices]
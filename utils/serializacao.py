@@ -0,0 +1,229 @@
+"""Pluggable JSON serializer for the local stores.
+
+Uses the fastest library available — orjson, then msgspec — and falls back to
+the standard library, so the app keeps working without the optional
+dependencies. Output is always compact UTF-8 (no indentation, non-ASCII
+characters unescaped), which keeps large transaction files small, and
+non-finite floats (NaN, Infinity) are written as ``null`` by every backend.
+
+The backend can be forced with the ``DFF_JSON`` environment variable
+(``orjson``, ``msgspec`` or ``json``) or with definir_backend().
+"""
+
+import json
+import math
+import os
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypedDict, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    _TEM_ORJSON = False
+else:
+    _TEM_ORJSON = True
+
+try:
+    import msgspec  # type: ignore[import-not-found]
+except ImportError:  # pragma: no cover - optional dependency
+    _TEM_MSGSPEC = False
+else:
+    _TEM_MSGSPEC = True
+
+
+class Transacao(TypedDict, total=False):
+    """Record of ``transacoes.json`` / ``transacoes_importadas.json``.
+
+    ``Valor`` may be a raw string for rows imported from CSV/XLSX; it is
+    parsed by utils.parsing when the data is processed.
+    """
+
+    Data: str
+    Descrição: str
+    Valor: Union[float, str]
+    Pessoa: str
+    Categoria_Manual: Optional[str]
+    FITID: Optional[str]
+    Conta: Optional[str]
+
+
+# Decoding schema: flat records with scalar values. Looser than Transacao on
+# purpose, so fields added by other versions are kept instead of dropped.
+_ESQUEMA_TRANSACOES = List[Dict[str, Union[str, float, None]]]
+
+# Backend signatures: every backend decodes both bytes and str input.
+_Dumps = Callable[[Any], bytes]
+_Loads = Callable[[Union[bytes, str]], Any]
+
+
+def _finitos(data: Any) -> Any:
+    """Copy of ``data`` with NaN/Infinity floats replaced by None."""
+    if isinstance(data, float):
+        return data if math.isfinite(data) else None
+    if isinstance(data, dict):
+        return {k: _finitos(v) for k, v in data.items()}
+    if isinstance(data, (list, tuple)):
+        return [_finitos(v) for v in data]
+    return data
+
+
+def _dumps_json(data: Any) -> bytes:
+    try:
+        texto = json.dumps(data, ensure_ascii=False, separators=(",", ":"), allow_nan=False)
+    except ValueError:
+        # NaN/Infinity are written as null, as orjson and msgspec do, so the
+        # output (and data fingerprints) never depend on the backend
+        texto = json.dumps(_finitos(data), ensure_ascii=False, separators=(",", ":"))
+    return texto.encode("utf-8")
+
+
+def _loads_json(dados: Union[bytes, str]) -> Any:
+    return json.loads(dados)
+
+
+def _criar_orjson() -> Tuple[_Dumps, _Loads]:
+    opcoes = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+    def _dumps(data: Any) -> bytes:
+        try:
+            return orjson.dumps(data, option=opcoes)
+        except TypeError:
+            # e.g. integers beyond 64 bits: let the stdlib handle (or reject) it
+            return _dumps_json(data)
+
+    def _loads(dados: Union[bytes, str]) -> Any:
+        try:
+            return orjson.loads(dados)
+        except orjson.JSONDecodeError:
+            # Files written by the stdlib may hold NaN/Infinity literals
+            return _loads_json(dados)
+
+    return _dumps, _loads
+
+
+def _criar_msgspec() -> Tuple[_Dumps, _Loads]:
+    codificador = msgspec.json.Encoder()
+    decodificador = msgspec.json.Decoder()
+
+    def _dumps(data: Any) -> bytes:
+        try:
+            return codificador.encode(data)
+        except (TypeError, msgspec.EncodeError):
+            return _dumps_json(data)
+
+    def _loads(dados: Union[bytes, str]) -> Any:
+        try:
+            return decodificador.decode(dados)
+        except msgspec.DecodeError:
+            return _loads_json(dados)  # NaN/Infinity literals
+
+    return _dumps, _loads
+
+
+_FABRICAS: Dict[str, Callable[[], Tuple[_Dumps, _Loads]]] = {
+    "json": lambda: (_dumps_json, _loads_json),
+}
+if _TEM_ORJSON:
+    _FABRICAS["orjson"] = _criar_orjson
+if _TEM_MSGSPEC:
+    _FABRICAS["msgspec"] = _criar_msgspec
+
+# Preference order when DFF_JSON is not set.
+_PREFERENCIA = ("orjson", "msgspec", "json")
+
+BACKENDS_DISPONIVEIS: Tuple[str, ...] = tuple(n for n in _PREFERENCIA if n in _FABRICAS)
+
+BACKEND: str = ""
+_dumps: _Dumps = _dumps_json
+_loads: _Loads = _loads_json
+_decodificador_transacoes: Any = None
+
+
+def definir_backend(nome: Optional[str] = None) -> str:
+    """Select the JSON backend.
+
+    Args:
+        nome: ``orjson``, ``msgspec`` or ``json``; None picks the fastest
+            available one.
+
+    Returns:
+        Name of the backend in use.
+
+    Raises:
+        ValueError: If the backend is unknown or not installed.
+    """
+    global BACKEND, _dumps, _loads, _decodificador_transacoes
+    if nome is None:
+        nome = BACKENDS_DISPONIVEIS[0]
+    if nome not in _FABRICAS:
+        raise ValueError(
+            f"Backend JSON indisponível: {nome} (disponíveis: {', '.join(BACKENDS_DISPONIVEIS)})"
+        )
+    _dumps, _loads = _FABRICAS[nome]()
+    _decodificador_transacoes = (
+        msgspec.json.Decoder(_ESQUEMA_TRANSACOES) if nome == "msgspec" else None
+    )
+    BACKEND = nome
+    return nome
+
+
+def dumps(data: Any) -> bytes:
+    """Serialize to compact UTF-8 JSON.
+
+    Args:
+        data: JSON-compatible data (numpy scalars are accepted by orjson).
+
+    Returns:
+        Encoded bytes.
+
+    Raises:
+        TypeError: If the data is not serializable.
+    """
+    return _dumps(data)
+
+
+def loads(dados: Union[bytes, str]) -> Any:
+    """Parse JSON.
+
+    Args:
+        dados: Encoded JSON.
+
+    Returns:
+        Decoded data.
+
+    Raises:
+        ValueError: If the input is not valid JSON.
+    """
+    return _loads(dados)
+
+
+def decodificar_transacoes(dados: Union[bytes, str]) -> List[Transacao]:
+    """Decode a transaction store straight into typed records.
+
+    With msgspec the records are validated (flat objects with string,
+    number or null values; numbers decoded as float) while parsing, without
+    an intermediate generic tree. Other backends parse generically and check
+    the shape. Files that do not match the schema are decoded untyped, so no
+    data is dropped.
+
+    Args:
+        dados: Encoded JSON list of transactions.
+
+    Returns:
+        List of transaction dicts.
+
+    Raises:
+        ValueError: If the input is not valid JSON or not a list of objects.
+    """
+    if _decodificador_transacoes is not None:
+        try:
+            return _decodificador_transacoes.decode(dados)
+        except msgspec.DecodeError:  # includes ValidationError
+            pass
+
+    registros = _loads(dados)
+    if not isinstance(registros, list) or not all(isinstance(r, dict) for r in registros):
+        raise ValueError("Arquivo de transações deve conter uma lista de objetos")
+    return registros
+
+
+definir_backend(os.environ.get("DFF_JSON") or None)
@@ -0,0 +1,134 @@
+"""Read-only, column-projected XLSX loading.
+
+Uses openpyxl's read-only mode, which streams the sheet XML row by row
+instead of materializing the whole workbook. The sidebar first reads a small
+sample for column auto-detection and preview, then streams only the three
+mapped columns when the statement is processed.
+"""
+
+from datetime import date, datetime, time
+from typing import IO, Any, List, Optional, Tuple
+
+import openpyxl
+import pandas as pd
+
+# Rows read for column auto-detection and preview.
+AMOSTRA_LINHAS: int = 50
+
+
+def _abrir(arquivo: IO[bytes]) -> "openpyxl.Workbook":
+    """Open a workbook in streaming (read-only) mode."""
+    if hasattr(arquivo, "seek"):
+        arquivo.seek(0)
+    return openpyxl.load_workbook(arquivo, read_only=True, data_only=True)
+
+
+def _nomes_colunas(cabecalho: Tuple[Any, ...]) -> List[str]:
+    """Name header cells like pandas: blanks become ``Unnamed: i``, repeats get ``.n``."""
+    nomes: List[str] = []
+    vistos: dict = {}
+    for i, valor in enumerate(cabecalho):
+        nome = f"Unnamed: {i}" if valor is None or str(valor).strip() == "" else str(valor)
+        if nome in vistos:
+            vistos[nome] += 1
+            nome = f"{nome}.{vistos[nome]}"
+        else:
+            vistos[nome] = 0
+        nomes.append(nome)
+    return nomes
+
+
+def _valor_celula(valor: Any) -> Any:
+    """Convert date cells to ISO strings so rows stay JSON-serializable."""
+    if isinstance(valor, datetime):
+        if valor.time() == time(0, 0):
+            return valor.date().isoformat()
+        return valor.isoformat(sep=" ")
+    if isinstance(valor, date):
+        return valor.isoformat()
+    return valor
+
+
+def _linha_vazia(linha: Tuple[Any, ...]) -> bool:
+    return all(v is None or (isinstance(v, str) and not v.strip()) for v in linha)
+
+
+def amostrar_xlsx(
+    arquivo: IO[bytes], linhas: int = AMOSTRA_LINHAS
+) -> Tuple[pd.DataFrame, Optional[int]]:
+    """Read the header and the first rows of the active sheet.
+
+    Args:
+        arquivo: Binary file-like object with the workbook.
+        linhas: Maximum number of data rows to read.
+
+    Returns:
+        Tuple ``(amostra, total)`` with a DataFrame of the first rows and the
+        number of data rows declared by the sheet dimensions (None when the
+        file does not declare them).
+    """
+    wb = _abrir(arquivo)
+    try:
+        ws = wb.active
+        linhas_iter = ws.iter_rows(values_only=True)
+        cabecalho = next(linhas_iter, None)
+        if cabecalho is None:
+            return pd.DataFrame(), 0
+        colunas = _nomes_colunas(cabecalho)
+
+        dados: List[List[Any]] = []
+        for linha in linhas_iter:
+            if len(dados) >= linhas:
+                break
+            if not _linha_vazia(linha):
+                dados.append([_valor_celula(v) for v in linha])
+        total = ws.max_row - 1 if ws.max_row is not None else None
+    finally:
+        wb.close()
+
+    largura = len(colunas)
+    dados = [list(linha[:largura]) + [None] * (largura - len(linha)) for linha in dados]
+    return pd.DataFrame(dados, columns=colunas), total
+
+
+def ler_colunas_xlsx(arquivo: IO[bytes], colunas: List[str]) -> pd.DataFrame:
+    """Stream only the given columns of the active sheet.
+
+    Only the cell range spanning the requested columns is materialized,
+    so unused columns cost nothing beyond XML parsing.
+
+    Args:
+        arquivo: Binary file-like object with the workbook.
+        colunas: Header names (as returned by amostrar_xlsx) to read.
+
+    Returns:
+        DataFrame with the requested columns, in the given order. Fully
+        empty rows are skipped.
+
+    Raises:
+        KeyError: If a column is not in the header.
+    """
+    wb = _abrir(arquivo)
+    try:
+        ws = wb.active
+        cabecalho = next(ws.iter_rows(max_row=1, values_only=True), ())
+        nomes = _nomes_colunas(cabecalho)
+        faltando = [c for c in colunas if c not in nomes]
+        if faltando:
+            raise KeyError(f"Colunas não encontradas: {faltando}")
+
+        indices = [nomes.index(c) for c in colunas]
+        primeira, ultima = min(indices), max(indices)
+        posicoes = [i - primeira for i in indices]
+
+        dados = []
+        for linha in ws.iter_rows(
+            min_row=2, min_col=primeira + 1, max_col=ultima + 1, values_only=True
+        ):
+            valores = tuple(linha[p] if p < len(linha) else None for p in posicoes)
+            if not _linha_vazia(valores):
+                dados.append([_valor_celula(v) for v in valores])
+    finally:
+        wb.close()
+
+    return pd.DataFrame(dados, columns=colunas)